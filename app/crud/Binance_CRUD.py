@@ -1,27 +1,195 @@
 from fastapi import HTTPException
-import hmac
-import hashlib
-import time
-import httpx
 import json
 from decouple import config
 from app.schemas.Binance_Schema import OCOOrderRequest
-from binance import AsyncClient, BinanceSocketManager, BinanceWebsocketQueueOverflow
-import datetime
+from app.utils.HTTP_Client import PooledHTTPClient
+from app.utils.Request_Signer import RequestSigner
+from app.utils.Server_Clock import ServerClock
+from app.utils.Rate_Limiter import BinanceRateLimiter
+from app.utils.Stream_Hub import BinanceStreamHub
+from app.utils.Market_Cache import MarketDataCache
+from app.utils.Order_Book import BinanceOrderBooks
+from app.utils.Exit_Engine import ExitEngine
+from app.utils.Trade_Journal import TradeJournal
+from app.utils.Shared_State import SharedState
+from app.utils.User_Data_Stream import AccountState, BinanceUserDataStream
+from app.utils.Order_Store import order_store
+from app.utils.Metrics import metrics, observe_trace
+from binance import AsyncClient, BinanceSocketManager
 import asyncio
+import logging
+import uuid
 
 
+logger = logging.getLogger(__name__)
+
 BINANCE_API_KEY = str(config("BINANCE_API_KEY"))
 BINANCE_API_SECRET = str(config("BINANCE_API_SECRET"))
 BINANCE_BASE_URL = str(config("BINANCE_BASE_URL"))
 
+BINANCE_TIME_SYNC_INTERVAL = config(
+    "BINANCE_TIME_SYNC_INTERVAL", default=60.0, cast=float
+)
+BINANCE_RECV_WINDOW = config("BINANCE_RECV_WINDOW", default=5000, cast=int)
+
+# Estimated Binance server time, re-synced in the background; started by the app lifespan.
+binance_clock = ServerClock(
+    "binance",
+    lambda: get_binance_server_time_ms(),
+    interval=BINANCE_TIME_SYNC_INTERVAL,
+    recv_window=BINANCE_RECV_WINDOW,
+)
+
+# Signs the query string of every signed call with an HMAC key prepared once, and sets its
+# timestamp and recvWindow from the server clock.
+binance_signer = RequestSigner(BINANCE_API_KEY, BINANCE_API_SECRET, binance_clock)
+
+BINANCE_HTTP2 = config("BINANCE_HTTP2", default=True, cast=bool)
+BINANCE_MAX_CONNECTIONS = config("BINANCE_MAX_CONNECTIONS", default=20, cast=int)
+BINANCE_MAX_KEEPALIVE_CONNECTIONS = config(
+    "BINANCE_MAX_KEEPALIVE_CONNECTIONS", default=10, cast=int
+)
+BINANCE_KEEPALIVE_EXPIRY = config("BINANCE_KEEPALIVE_EXPIRY", default=30.0, cast=float)
+BINANCE_TIMEOUT = config("BINANCE_TIMEOUT", default=10.0, cast=float)
+BINANCE_CONNECT_TIMEOUT = config("BINANCE_CONNECT_TIMEOUT", default=5.0, cast=float)
+
+BINANCE_WEIGHT_LIMIT = config("BINANCE_WEIGHT_LIMIT", default=6000, cast=int)
+BINANCE_ORDER_LIMIT_10S = config("BINANCE_ORDER_LIMIT_10S", default=100, cast=int)
+BINANCE_RATE_LIMIT_HEADROOM = config(
+    "BINANCE_RATE_LIMIT_HEADROOM", default=0.1, cast=float
+)
+
+# Every Binance REST call waits for the rate limits here; orders are served before queries.
+binance_rate_limiter = BinanceRateLimiter(
+    weight_limit=BINANCE_WEIGHT_LIMIT,
+    order_limit_10s=BINANCE_ORDER_LIMIT_10S,
+    headroom=BINANCE_RATE_LIMIT_HEADROOM,
+)
+
+# One pooled client shared by every Binance REST call; opened and closed by the app lifespan.
+binance_http = PooledHTTPClient(
+    "binance",
+    max_connections=BINANCE_MAX_CONNECTIONS,
+    max_keepalive_connections=BINANCE_MAX_KEEPALIVE_CONNECTIONS,
+    keepalive_expiry=BINANCE_KEEPALIVE_EXPIRY,
+    timeout=BINANCE_TIMEOUT,
+    connect_timeout=BINANCE_CONNECT_TIMEOUT,
+    http2=BINANCE_HTTP2,
+    rate_limiter=binance_rate_limiter,
+    metrics=metrics,
+    signer=binance_signer,
+)
+
+## USE wss://stream.binance.com:9443/stream FOR REAL DATA, AND wss://testnet.binance.vision/stream FOR TESTING ENVIRONMENTS
+BINANCE_STREAM_URL = str(
+    config(
+        "BINANCE_STREAM_URL",
+        default=(
+            "wss://testnet.binance.vision/stream"
+            if "testnet" in BINANCE_BASE_URL
+            else "wss://stream.binance.com:9443/stream"
+        ),
+    )
+)
+BINANCE_STREAM_QUEUE_SIZE = config("BINANCE_STREAM_QUEUE_SIZE", default=1000, cast=int)
+
+# One combined-stream connection shared by every in-process consumer of Binance market data.
+binance_streams = BinanceStreamHub(
+    BINANCE_STREAM_URL, queue_size=BINANCE_STREAM_QUEUE_SIZE
+)
+
+BINANCE_MARKET_CACHE_SIZE = config("BINANCE_MARKET_CACHE_SIZE", default=1024, cast=int)
+BINANCE_TICKER_TTL = config("BINANCE_TICKER_TTL", default=1.0, cast=float)
+BINANCE_AVG_PRICE_TTL = config("BINANCE_AVG_PRICE_TTL", default=5.0, cast=float)
+BINANCE_24HR_STATS_TTL = config("BINANCE_24HR_STATS_TTL", default=5.0, cast=float)
+
+# Short-lived cache of ticker, average price and 24hr statistics; concurrent requests share one call.
+binance_market_cache = MarketDataCache(
+    {
+        "ticker/price": BINANCE_TICKER_TTL,
+        "avgPrice": BINANCE_AVG_PRICE_TTL,
+        "ticker/24hr": BINANCE_24HR_STATS_TTL,
+    },
+    max_entries=BINANCE_MARKET_CACHE_SIZE,
+)
+
+BINANCE_ORDER_BOOK_DEPTH = config("BINANCE_ORDER_BOOK_DEPTH", default=1000, cast=int)
+BINANCE_ORDER_BOOK_IDLE_TIMEOUT = config(
+    "BINANCE_ORDER_BOOK_IDLE_TIMEOUT", default=300.0, cast=float
+)
+BINANCE_ORDER_BOOK_SYNC_TIMEOUT = config(
+    "BINANCE_ORDER_BOOK_SYNC_TIMEOUT", default=5.0, cast=float
+)
+
+# Local order books kept up to date from the depth diff streams; started on the first request of a symbol.
+binance_order_books = BinanceOrderBooks(
+    binance_streams,
+    lambda symbol, limit: get_binance_order_book_snapshot(symbol, limit),
+    depth=BINANCE_ORDER_BOOK_DEPTH,
+    idle_timeout=BINANCE_ORDER_BOOK_IDLE_TIMEOUT,
+)
+
+# Time from receiving a webhook until the exchange accepted an order placed while handling it.
+webhook_to_order = metrics.histogram(
+    "webhook_to_order_seconds",
+    "Seconds from receiving a webhook until the exchange accepted an order it triggered.",
+    ("exchange",),
+)
+
+TRADE_JOURNAL_PATH = str(config("TRADE_JOURNAL_PATH", default="trade_journal.db"))
+
+# Append-only record of indicators, orders, exchange responses and exits; written in the background.
+trade_journal = TradeJournal(TRADE_JOURNAL_PATH)
+
+MULTI_WORKER = config("MULTI_WORKER", default=False, cast=bool)
+SHARED_STATE_PATH = str(config("SHARED_STATE_PATH", default="shared_state.db"))
+EXIT_LEASE_TTL = config("EXIT_LEASE_TTL", default=10.0, cast=float)
+EXIT_SYNC_INTERVAL = config("EXIT_SYNC_INTERVAL", default=2.0, cast=float)
+EXIT_CLAIM_TIMEOUT = config("EXIT_CLAIM_TIMEOUT", default=120.0, cast=float)
+
+# Positions, symbol leases, webhook keys and stop signals shared by the uvicorn worker processes.
+shared_state = SharedState(SHARED_STATE_PATH) if MULTI_WORKER else None
+
+BINANCE_USER_DATA_STREAM = config("BINANCE_USER_DATA_STREAM", default=True, cast=bool)
+## THE USER DATA STREAM CONNECTS TO <URL>/<listenKey>; DERIVED FROM BINANCE_STREAM_URL BY DEFAULT
+BINANCE_USER_DATA_STREAM_URL = str(
+    config(
+        "BINANCE_USER_DATA_STREAM_URL",
+        default=BINANCE_STREAM_URL.rstrip("/").rsplit("/", 1)[0] + "/ws",
+    )
+)
+BINANCE_LISTEN_KEY_KEEPALIVE_INTERVAL = config(
+    "BINANCE_LISTEN_KEY_KEEPALIVE_INTERVAL", default=1800.0, cast=float
+)
+BINANCE_CLOSED_ORDERS_KEPT = config(
+    "BINANCE_CLOSED_ORDERS_KEPT", default=1000, cast=int
+)
+
+# Orders, fills and balances of the account, kept up to date by the user data stream.
+binance_account_state = AccountState(
+    max_closed_orders=BINANCE_CLOSED_ORDERS_KEPT,
+    max_fills=BINANCE_CLOSED_ORDERS_KEPT,
+    on_order=order_store.record_binance_order,
+)
+
+# Managed user data stream with listenKey renewal and reconnects; started by the app lifespan.
+binance_user_data_stream = BinanceUserDataStream(
+    BINANCE_USER_DATA_STREAM_URL,
+    lambda: start_user_data_stream(),
+    lambda listen_key: keep_user_data_stream_alive(listen_key),
+    lambda: get_binance_account_info(),
+    lambda: fetch_binance_open_orders(),
+    binance_account_state,
+    keepalive_interval=BINANCE_LISTEN_KEY_KEEPALIVE_INTERVAL,
+    # Read from REST: the local state is not synced while the snapshot loads.
+    fetch_order=lambda symbol, order_id: get_binance_order_details(symbol, order_id),
+)
+
 
 ########################################################################################## Signature
 def create_signature(params: dict) -> str:
-    query_string = "&".join([f"{key}={value}" for key, value in params.items()])
-    return hmac.new(
-        BINANCE_API_SECRET.encode(), query_string.encode(), hashlib.sha256
-    ).hexdigest()
+    # Signed calls use binance_signer.url(), which also sends exactly the signed bytes.
+    return binance_signer.signature(binance_signer.encode(params))
 
 
 ########################################################################################## Account Info
@@ -43,15 +211,43 @@ async def get_binance_account_info():
         11 Dec 2024
     """
     endpoint = "/api/v3/account"
-    params = {"timestamp": int(time.time() * 1000)}
-    params["signature"] = create_signature(params)
+    params = {}
     headers = {"X-MBX-APIKEY": BINANCE_API_KEY}
 
-    async with httpx.AsyncClient() as client:
-        response = await client.get(
-            BINANCE_BASE_URL + endpoint, headers=headers, params=params
-        )
+    client = binance_http.client
+    response = await client.get(
+        binance_signer.url(BINANCE_BASE_URL + endpoint, params), headers=headers
+    )
+    if response.status_code == 200:
         return response.json()
+    else:
+        raise HTTPException(
+            status_code=response.status_code, detail=response.json()
+        )
+
+
+########################################################################################### Balances
+async def get_binance_balances():
+    """
+    Fetch the non-zero balances of the account.
+
+    While the user data stream is synced, the balances are read from the local account
+    state without a request; otherwise they are taken from the account information.
+
+    Returns:
+        list: The balances as {"asset", "free", "locked"}.
+
+    Last Reviewed Date:
+        18 Oct 2026
+    """
+    if binance_user_data_stream.synced:
+        return binance_account_state.balances()
+    account = await get_binance_account_info()
+    return [
+        balance
+        for balance in account["balances"]
+        if float(balance["free"]) or float(balance["locked"])
+    ]
 
 
 ########################################################################################### Trading Status
@@ -78,20 +274,19 @@ async def get_binance_trading_status():
         11 Dec 2024
     """
     endpoint = "/api/v3/apiTradingStatus"
-    params = {"timestamp": int(time.time() * 1000)}
-    params["signature"] = create_signature(params)
+    params = {}
     headers = {"X-MBX-APIKEY": BINANCE_API_KEY}
 
-    async with httpx.AsyncClient() as client:
-        response = await client.get(
-            BINANCE_BASE_URL + endpoint, headers=headers, params=params
+    client = binance_http.client
+    response = await client.get(
+        binance_signer.url(BINANCE_BASE_URL + endpoint, params), headers=headers
+    )
+    if response.status_code == 200:
+        return response.json()
+    else:
+        raise HTTPException(
+            status_code=response.status_code, detail=response.json()
         )
-        if response.status_code == 200:
-            return response.json()
-        else:
-            raise HTTPException(
-                status_code=response.status_code, detail=response.json()
-            )
 
 
 ################################################################################################# Avg price
@@ -103,6 +298,9 @@ async def get_binance_avg_price(symbol: str):
     of a trading pair (symbol). The response contains the most recent average
     price for the specified symbol.
 
+    Responses are cached for `BINANCE_AVG_PRICE_TTL` seconds, and concurrent requests
+    for the same symbol share one call to the API.
+
     Args:
         symbol (str): The symbol for which the average price is being queried
         (e.g., "BTCUSDT").
@@ -116,13 +314,14 @@ async def get_binance_avg_price(symbol: str):
         with the corresponding error message is raised.
 
     Last Reviewed Date:
-        11 Dec 2024
+        18 Oct 2026
     """
-    endpoint = "/api/v3/avgPrice"
-    params = {"symbol": symbol}
-    headers = {"X-MBX-APIKEY": BINANCE_API_KEY}
+    async def fetch():
+        endpoint = "/api/v3/avgPrice"
+        params = {"symbol": symbol}
+        headers = {"X-MBX-APIKEY": BINANCE_API_KEY}
 
-    async with httpx.AsyncClient() as client:
+        client = binance_http.client
         response = await client.get(
             BINANCE_BASE_URL + endpoint, headers=headers, params=params
         )
@@ -133,15 +332,82 @@ async def get_binance_avg_price(symbol: str):
                 status_code=response.status_code, detail=response.json()
             )
 
+    return await binance_market_cache.get("avgPrice", symbol.upper(), fetch)
+
 
 ################################################################################################# Show symbol order
 async def get_binance_order_book(symbol: str, limit: int):
+    """
+    Return the order book for a specified symbol from the local order book.
+
+    The local order book of the symbol is bootstrapped from one snapshot and kept up to
+    date from the depth diff stream, so repeated requests do not fetch the depth over
+    REST. The first request of a symbol waits up to `BINANCE_ORDER_BOOK_SYNC_TIMEOUT`
+    seconds for the book to sync. Requests deeper than `BINANCE_ORDER_BOOK_DEPTH`, or
+    made while the book is not synced, are sent to the Binance API instead.
+
+    Args:
+        symbol (str): The symbol for which the order book is being queried (e.g., "BTCUSDT").
+        limit (int): The number of order book entries to return. Common values are 5, 10, 20, 50, 100, 500, and 1000.
+
+    Returns:
+        dict: The order book in the format of the Binance API ("lastUpdateId", "bids" and "asks").
+
+    Raises:
+        HTTPException: If the request is sent to the Binance API and its response status
+        code is not 200.
+
+    Last Reviewed Date:
+        18 Oct 2026
+    """
+    if limit <= BINANCE_ORDER_BOOK_DEPTH:
+        book = await binance_order_books.book(symbol, BINANCE_ORDER_BOOK_SYNC_TIMEOUT)
+        if book is not None:
+            return {"lastUpdateId": book.update_id, **book.depth(limit)}
+    return await get_binance_order_book_snapshot(symbol, limit)
+
+
+async def get_binance_order_book_vwap(symbol: str, side: str, quantity: float):
+    """
+    Calculate the average fill price of a market order against the local order book.
+
+    Args:
+        symbol (str): The symbol of the order (e.g., "BTCUSDT").
+        side (str): "BUY" to walk the asks or "SELL" to walk the bids.
+        quantity (float): The quantity of the order.
+
+    Returns:
+        dict: The best bid and ask, the volume-weighted average price and the quantity the
+        book can fill (less than `quantity` if the book is not deep enough).
+
+    Raises:
+        HTTPException: If the local order book of the symbol did not sync.
+
+    Last Reviewed Date:
+        18 Oct 2026
+    """
+    book = await binance_order_books.book(symbol, BINANCE_ORDER_BOOK_SYNC_TIMEOUT)
+    if book is None:
+        raise HTTPException(
+            status_code=503, detail=f"The order book of {symbol} is not synced"
+        )
+    return {
+        "symbol": book.symbol,
+        "side": side.upper(),
+        "quantity": quantity,
+        **book.top(),
+        **book.vwap(side, quantity),
+    }
+
+
+async def get_binance_order_book_snapshot(symbol: str, limit: int):
     """
     Fetch the order book for a specified symbol from Binance.
 
     This function sends a request to the Binance API to retrieve the order book
     for a specific symbol (trading pair). The response includes the current order
-    book depth for the symbol with the specified limit.
+    book depth for the symbol with the specified limit. It bootstraps the local
+    order books.
 
     Args:
         symbol (str): The symbol for which the order book is being queried (e.g., "BTCUSDT").
@@ -156,22 +422,22 @@ async def get_binance_order_book(symbol: str, limit: int):
         with the corresponding error message is raised.
 
     Last Reviewed Date:
-        11 Dec 2024
+        18 Oct 2026
     """
     endpoint = "/api/v3/depth"
     params = {"symbol": symbol, "limit": limit}
     headers = {"X-MBX-APIKEY": BINANCE_API_KEY}
 
-    async with httpx.AsyncClient() as client:
-        response = await client.get(
-            BINANCE_BASE_URL + endpoint, headers=headers, params=params
+    client = binance_http.client
+    response = await client.get(
+        BINANCE_BASE_URL + endpoint, headers=headers, params=params
+    )
+    if response.status_code == 200:
+        return response.json()
+    else:
+        raise HTTPException(
+            status_code=response.status_code, detail=response.json()
         )
-        if response.status_code == 200:
-            return response.json()
-        else:
-            raise HTTPException(
-                status_code=response.status_code, detail=response.json()
-            )
 
 
 ################################################################################################# Get symbol price
@@ -183,6 +449,10 @@ async def get_binance_price_ticker(symbol: str):
     price ticker for a specified symbol (trading pair). The response includes
     the most recent price for the symbol.
 
+    While a live trade stream of the symbol is consumed in-process, the price of its last
+    trade is returned without a request. Otherwise responses are cached for
+    `BINANCE_TICKER_TTL` seconds, and concurrent requests for the same symbol share one call.
+
     Args:
         symbol (str): The symbol for which the price ticker is being queried (e.g., "BTCUSDT").
 
@@ -195,13 +465,20 @@ async def get_binance_price_ticker(symbol: str):
         with the corresponding error message is raised.
 
     Last Reviewed Date:
-        11 Dec 2024
+        18 Oct 2026
     """
-    endpoint = "/api/v3/ticker/price"
-    params = {"symbol": symbol}
-    headers = {"X-MBX-APIKEY": BINANCE_API_KEY}
-
-    async with httpx.AsyncClient() as client:
+    # A live trade stream of the symbol (e.g. from the exit engine) is fresher than REST.
+    price = binance_streams.last_trade_price(symbol, BINANCE_TICKER_TTL)
+    if price is not None:
+        binance_market_cache.record_stream_hit()
+        return {"symbol": symbol.upper(), "price": price}
+
+    async def fetch():
+        endpoint = "/api/v3/ticker/price"
+        params = {"symbol": symbol}
+        headers = {"X-MBX-APIKEY": BINANCE_API_KEY}
+
+        client = binance_http.client
         response = await client.get(
             BINANCE_BASE_URL + endpoint, headers=headers, params=params
         )
@@ -212,6 +489,65 @@ async def get_binance_price_ticker(symbol: str):
                 status_code=response.status_code, detail=response.json()
             )
 
+    return await binance_market_cache.get("ticker/price", symbol.upper(), fetch)
+
+
+################################################################################################# Get several symbol prices
+async def get_binance_price_tickers(symbols: list) -> dict:
+    """
+    Fetch the current prices of several symbols on Binance in one request.
+
+    Symbols with a live trade stream are answered from their last trade and cached tickers
+    are reused, as in `get_binance_price_ticker`. All remaining symbols are fetched with one
+    `/api/v3/ticker/price?symbols=[...]` request (weight 4, the same as two single-symbol
+    requests), and each price is cached per symbol.
+
+    Args:
+        symbols (list): The symbols whose prices are being queried (e.g., ["BTCUSDT", "ETHUSDT"]).
+
+    Returns:
+        dict: The price of every requested symbol as a float, by upper-case symbol.
+
+    Raises:
+        HTTPException: If the API response status code is not 200 (e.g. an unknown symbol
+        fails the whole request), an exception with the corresponding error message is raised.
+
+    Last Reviewed Date:
+        18 Oct 2026
+    """
+    prices = {}
+    pending = []
+    for symbol in dict.fromkeys(symbol.upper() for symbol in symbols):
+        price = binance_streams.last_trade_price(symbol, BINANCE_TICKER_TTL)
+        if price is not None:
+            binance_market_cache.record_stream_hit()
+            prices[symbol] = float(price)
+        else:
+            pending.append(symbol)
+    if not pending:
+        return prices
+
+    async def fetch_many(missing: list) -> dict:
+        endpoint = "/api/v3/ticker/price"
+        params = {"symbols": json.dumps(missing, separators=(",", ":"))}
+        headers = {"X-MBX-APIKEY": BINANCE_API_KEY}
+
+        client = binance_http.client
+        response = await client.get(
+            BINANCE_BASE_URL + endpoint, headers=headers, params=params
+        )
+        if response.status_code == 200:
+            return {ticker["symbol"]: ticker for ticker in response.json()}
+        else:
+            raise HTTPException(
+                status_code=response.status_code, detail=response.json()
+            )
+
+    tickers = await binance_market_cache.get_many("ticker/price", pending, fetch_many)
+    for symbol, ticker in tickers.items():
+        prices[symbol] = float(ticker["price"])
+    return prices
+
 
 ################################################################################################# Get 24 hour price change statistics
 async def get_binance_24hr_price_change_stats(symbol: str):
@@ -223,6 +559,9 @@ async def get_binance_24hr_price_change_stats(symbol: str):
     such as the price change, price percentage change, high/low prices, and
     other relevant statistics for the last 24 hours.
 
+    Responses are cached for `BINANCE_24HR_STATS_TTL` seconds, and concurrent requests
+    for the same symbol share one call to the API.
+
     Args:
         symbol (str): The symbol for which the 24-hour price change statistics are being queried (e.g., "BTCUSDT").
 
@@ -235,14 +574,14 @@ async def get_binance_24hr_price_change_stats(symbol: str):
         with the corresponding error message is raised.
 
     Last Reviewed Date:
-        11 Dec 2024
+        18 Oct 2026
     """
+    async def fetch():
+        endpoint = "/api/v3/ticker/24hr"
+        params = {"symbol": symbol}
+        headers = {"X-MBX-APIKEY": BINANCE_API_KEY}
 
-    endpoint = "/api/v3/ticker/24hr"
-    params = {"symbol": symbol}
-    headers = {"X-MBX-APIKEY": BINANCE_API_KEY}
-
-    async with httpx.AsyncClient() as client:
+        client = binance_http.client
         response = await client.get(
             BINANCE_BASE_URL + endpoint, headers=headers, params=params
         )
@@ -253,6 +592,8 @@ async def get_binance_24hr_price_change_stats(symbol: str):
                 status_code=response.status_code, detail=response.json()
             )
 
+    return await binance_market_cache.get("ticker/24hr", symbol.upper(), fetch)
+
 
 ################################################################################################# Historic Trades
 async def get_binance_historical_trades(symbol: str, limit: int, from_id: int = None):
@@ -287,32 +628,87 @@ async def get_binance_historical_trades(symbol: str, limit: int, from_id: int =
 
     headers = {"X-MBX-APIKEY": BINANCE_API_KEY}
 
-    async with httpx.AsyncClient() as client:
-        response = await client.get(
-            BINANCE_BASE_URL + endpoint, headers=headers, params=params
+    client = binance_http.client
+    response = await client.get(
+        BINANCE_BASE_URL + endpoint, headers=headers, params=params
+    )
+    if response.status_code == 200:
+        return response.json()
+    else:
+        raise HTTPException(
+            status_code=response.status_code, detail=response.json()
+        )
+
+
+################################################################################################# Klines
+async def get_binance_klines(
+    symbol: str,
+    interval: str,
+    start_time: int = None,
+    end_time: int = None,
+    limit: int = 500,
+):
+    """
+    Fetch kline (candlestick) data for a specified symbol on Binance.
+
+    This function sends a request to the Binance API to retrieve the klines of a symbol
+    for an interval, optionally bounded by a start and end time.
+
+    Args:
+        symbol (str): The symbol for which the klines are being queried (e.g., "BTCUSDT").
+        interval (str): The kline interval (e.g., "1m", "1h", "1d").
+        start_time (Optional[int]): The open time of the first kline, in milliseconds (optional).
+        end_time (Optional[int]): The open time of the last kline, in milliseconds (optional).
+        limit (int): The maximum number of klines to retrieve (up to 1000).
+
+    Returns:
+        list: The klines, oldest first. Each kline is a list of the open time, open, high,
+        low, close, volume, close time, quote volume, number of trades, taker buy base
+        volume and taker buy quote volume.
+
+    Raises:
+        HTTPException: If the API response status code is not 200, an exception
+        with the corresponding error message is raised.
+
+    Last Reviewed Date:
+        18 Oct 2026
+    """
+
+    endpoint = "/api/v3/klines"
+    params = {"symbol": symbol, "interval": interval, "limit": limit}
+    if start_time is not None:
+        params["startTime"] = start_time
+    if end_time is not None:
+        params["endTime"] = end_time
+
+    client = binance_http.client
+    response = await client.get(BINANCE_BASE_URL + endpoint, params=params)
+    if response.status_code == 200:
+        return response.json()
+    else:
+        raise HTTPException(
+            status_code=response.status_code, detail=response.json()
         )
-        if response.status_code == 200:
-            return response.json()
-        else:
-            raise HTTPException(
-                status_code=response.status_code, detail=response.json()
-            )
 
 
 #################################################################################################  Buy Trade Function
-async def Binance_place_order(symbol: str, side: str, quantity: float):
+async def Binance_place_order(
+    symbol: str, side: str, quantity: float, strategy: str = None
+):
     """
     Place a test order on Binance Spot Testnet.
 
     This function sends a request to the Binance API to place a test market order
     on the Binance Spot Testnet. It allows you to specify the symbol, side (buy/sell),
     and quantity for the test order. This test ensures the validity of the API interaction
-    without executing a real trade.
+    without executing a real trade. The order is recorded in the `order_store` under the
+    strategy that placed it.
 
     Args:
         symbol (str): The symbol for the market order (e.g., "BTCUSDT").
         side (str): The side of the order ("BUY" or "SELL").
         quantity (float): The quantity of the asset to buy or sell.
+        strategy (str, optional): The strategy placing the order (e.g., "momentum").
 
     Returns:
         dict: A response indicating that the test order was successfully placed.
@@ -322,7 +718,7 @@ async def Binance_place_order(symbol: str, side: str, quantity: float):
         with the corresponding error message is raised.
 
     Last Reviewed Date:
-        11 Dec 2024
+        18 Oct 2026
     """
 
     endpoint = "/api/v3/order"  # Replace with /api/v3/order/test if you just want to test if the interaction is valid
@@ -333,33 +729,70 @@ async def Binance_place_order(symbol: str, side: str, quantity: float):
         "side": side,
         "type": "MARKET",
         "quantity": quantity,
-        "timestamp": int(time.time() * 1000),
+        # Known before the response, so stream events of the order find its strategy.
+        "newClientOrderId": uuid.uuid4().hex,
     }
-    params["signature"] = create_signature(params)
+    order_store.expect("binance", params["newClientOrderId"], strategy)
 
     headers = {"X-MBX-APIKEY": BINANCE_API_KEY}
 
-    async with httpx.AsyncClient() as client:
-        response = await client.post(url, headers=headers, params=params)
-        if response.status_code == 200:
-            return response.json()
-        else:
-            raise HTTPException(
-                status_code=response.status_code, detail=response.json()
-            )
+    trade_journal.record(
+        "order_request",
+        {"side": side, "type": "MARKET", "quantity": quantity},
+        symbol=symbol,
+    )
+
+    client = binance_http.client
+    response = await client.post(binance_signer.url(url, params), headers=headers)
+    if response.status_code == 200:
+        observe_trace(webhook_to_order, "binance")
+        order = response.json()
+        order_store.record_binance_order(order, strategy)
+        logger.info(
+            "Order placed.",
+            extra={
+                "symbol": symbol,
+                "side": side,
+                "quantity": quantity,
+                "order_id": order.get("orderId"),
+            },
+        )
+        trade_journal.record(
+            "order_response", order, symbol=symbol, order_id=order.get("orderId")
+        )
+        return order
+    else:
+        logger.error(
+            "Order rejected.",
+            extra={
+                "symbol": symbol,
+                "side": side,
+                "status_code": response.status_code,
+                "detail": response.text,
+            },
+        )
+        trade_journal.record(
+            "order_error",
+            {"status_code": response.status_code, "detail": response.json()},
+            symbol=symbol,
+        )
+        raise HTTPException(
+            status_code=response.status_code, detail=response.json()
+        )
 
 
 ################################################################################################### get all open orders by spesific type
-async def Binance_get_open_orders(symbol: str):
+async def Binance_get_open_orders(symbol: str = None):
     """
     Retrieve open orders for a specific symbol on Binance.
 
-    This function sends a request to the Binance API to fetch all open orders
-    for a given trading pair (symbol). The function returns the current active
-    orders that have not been filled or canceled.
+    This function returns the current active orders that have not been filled or
+    canceled for a given trading pair (symbol), or for every symbol if none is given.
+    While the user data stream is synced, the orders are read from the local account
+    state without a request; otherwise they are fetched from the Binance API.
 
     Args:
-        symbol (str): The symbol for which to retrieve open orders (e.g., "BTCUSDT").
+        symbol (str, optional): The symbol for which to retrieve open orders (e.g., "BTCUSDT").
 
     Returns:
         dict: A list of open orders for the specified symbol.
@@ -369,27 +802,49 @@ async def Binance_get_open_orders(symbol: str):
         with the corresponding error message is raised.
 
     Last Reviewed Date:
-        11 Dec 2024
+        18 Oct 2026
+    """
+    if binance_user_data_stream.synced:
+        return binance_account_state.open_orders(symbol)
+    return await fetch_binance_open_orders(symbol)
+
+
+async def fetch_binance_open_orders(symbol: str = None):
+    """
+    Fetch the open orders from the Binance API, of one symbol or of every symbol.
+
+    Without a symbol the request weighs 80 instead of 6; it is made once per user data
+    stream connection to load the open orders.
+
+    Args:
+        symbol (str, optional): The symbol for which to fetch open orders (e.g., "BTCUSDT").
+
+    Returns:
+        list: The open orders.
+
+    Raises:
+        HTTPException: If the API response status code is not 200.
+
+    Last Reviewed Date:
+        18 Oct 2026
     """
 
     endpoint = "/api/v3/openOrders"
     url = BINANCE_BASE_URL + endpoint
 
-    params = {
-        "symbol": symbol,
-        "timestamp": int(time.time() * 1000),
-    }
-    params["signature"] = create_signature(params)
+    params = {}
+    if symbol:
+        params["symbol"] = symbol
     headers = {"X-MBX-APIKEY": BINANCE_API_KEY}
 
-    async with httpx.AsyncClient() as client:
-        response = await client.get(url, headers=headers, params=params)
-        if response.status_code == 200:
-            return response.json()
-        else:
-            raise HTTPException(
-                status_code=response.status_code, detail=response.json()
-            )
+    client = binance_http.client
+    response = await client.get(binance_signer.url(url, params), headers=headers)
+    if response.status_code == 200:
+        return response.json()
+    else:
+        raise HTTPException(
+            status_code=response.status_code, detail=response.json()
+        )
 
 
 ################################################################################################### Get order details by order ID
@@ -401,7 +856,8 @@ async def get_binance_order_details(
 
     This function retrieves information about a specific order on Binance by
     either its `orderId` or `clientOrderId`. If neither is provided, a 400
-    HTTP error is raised.
+    HTTP error is raised. Orders known to the synced user data stream are read
+    from the local account state without a request.
 
     Args:
         symbol (str): The symbol of the order (e.g., "BTCUSDT").
@@ -416,13 +872,12 @@ async def get_binance_order_details(
         neither `orderId` nor `clientOrderId` is provided.
 
     Last Reviewed Date:
-        11 Dec 2024
+        18 Oct 2026
     """
 
     endpoint = "/api/v3/order"
     params = {
         "symbol": symbol,
-        "timestamp": int(time.time() * 1000),
     }
 
     # Include either orderId or clientOrderId
@@ -435,21 +890,24 @@ async def get_binance_order_details(
             status_code=400, detail="Either orderId or clientOrderId must be provided."
         )
 
-    # Generate the signature for authentication
-    params["signature"] = create_signature(params)
+    if binance_user_data_stream.synced:
+        # Orders older than the kept history are not known locally and are fetched below.
+        order = binance_account_state.order(order_id, client_order_id)
+        if order is not None and order["symbol"] == symbol:
+            return order
 
     headers = {"X-MBX-APIKEY": BINANCE_API_KEY}
 
-    async with httpx.AsyncClient() as client:
-        response = await client.get(
-            BINANCE_BASE_URL + endpoint, headers=headers, params=params
+    client = binance_http.client
+    response = await client.get(
+        binance_signer.url(BINANCE_BASE_URL + endpoint, params), headers=headers
+    )
+    if response.status_code == 200:
+        return response.json()
+    else:
+        raise HTTPException(
+            status_code=response.status_code, detail=response.json()
         )
-        if response.status_code == 200:
-            return response.json()
-        else:
-            raise HTTPException(
-                status_code=response.status_code, detail=response.json()
-            )
 
 
 ################################################################################################### cancel open orders
@@ -484,7 +942,6 @@ async def Binance_cancel_order(
 
     params = {
         "symbol": symbol,
-        "timestamp": int(time.time() * 1000),
     }
     # Include either order_id or orig_client_order_id
     if order_id:
@@ -497,17 +954,137 @@ async def Binance_cancel_order(
             detail="Either order_id or orig_client_order_id must be provided.",
         )
 
-    params["signature"] = create_signature(params)
     headers = {"X-MBX-APIKEY": BINANCE_API_KEY}
 
-    async with httpx.AsyncClient() as client:
-        response = await client.delete(url, headers=headers, params=params)
-        if response.status_code == 200:
-            return response.json()
-        else:
-            raise HTTPException(
-                status_code=response.status_code, detail=response.json()
-            )
+    client = binance_http.client
+    response = await client.delete(binance_signer.url(url, params), headers=headers)
+    if response.status_code == 200:
+        return response.json()
+    else:
+        raise HTTPException(
+            status_code=response.status_code, detail=response.json()
+        )
+
+
+################################################################################################### batch orders
+def _batch_result(result) -> dict:
+    # One entry of a batch response: the exchange response, or the error of that order only.
+    if isinstance(result, HTTPException):
+        return {
+            "ok": False,
+            "error": {"status_code": result.status_code, "detail": result.detail},
+        }
+    if isinstance(result, BaseException):
+        return {"ok": False, "error": {"status_code": None, "detail": repr(result)}}
+    return {"ok": True, "result": result}
+
+
+async def Binance_place_orders(orders: list, strategy: str = None):
+    """
+    Place several market orders on Binance at once.
+
+    Binance Spot has no batch order endpoint, so the orders are sent as concurrent requests
+    over the pooled connections. The rate limiter schedules them within the order and
+    request weight limits, ahead of account and market data requests, so a large batch
+    waits for the limits instead of being rejected. Each order is placed, journaled and
+    recorded in the `order_store` as by `Binance_place_order`.
+
+    Args:
+        orders (list): The orders to place (`OrderRequest`: symbol, side and quantity).
+        strategy (str, optional): The strategy placing the orders (e.g., "momentum").
+
+    Returns:
+        list: One result per order, in the order given: {"ok": True, "result": <order>} or
+        {"ok": False, "error": {"status_code": ..., "detail": ...}}. A failed order does not
+        stop the others.
+
+    Last Reviewed Date:
+        18 Oct 2026
+    """
+    results = await asyncio.gather(
+        *(
+            Binance_place_order(order.symbol, order.side, order.quantity, strategy)
+            for order in orders
+        ),
+        return_exceptions=True,
+    )
+    results = [_batch_result(result) for result in results]
+    logger.info(
+        "Batch of orders placed.",
+        extra={
+            "orders": len(results),
+            "failed": sum(1 for result in results if not result["ok"]),
+        },
+    )
+    return results
+
+
+async def Binance_cancel_orders(orders: list):
+    """
+    Cancel several orders on Binance at once.
+
+    Binance Spot has no batch cancel endpoint, so the cancels are sent as concurrent
+    requests, scheduled by the rate limiter like the orders of `Binance_place_orders`.
+    Use `Binance_cancel_all_orders` to cancel every open order of a symbol in one request.
+
+    Args:
+        orders (list): The orders to cancel (`CancelOrder`: symbol, and orderId or clientOrderId).
+
+    Returns:
+        list: One result per order, in the order given: {"ok": True, "result": <cancel response>}
+        or {"ok": False, "error": {"status_code": ..., "detail": ...}}.
+
+    Last Reviewed Date:
+        18 Oct 2026
+    """
+    results = await asyncio.gather(
+        *(
+            Binance_cancel_order(order.symbol, order.orderId, order.clientOrderId)
+            for order in orders
+        ),
+        return_exceptions=True,
+    )
+    return [_batch_result(result) for result in results]
+
+
+async def Binance_cancel_all_orders(symbol: str):
+    """
+    Cancel all open orders of a symbol on Binance, in one request.
+
+    This includes the orders of open OCO order lists.
+
+    Args:
+        symbol (str): The symbol of the orders to cancel (e.g., "BTCUSDT").
+
+    Returns:
+        list: The canceled orders, empty if the symbol had no open orders.
+
+    Raises:
+        HTTPException: If the API response status code is not 200.
+
+    Last Reviewed Date:
+        18 Oct 2026
+    """
+
+    endpoint = "/api/v3/openOrders"
+    url = BINANCE_BASE_URL + endpoint
+
+    params = {"symbol": symbol}
+    headers = {"X-MBX-APIKEY": BINANCE_API_KEY}
+
+    client = binance_http.client
+    response = await client.delete(binance_signer.url(url, params), headers=headers)
+    if response.status_code == 200:
+        canceled = response.json()
+        logger.info(
+            "Open orders canceled.", extra={"symbol": symbol, "orders": len(canceled)}
+        )
+        return canceled
+    detail = response.json()
+    if response.status_code == 400 and detail.get("code") == -2011:
+        # "Unknown order sent.": the symbol has no open orders.
+        return []
+    raise HTTPException(status_code=response.status_code, detail=detail)
 
 
 ################################################################################################## Trading History & Information
@@ -537,20 +1114,18 @@ async def Binance_get_orders(symbol: str):
 
     params = {
         "symbol": symbol,
-        "timestamp": int(time.time() * 1000),
     }
-    params["signature"] = create_signature(params)
 
     headers = {"X-MBX-APIKEY": BINANCE_API_KEY}
 
-    async with httpx.AsyncClient() as client:
-        response = await client.get(url, headers=headers, params=params)
-        if response.status_code == 200:
-            return response.json()
-        else:
-            raise HTTPException(
-                status_code=response.status_code, detail=response.json()
-            )
+    client = binance_http.client
+    response = await client.get(binance_signer.url(url, params), headers=headers)
+    if response.status_code == 200:
+        return response.json()
+    else:
+        raise HTTPException(
+            status_code=response.status_code, detail=response.json()
+        )
 
 
 ############################################################################################### Get recent orders
@@ -583,16 +1158,16 @@ async def get_binance_recent_trades(symbol: str, limit: int):
 
     headers = {"X-MBX-APIKEY": BINANCE_API_KEY}
 
-    async with httpx.AsyncClient() as client:
-        response = await client.get(
-            BINANCE_BASE_URL + endpoint, headers=headers, params=params
+    client = binance_http.client
+    response = await client.get(
+        BINANCE_BASE_URL + endpoint, headers=headers, params=params
+    )
+    if response.status_code == 200:
+        return response.json()
+    else:
+        raise HTTPException(
+            status_code=response.status_code, detail=response.json()
         )
-        if response.status_code == 200:
-            return response.json()
-        else:
-            raise HTTPException(
-                status_code=response.status_code, detail=response.json()
-            )
 
 
 ################################################################################################## User Data Stream
@@ -616,21 +1191,17 @@ async def start_user_data_stream():
     """
 
     endpoint = "/api/v3/userDataStream"
-    params = {
-        # "timestamp": int(time.time() * 1000),
-    }
-    params["signature"] = create_signature(params)
 
     headers = {"X-MBX-APIKEY": BINANCE_API_KEY}
 
-    async with httpx.AsyncClient() as client:
-        response = await client.post(BINANCE_BASE_URL + endpoint, headers=headers)
-        if response.status_code == 200:
-            return response.json()  # Returns the listenKey for the user data stream
-        else:
-            raise HTTPException(
-                status_code=response.status_code, detail=response.json()
-            )
+    client = binance_http.client
+    response = await client.post(BINANCE_BASE_URL + endpoint, headers=headers)
+    if response.status_code == 200:
+        return response.json()  # Returns the listenKey for the user data stream
+    else:
+        raise HTTPException(
+            status_code=response.status_code, detail=response.json()
+        )
 
 
 ############################################################################################### Keep data stream alive
@@ -658,22 +1229,60 @@ async def keep_user_data_stream_alive(listen_key: str):
     endpoint = "/api/v3/userDataStream"
     params = {
         "listenKey": listen_key,
-        "timestamp": int(time.time() * 1000),
     }
-    params["signature"] = create_signature(params)
 
     headers = {"X-MBX-APIKEY": BINANCE_API_KEY}
 
-    async with httpx.AsyncClient() as client:
-        response = await client.put(
-            BINANCE_BASE_URL + endpoint, headers=headers, params=params
+    client = binance_http.client
+    response = await client.put(
+        binance_signer.url(BINANCE_BASE_URL + endpoint, params), headers=headers
+    )
+    if response.status_code == 200:
+        return {"status": "success", "message": "Stream kept alive successfully"}
+    else:
+        raise HTTPException(
+            status_code=response.status_code, detail=response.json()
+        )
+
+
+############################################################################################### Close data stream
+async def close_user_data_stream(listen_key: str):
+    """
+    Close a user data stream on Binance.
+
+    The listenKey is shared by every connection opened with the same API key, so closing
+    it also ends the managed user data stream until it reconnects with a new key.
+
+    Args:
+        listen_key (str): The listenKey of the user data stream.
+
+    Returns:
+        dict: A confirmation message indicating that the stream was closed.
+
+    Raises:
+        HTTPException: If the API response status code is not 200.
+
+    Last Reviewed Date:
+        18 Oct 2026
+    """
+
+    endpoint = "/api/v3/userDataStream"
+    params = {
+        "listenKey": listen_key,
+    }
+
+    headers = {"X-MBX-APIKEY": BINANCE_API_KEY}
+
+    client = binance_http.client
+    response = await client.delete(
+        BINANCE_BASE_URL + endpoint, headers=headers, params=params
+    )
+    if response.status_code == 200:
+        return {"status": "success", "message": "Stream closed successfully"}
+    else:
+        raise HTTPException(
+            status_code=response.status_code, detail=response.json()
         )
-        if response.status_code == 200:
-            return {"status": "success", "message": "Stream kept alive successfully"}
-        else:
-            raise HTTPException(
-                status_code=response.status_code, detail=response.json()
-            )
 
 
 ##################################################################################################
@@ -686,9 +1295,12 @@ async def listen_to_websocket(
     quantity: float,
 ):
     """
-    Listens to a WebSocket for real-time market data and monitors the price to execute a trade strategy.
+    Monitors an open trade and exits it when the price reaches the target or hits the stop loss.
 
-    This function listens to price updates for a specific trading pair and side (buy/sell) for a period of 2 minutes. It monitors the price and triggers trade closure if the price reaches a specified target or hits the stop loss. The target price is calculated based on a momentum strategy (3% gain), and the stop loss is a user-defined price.
+    The trade is registered with the shared `exit_engine`, which watches the trades of the pair
+    through the shared stream hub and triggers the trade closure once a tick crosses one of its
+    exit levels. The target price is calculated based on a momentum strategy (3% gain), and the
+    stop loss is a user-defined price. The trade is monitored until it exits; there is no timeout.
 
     Args:
         trading_pair (str): The trading pair to monitor (e.g., "BTCUSDT").
@@ -698,53 +1310,27 @@ async def listen_to_websocket(
         orderId (str): The unique ID of the order to be monitored.
         quantity (float): The quantity of the asset being traded.
 
-    Raises:
-        Exception: If any error occurs during WebSocket communication.
-        BinanceWebsocketQueueOverflow: If the WebSocket queue overflows.
-
-    Note:
-        The function runs for 2 minutes from the start time, after which it will stop listening.
+    Returns:
+        Position: The monitored position. It is updated in place when the trade exits.
 
     Last Reviewed Date:
-        11 Dec 2024
+        18 Oct 2026
     """
-    client, bm, ts = await create_websocket_connection(trading_pair)
-
-    try:
-        async with ts as tscm:
-            print(f"Listening to WebSocket for {trading_pair}...")
-            start_time = datetime.datetime.now()
-            while datetime.datetime.now() - start_time < datetime.timedelta(minutes=2):
-                res = await tscm.recv()
-                current_price = float(res["p"])
-
-                # Calculate target price for momentum strategy (3% gain)
-                target_price = (
-                    entry_price * 1.03 if side == "BUY" else entry_price * 0.97
-                )
-
-                # Exit conditions
-                if (side == "BUY" and current_price >= target_price) or (
-                    side == "SELL" and current_price <= target_price
-                ):
-                    await close_trade(trading_pair, side, orderId, quantity)
-                    print(f"Target reached. Closing trade at {current_price}.")
-                    break
-
-                if stoploss and (
-                    (side == "BUY" and current_price <= stoploss)
-                    or (side == "SELL" and current_price >= stoploss)
-                ):
-                    await close_trade(trading_pair, side, orderId, quantity)
-                    print(f"Stoploss triggered. Closing trade at {current_price}.")
-                    break
-
-    except Exception as e:
-        print(f"Error while monitoring WebSocket: {e}")
-    except BinanceWebsocketQueueOverflow:
-        print("No sudden change in price.")
-    finally:
-        await delete_websocket_connection(client)
+    position = await exit_engine.add_position(
+        trading_pair, side, entry_price, stoploss, quantity, orderId
+    )
+    logger.info(
+        "Monitoring position.",
+        extra={
+            "position_id": position.position_id,
+            "symbol": trading_pair,
+            "side": side,
+            "order_id": orderId,
+            "target_price": position.target_price,
+            "stoploss": position.stoploss,
+        },
+    )
+    return position
 
 
 async def close_trade(trading_pair: str, side: str, orderId: str, quantity: float):
@@ -752,12 +1338,13 @@ async def close_trade(trading_pair: str, side: str, orderId: str, quantity: floa
     Closes an open trade by placing an opposite side order.
 
     This function closes an open position by placing an order on the opposite side (buy for sell, sell for buy)
-    using the current price. It calls the Binance API to execute the order.
+    using the current price. It calls the Binance API to execute the order. The closing order is
+    recorded under the strategy of the entry order, so the strategy's position nets to zero.
 
     Args:
         trading_pair (str): The trading pair to close the position on (e.g., "BTCUSDT").
         side (str): The side of the open order, either "BUY" or "SELL".
-        orderId (str): The unique ID of the order to close.
+        orderId (str): The unique ID of the entry order of the trade.
         quantity (float): The quantity of the asset to close the position for.
 
     Returns:
@@ -767,21 +1354,42 @@ async def close_trade(trading_pair: str, side: str, orderId: str, quantity: floa
         Exception: If an error occurs while closing the trade.
 
     Last Reviewed Date:
-        11 Dec 2024
+        18 Oct 2026
     """
     opposite_side = (
         "SELL" if side == "BUY" else "BUY"
     )  # For example, close a buy position by selling
+    entry = order_store.order("binance", orderId)
 
     try:
         # Use the current price for the opposite order and place it using Binance API
         response = await Binance_place_order(
-            symbol=trading_pair, side=opposite_side, quantity=quantity
+            symbol=trading_pair,
+            side=opposite_side,
+            quantity=quantity,
+            strategy=entry.strategy if entry is not None else None,
         )  # Quantity may need to match open position size
-        print(f"Trade closed successfully: {response}")
+        logger.info(
+            "Trade closed successfully.",
+            extra={"symbol": trading_pair, "order_id": orderId, "response": response},
+        )
         return response
-    except Exception as e:
-        print(f"Error closing trade {orderId}: {e}")
+    except Exception:
+        logger.exception(
+            "Error closing trade.", extra={"symbol": trading_pair, "order_id": orderId}
+        )
+
+
+# Monitors every open trade; one trade stream per symbol, exits triggered by crossed levels.
+exit_engine = ExitEngine(
+    binance_streams,
+    close_trade,
+    journal=trade_journal,
+    store=shared_state,
+    lease_ttl=EXIT_LEASE_TTL,
+    sync_interval=EXIT_SYNC_INTERVAL,
+    claim_timeout=EXIT_CLAIM_TIMEOUT,
+)
 
 
 async def create_websocket_connection(trading_pair: str):
@@ -826,10 +1434,9 @@ async def delete_websocket_connection(client: AsyncClient):
     """
     try:
         await client.close_connection()
-        print("No sudden change in price.")
-        print("WebSocket connection closed.")
+        logger.info("No sudden change in price. WebSocket connection closed.")
     except Exception as e:
-        print(f"Error closing WebSocket connection: {e}")
+        logger.error("Error closing WebSocket connection: %s", e)
 
 
 async def send_heartbeat(ts):
@@ -851,10 +1458,10 @@ async def send_heartbeat(ts):
     while True:
         try:
             await ts.ping()  # Send a ping message
-            print("Heartbeat sent.")
+            logger.debug("Heartbeat sent.")
             await asyncio.sleep(60)  # Send a heartbeat every 60 seconds
         except Exception as e:
-            print(f"Error sending heartbeat: {e}")
+            logger.error("Error sending heartbeat: %s", e)
             break
 
 
@@ -888,22 +1495,20 @@ async def place_oco_order(order_data: OCOOrderRequest):
         "stopLimitPrice": order_data.stopLimitPrice,
         "stopLimitTimeInForce": order_data.stopLimitTimeInForce,
         "listClientOrderId": order_data.listClientOrderId,
-        "timestamp": int(time.time() * 1000),
     }
-    params["signature"] = create_signature(params)
 
     headers = {"X-MBX-APIKEY": BINANCE_API_KEY}
 
-    async with httpx.AsyncClient() as client:
-        response = await client.post(
-            BINANCE_BASE_URL + endpoint, headers=headers, params=params
+    client = binance_http.client
+    response = await client.post(
+        binance_signer.url(BINANCE_BASE_URL + endpoint, params), headers=headers
+    )
+    if response.status_code == 200:
+        return response.json()
+    else:
+        raise HTTPException(
+            status_code=response.status_code, detail=response.json()
         )
-        if response.status_code == 200:
-            return response.json()
-        else:
-            raise HTTPException(
-                status_code=response.status_code, detail=response.json()
-            )
 
 
 ################################################################################################## Get system Status
@@ -927,20 +1532,30 @@ async def get_system_time():
     endpoint = "/api/v3/time"
     headers = {"X-MBX-APIKEY": BINANCE_API_KEY}
 
-    async with httpx.AsyncClient() as client:
-        response = await client.get(BINANCE_BASE_URL + endpoint, headers=headers)
-        if response.status_code == 200:
-            try:
-                return response.json()
-            except json.JSONDecodeError:
-                raise HTTPException(
-                    status_code=500,
-                    detail="Received invalid JSON response from Binance.",
-                )
-        else:
-            try:
-                error_detail = response.json()
-            except json.JSONDecodeError:
-                error_detail = response.text or "No response content"
+    client = binance_http.client
+    response = await client.get(BINANCE_BASE_URL + endpoint, headers=headers)
+    if response.status_code == 200:
+        try:
+            return response.json()
+        except json.JSONDecodeError:
+            raise HTTPException(
+                status_code=500,
+                detail="Received invalid JSON response from Binance.",
+            )
+    else:
+        try:
+            error_detail = response.json()
+        except json.JSONDecodeError:
+            error_detail = response.text or "No response content"
+
+        raise HTTPException(status_code=response.status_code, detail=error_detail)
 
-            raise HTTPException(status_code=response.status_code, detail=error_detail)
+
+async def get_binance_server_time_ms() -> int:
+    """
+    Return the Binance server time in milliseconds. Sampled by the `binance_clock`.
+
+    Last Reviewed Date:
+        18 Oct 2026
+    """
+    return (await get_system_time())["serverTime"]
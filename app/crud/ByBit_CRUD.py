@@ -2,11 +2,25 @@ from decouple import config
 from pybit.exceptions import InvalidRequestError
 from pybit.unified_trading import HTTP
 from app.schemas.Bybit_Schema import *
-from pybit.unified_trading import WebSocket
-from time import sleep
+from app.utils.Blocking_Executor import BoundedExecutor
+from app.utils.Rate_Limiter import BybitRateLimiter
+from app.utils.Order_Book import BybitOrderBooks
+from app.utils.Server_Clock import ServerClock
+from app.utils.Stream_Hub import BybitStreamHub
+from app.utils.Metrics import metrics, observe_trace
+from app.utils.Order_Store import order_store
+from app.utils.Structured_Logging import TICK_LOGGER
+from requests.adapters import HTTPAdapter
+from urllib.parse import urlsplit
+import time
+import uuid
 import asyncio
+import logging
 
 
+logger = logging.getLogger(__name__)
+tick_logger = logging.getLogger(TICK_LOGGER)
+
 BYBIT_API_KEY = str(config("BYBIT_API_KEY"))
 BYBIT_API_SECRET = str(config("BYBIT_API_SECRET"))
 BYBIT_BASE_URL = str(config("BYBIT_BASE_URL"))
@@ -16,8 +30,139 @@ session = HTTP(
     api_key=BYBIT_API_KEY,
     api_secret=BYBIT_API_SECRET,
 )
+# pybit derives its endpoint from `testnet`; send every request to the configured BYBIT_BASE_URL instead.
+session.endpoint = BYBIT_BASE_URL.rstrip("/")
+
+BYBIT_MAX_WORKERS = config("BYBIT_MAX_WORKERS", default=8, cast=int)
+BYBIT_PER_CALL_LIMIT = config("BYBIT_PER_CALL_LIMIT", default=4, cast=int)
+
+BYBIT_REQUESTS_PER_5S = config("BYBIT_REQUESTS_PER_5S", default=600, cast=int)
+BYBIT_ORDERS_PER_SECOND = config("BYBIT_ORDERS_PER_SECOND", default=10, cast=int)
+BYBIT_RATE_LIMIT_HEADROOM = config("BYBIT_RATE_LIMIT_HEADROOM", default=0.1, cast=float)
+
+# Every Bybit call waits for the rate limits here; orders are served before queries.
+bybit_rate_limiter = BybitRateLimiter(
+    requests_per_5s=BYBIT_REQUESTS_PER_5S,
+    orders_per_second=BYBIT_ORDERS_PER_SECOND,
+    headroom=BYBIT_RATE_LIMIT_HEADROOM,
+)
+
+# pybit is synchronous, so every session call runs on this bounded executor instead of the event loop.
+bybit_executor = BoundedExecutor(
+    "bybit",
+    max_workers=BYBIT_MAX_WORKERS,
+    per_call_limit=BYBIT_PER_CALL_LIMIT,
+    rate_limiter=bybit_rate_limiter,
+    metrics=metrics,
+)
+
+# Time from receiving a webhook until the exchange accepted an order placed while handling it.
+webhook_to_order = metrics.histogram(
+    "webhook_to_order_seconds",
+    "Seconds from receiving a webhook until the exchange accepted an order it triggered.",
+    ("exchange",),
+)
+
+BYBIT_TIME_SYNC_INTERVAL = config("BYBIT_TIME_SYNC_INTERVAL", default=60.0, cast=float)
+BYBIT_RECV_WINDOW = config("BYBIT_RECV_WINDOW", default=5000, cast=int)
+
+
+def apply_bybit_clock(clock: ServerClock):
+    # pybit reads the receive window from the session on every signed request.
+    session.recv_window = clock.recv_window
+
+
+class BybitClockAdapter(HTTPAdapter):
+    """
+    Transport adapter of the pybit session that stamps every signed request with the
+    estimated Bybit server time, and signs it again with pybit's own signing, just before
+    it is sent.
+
+    pybit takes the request timestamp from a module-wide helper; stamping the requests in
+    the adapter of this session keeps the server clock to the requests of this session.
+
+    Last Reviewed Date:
+        18 Oct 2026
+    """
+
+    def __init__(self, http: HTTP, clock: ServerClock):
+        super().__init__()
+        self.http = http
+        self.clock = clock
+
+    def send(self, request, **kwargs):
+        if "X-BAPI-TIMESTAMP" in request.headers:
+            payload = (
+                urlsplit(request.url).query if request.method == "GET" else request.body
+            )
+            if isinstance(payload, bytes):
+                payload = payload.decode()
+            timestamp = self.clock.now_ms()
+            request.headers["X-BAPI-TIMESTAMP"] = str(timestamp)
+            request.headers["X-BAPI-SIGN"] = self.http._auth(
+                payload=payload or "",
+                recv_window=request.headers["X-BAPI-RECV-WINDOW"],
+                timestamp=timestamp,
+            )
+        return super().send(request, **kwargs)
+
+
+# Estimated Bybit server time, re-synced in the background; started by the app lifespan.
+bybit_clock = ServerClock(
+    "bybit",
+    lambda: get_bybit_server_time_ms(),
+    interval=BYBIT_TIME_SYNC_INTERVAL,
+    recv_window=BYBIT_RECV_WINDOW,
+    on_sync=apply_bybit_clock,
+)
+# pybit has no hook for the request timestamp; the session's own adapter sets it instead.
+session.client.mount(session.endpoint, BybitClockAdapter(session, bybit_clock))
+apply_bybit_clock(bybit_clock)
+
+## USE wss://stream.bybit.com/v5/public FOR REAL DATA, AND wss://stream-testnet.bybit.com/v5/public FOR TESTING ENVIRONMENTS
+BYBIT_PUBLIC_STREAM_URL = str(
+    config(
+        "BYBIT_PUBLIC_STREAM_URL", default="wss://stream-testnet.bybit.com/v5/public"
+    )
+)
+BYBIT_ORDER_BOOK_DEPTH = config("BYBIT_ORDER_BOOK_DEPTH", default=200, cast=int)
+BYBIT_ORDER_BOOK_IDLE_TIMEOUT = config(
+    "BYBIT_ORDER_BOOK_IDLE_TIMEOUT", default=300.0, cast=float
+)
+BYBIT_ORDER_BOOK_SYNC_TIMEOUT = config(
+    "BYBIT_ORDER_BOOK_SYNC_TIMEOUT", default=5.0, cast=float
+)
+# The categories with an order book stream of BYBIT_ORDER_BOOK_DEPTH levels; others use REST.
+BYBIT_ORDER_BOOK_CATEGORIES = ("spot", "linear", "inverse")
+# The number of levels the Bybit API returns when no limit is given.
+BYBIT_ORDER_BOOK_DEFAULT_LIMITS = {"spot": 1, "linear": 25, "inverse": 25}
+
+# Local order books kept up to date from the public order book streams; started on the first request.
+bybit_order_books = BybitOrderBooks(
+    BYBIT_PUBLIC_STREAM_URL,
+    depth=BYBIT_ORDER_BOOK_DEPTH,
+    idle_timeout=BYBIT_ORDER_BOOK_IDLE_TIMEOUT,
+)
 
-stop_event = asyncio.Event()
+## USE wss://stream.bybit.com/v5/private FOR REAL DATA, AND wss://stream-testnet.bybit.com/v5/private FOR TESTING ENVIRONMENTS
+BYBIT_PRIVATE_STREAM_URL = str(
+    config(
+        "BYBIT_PRIVATE_STREAM_URL",
+        default="wss://stream-testnet.bybit.com/v5/private",
+    )
+)
+BYBIT_STREAM_QUEUE_SIZE = config("BYBIT_STREAM_QUEUE_SIZE", default=1000, cast=int)
+BYBIT_ORDER_STREAM = config("BYBIT_ORDER_STREAM", default=True, cast=bool)
+
+# Public and private Bybit streams read on the event loop: one connection per channel carries every topic.
+bybit_streams = BybitStreamHub(
+    BYBIT_PUBLIC_STREAM_URL,
+    BYBIT_PRIVATE_STREAM_URL,
+    BYBIT_API_KEY,
+    BYBIT_API_SECRET,
+    now_ms=bybit_clock.now_ms,
+    queue_size=BYBIT_STREAM_QUEUE_SIZE,
+)
 
 
 ############################################################################### Account and Wallet Management:
@@ -35,7 +180,7 @@ async def get_account_info_f():
         11 Dec 2024
     """
     try:
-        balance = session.get_account_info()
+        balance = await bybit_executor.run(session.get_account_info)
         return balance
     except InvalidRequestError as e:
         return f"Invalid request error: {str(e)}"
@@ -63,8 +208,10 @@ async def get_wallet_balance_f(coin: CoinType):
         11 Dec 2024
     """
     try:
-        balance = session.get_wallet_balance(
-            accountType="UNIFIED", coin=coin if coin else None
+        balance = await bybit_executor.run(
+            session.get_wallet_balance,
+            accountType="UNIFIED",
+            coin=coin if coin else None,
         )
 
         return balance
@@ -94,8 +241,8 @@ async def get_account_funding_f(coin: CoinType):
         11 Dec 2024
     """
     try:
-        balance = session.get_coins_balance(
-            accountType="FUND", coin=coin if coin else None
+        balance = await bybit_executor.run(
+            session.get_coins_balance, accountType="FUND", coin=coin if coin else None
         )
         return balance
     except InvalidRequestError as e:
@@ -125,7 +272,9 @@ async def get_user_trading_fee_f(symbol: SymbolType):
         11 Dec 2024
     """
     try:
-        response = session.get_fee_rates(symbol=symbol if symbol else None)
+        response = await bybit_executor.run(
+            session.get_fee_rates, symbol=symbol if symbol else None
+        )
 
         return response
     except InvalidRequestError as e:
@@ -133,7 +282,7 @@ async def get_user_trading_fee_f(symbol: SymbolType):
 
 
 ############################################################################### Order Management:
-async def place_order_f(order: PlaceOrderRequest):
+async def place_order_f(order: PlaceOrderRequest, strategy: str = None):
     """
     Place a new order on Bybit.
 
@@ -141,7 +290,8 @@ async def place_order_f(order: PlaceOrderRequest):
     on the provided parameters. The order can include optional fields for
     advanced configurations such as price, time-in-force, and leverage settings.
     It gracefully handles `InvalidRequestError` exceptions, returning a descriptive
-    error message when the request fails.
+    error message when the request fails. The order is recorded in the `order_store`
+    under the strategy that placed it, and an `orderLinkId` is generated when none is given.
 
     Args:
         order:
@@ -158,15 +308,20 @@ async def place_order_f(order: PlaceOrderRequest):
             - `orderLinkId` (Optional[str]): A unique identifier for the order (optional).
             - `isLeverage` (Optional[int]): Whether the order uses leverage (1 for true, 0 for false).
             - `orderFilter` (Optional[str]): Order filter for advanced configurations.
+        strategy (str, optional): The strategy placing the order (e.g., "momentum").
 
     Returns:
         dict: The response from the Bybit API if the order is placed successfully.
 
     Last Reviewed Date:
-        11 Dec 2024
+        18 Oct 2026
     """
+    # Known before the response, so "order" stream events of the order find its strategy.
+    order_link_id = order.orderLinkId or uuid.uuid4().hex
+    order_store.expect("bybit", order_link_id, strategy)
     try:
-        response = session.place_order(
+        response = await bybit_executor.run(
+            session.place_order,
             category=order.category,
             symbol=order.symbol,
             side=order.side,
@@ -174,10 +329,22 @@ async def place_order_f(order: PlaceOrderRequest):
             qty=order.qty,
             price=order.price if order.price else None,
             timeInForce=order.timeInForce if order.price else None,
-            orderLinkId=order.orderLinkId if order.price else None,
+            orderLinkId=order_link_id,
             isLeverage=order.isLeverage if order.price else None,
             orderFilter=order.orderFilter if order.price else None,
         )
+        observe_trace(webhook_to_order, "bybit")
+        order_store.record(
+            "bybit",
+            response["result"]["orderId"],
+            order.symbol,
+            order.side,
+            "New",
+            quantity=float(order.qty),
+            client_order_id=order_link_id,
+            order_type=order.orderType,
+            strategy=strategy,
+        )
 
         return response
     except InvalidRequestError as e:
@@ -217,7 +384,8 @@ async def cancel_order_f(cancelorder: CancelOrder):
         11 Dec 2024
     """
     try:
-        response = session.cancel_order(
+        response = await bybit_executor.run(
+            session.cancel_order,
             category=cancelorder.category,
             symbol=cancelorder.symbol,
             orderId=cancelorder.orderId if cancelorder.orderId else None,
@@ -229,6 +397,222 @@ async def cancel_order_f(cancelorder: CancelOrder):
         return f"Invalid request error: {str(e)}"
 
 
+# The maximum number of orders of one batch call, by category.
+BYBIT_BATCH_ORDER_LIMITS = {"spot": 10, "linear": 20, "inverse": 20, "option": 20}
+
+
+def _batches(items: list, key) -> list:
+    # Split (index, item) pairs into batches of one category, of at most the category limit.
+    by_category = {}
+    for index, item in items:
+        by_category.setdefault(key(item), []).append((index, item))
+    return [
+        (category, group[start : start + BYBIT_BATCH_ORDER_LIMITS.get(category, 10)])
+        for category, group in by_category.items()
+        for start in range(0, len(group), BYBIT_BATCH_ORDER_LIMITS.get(category, 10))
+    ]
+
+
+async def _run_batch(call, category: str, batch: list, requests: list, results: list):
+    # One batch call; fills the results of its orders from the per-order codes of retExtInfo.
+    try:
+        response = await bybit_executor.run(
+            call,
+            category=category,
+            request=requests,
+            rate_limit_weight=len(requests),
+        )
+    except Exception as e:
+        # A failed call (rejected, timed out, network error) fails only the orders of its
+        # batch; the other batches keep their results, so placed orders are still recorded.
+        if not isinstance(e, InvalidRequestError):
+            logger.warning("Bybit batch call failed for %d orders: %s", len(batch), e)
+        for index, _ in batch:
+            results[index] = {
+                "ok": False,
+                "error": {
+                    "code": getattr(e, "status_code", None),
+                    "msg": getattr(e, "message", None) or str(e) or type(e).__name__,
+                },
+            }
+        return
+    items = response["result"].get("list") or []
+    codes = response["retExtInfo"].get("list") or [{"code": 0, "msg": "OK"}] * len(items)
+    for index, _ in batch:
+        results[index] = {"ok": False, "error": {"code": None, "msg": "No result."}}
+    for (index, _), item, code in zip(batch, items, codes):
+        if code["code"] == 0:
+            results[index] = {"ok": True, "result": item}
+        else:
+            results[index] = {"ok": False, "error": code}
+
+
+async def place_batch_order_f(batch: BatchPlaceOrderRequest, strategy: str = None):
+    """
+    Place several orders on Bybit with the batch order API.
+
+    The orders are grouped by category and sent in batch calls of at most 10 (spot) or 20
+    (linear, inverse, option) orders; the batch calls run concurrently. Every order takes a
+    token of the order rate limit. As with `place_order_f`, each order gets an `orderLinkId`
+    when none is given and is recorded in the `order_store` under the strategy that placed it.
+
+    Args:
+        batch:
+            An instance of the `BatchPlaceOrderRequest` class containing the orders
+            (`PlaceOrderRequest`) to place.
+        strategy (str, optional): The strategy placing the orders (e.g., "momentum").
+
+    Returns:
+        list: One result per order, in the order given: {"ok": True, "result": {"orderId": ...,
+        "orderLinkId": ...}} or {"ok": False, "error": {"code": ..., "msg": ...}}. A rejected
+        order does not stop the others.
+
+    Last Reviewed Date:
+        18 Oct 2026
+    """
+    orders = []
+    for order in batch.orders:
+        order_link_id = order.orderLinkId or uuid.uuid4().hex
+        order_store.expect("bybit", order_link_id, strategy)
+        orders.append(order.model_copy(update={"orderLinkId": order_link_id}))
+
+    results = [None] * len(orders)
+    calls = []
+    for category, group in _batches(list(enumerate(orders)), lambda order: order.category):
+        requests = [
+            {
+                key: value
+                for key, value in {
+                    "symbol": order.symbol,
+                    "side": order.side,
+                    "orderType": order.orderType,
+                    "qty": order.qty,
+                    "price": order.price,
+                    "timeInForce": order.timeInForce if order.price else None,
+                    "orderLinkId": order.orderLinkId,
+                    "isLeverage": order.isLeverage if order.price else None,
+                    "orderFilter": order.orderFilter if order.price else None,
+                }.items()
+                if value is not None
+            }
+            for _, order in group
+        ]
+        calls.append(
+            _run_batch(session.place_batch_order, category, group, requests, results)
+        )
+    await asyncio.gather(*calls)
+
+    for order, result in zip(orders, results):
+        if result["ok"]:
+            order_store.record(
+                "bybit",
+                result["result"]["orderId"],
+                order.symbol,
+                order.side,
+                "New",
+                quantity=float(order.qty),
+                client_order_id=order.orderLinkId,
+                order_type=order.orderType,
+                strategy=strategy,
+            )
+    if any(result["ok"] for result in results):
+        observe_trace(webhook_to_order, "bybit")
+    logger.info(
+        "Batch of orders placed.",
+        extra={
+            "orders": len(results),
+            "failed": sum(1 for result in results if not result["ok"]),
+        },
+    )
+    return results
+
+
+async def cancel_batch_order_f(batch: BatchCancelOrderRequest):
+    """
+    Cancel several orders on Bybit with the batch cancel API.
+
+    The orders are grouped by category and sent in batch calls of at most 10 (spot) or 20
+    (linear, inverse, option) orders; the batch calls run concurrently.
+
+    Args:
+        batch:
+            An instance of the `BatchCancelOrderRequest` class containing the orders
+            (`CancelOrder`) to cancel.
+
+    Returns:
+        list: One result per order, in the order given: {"ok": True, "result": {"orderId": ...,
+        "orderLinkId": ...}} or {"ok": False, "error": {"code": ..., "msg": ...}}.
+
+    Last Reviewed Date:
+        18 Oct 2026
+    """
+    results = [None] * len(batch.orders)
+    calls = []
+    for category, group in _batches(
+        list(enumerate(batch.orders)), lambda order: order.category
+    ):
+        requests = [
+            {
+                key: value
+                for key, value in {
+                    "symbol": order.symbol,
+                    "orderId": order.orderId,
+                    "orderLinkId": order.orderLinkId,
+                }.items()
+                if value
+            }
+            for _, order in group
+        ]
+        calls.append(
+            _run_batch(session.cancel_batch_order, category, group, requests, results)
+        )
+    await asyncio.gather(*calls)
+    return results
+
+
+async def cancel_all_orders_f(cancelall: CancelAllOrders):
+    """
+    Cancel all open orders of a category on Bybit, in one request.
+
+    The orders can be narrowed to a symbol, a base coin or a settlement coin; linear and
+    inverse orders need one of them.
+
+    Args:
+        cancelall:
+            An instance of the `CancelAllOrders` class containing:
+            - `category` (str): The category of the orders (e.g., "linear", "spot").
+            - `symbol` (Optional[str]): The trading pair (e.g., "BTCUSDT").
+            - `baseCoin` (Optional[str]): The base coin of the orders (e.g., "BTC").
+            - `settleCoin` (Optional[str]): The settlement coin of the orders (e.g., "USDT").
+
+    Returns:
+        dict: The response from the Bybit API, listing the canceled orders.
+
+    Last Reviewed Date:
+        18 Oct 2026
+    """
+    try:
+        response = await bybit_executor.run(
+            session.cancel_all_orders,
+            category=cancelall.category,
+            symbol=cancelall.symbol if cancelall.symbol else None,
+            baseCoin=cancelall.baseCoin if cancelall.baseCoin else None,
+            settleCoin=cancelall.settleCoin if cancelall.settleCoin else None,
+        )
+        logger.info(
+            "Open orders canceled.",
+            extra={
+                "category": cancelall.category,
+                "symbol": cancelall.symbol,
+                "orders": len(response["result"].get("list") or []),
+            },
+        )
+
+        return response
+    except InvalidRequestError as e:
+        return f"Invalid request error: {str(e)}"
+
+
 async def get_orders_f(order: GetOrders):
     """
     Retrieve a list of open orders on Bybit.
@@ -246,10 +630,12 @@ async def get_orders_f(order: GetOrders):
             - `category` (str): The category of the orders (e.g., "spot", "linear").
             - `symbol` (Optional[str]): The trading pair (e.g., "BTCUSDT").
             - `baseCoin` (Optional[str]): The base coin in the order (e.g., "BTC").
+            - `settleCoin` (Optional[str]): The settlement coin of the orders (e.g., "USDT").
             - `orderId` (Optional[str]): The ID of the order to retrieve (optional).
             - `orderLinkId` (Optional[str]): A user-defined identifier for the order (optional).
             - `openOnly` (Optional[int]): Whether to retrieve only open orders (1 for true, 0 for false).
             - `limit` (Optional[int]): The number of orders to retrieve (default is no limit).
+            - `cursor` (Optional[str]): A cursor for pagination, used to fetch the next page of results.
 
     Returns:
         dict: The response from the Bybit API if the orders are successfully retrieved.
@@ -258,14 +644,17 @@ async def get_orders_f(order: GetOrders):
         11 Dec 2024
     """
     try:
-        response = session.get_open_orders(
+        response = await bybit_executor.run(
+            session.get_open_orders,
             category=order.category,
             symbol=order.symbol if order.symbol else None,
             baseCoin=order.baseCoin if order.baseCoin else None,
+            settleCoin=order.settleCoin if order.settleCoin else None,
             orderId=order.orderId if order.orderId else None,
             orderLinkId=order.orderLinkId if order.orderLinkId else None,
             openOnly=order.openOnly if order.openOnly else None,
             limit=order.limit if order.limit else None,
+            cursor=order.cursor if order.cursor else None,
         )
 
         return response
@@ -304,7 +693,8 @@ async def modify_order_f(order: AmendOrder):
         11 Dec 2024
     """
     try:
-        response = session.amend_order(
+        response = await bybit_executor.run(
+            session.amend_order,
             category=order.category,
             symbol=order.symbol,
             orderId=order.orderId if order.orderId else None,
@@ -346,7 +736,8 @@ async def get_market_price_ticker_f(marketprice: MarketPriceTicker):
         11 Dec 2024
     """
     try:
-        response = session.get_tickers(
+        response = await bybit_executor.run(
+            session.get_tickers,
             category=marketprice.category,
             symbol=marketprice.symbol if marketprice.symbol else None,
         )
@@ -358,7 +749,7 @@ async def get_market_price_ticker_f(marketprice: MarketPriceTicker):
 
 async def get_24_hour_price_change_f():
     try:
-        response = session.get_fee_rates()
+        response = await bybit_executor.run(session.get_fee_rates)
 
         return response
     except InvalidRequestError as e:
@@ -392,7 +783,8 @@ async def get_Kline_data_f(kline: GetKline):
         11 Dec 2024
     """
     try:
-        response = session.get_kline(
+        response = await bybit_executor.run(
+            session.get_kline,
             category=kline.category if kline.category else None,
             symbol=kline.symbol,
             interval=kline.interval,
@@ -423,14 +815,43 @@ async def get_symbol_order_book_f(orderbook: OrderBook):
             - `symbol` (str): The trading pair symbol (e.g., "BTCUSDT").
             - `limit` (Optional[int]): The number of order book entries to retrieve (default is `None` for full order book).
 
+    For the spot, linear and inverse categories the order book is served from a local
+    order book kept up to date from the public order book stream, as long as the limit
+    is within `BYBIT_ORDER_BOOK_DEPTH`. The first request of a symbol waits up to
+    `BYBIT_ORDER_BOOK_SYNC_TIMEOUT` seconds for the book to sync; other requests, or
+    requests made while the book is not synced, are sent to the Bybit API.
+
     Returns:
         dict: The response from the Bybit API, including the order book for the specified trading pair.
 
     Last Reviewed Date:
-        11 Dec 2024
+        18 Oct 2026
     """
+    category = orderbook.category
+    limit = orderbook.limit or BYBIT_ORDER_BOOK_DEFAULT_LIMITS.get(category)
+    if category in BYBIT_ORDER_BOOK_CATEGORIES and limit <= BYBIT_ORDER_BOOK_DEPTH:
+        book = await bybit_order_books.book(
+            category, orderbook.symbol, BYBIT_ORDER_BOOK_SYNC_TIMEOUT
+        )
+        if book is not None:
+            depth = book.depth(limit)
+            return {
+                "retCode": 0,
+                "retMsg": "OK",
+                "result": {
+                    "s": book.symbol,
+                    "b": depth["bids"],
+                    "a": depth["asks"],
+                    "ts": int(book.updated_at * 1000),
+                    "u": book.update_id,
+                },
+                "retExtInfo": {},
+                "time": int(time.time() * 1000),
+            }
+
     try:
-        response = session.get_orderbook(
+        response = await bybit_executor.run(
+            session.get_orderbook,
             category=orderbook.category,
             symbol=orderbook.symbol,
             limit=orderbook.limit if orderbook.limit else None,
@@ -465,7 +886,8 @@ async def get_recent_trades_f(trades: RecentTrades):
         11 Dec 2024
     """
     try:
-        response = session.get_public_trade_history(
+        response = await bybit_executor.run(
+            session.get_public_trade_history,
             category=trades.category,
             symbol=trades.symbol if trades.symbol else None,
             limit=trades.limit if trades.limit else None,
@@ -504,7 +926,8 @@ async def get_position_info_f(position: PositionInfo):
         11 Dec 2024
     """
     try:
-        response = session.get_positions(
+        response = await bybit_executor.run(
+            session.get_positions,
             category=position.category,
             symbol=position.symbol if position.symbol else None,
             settleCoin=position.settleCoin if position.settleCoin else None,
@@ -542,7 +965,8 @@ async def set_leverage_for_position_f(leverage: SetLeverage):
         11 Dec 2024
     """
     try:
-        response = session.set_leverage(
+        response = await bybit_executor.run(
+            session.set_leverage,
             category=leverage.category,
             symbol=leverage.symbol,
             buyLeverage=leverage.buyLeverage,
@@ -579,7 +1003,8 @@ async def switch_position_mode_f(positionmode: SwitchPositionMode):
         11 Dec 2024
     """
     try:
-        response = session.switch_position_mode(
+        response = await bybit_executor.run(
+            session.switch_position_mode,
             category=positionmode.category,
             symbol=positionmode.symbol if positionmode.symbol else None,
             coin=positionmode.coin if positionmode.coin else None,
@@ -591,6 +1016,68 @@ async def switch_position_mode_f(positionmode: SwitchPositionMode):
         return f"Invalid request error: {str(e)}"
 
 
+async def _fetch_all_pages(fetch, request) -> list:
+    # Follows nextPageCursor until the last page; `fetch` returns an error string on failure.
+    items = []
+    while True:
+        response = await fetch(request)
+        if isinstance(response, str):
+            raise RuntimeError(response)
+        items.extend(response["result"]["list"])
+        cursor = response["result"].get("nextPageCursor")
+        if not cursor:
+            return items
+        request = request.model_copy(update={"cursor": cursor})
+
+
+async def fetch_bybit_open_orders(category: str) -> list:
+    """
+    Fetch the open orders of a category (of every USDT-settled symbol for "linear"), following
+    the pagination cursor until every page is read.
+
+    Returns:
+        list: The orders of the `result.list` of every page.
+
+    Raises:
+        RuntimeError: If a request was rejected.
+
+    Last Reviewed Date:
+        18 Oct 2026
+    """
+    return await _fetch_all_pages(
+        get_orders_f,
+        GetOrders(
+            category=category,
+            settleCoin="USDT" if category == "linear" else None,
+            limit=50,
+        ),
+    )
+
+
+async def fetch_bybit_positions(category: str) -> list:
+    """
+    Fetch the positions of a category (of every USDT-settled symbol for "linear"), following
+    the pagination cursor until every page is read.
+
+    Returns:
+        list: The positions of the `result.list` of every page.
+
+    Raises:
+        RuntimeError: If a request was rejected.
+
+    Last Reviewed Date:
+        18 Oct 2026
+    """
+    return await _fetch_all_pages(
+        get_position_info_f,
+        PositionInfo(
+            category=category,
+            settleCoin="USDT" if category == "linear" else None,
+            limit=200,
+        ),
+    )
+
+
 ############################################################################### Risk Settings:
 async def get_risk_limit_f(risk: RiskLimit):
     """
@@ -617,7 +1104,8 @@ async def get_risk_limit_f(risk: RiskLimit):
         11 Dec 2024
     """
     try:
-        response = session.get_risk_limit(
+        response = await bybit_executor.run(
+            session.get_risk_limit,
             category=risk.category,
             symbol=risk.symbol if risk.symbol else None,
             cursor=risk.cursor if risk.cursor else None,
@@ -629,47 +1117,79 @@ async def get_risk_limit_f(risk: RiskLimit):
 
 
 ############################################################################### User Data Stream (Real-time Updates):
-async def listen_stream(symbol: str, category: str):
-    """
-    Listens to a WebSocket stream for real-time market data or user data based on the provided symbol and category.
+# The topics of the private stream listened to when none are given.
+BYBIT_PRIVATE_TOPICS = ("order", "execution", "position", "wallet")
 
-    This function connects to the specified WebSocket stream, continuously receives messages, and processes them
-    via a callback function. The stream runs asynchronously, printing incoming messages until the stop_event is triggered.
 
-    Args:
-        symbol (str): The trading pair symbol to listen to, e.g., "BTCUSDT". The symbol will be converted to uppercase.
-        category (str): The category of the stream, such as "user" or "market", specifying the type of data to receive.
+def stream_topics(category: str, symbol: str = None, topics: list = None) -> list:
+    """
+    Returns the topics to listen to: the given topics, else the private topics on the
+    private channel, else the "tickers.<symbol>" topic.
+    """
+    if topics:
+        return list(topics)
+    if category == "private":
+        return list(BYBIT_PRIVATE_TOPICS)
+    if not symbol:
+        raise ValueError("A symbol or topics are required for a public stream.")
+    return [f"tickers.{symbol.upper()}"]
+
+
+async def _log_stream_messages(subscription):
+    async for message in subscription:
+        # Ticks are debug events of the sampled tick logger: free unless it is enabled.
+        if tick_logger.isEnabledFor(logging.DEBUG):
+            tick_logger.debug(
+                "Bybit stream message",
+                extra={"topic": message["topic"], "data": message.get("data")},
+            )
+
+
+async def listen_stream(category: str, topics: list):
+    """
+    Listens to Bybit stream topics and logs every message until the listener is cancelled.
 
-    Raises:
-        None: This function does not explicitly raise any exceptions, but WebSocket connection issues may cause errors.
+    The topics are subscribed once on the shared `bybit_streams` connection of the category,
+    so many listeners, symbols and topics share one connection per channel. Messages are
+    received on the event loop without blocking it. Cancelling the task that runs the
+    listener closes its subscriptions; a topic is unsubscribed when its last listener stops.
 
-    Note:
-        The function runs asynchronously and continuously, and can be stopped by setting the `stop_event`.
+    Args:
+        category (str): The stream channel: "spot", "linear", "inverse", "option" or "private".
+        topics (list): The topics to listen to (e.g., ["tickers.BTCUSDT"]).
 
     Last Reviewed Date:
-        11 Dec 2024
+        18 Oct 2026
     """
-    symbol = symbol.upper()
-
-    ws = WebSocket(
-        testnet=True,
-        channel_type=category,
-    )
-
-    def handle_message(message):
-        if not stop_event.is_set():
-            print(message)
-
-    print("Connected to Binance User Data Stream.")
+    subscriptions = [bybit_streams.subscribe(category, topic) for topic in topics]
+    logger.info("Listening to the Bybit %s stream topics %s.", category, topics)
+    try:
+        await asyncio.gather(
+            *(_log_stream_messages(subscription) for subscription in subscriptions)
+        )
+    finally:
+        for subscription in subscriptions:
+            subscription.close()
+        logger.info(
+            "Stopped listening to the Bybit %s stream topics %s.", category, topics
+        )
 
-    while not stop_event.is_set():
-        ws.ticker_stream(symbol=symbol, callback=handle_message)
 
-        sleep(1)
+async def track_bybit_orders():
+    """
+    Records every update of the Bybit "order" private stream topic in the `order_store`,
+    until cancelled. Started from the FastAPI lifespan.
 
-        # You can add more processing here as needed
-    ws.exit()
-    print("websocket has stopped")
+    Last Reviewed Date:
+        18 Oct 2026
+    """
+    with bybit_streams.subscribe("private", "order") as subscription:
+        async for message in subscription:
+            for order in message.get("data", ()):
+                try:
+                    order_store.record_bybit_order(order)
+                except (KeyError, TypeError, ValueError):
+                    logger.warning("Unexpected Bybit order update: %s", order)
 
 
 ############################################################################### Market Data (Additional Functions):
@@ -702,7 +1222,8 @@ async def get_funding_rate_for_symbol_f(fundingrate: FundingRateHistory):
         11 Dec 2024
     """
     try:
-        response = session.get_funding_rate_history(
+        response = await bybit_executor.run(
+            session.get_funding_rate_history,
             category=fundingrate.category,
             symbol=fundingrate.symbol,
             startTime=fundingrate.startTime if fundingrate.startTime else None,
@@ -741,7 +1262,8 @@ async def get_exchange_info_f(exchangeinfo: CoinExchangeRecord):
         11 Dec 2024
     """
     try:
-        response = session.get_coin_exchange_records(
+        response = await bybit_executor.run(
+            session.get_coin_exchange_records,
             fromCoin=exchangeinfo.fromCoin if exchangeinfo.fromCoin else None,
             toCoin=exchangeinfo.toCOin if exchangeinfo.toCOin else None,
             limit=exchangeinfo.limit if exchangeinfo.limit else None,
@@ -773,8 +1295,19 @@ async def get_server_time_f():
         11 Dec 2024
     """
     try:
-        response = session.get_server_time()
+        response = await bybit_executor.run(session.get_server_time)
 
         return response
     except InvalidRequestError as e:
         return f"Invalid request error: {str(e)}"
+
+
+async def get_bybit_server_time_ms() -> float:
+    """
+    Return the Bybit server time in milliseconds. Sampled by the `bybit_clock`.
+
+    Last Reviewed Date:
+        18 Oct 2026
+    """
+    response = await bybit_executor.run(session.get_server_time)
+    return int(response["result"]["timeNano"]) / 1_000_000
@@ -1,12 +1,146 @@
+import asyncio
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
-from fastapi.responses import RedirectResponse
-from decouple import config
+from fastapi.responses import RedirectResponse, Response
+from decouple import config, Csv
 
 from app.routers import Binance_Routers, MarketRaker_Routers, ByBit_Routers
+from app.crud.Binance_CRUD import (
+    BINANCE_USER_DATA_STREAM,
+    binance_clock,
+    binance_http,
+    binance_order_books,
+    binance_rate_limiter,
+    binance_streams,
+    binance_user_data_stream,
+    exit_engine,
+    shared_state,
+    trade_journal,
+)
+from app.crud.ByBit_CRUD import (
+    BYBIT_ORDER_STREAM,
+    bybit_clock,
+    bybit_executor,
+    bybit_order_books,
+    bybit_rate_limiter,
+    bybit_streams,
+    track_bybit_orders,
+)
+from app.utils.Metrics import metrics
+from app.utils.Order_Store import order_store
+from app.utils.Structured_Logging import LogPipeline, parse_levels
+from app.utils.MarketRaker_Functions import (
+    indicator_queue,
+    signature_verifier,
+    startup_reconciler,
+    PUBLIC_KEY_RELOAD_INTERVAL,
+    RECONCILE_ON_STARTUP,
+)
+
+
+LOG_LEVEL = str(config("LOG_LEVEL", default="INFO"))
+LOG_LEVELS = config("LOG_LEVELS", default="", cast=Csv())
+LOG_FORMAT = str(config("LOG_FORMAT", default="json"))
+LOG_QUEUE_SIZE = config("LOG_QUEUE_SIZE", default=10000, cast=int)
+LOG_TICK_SAMPLE_EVERY = config("LOG_TICK_SAMPLE_EVERY", default=100, cast=int)
+
+# Every "app" logger writes through this queue; the records are written by a background thread.
+log_pipeline = LogPipeline(
+    level=LOG_LEVEL,
+    levels=parse_levels(LOG_LEVELS),
+    json_output=LOG_FORMAT == "json",
+    queue_size=LOG_QUEUE_SIZE,
+    tick_sample_every=LOG_TICK_SAMPLE_EVERY,
+)
+log_pipeline.start()
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """
+    Application lifespan that owns the long-lived resources shared by every request.
+
+    The pooled exchange HTTP clients are opened on startup and closed on shutdown so
+    that connections are reused across requests instead of being created per call.
+    The exchange server clocks are synced in the background from startup, so signed
+    requests carry corrected timestamps without a round trip.
+    The exit engine watchers, the local order books, the shared Binance market data
+    stream connection and the Bybit stream connections are closed on shutdown.
+    Unless disabled, the Binance user data stream is started on startup, so orders, fills
+    and balances are read locally, and closed on shutdown. Unless disabled, the Bybit "order"
+    topic is followed from startup to keep the order store current.
+    Unless disabled, the positions open before a restart are reconciled with the exchanges
+    in the background from startup, and their exit monitoring is restored.
+    The worker threads that run the blocking Bybit SDK calls are stopped on shutdown.
+    The trade journal writer is started on startup and writes its pending entries on shutdown.
+    The log writer thread writes the queued log records on shutdown.
+    The indicator queue workers are started on startup; on shutdown they get a few seconds
+    to finish the queued indicators.
+    If a public key file is configured, it is watched so MarketRaker verification keys
+    can be rotated without a restart.
+    In multi-worker mode, the exit engine syncs its symbol leases and positions with the
+    shared state from startup, and every worker watches the shared stop signals of the
+    websocket listeners.
+
+    Args:
+        app (FastAPI): The application instance.
+
+    """
+    await binance_http.open()
+    binance_clock.start()
+    bybit_clock.start()
+    trade_journal.open()
+    indicator_queue.start()
+    exit_engine.start()
+    if RECONCILE_ON_STARTUP:
+        startup_reconciler.start()
+    if BINANCE_USER_DATA_STREAM:
+        binance_user_data_stream.start()
+    order_tracker = None
+    if BYBIT_ORDER_STREAM:
+        order_tracker = asyncio.create_task(track_bybit_orders())
+    signal_watcher = None
+    if shared_state is not None:
+        signal_watcher = asyncio.create_task(
+            shared_state.watch_signals(
+                {
+                    "binance_websocket_stop": Binance_Routers.stop_listeners,
+                    "bybit_websocket_stop": ByBit_Routers.stop_listeners,
+                }
+            )
+        )
+    key_watcher = None
+    if signature_verifier.key_file:
+        key_watcher = asyncio.create_task(
+            signature_verifier.watch_key_file(PUBLIC_KEY_RELOAD_INTERVAL)
+        )
+    yield
+    if key_watcher:
+        key_watcher.cancel()
+    if signal_watcher:
+        signal_watcher.cancel()
+    if order_tracker:
+        order_tracker.cancel()
+    await indicator_queue.close()
+    await startup_reconciler.close()
+    await binance_clock.close()
+    await bybit_clock.close()
+    await exit_engine.close()
+    await binance_order_books.close()
+    await bybit_order_books.close()
+    await binance_user_data_stream.close()
+    await binance_streams.close()
+    await bybit_streams.close()
+    await binance_http.close()
+    bybit_executor.shutdown()
+    await asyncio.to_thread(trade_journal.close)
+    if shared_state is not None:
+        shared_state.close()
+    log_pipeline.stop()
 
 
 # Initialize FastAPI app
-app = FastAPI()
+app = FastAPI(lifespan=lifespan)
 app.include_router(Binance_Routers.router, prefix="/binance", tags=["Binance"])
 app.include_router(
     MarketRaker_Routers.router, prefix="/marketraker", tags=["MarketRaker"]
@@ -14,6 +148,153 @@ app.include_router(
 app.include_router(ByBit_Routers.router, prefix="/bybit", tags=["Bybit"])
 
 
+def stream_stats(field: str) -> dict:
+    values = {
+        ("binance", stream): stats[field]
+        for stream, stats in binance_streams.stats()["streams"].items()
+    }
+    for channel, connection in bybit_streams.stats().items():
+        for topic, stats in connection["streams"].items():
+            values[("bybit", f"{channel}/{topic}")] = stats[field]
+    return values
+
+
+def order_book_stats(field: str) -> dict:
+    return {
+        (exchange, key): stats[field]
+        for exchange, books in (
+            ("binance", binance_order_books),
+            ("bybit", bybit_order_books),
+        )
+        for key, stats in books.stats().items()
+    }
+
+
+def rate_limit_headroom() -> dict:
+    return {
+        (exchange, bucket): stats["headroom"]
+        for exchange, limiter in (
+            ("binance", binance_rate_limiter),
+            ("bybit", bybit_rate_limiter),
+        )
+        for bucket, stats in limiter.stats()["buckets"].items()
+    }
+
+
+# Read from the existing statistics at scrape time, so they add nothing to the hot paths.
+metrics.counter(
+    "websocket_messages_total",
+    "Messages received per stream.",
+    ("exchange", "stream"),
+    collect=lambda: stream_stats("messages"),
+)
+metrics.counter(
+    "websocket_dropped_messages_total",
+    "Messages dropped by slow consumers, per stream.",
+    ("exchange", "stream"),
+    collect=lambda: stream_stats("dropped"),
+)
+metrics.gauge(
+    "websocket_queued_messages",
+    "Messages waiting in the consumer queues, per stream.",
+    ("exchange", "stream"),
+    collect=lambda: stream_stats("queued"),
+)
+metrics.counter(
+    "order_book_updates_total",
+    "Depth snapshots and updates applied to the local order books.",
+    ("exchange", "book"),
+    collect=lambda: order_book_stats("updates"),
+)
+metrics.gauge(
+    "order_book_synced",
+    "1 if the local order book is in sync with the exchange.",
+    ("exchange", "book"),
+    collect=lambda: {
+        key: int(synced) for key, synced in order_book_stats("synced").items()
+    },
+)
+metrics.gauge(
+    "rate_limit_headroom",
+    "Fraction of the usable capacity of each exchange rate limit bucket that is available.",
+    ("exchange", "bucket"),
+    collect=rate_limit_headroom,
+)
+metrics.gauge(
+    "open_positions",
+    "Open positions monitored by the exit engine of this worker, per symbol.",
+    ("symbol",),
+    collect=lambda: {
+        (symbol,): count
+        for symbol, count in exit_engine.stats()["positions_per_symbol"].items()
+    },
+)
+metrics.counter(
+    "exit_engine_ticks_total",
+    "Trade ticks processed by the exit engine.",
+    collect=lambda: exit_engine.stats()["ticks"],
+)
+metrics.counter(
+    "exit_engine_exits_total",
+    "Exits triggered by the exit engine.",
+    collect=lambda: exit_engine.stats()["exits_triggered"],
+)
+metrics.gauge(
+    "user_data_stream_synced",
+    "1 if the local orders and balances are in sync with the Binance user data stream.",
+    collect=lambda: int(binance_user_data_stream.synced),
+)
+metrics.counter(
+    "user_data_events_total",
+    "Binance user data stream events applied to the local account state, per event type.",
+    ("event",),
+    collect=lambda: {
+        (event,): count
+        for event, count in binance_user_data_stream.stats()["state"]["events"].items()
+    },
+)
+metrics.gauge(
+    "tracked_open_orders",
+    "Open orders of the bot in the order store, per exchange.",
+    ("exchange",),
+    collect=lambda: {
+        (exchange,): len(order_store.orders(exchange=exchange, open_only=True))
+        for exchange in ("binance", "bybit")
+    },
+)
+metrics.gauge(
+    "startup_reconciliation_seconds",
+    "Seconds the startup reconciliation took to restore the open positions (0 until done).",
+    collect=lambda: startup_reconciler.report.get("seconds", 0.0),
+)
+metrics.counter(
+    "log_records_dropped_total",
+    "Log records dropped because the log queue was full.",
+    collect=lambda: log_pipeline.stats()["dropped"],
+)
+metrics.gauge(
+    "exchange_sdk_calls_in_flight",
+    "Blocking exchange SDK calls running on the executor.",
+    ("exchange",),
+    collect=lambda: {("bybit",): bybit_executor.stats()["in_flight"]},
+)
+
+
+@app.get("/metrics", include_in_schema=False)
+async def metrics_endpoint() -> Response:
+    """
+    Metrics endpoint in the Prometheus text format, for scraping.
+
+    Async, so the `collect=` callbacks run on the event loop thread and never read the
+    stream, order store and exit engine state while the loop is changing it.
+
+    Returns:
+        Response: The metrics of this worker process.
+
+    """
+    return Response(metrics.render(), media_type="text/plain; version=0.0.4")
+
+
 @app.get("/", include_in_schema=False)
 def root() -> RedirectResponse:
     """
@@ -1,12 +1,14 @@
 from fastapi import APIRouter
 from app.crud.Binance_CRUD import *
 from app.schemas.Binance_Schema import *
+from app.utils.Structured_Logging import TICK_LOGGER
 import asyncio
-import websockets
+import logging
 
 
+logger = logging.getLogger(__name__)
+tick_logger = logging.getLogger(TICK_LOGGER)
 router = APIRouter()
-stop_event = asyncio.Event()
 
 
 ####################################################### Account Management
@@ -65,6 +67,21 @@ async def binance_order_book(request: OrderBookRequest):
     return await get_binance_order_book(request.symbol, request.limit)
 
 
+##### Get the average fill price of a market order
+@router.get("/orderbookvwap")
+async def binance_order_book_vwap(request: OrderBookVWAPRequest):
+    """
+    Endpoint to retrieve the volume-weighted average price of a market order against the local order book.
+        Input:
+            - symbol (str): The symbol of the order (e.g., "BTCUSDT").
+            - side (str): "BUY" or "SELL".
+            - quantity (float): The quantity of the order.
+    """
+    return await get_binance_order_book_vwap(
+        request.symbol, request.side, request.quantity
+    )
+
+
 ##### Get symbol price
 @router.get("/priceticker")
 async def binance_price_ticker(request: PriceTickerRequest):
@@ -102,6 +119,27 @@ async def binance_historical_trades(request: HistoricalTradesRequest):
     )
 
 
+##### Get klines
+@router.get("/klines")
+async def binance_klines(request: KlinesRequest):
+    """
+    Endpoint to retrieve kline (candlestick) data for a specific symbol from Binance.
+        Input:
+            - symbol (str): The trading pair (e.g., "BTCUSDT").
+            - interval (str): The kline interval (e.g., "1m", "1h", "1d").
+            - startTime (Optional[int]): The open time of the first kline in milliseconds (optional).
+            - endTime (Optional[int]): The open time of the last kline in milliseconds (optional).
+            - limit (int): The maximum number of klines to retrieve.
+    """
+    return await get_binance_klines(
+        request.symbol,
+        request.interval,
+        request.startTime,
+        request.endTime,
+        request.limit,
+    )
+
+
 ######################################################  End of Market Data
 ######################################################
 #
@@ -165,6 +203,45 @@ async def cancel_order(cancel_Order: CancelOrder):
     )
 
 
+##### Place a batch of orders
+@router.post("/orders/batch")
+async def binance_batch_orders(request: BatchOrderRequest):
+    """
+    Endpoint to place several market orders at once, sent concurrently within the rate limits.
+        Input:
+            - orders (list): The orders, each with symbol, side ("BUY" or "SELL") and quantity.
+        Output:
+            - One result per order, in the same order: {"ok": true, "result": ...} or
+              {"ok": false, "error": ...}.
+    """
+    return await Binance_place_orders(request.orders)
+
+
+##### Cancel a batch of orders
+@router.delete("/orders/batch")
+async def binance_batch_cancel(request: BatchCancelRequest):
+    """
+    Endpoint to cancel several orders at once, sent concurrently within the rate limits.
+        Input:
+            - orders (list): The orders, each with symbol and orderId or clientOrderId.
+        Output:
+            - One result per order, in the same order: {"ok": true, "result": ...} or
+              {"ok": false, "error": ...}.
+    """
+    return await Binance_cancel_orders(request.orders)
+
+
+##### Cancel all open orders of a symbol
+@router.delete("/cancelallorders")
+async def binance_cancel_all(request: AllOrders):
+    """
+    Endpoint to cancel every open order of a symbol in one request.
+        Input:
+            - symbol (str): The trading pair (e.g., "BTCUSDT").
+    """
+    return await Binance_cancel_all_orders(request.symbol)
+
+
 ######################################################  End of Placing & Managing Orders
 ######################################################
 #
@@ -220,6 +297,51 @@ async def binance_keep_user_data_stream_alive(request: ListenKeyRequest):
     return await keep_user_data_stream_alive(request.listenKey)
 
 
+##### Close the data stream
+@router.delete("/closeuserdatastream")
+async def binance_close_user_data_stream(request: ListenKeyRequest):
+    """
+    Endpoint to close a user data stream.
+        Input:
+            - listen_key (str): The listen key for the user data stream.
+    """
+    return await close_user_data_stream(request.listenKey)
+
+
+##### Get the balances
+@router.get("/balances")
+async def binance_balances():
+    """
+    Endpoint to retrieve the non-zero balances of the account, from the user data stream when it is synced.
+        Input:
+            - None
+    """
+    return await get_binance_balances()
+
+
+##### Get the recent fills
+@router.get("/fills")
+async def binance_fills(symbol: str = None, orderId: int = None):
+    """
+    Endpoint to retrieve the recent fills received on the user data stream.
+        Input:
+            - symbol (Optional[str]): The trading pair (e.g., "BTCUSDT").
+            - orderId (Optional[int]): The Binance order ID.
+    """
+    return binance_account_state.fills(symbol, orderId)
+
+
+##### Get user data stream statistics
+@router.get("/userdatastreamstats")
+async def binance_user_data_stream_stats():
+    """
+    Endpoint to retrieve the state of the managed user data stream and the local account state.
+        Input:
+            - None
+    """
+    return binance_user_data_stream.stats()
+
+
 ######################################################  End of Advanced Trading
 ######################################################
 #
@@ -256,6 +378,88 @@ async def binance_system_status():
     return await get_system_time()
 
 
+##### Get connection pool statistics
+@router.get("/poolstats")
+async def binance_pool_stats():
+    """
+    Endpoint to retrieve the statistics of the shared Binance HTTP connection pool.
+        Input:
+            - None
+    """
+    return binance_http.stats()
+
+
+##### Get rate limit headroom
+@router.get("/ratelimits")
+async def binance_rate_limits():
+    """
+    Endpoint to retrieve the state and headroom of the Binance rate limits.
+        Input:
+            - None
+    """
+    return binance_rate_limiter.stats()
+
+
+##### Get market data stream statistics
+@router.get("/streamstats")
+async def binance_stream_stats():
+    """
+    Endpoint to retrieve the statistics of the shared Binance market data stream connection.
+        Input:
+            - None
+    """
+    return binance_streams.stats()
+
+
+##### Get the server clock estimate
+@router.get("/clock")
+async def binance_clock_stats():
+    """
+    Endpoint to retrieve the estimated offset of the Binance server clock and the receive window of signed requests.
+        Input:
+            - None
+    """
+    return binance_clock.stats()
+
+
+##### Get local order book statistics
+@router.get("/orderbookstats")
+async def binance_order_book_stats():
+    """
+    Endpoint to retrieve the state of the local Binance order books.
+        Input:
+            - None
+    """
+    return binance_order_books.stats()
+
+
+##### Get market data cache statistics
+@router.get("/cachestats")
+async def binance_cache_stats():
+    """
+    Endpoint to retrieve the statistics of the Binance market data cache.
+        Input:
+            - None
+    """
+    return binance_market_cache.stats()
+
+
+##### Get monitored positions
+@router.get("/positions")
+async def binance_positions():
+    """
+    Endpoint to retrieve the open positions monitored by the exit engine, its statistics, and
+    in multi-worker mode the shared positions whose exit never finished.
+        Input:
+            - None
+    """
+    return {
+        "positions": [position.to_dict() for position in exit_engine.positions()],
+        "stats": exit_engine.stats(),
+        "stale_exits": await exit_engine.stale_exits(),
+    }
+
+
 ######################################################  End of Useful Tools
 ######################################################
 
@@ -264,34 +468,54 @@ async def binance_system_status():
 
 
 async def listen_stream(symbol: str):
-    symbol = symbol.lower()
-    url = f"wss://testnet.binance.vision/ws/{symbol}@trade"
-
-    async with websockets.connect(url) as ws:
-        print("Connected to Binance User Data Stream.")
+    # Trades come from the shared stream hub, which multiplexes every consumer over one connection.
+    with binance_streams.subscribe(f"{symbol.lower()}@trade") as trades:
+        logger.info("Connected to Binance trade stream.")
+
+        while True:
+            event = await trades.get()
+
+            # Ticks are debug events of the sampled tick logger: free unless it is enabled.
+            if tick_logger.isEnabledFor(logging.DEBUG):
+                quantity = float(event["q"])
+                price = float(event["p"])
+                tick_logger.debug(
+                    "Binance trade",
+                    extra={
+                        "symbol": symbol,
+                        "price": price,
+                        "quantity": quantity,
+                        "usd": quantity * price,
+                        "zar": quantity * price * 18,
+                    },
+                )
 
-        while not stop_event.is_set():
-            message = await ws.recv()
-            event = json.loads(message)
+            # You can add more processing here as needed
 
-            quantity = float(event["q"])
-            price = float(event["p"])
-            print("$" + str(quantity * price))
-            print("R" + str(quantity * price * 18))
-            print("")
 
-            # You can add more processing here as needed
-    print("websocket has stopped")
+# The trade stream listeners running in this worker.
+listeners: set = set()
 
 
 @router.post("/startwebsocket")
 async def start_listening(symbol: SymbolType):
-    asyncio.create_task(listen_stream(symbol.symbol))
+    task = asyncio.create_task(listen_stream(symbol.symbol))
+    listeners.add(task)
+    task.add_done_callback(listeners.discard)
+
+
+def stop_listeners():
+    # Cancelling a listener closes its subscription, even when no trade arrives on a quiet symbol.
+    while listeners:
+        listeners.pop().cancel()
+    logger.info("websocket has stopped")
 
 
 @router.delete("/stopwebsocket")
 async def stop_listening():
-    stop_event.set()
-    await asyncio.sleep(1)
-    stop_event.clear()
+    if shared_state is not None:
+        # The listeners may run in any worker; every worker stops its own on the signal.
+        await shared_state.run(shared_state.signal, "binance_websocket_stop")
+    else:
+        stop_listeners()
     return {"status": "Stopped listening to WebSocket."}
@@ -1,7 +1,9 @@
-from fastapi import APIRouter
+from fastapi import APIRouter, HTTPException
 from app.crud.ByBit_CRUD import *
+from app.crud.Binance_CRUD import shared_state
 from app.schemas.Bybit_Schema import *
 import asyncio
+import uuid
 
 
 router = APIRouter()
@@ -81,6 +83,49 @@ async def bybit_order_cancel(cancelorder: CancelOrder):
     return await cancel_order_f(cancelorder)
 
 
+@router.post("/order/create-batch")
+async def bybit_order_place_batch(batch: BatchPlaceOrderRequest):
+    """
+    Example of place_batch_order_f()
+        Input:
+        - batch.orders : [
+            {"category": "linear", "symbol": "BTCUSDT", "side": "Buy", "orderType": "Market", "qty": "0.01"},
+            {"category": "linear", "symbol": "ETHUSDT", "side": "Sell", "orderType": "Limit", "qty": "0.1", "price": "4000"}
+          ]
+        Output:
+        - One result per order, in the same order: {"ok": true, "result": ...} or {"ok": false, "error": ...}
+    """
+    return await place_batch_order_f(batch)
+
+
+@router.post("/order/cancel-batch")
+async def bybit_order_cancel_batch(batch: BatchCancelOrderRequest):
+    """
+    Example of cancel_batch_order_f()
+        Input:
+        - batch.orders : [
+            {"category": "linear", "symbol": "BTCUSDT", "orderId": "123456"},
+            {"category": "linear", "symbol": "ETHUSDT", "orderLinkId": "order123"}
+          ]
+        Output:
+        - One result per order, in the same order: {"ok": true, "result": ...} or {"ok": false, "error": ...}
+    """
+    return await cancel_batch_order_f(batch)
+
+
+@router.post("/order/cancel-all")
+async def bybit_order_cancel_all(cancelall: CancelAllOrders):
+    """
+    Example of cancel_all_orders_f()
+        Input:
+        - cancelall.category : "linear"
+        - cancelall.symbol : "BTCUSDT"
+        - cancelall.baseCoin : "BTC"
+        - cancelall.settleCoin : "USDT"
+    """
+    return await cancel_all_orders_f(cancelall)
+
+
 @router.get("/order")
 async def bybit_order_get(order: GetOrders):
     """
@@ -219,22 +264,78 @@ async def bybit_risk_limit(risk: RiskLimit):
 ############################################################################### websockets (Real-time Updates):
 
 
+# The stream listeners running in this worker, by listener id.
+listeners: dict = {}
+
+
 @router.post("/websocket")
-async def start_listening(set: MarketPriceTicker):
-    """Start listening to the Bybit WebSocket."""
-    asyncio.create_task(listen_stream(set.symbol, set.category))
-    return {"status": f"Started listening to WebSocket for {set.symbol}"}
+async def start_listening(request: StreamRequest):
+    """
+    Start listening to Bybit stream topics.
+        Input:
+        - request.category: "linear"  # "spot", "linear", "inverse", "option" or "private"
+        - request.symbol: "BTCUSDT"  # listens to "tickers.BTCUSDT" when no topics are given
+        - request.topics: ["tickers.BTCUSDT", "publicTrade.BTCUSDT"]  # optional
+    """
+    try:
+        topics = stream_topics(request.category, request.symbol, request.topics)
+        # Fails on an unknown channel before the listener is started.
+        bybit_streams.connection(request.category)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    listener_id = uuid.uuid4().hex
+    task = asyncio.create_task(listen_stream(request.category, topics))
+    listeners[listener_id] = task
+    task.add_done_callback(lambda _: listeners.pop(listener_id, None))
+    return {
+        "status": f"Started listening to the Bybit {request.category} stream.",
+        "listener_id": listener_id,
+        "topics": topics,
+    }
+
+
+def stop_listeners():
+    # Cancelling a listener closes its subscriptions; the topics without listeners are unsubscribed.
+    while listeners:
+        listeners.popitem()[1].cancel()
 
 
 @router.delete("/websocket")
-async def stop_listening():
-    """Stop listening to the Bybit WebSocket."""
-    stop_event.set()
-    await asyncio.sleep(2)
-    stop_event.clear()
+async def stop_listening(listener_id: str = None):
+    """
+    Stop listening to the Bybit stream topics.
+        Input:
+        - listener_id: "3f1c..."  # optional query parameter; all listeners are stopped without it
+    """
+    if listener_id is not None:
+        task = listeners.pop(listener_id, None)
+        if task is None:
+            # In multi-worker mode the listener may run in another worker.
+            raise HTTPException(
+                status_code=404, detail=f"No listener {listener_id} in this worker."
+            )
+        task.cancel()
+        return {"status": f"Stopped listener {listener_id}."}
+
+    if shared_state is not None:
+        # The listeners may run in any worker; every worker stops its own on the signal.
+        await shared_state.run(shared_state.signal, "bybit_websocket_stop")
+    else:
+        stop_listeners()
     return {"status": "Stopped listening to WebSocket."}
 
 
+@router.get("/streamstats")
+async def bybit_stream_stats():
+    """
+    Endpoint to retrieve the statistics of the Bybit stream connections and the listeners of this worker.
+        Input:
+        - No input parameters required.
+    """
+    return {"connections": bybit_streams.stats(), "listeners": list(listeners)}
+
+
 ############################################################################### Market Data (Additional Functions):
 @router.get("/market/funding_rate")
 async def bybit_market_funding_rate(fundingrate: FundingRateHistory):
@@ -272,3 +373,43 @@ async def bybit_server_time():
         None
     """
     return await get_server_time_f()
+
+
+@router.get("/executor_stats")
+async def bybit_executor_stats():
+    """
+    Statistics of the bounded executor that runs the blocking pybit calls.
+        Input:
+        None
+    """
+    return bybit_executor.stats()
+
+
+@router.get("/ratelimits")
+async def bybit_rate_limits():
+    """
+    State and headroom of the Bybit rate limits.
+        Input:
+        None
+    """
+    return bybit_rate_limiter.stats()
+
+
+@router.get("/orderbook_stats")
+async def bybit_order_book_stats():
+    """
+    State of the local Bybit order books.
+        Input:
+        None
+    """
+    return bybit_order_books.stats()
+
+
+@router.get("/clock")
+async def bybit_clock_stats():
+    """
+    Estimated offset of the Bybit server clock and the receive window of signed requests.
+        Input:
+        None
+    """
+    return bybit_clock.stats()
@@ -1,7 +1,13 @@
+import asyncio
+import logging
+import time
 from fastapi import APIRouter, Request, HTTPException
+from fastapi.responses import JSONResponse
 from app.utils.MarketRaker_Functions import *
+from app.utils.Metrics import trace_started_at
 
 
+logger = logging.getLogger(__name__)
 router = APIRouter()
 
 
@@ -12,8 +18,8 @@ async def webhook_endpoint(request: Request):
     Webhook endpoint for processing different types of notifications.
 
     This function handles incoming POST requests at the "/notification" endpoint.
-    It processes the request payload, determines the notification type, and
-    delegates the processing to the corresponding function. Currently, it supports
+    It reads the raw request body once, decodes it once, determines the notification
+    type, and delegates the processing to the corresponding function. Currently, it supports
     two types of notifications: "indicator" and "market_direction".
 
     Based on the notification type, the function calls the appropriate handler:
@@ -23,26 +29,173 @@ async def webhook_endpoint(request: Request):
     Args:
         request (Request): The incoming HTTP request containing the notification payload.
 
+    Indicators are verified, recorded and queued, and the endpoint answers 202 (Accepted)
+    without waiting for the trading strategies, so MarketRaker's delivery does not time out.
+
     Returns:
-        None: The function performs internal processing and does not return any data to the caller.
+        JSONResponse: For an indicator, 202 with its status ("queued", or "duplicate" for a
+            redelivered indicator) and its idempotency key.
 
     Raises:
-        HTTPException: If an error occurs during the processing of the webhook,
-            an HTTPException with status code 500 (Internal Server Error) is raised.
+        HTTPException: 401 (Unauthorized) if the signature of an indicator is invalid,
+            503 (Service Unavailable) with a Retry-After header if the indicator
+            queue is full, or 500 (Internal Server Error) if an error occurs during the
+            processing of the webhook.
 
     Last Reviewed Date:
-        11 Dec 2024
+        18 Oct 2026
     """
-    response = await request.json()
+    # Orders placed for this webhook, also on the indicator queue, measure their latency from here.
+    trace_started_at.set(time.perf_counter())
+    # The body is read once; the raw bytes are kept for signature verification.
+    body = await request.body()
     try:
-        match response["type"]:
+        notification = json_loads(body)
+        match notification["type"]:
 
             case "indicator":
-                await notification_type_indicator(request)
+                status = await notification_type_indicator(
+                    body, notification, request.headers.get("x-signature")
+                )
+                # Accepted: the strategies run after the response, on the indicator queue.
+                return JSONResponse(status, status_code=202)
 
             case "market_dircetion":
-                await notification_type_market_direction(request)
+                await notification_type_market_direction(notification)
 
-    except Exception as e:
-        print(f"Error processing webhook: {e}")
+    except HTTPException:
+        raise
+    except Exception:
+        logger.exception("Error processing webhook")
         raise HTTPException(status_code=500, detail="Internal server error")
+
+
+############################## Read back the trade journal for replay and reconciliation
+@router.get("/journal")
+async def journal_entries(
+    kind: str = None,
+    symbol: str = None,
+    order_id: str = None,
+    since: float = None,
+    until: float = None,
+    after_seq: int = 0,
+    limit: int = 100,
+):
+    """
+    Endpoint to read the entries of the trade journal, in the order they were recorded.
+        Input:
+            - kind (optional): "indicator", "order_request", "order_response", "order_error", "position_opened" or "exit"
+            - symbol (optional): The trading pair, e.g. BTCUSDT
+            - order_id (optional): The exchange id of an order
+            - since / until (optional): Unix timestamps bounding the entries
+            - after_seq (optional): Only return entries after this sequence number
+            - limit (optional): The maximum number of entries to return
+    """
+    return await asyncio.to_thread(
+        trade_journal.query, kind, symbol, order_id, since, until, after_seq, limit
+    )
+
+
+@router.get("/journalstats")
+async def journal_stats():
+    """
+    Endpoint to retrieve the statistics of the trade journal writer.
+        Input:
+            - None
+    """
+    return trade_journal.stats()
+
+
+############################## Read the orders and positions of the bot without polling the exchanges
+@router.get("/orders")
+async def tracked_orders(
+    exchange: str = None,
+    symbol: str = None,
+    strategy: str = None,
+    open_only: bool = False,
+):
+    """
+    Endpoint to read the orders placed by the bot from the in-memory order store, oldest first.
+        Input:
+            - exchange (optional): "binance" or "bybit"
+            - symbol (optional): The trading pair, e.g. BTCUSDT
+            - strategy (optional): The strategy that placed the orders, e.g. "momentum"
+            - open_only (optional): Only return the orders that are still open
+    """
+    return [
+        record.to_dict()
+        for record in order_store.orders(exchange, symbol, strategy, open_only)
+    ]
+
+
+@router.get("/order")
+async def tracked_order(
+    exchange: str, order_id: str = None, client_order_id: str = None
+):
+    """
+    Endpoint to read one order of the bot from the in-memory order store.
+        Input:
+            - exchange: "binance" or "bybit"
+            - order_id (optional): The exchange id of the order
+            - client_order_id (optional): The client order id (Binance) or orderLinkId (Bybit)
+    """
+    if order_id is None and client_order_id is None:
+        raise HTTPException(
+            status_code=400, detail="Either order_id or client_order_id must be provided."
+        )
+    record = order_store.order(exchange, order_id, client_order_id)
+    if record is None:
+        raise HTTPException(status_code=404, detail="Order not found")
+    return record.to_dict()
+
+
+@router.get("/positions")
+async def strategy_positions(
+    exchange: str = None,
+    symbol: str = None,
+    strategy: str = None,
+    open_only: bool = True,
+):
+    """
+    Endpoint to read the net positions of the strategies, built from the fills of their orders.
+        Input:
+            - exchange (optional): "binance" or "bybit"
+            - symbol (optional): The trading pair, e.g. BTCUSDT
+            - strategy (optional): The strategy, e.g. "momentum"
+            - open_only (optional): Only return the positions that are not flat (default)
+    """
+    return [
+        position.to_dict()
+        for position in order_store.positions(exchange, symbol, strategy, open_only)
+    ]
+
+
+@router.get("/orderstats")
+async def order_store_stats():
+    """
+    Endpoint to retrieve the statistics of the in-memory order store.
+        Input:
+            - None
+    """
+    return order_store.stats()
+
+
+@router.get("/reconciliation")
+async def startup_reconciliation():
+    """
+    Endpoint to retrieve the report of the startup reconciliation: the positions restored,
+    closed while the bot was down or left unverified, the orders loaded and the time to ready.
+        Input:
+            - None
+    """
+    return startup_reconciler.stats()
+
+
+@router.get("/queuestats")
+async def indicator_queue_stats():
+    """
+    Endpoint to retrieve the backpressure statistics of the indicator queue.
+        Input:
+            - None
+    """
+    return indicator_queue.stats()
@@ -1,5 +1,5 @@
 from pydantic import BaseModel
-from typing import Optional
+from typing import List, Optional
 
 
 ### Market Data
@@ -30,6 +30,21 @@ class OrderBookRequest(BaseModel):
     )
 
 
+class OrderBookVWAPRequest(BaseModel):
+    """
+    Request to get the average fill price of a market order against the order book.
+
+    Attributes:
+        symbol (str): The trading pair symbol (e.g., "BTCUSDT").
+        side (str): The side of the order, "BUY" or "SELL".
+        quantity (float): The quantity of the order.
+    """
+
+    symbol: str
+    side: str
+    quantity: float
+
+
 class PriceTickerRequest(BaseModel):
     """
     Request to get the latest price ticker for a symbol.
@@ -67,6 +82,25 @@ class HistoricalTradesRequest(BaseModel):
     fromId: int = None  # Trade ID to fetch from (optional)
 
 
+class KlinesRequest(BaseModel):
+    """
+    Request to get kline (candlestick) data for a symbol.
+
+    Attributes:
+        symbol (str): The trading pair symbol (e.g., "BTCUSDT").
+        interval (str): The kline interval (e.g., "1m", "5m", "1h", "1d").
+        startTime (int): The open time of the first kline (timestamp in milliseconds). Optional.
+        endTime (int): The open time of the last kline (timestamp in milliseconds). Optional.
+        limit (int): The maximum number of klines to retrieve. Default is 500, max is 1000.
+    """
+
+    symbol: str
+    interval: str
+    startTime: int = None  # Start time in milliseconds (optional)
+    endTime: int = None  # End time in milliseconds (optional)
+    limit: int = 500  # Default is 500; max is 1000
+
+
 ### Placing and Managing Orders
 class OrderRequest(BaseModel):
     """
@@ -113,6 +147,28 @@ class CancelOrder(BaseModel):
     clientOrderId: str = None
 
 
+class BatchOrderRequest(BaseModel):
+    """
+    Request to place several orders at once.
+
+    Attributes:
+        orders (List[OrderRequest]): The orders to place.
+    """
+
+    orders: List[OrderRequest]
+
+
+class BatchCancelRequest(BaseModel):
+    """
+    Request to cancel several orders at once.
+
+    Attributes:
+        orders (List[CancelOrder]): The orders to cancel, each by orderId or clientOrderId.
+    """
+
+    orders: List[CancelOrder]
+
+
 ### Advanced Trading
 # Margin and Futures Trading
 class FuturesOrderRequest(BaseModel):
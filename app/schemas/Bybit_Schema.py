@@ -1,5 +1,5 @@
 from pydantic import BaseModel
-from typing import Optional
+from typing import List, Optional
 
 
 class CoinType(BaseModel):
@@ -70,6 +70,46 @@ class CancelOrder(BaseModel):
     orderLinkId: Optional[str] = None
 
 
+class BatchPlaceOrderRequest(BaseModel):
+    """
+    Request to place several orders at once.
+
+    Attributes:
+        orders (List[PlaceOrderRequest]): The orders to place. Orders of different categories
+            may be mixed; they are sent in one batch call per category.
+    """
+
+    orders: List[PlaceOrderRequest]
+
+
+class BatchCancelOrderRequest(BaseModel):
+    """
+    Request to cancel several orders at once.
+
+    Attributes:
+        orders (List[CancelOrder]): The orders to cancel, each by orderId or orderLinkId.
+    """
+
+    orders: List[CancelOrder]
+
+
+class CancelAllOrders(BaseModel):
+    """
+    Request to cancel all open orders of a category.
+
+    Attributes:
+        category (str): The category of the orders (e.g., "linear").
+        symbol (Optional[str]): The trading pair symbol to cancel the orders of. Optional.
+        baseCoin (Optional[str]): The base coin to cancel the orders of. Optional.
+        settleCoin (Optional[str]): The settlement coin to cancel the orders of. Optional.
+    """
+
+    category: str
+    symbol: Optional[str] = None
+    baseCoin: Optional[str] = None
+    settleCoin: Optional[str] = None
+
+
 class GetOrders(BaseModel):
     """
     Request to retrieve orders for a symbol.
@@ -78,19 +118,23 @@ class GetOrders(BaseModel):
         category (str): The category of the orders.
         symbol (Optional[str]): The trading pair symbol to retrieve orders for. Optional.
         baseCoin (Optional[str]): The base coin for filtering orders. Optional.
+        settleCoin (Optional[str]): The settlement coin for filtering orders. Optional.
         orderId (Optional[str]): The specific order ID to retrieve. Optional.
         orderLinkId (Optional[str]): The client-specific order link ID to retrieve. Optional.
         openOnly (Optional[int]): If set to 1, only open orders are retrieved. Optional.
         limit (Optional[int]): The number of orders to retrieve. Optional.
+        cursor (Optional[str]): The cursor for pagination. Optional.
     """
 
     category: str
     symbol: Optional[str] = None
     baseCoin: Optional[str] = None
+    settleCoin: Optional[str] = None
     orderId: Optional[str] = None
     orderLinkId: Optional[str] = None
     openOnly: Optional[int] = None
     limit: Optional[int] = None
+    cursor: Optional[str] = None
 
 
 class AmendOrder(BaseModel):
@@ -286,3 +330,20 @@ class CoinExchangeRecord(BaseModel):
     toCOin: Optional[str] = None
     limit: Optional[int] = None
     cursor: Optional[str] = None
+
+
+class StreamRequest(BaseModel):
+    """
+    Request to listen to Bybit stream topics.
+
+    Attributes:
+        category (str): The stream channel: "spot", "linear", "inverse", "option" or "private".
+        symbol (Optional[str]): The trading pair symbol (e.g., "BTCUSDT") of the default
+            "tickers.<symbol>" topic of a public channel. Optional.
+        topics (Optional[List[str]]): The topics to listen to (e.g., ["tickers.BTCUSDT",
+            "publicTrade.ETHUSDT"], or ["order", "execution"] on the private channel). Optional.
+    """
+
+    category: str
+    symbol: Optional[str] = None
+    topics: Optional[List[str]] = None
@@ -0,0 +1,43 @@
+from pydantic import BaseModel
+from typing import Optional
+
+
+class Indicator(BaseModel):
+    """
+    A MarketRaker trading indicator, as delivered in the "data" field of an indicator notification.
+
+    Attributes:
+        trading_type (str): The type of trade, either "Long" or "Short".
+        leverage (int): The suggested leverage.
+        buy_price (float): The suggested entry price.
+        sell_price (float): The predicted exit price.
+        buy_date (int): The entry time (Unix timestamp in seconds).
+        sell_prediction_date (int): The predicted exit time (Unix timestamp in seconds).
+        risk (int): The risk rating of the trade.
+        market_direction (str): The market direction, either "Bull" or "Bear".
+        percentage_change (float): The predicted percentage change.
+        stoploss (float): The suggested stoploss price.
+        trading_type_24h (Optional[str]): The type of trade for the next 24 hours. Optional.
+        percentage_change_24h (Optional[float]): The predicted percentage change in the next 24 hours. Optional.
+        risk_24h (Optional[int]): The risk rating for the next 24 hours. Optional.
+        leverage_24h (Optional[int]): The suggested leverage for the next 24 hours. Optional.
+        stoploss_24h (Optional[float]): The suggested stoploss price for the next 24 hours. Optional.
+        trading_pair (str): The MarketRaker trading pair (e.g., "SOL/USD").
+    """
+
+    trading_type: str
+    leverage: int = 1
+    buy_price: float
+    sell_price: Optional[float] = None
+    buy_date: Optional[int] = None
+    sell_prediction_date: Optional[int] = None
+    risk: Optional[int] = None
+    market_direction: str
+    percentage_change: float
+    stoploss: Optional[float] = None
+    trading_type_24h: Optional[str] = None
+    percentage_change_24h: Optional[float] = None
+    risk_24h: Optional[int] = None
+    leverage_24h: Optional[int] = None
+    stoploss_24h: Optional[float] = None
+    trading_pair: str
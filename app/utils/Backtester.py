@@ -0,0 +1,463 @@
+import argparse
+import csv
+import glob
+import json
+import os
+import numpy as np
+from app.utils.Column_Store import ColumnStore
+from app.utils.TradingBot import STRATEGIES, order_intents
+from app.utils.MarketRaker_Functions import (
+    decode_indicator,
+    prepare_binance_trading_pair,
+)
+
+
+TRADE_FIELDS = (
+    "symbol",
+    "strategy",
+    "side",
+    "quantity",
+    "entry_time",
+    "entry_price",
+    "target_price",
+    "stoploss",
+    "exit_time",
+    "exit_price",
+    "exit_reason",
+    "fees",
+    "pnl",
+    "return",
+)
+
+
+class Klines:
+    """
+    OHLC candles of one symbol, as NumPy arrays sorted by open time.
+
+    Args:
+        open_time (np.ndarray): The candle open times (Unix timestamps in milliseconds).
+        open, high, low, close (np.ndarray): The candle prices.
+    """
+
+    __slots__ = ("open_time", "open", "high", "low", "close")
+
+    def __init__(self, open_time, open, high, low, close):
+        columns = [
+            np.asarray(open_time, dtype=np.int64),
+            np.asarray(open, dtype=np.float64),
+            np.asarray(high, dtype=np.float64),
+            np.asarray(low, dtype=np.float64),
+            np.asarray(close, dtype=np.float64),
+        ]
+        # Sorted input (e.g. memory-mapped downloads) is used as is, without a copy.
+        if np.any(np.diff(columns[0]) < 0):
+            order = np.argsort(columns[0], kind="stable")
+            columns = [column[order] for column in columns]
+        self.open_time, self.open, self.high, self.low, self.close = columns
+
+    def __len__(self):
+        return len(self.open_time)
+
+
+def load_klines_csv(paths: list) -> Klines:
+    """
+    Load candles from one or more CSV files in the Binance kline format.
+
+    The first five columns must be open time, open, high, low and close, as in the files of
+    https://data.binance.vision and the /api/v3/klines response. A header line is skipped.
+    Open times in microseconds (Binance spot files since 2025) are converted to milliseconds.
+
+    Args:
+        paths (list): The CSV files of one symbol, in any order.
+
+    Returns:
+        Klines: The candles of all files, sorted by open time.
+    """
+    arrays = []
+    for path in paths:
+        with open(path, "r") as f:
+            first_line = f.readline()
+        skip_header = not first_line[:1].isdigit()
+        arrays.append(
+            np.loadtxt(
+                path,
+                delimiter=",",
+                usecols=(0, 1, 2, 3, 4),
+                skiprows=1 if skip_header else 0,
+                ndmin=2,
+            )
+        )
+    data = np.concatenate(arrays)
+    open_time = data[:, 0].astype(np.int64)
+    open_time = np.where(open_time > 10**14, open_time // 1000, open_time)
+    return Klines(open_time, data[:, 1], data[:, 2], data[:, 3], data[:, 4])
+
+
+def load_klines_store(directory: str) -> Klines:
+    """
+    Load candles downloaded by the `HistoryDownloader` (e.g. "history/binance/klines-1m/BTCUSDT").
+
+    The columns are memory-mapped, so nothing is parsed.
+    """
+    data = ColumnStore(directory).load()
+    return Klines(
+        data["open_time"], data["open"], data["high"], data["low"], data["close"]
+    )
+
+
+def load_klines_dir(directory: str) -> dict:
+    """
+    Load the candles of every symbol in a directory.
+
+    The directory holds CSV files, or the per-symbol datasets of the `HistoryDownloader`
+    (e.g. "history/binance/klines-1m"). CSV files are matched to symbols by the part of
+    their name before the first "-" or ".", e.g. "BTCUSDT-1m-2024-01.csv" and
+    "BTCUSDT-1m-2024-02.csv" both belong to BTCUSDT.
+
+    Args:
+        directory (str): The directory holding the CSV files or datasets.
+
+    Returns:
+        dict: The `Klines` of each symbol.
+    """
+    klines = {
+        os.path.basename(os.path.dirname(path)).upper(): load_klines_store(
+            os.path.dirname(path)
+        )
+        for path in sorted(glob.glob(os.path.join(directory, "*", "meta.json")))
+    }
+    files: dict = {}
+    for path in sorted(glob.glob(os.path.join(directory, "*.csv"))):
+        symbol = os.path.basename(path).split("-")[0].split(".")[0].upper()
+        files.setdefault(symbol, []).append(path)
+    klines.update({symbol: load_klines_csv(paths) for symbol, paths in files.items()})
+    return klines
+
+
+def load_indicators(path: str) -> list:
+    """
+    Load MarketRaker indicators from a file.
+
+    The file holds either a JSON array or one JSON document per line. Each document is an
+    indicator notification in the README format ({"type": "indicator", "data": ...}, with the
+    data as a string or an object), or the indicator object itself.
+
+    Args:
+        path (str): The indicator file.
+
+    Returns:
+        list: The decoded `Indicator` models, in file order.
+    """
+    with open(path, "r") as f:
+        text = f.read().strip()
+    if text.startswith("["):
+        documents = json.loads(text)
+    else:
+        documents = [json.loads(line) for line in text.splitlines() if line.strip()]
+
+    indicators = []
+    for document in documents:
+        if document.get("type") == "market_direction":
+            continue
+        indicators.append(
+            decode_indicator(document if "data" in document else {"data": document})
+        )
+    return indicators
+
+
+def _sparse_table(values: np.ndarray, op) -> list:
+    # table[k][i] is op over values[i : i + 2**k], clipped at the end of the array.
+    table = [values]
+    half = 1
+    while half * 2 <= len(values):
+        previous = table[-1]
+        level = previous.copy()
+        level[:-half] = op(previous[:-half], previous[half:])
+        table.append(level)
+        half *= 2
+    return table
+
+
+def _first_crossing(table: list, start: np.ndarray, levels: np.ndarray, above: bool):
+    """
+    For every start index, return the first index at or after it whose value reaches the
+    level (>= level if `above`, <= level otherwise), or the length of the data if none does.
+
+    Blocks of decreasing power-of-two size that cannot contain a crossing are skipped, so each
+    search costs O(log n) and all searches run together as array operations.
+    """
+    n = len(table[0])
+    position = start.copy()
+    for k in range(len(table) - 1, -1, -1):
+        block = table[k][np.minimum(position, n - 1)]
+        no_crossing = block < levels if above else block > levels
+        position = np.where((position < n) & no_crossing, position + (1 << k), position)
+    return np.minimum(position, n)
+
+
+class BacktestResult:
+    """
+    The simulated trades of a backtest, as NumPy arrays keyed by field name (see TRADE_FIELDS).
+
+    Attributes:
+        trades (dict): The trade arrays, sorted by entry time.
+        skipped (dict): The number of indicators skipped per reason.
+    """
+
+    def __init__(self, trades: dict, skipped: dict):
+        self.trades = trades
+        self.skipped = skipped
+
+    def __len__(self):
+        return len(self.trades["pnl"])
+
+    def summary(self) -> dict:
+        """
+        Return the aggregate statistics of the backtest.
+
+        Returns:
+            dict: The number of trades, win rate, net profit, fees, average return and maximum
+            drawdown of the cumulative profit, with the trades per strategy and exit reason.
+        """
+        pnl = self.trades["pnl"]
+        if len(pnl) == 0:
+            return {"trades": 0, "skipped": self.skipped}
+
+        cumulative = np.cumsum(pnl[np.argsort(self.trades["exit_time"], kind="stable")])
+        drawdown = np.maximum.accumulate(np.maximum(cumulative, 0)) - cumulative
+        strategies, strategy_counts = np.unique(
+            self.trades["strategy"], return_counts=True
+        )
+        reasons, reason_counts = np.unique(
+            self.trades["exit_reason"], return_counts=True
+        )
+        return {
+            "trades": len(pnl),
+            "win_rate": float(np.mean(pnl > 0)),
+            "net_pnl": float(pnl.sum()),
+            "fees": float(self.trades["fees"].sum()),
+            "average_return": float(self.trades["return"].mean()),
+            "max_drawdown": float(drawdown.max()),
+            "per_strategy": dict(zip(strategies.tolist(), strategy_counts.tolist())),
+            "exit_reasons": dict(zip(reasons.tolist(), reason_counts.tolist())),
+            "skipped": self.skipped,
+        }
+
+    def to_csv(self, path: str):
+        """
+        Write the trades to a CSV file, one row per trade.
+        """
+        with open(path, "w", newline="") as f:
+            writer = csv.writer(f)
+            writer.writerow(TRADE_FIELDS)
+            writer.writerows(
+                zip(*(self.trades[field].tolist() for field in TRADE_FIELDS))
+            )
+
+
+class Backtester:
+    """
+    Offline backtest of the trading bot strategies on historical candles.
+
+    Every indicator is passed through the entry rules of `momentum_strategy` and
+    `overbought_oversold_strategy`. An accepted trade is entered at the open of the first
+    candle at or after the indicator's `buy_date`, which stands in for the live price ticker,
+    and exits like the live exit engine: at the target (3% from the entry reference price, as
+    `listen_to_websocket` computes it) or at the indicator's stoploss, whichever the price
+    reaches first. If both are reached within one candle the stoploss is assumed to come first.
+    Exits are filled at the level, or at the candle open if the price gapped through it.
+    Positions that never exit are closed at the last close ("end_of_data").
+
+    The exit search is vectorized per symbol: a sparse table of running highs and lows answers
+    "first candle at or after the entry that reaches the level" for every trade of the symbol
+    in O(log n) array operations, so a year of 1-minute candles across dozens of pairs is
+    simulated in seconds.
+
+    Args:
+        klines (dict): The `Klines` of each symbol (e.g., "SOLUSDT").
+        fee (float): The fee per fill as a fraction of the notional (0.001 = 0.1%).
+        slippage (float): The adverse price slippage per fill as a fraction (0.0005 = 0.05%).
+        target_percentage (float): The take-profit distance from the entry reference price.
+        strategies (tuple): The strategies to simulate, any of STRATEGIES.
+
+    Last Reviewed Date:
+        18 Oct 2026
+    """
+
+    def __init__(
+        self,
+        klines: dict,
+        fee: float = 0.001,
+        slippage: float = 0.0005,
+        target_percentage: float = 0.03,
+        strategies: tuple = STRATEGIES,
+    ):
+        self.klines = klines
+        self.fee = fee
+        self.slippage = slippage
+        self.target_percentage = target_percentage
+        self.strategies = strategies
+
+    def _entries(self, indicators: list, skipped: dict) -> dict:
+        # Apply the live entry rules to the whole batch and group the accepted trades by symbol.
+        accepted, symbols, indexes, current_prices = [], [], [], []
+        for indicator in indicators:
+            symbol = prepare_binance_trading_pair(indicator.trading_pair)
+            klines = self.klines.get(symbol)
+            if klines is None or indicator.buy_date is None:
+                reason = "no_klines" if klines is None else "no_buy_date"
+                skipped[reason] = skipped.get(reason, 0) + 1
+                continue
+            index = int(
+                np.searchsorted(klines.open_time, indicator.buy_date * 1000, "left")
+            )
+            if index >= len(klines):
+                skipped["after_klines"] = skipped.get("after_klines", 0) + 1
+                continue
+            accepted.append(indicator)
+            symbols.append(symbol)
+            indexes.append(index)
+            current_prices.append(klines.open[index])
+
+        intents = order_intents(accepted, symbols, current_prices, self.strategies)
+        no_entry = len(accepted) - len({intent["index"] for intent in intents})
+        if no_entry:
+            skipped["no_entry"] = skipped.get("no_entry", 0) + no_entry
+
+        entries: dict = {}
+        for intent in intents:
+            entries.setdefault(intent["symbol"], []).append(
+                (
+                    indexes[intent["index"]],
+                    intent["strategy"],
+                    intent["side"] == "BUY",
+                    intent["reference_price"],
+                    intent["stoploss"] or np.nan,
+                    intent["quantity"],
+                )
+            )
+        return entries
+
+    def _simulate(self, symbol: str, klines: Klines, entries: list) -> dict:
+        index, strategy, is_buy, reference, stoploss, quantity = (
+            np.array(column) for column in zip(*entries)
+        )
+        n = len(klines)
+        direction = np.where(is_buy, 1.0, -1.0)
+        target = reference * (1 + direction * self.target_percentage)
+
+        highs = _sparse_table(klines.high, np.maximum)
+        lows = _sparse_table(klines.low, np.minimum)
+        # A missing stoploss is a level that is never reached.
+        stop_up = np.where(np.isnan(stoploss), np.inf, stoploss)
+        stop_down = np.where(np.isnan(stoploss), -np.inf, stoploss)
+        target_index = np.where(
+            is_buy,
+            _first_crossing(highs, index, target, above=True),
+            _first_crossing(lows, index, target, above=False),
+        )
+        stop_index = np.where(
+            is_buy,
+            _first_crossing(lows, index, stop_down, above=False),
+            _first_crossing(highs, index, stop_up, above=True),
+        )
+
+        stopped = (stop_index <= target_index) & (stop_index < n)
+        reached = ~stopped & (target_index < n)
+        exit_index = np.where(
+            stopped, stop_index, np.where(reached, target_index, n - 1)
+        )
+        exit_open = klines.open[exit_index]
+        # A gap through the level fills at the open: better for targets, worse for stops.
+        exit_price = np.where(
+            stopped,
+            np.where(
+                is_buy, np.minimum(stoploss, exit_open), np.maximum(stoploss, exit_open)
+            ),
+            np.where(
+                reached,
+                np.where(
+                    is_buy, np.maximum(target, exit_open), np.minimum(target, exit_open)
+                ),
+                klines.close[n - 1],
+            ),
+        )
+
+        entry_fill = klines.open[index] * (1 + direction * self.slippage)
+        exit_fill = exit_price * (1 - direction * self.slippage)
+        fees = self.fee * (entry_fill + exit_fill) * quantity
+        pnl = direction * (exit_fill - entry_fill) * quantity - fees
+
+        return {
+            "symbol": np.full(len(index), symbol),
+            "strategy": strategy,
+            "side": np.where(is_buy, "BUY", "SELL"),
+            "quantity": quantity,
+            "entry_time": klines.open_time[index],
+            "entry_price": entry_fill,
+            "target_price": target,
+            "stoploss": stoploss,
+            "exit_time": klines.open_time[exit_index],
+            "exit_price": exit_fill,
+            "exit_reason": np.where(
+                stopped, "stoploss", np.where(reached, "target", "end_of_data")
+            ),
+            "fees": fees,
+            "pnl": pnl,
+            "return": pnl / (entry_fill * quantity),
+        }
+
+    def run(self, indicators: list) -> BacktestResult:
+        """
+        Simulate the strategies on a list of indicators.
+
+        Args:
+            indicators (list): The `Indicator` models, e.g. from `load_indicators`.
+
+        Returns:
+            BacktestResult: The simulated trades and the number of skipped indicators.
+        """
+        skipped: dict = {}
+        results = [
+            self._simulate(symbol, self.klines[symbol], entries)
+            for symbol, entries in self._entries(indicators, skipped).items()
+        ]
+        if not results:
+            return BacktestResult(
+                {field: np.array([]) for field in TRADE_FIELDS}, skipped
+            )
+
+        trades = {
+            field: np.concatenate([result[field] for result in results])
+            for field in TRADE_FIELDS
+        }
+        order = np.argsort(trades["entry_time"], kind="stable")
+        return BacktestResult(
+            {field: values[order] for field, values in trades.items()}, skipped
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Backtest the trading bot strategies on MarketRaker indicators and historical candles."
+    )
+    parser.add_argument("indicators", help="JSON or JSON lines file of indicators")
+    parser.add_argument("klines", help="directory of Binance kline CSV files")
+    parser.add_argument("--fee", type=float, default=0.001)
+    parser.add_argument("--slippage", type=float, default=0.0005)
+    parser.add_argument("--target", type=float, default=0.03)
+    parser.add_argument("--strategies", nargs="+", default=list(STRATEGIES))
+    parser.add_argument("--trades", help="write the simulated trades to this CSV file")
+    args = parser.parse_args()
+
+    backtester = Backtester(
+        load_klines_dir(args.klines),
+        fee=args.fee,
+        slippage=args.slippage,
+        target_percentage=args.target,
+        strategies=tuple(args.strategies),
+    )
+    result = backtester.run(load_indicators(args.indicators))
+    print(json.dumps(result.summary(), indent=2))
+    if args.trades:
+        result.to_csv(args.trades)
@@ -0,0 +1,160 @@
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+
+
+class BoundedExecutor:
+    """
+    Dedicated, bounded thread pool for running blocking exchange SDK calls from async code.
+
+    Synchronous clients such as `pybit.unified_trading.HTTP` block the thread they run on.
+    Calling them directly inside an `async def` freezes the whole event loop, so every
+    other coroutine (webhooks, websockets, Binance requests) waits for the slowest Bybit
+    response. This executor moves those calls onto its own worker threads and awaits
+    the result, keeping the event loop free.
+
+    Concurrency is bounded twice: by the number of worker threads, and per call name
+    (e.g. "place_order", "get_tickers") by an asyncio semaphore, so a burst of one kind
+    of request cannot occupy every worker and starve the others.
+
+    Args:
+        name (str): A label for the executor, used for thread names and statistics (e.g., "bybit").
+        max_workers (int): The number of worker threads.
+        per_call_limit (int): The default maximum number of concurrent calls per call name.
+        call_limits (dict): Optional per call name overrides of `per_call_limit`.
+        rate_limiter (BybitRateLimiter): Optional limiter that every call waits for, by call name.
+        metrics (MetricsRegistry): Optional registry that receives the latency and outcome
+            ("ok" or the exception name) of every call, by call name.
+
+    Last Reviewed Date:
+        18 Oct 2026
+    """
+
+    def __init__(
+        self,
+        name: str,
+        max_workers: int = 8,
+        per_call_limit: int = 4,
+        call_limits: dict = None,
+        rate_limiter=None,
+        metrics=None,
+    ):
+        self.name = name
+        self.max_workers = max_workers
+        self.per_call_limit = min(per_call_limit, max_workers)
+        self.call_limits = call_limits or {}
+        self.rate_limiter = rate_limiter
+        self._executor: ThreadPoolExecutor = None
+        self._semaphores: dict = {}
+        self._calls: dict = {}
+        self._in_flight = 0
+        self._total_seconds = 0.0
+        self._latency = self._responses_total = None
+        if metrics is not None:
+            self._latency = metrics.histogram(
+                "exchange_rest_request_seconds",
+                "Exchange REST call latency in seconds, until the response headers (or SDK call) complete.",
+                ("exchange", "method", "endpoint"),
+            )
+            self._responses_total = metrics.counter(
+                "exchange_rest_responses_total",
+                "Exchange REST responses by status code.",
+                ("exchange", "endpoint", "status"),
+            )
+
+    @property
+    def executor(self) -> ThreadPoolExecutor:
+        """
+        Return the worker pool, creating it on first use.
+
+        Returns:
+            ThreadPoolExecutor: The dedicated worker pool.
+        """
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(
+                max_workers=self.max_workers, thread_name_prefix=f"{self.name}-executor"
+            )
+        return self._executor
+
+    def _semaphore(self, call_name: str) -> asyncio.Semaphore:
+        semaphore = self._semaphores.get(call_name)
+        if semaphore is None:
+            semaphore = asyncio.Semaphore(
+                self.call_limits.get(call_name, self.per_call_limit)
+            )
+            self._semaphores[call_name] = semaphore
+        return semaphore
+
+    async def run(self, fn, *args, rate_limit_weight: int = 1, **kwargs):
+        """
+        Run a blocking callable on the executor and await its result.
+
+        Args:
+            fn (Callable): The blocking function to call (e.g., `session.place_order`).
+            *args: Positional arguments for `fn`.
+            rate_limit_weight (int): The weight of the call in the rate limiter (e.g., the
+                number of orders of a batch call).
+            **kwargs: Keyword arguments for `fn`.
+
+        Returns:
+            Any: The return value of `fn`.
+
+        Raises:
+            Exception: Any exception raised by `fn` is re-raised in the calling coroutine.
+        """
+        call_name = getattr(fn, "__name__", repr(fn))
+        if self.rate_limiter is not None:
+            await self.rate_limiter.acquire(call_name, rate_limit_weight)
+        async with self._semaphore(call_name):
+            loop = asyncio.get_running_loop()
+            self._in_flight += 1
+            start = time.perf_counter()
+            status = "ok"
+            try:
+                return await loop.run_in_executor(
+                    self.executor, partial(fn, *args, **kwargs)
+                )
+            except Exception as e:
+                status = type(e).__name__
+                raise
+            finally:
+                elapsed = time.perf_counter() - start
+                self._in_flight -= 1
+                self._total_seconds += elapsed
+                self._calls[call_name] = self._calls.get(call_name, 0) + 1
+                if self._latency is not None:
+                    self._latency.observe(elapsed, self.name, "SDK", call_name)
+                    self._responses_total.inc(self.name, call_name, status)
+
+    def shutdown(self, wait: bool = False):
+        """
+        Stop the worker threads. Called from the FastAPI lifespan on shutdown.
+
+        Args:
+            wait (bool): Whether to wait for running calls to finish.
+        """
+        if self._executor is not None:
+            self._executor.shutdown(wait=wait, cancel_futures=True)
+        self._executor = None
+        self._semaphores = {}
+
+    def stats(self) -> dict:
+        """
+        Return executor statistics.
+
+        Returns:
+            dict: The configured limits, the number of calls in flight and the call count per call name.
+        """
+        calls = sum(self._calls.values())
+        return {
+            "name": self.name,
+            "max_workers": self.max_workers,
+            "per_call_limit": self.per_call_limit,
+            "call_limits": dict(self.call_limits),
+            "in_flight": self._in_flight,
+            "calls": dict(self._calls),
+            "average_call_seconds": (
+                round(self._total_seconds / calls, 6) if calls else 0.0
+            ),
+        }
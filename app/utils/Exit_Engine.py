@@ -0,0 +1,659 @@
+import asyncio
+import itertools
+import logging
+import os
+import socket
+import time
+import uuid
+from bisect import bisect_left, insort
+from app.utils.Metrics import trace_started_at
+from app.utils.Structured_Logging import correlation_id
+
+
+logger = logging.getLogger(__name__)
+
+
+class Position:
+    """
+    An open position monitored by the `ExitEngine`.
+
+    Attributes:
+        position_id (int): The engine's id for the position.
+        symbol (str): The trading pair (e.g., "BTCUSDT").
+        side (str): The side of the entry order, either "BUY" or "SELL".
+        entry_price (float): The price at which the trade was entered.
+        target_price (float): The take-profit price.
+        stoploss (float): The stoploss price, or None.
+        quantity (float): The quantity of the asset being traded.
+        order_id (str): The exchange id of the entry order.
+        opened_at (float): The time the position was registered (Unix timestamp).
+        status (str): "open", "closing", "closed", "exit_failed" or "removed".
+        exit_reason (str): "target" or "stoploss" once an exit was triggered.
+        exit_price (float): The price that triggered the exit.
+        closed_at (float): The time the exit completed (Unix timestamp).
+        correlation_id (str): The id of the indicator that opened the position, if any.
+    """
+
+    __slots__ = (
+        "position_id",
+        "symbol",
+        "side",
+        "entry_price",
+        "target_price",
+        "stoploss",
+        "quantity",
+        "order_id",
+        "opened_at",
+        "status",
+        "exit_reason",
+        "exit_price",
+        "closed_at",
+        "correlation_id",
+    )
+
+    def __init__(
+        self,
+        position_id: int,
+        symbol: str,
+        side: str,
+        entry_price: float,
+        target_price: float,
+        stoploss: float,
+        quantity: float,
+        order_id: str,
+        correlation_id: str = None,
+    ):
+        self.position_id = position_id
+        self.symbol = symbol
+        self.side = side
+        self.entry_price = entry_price
+        self.target_price = target_price
+        self.stoploss = stoploss
+        self.quantity = quantity
+        self.order_id = order_id
+        self.opened_at = time.time()
+        self.status = "open"
+        self.exit_reason = None
+        self.exit_price = None
+        self.closed_at = None
+        self.correlation_id = correlation_id
+
+    def triggers(self) -> list:
+        """
+        Return the exit levels of the position as (direction, level, reason) tuples.
+
+        "up" levels trigger when the price rises to or above them, "down" levels when the
+        price falls to or below them.
+        """
+        if self.side == "BUY":
+            triggers = [("up", self.target_price, "target")]
+            if self.stoploss:
+                triggers.append(("down", self.stoploss, "stoploss"))
+        else:
+            triggers = [("down", self.target_price, "target")]
+            if self.stoploss:
+                triggers.append(("up", self.stoploss, "stoploss"))
+        return triggers
+
+    def to_dict(self) -> dict:
+        return {name: getattr(self, name) for name in self.__slots__}
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "Position":
+        position = cls.__new__(cls)
+        for name in cls.__slots__:
+            setattr(position, name, data.get(name))
+        return position
+
+
+class SymbolExits:
+    """
+    The exit levels of all open positions on one symbol, kept in two sorted lists.
+
+    "up" levels are stored negated and "down" levels as-is, both in ascending order, so the
+    levels crossed by a price are always a suffix of each list. A tick therefore costs one
+    binary search per list plus the work for the positions it actually triggers.
+    """
+
+    __slots__ = ("up", "down")
+
+    def __init__(self):
+        self.up: list = []
+        self.down: list = []
+
+    def add(self, position: Position):
+        for direction, level, reason in position.triggers():
+            if direction == "up":
+                insort(self.up, (-level, position.position_id, reason))
+            else:
+                insort(self.down, (level, position.position_id, reason))
+
+    def remove(self, position: Position):
+        for direction, level, reason in position.triggers():
+            levels, key = (
+                (self.up, (-level, position.position_id, reason))
+                if direction == "up"
+                else (self.down, (level, position.position_id, reason))
+            )
+            index = bisect_left(levels, key)
+            if index < len(levels) and levels[index] == key:
+                del levels[index]
+
+    def crossed(self, price: float) -> list:
+        """
+        Remove and return the (position_id, reason) of every level crossed by the price.
+        """
+        crossed = []
+        # (x,) sorts before every (x, position_id, reason), so levels equal to the price are included
+        index = bisect_left(self.up, (-price,))
+        if index < len(self.up):
+            crossed.extend((entry[1], entry[2]) for entry in self.up[index:])
+            del self.up[index:]
+        index = bisect_left(self.down, (price,))
+        if index < len(self.down):
+            crossed.extend((entry[1], entry[2]) for entry in self.down[index:])
+            del self.down[index:]
+        return crossed
+
+    def __len__(self):
+        return len(self.up) + len(self.down)
+
+
+class ExitEngine:
+    """
+    Event-driven take-profit and stoploss monitoring for every open position.
+
+    Instead of one polling loop per trade, the engine keeps one trade stream subscription
+    per symbol (through the shared stream hub) and the exit levels of all positions on that
+    symbol in sorted lists. Each incoming tick only touches the positions whose levels it
+    crossed, so thousands of positions can be monitored at the cost of a binary search per
+    tick. Positions are monitored until they exit or are removed; there is no timeout.
+
+    With a shared `store`, the positions live in the store so several worker processes can
+    share them. Each symbol is monitored by the one worker holding its "exit:<symbol>" lease:
+    a worker that opens a position on a symbol leased by another worker only stores it, and the
+    lease holder adopts it within `sync_interval` seconds. Leases are renewed every
+    `sync_interval` seconds; if a worker stops, another one takes over its symbols once the
+    leases expire. Every exit is claimed in the store before `close_trade` is called, so a
+    position is never exited twice. Store calls run on the store's own thread (`store.run`),
+    so waiting for another worker's database lock never stalls the tick handling.
+
+    Args:
+        streams (BinanceStreamHub): The hub providing the "<symbol>@trade" streams. If None, no
+            streams are watched and prices must be fed with `on_price` (e.g. for backtesting).
+        close_trade (Callable): Coroutine function called as
+            `close_trade(symbol, side, order_id, quantity)` to exit a position. A return value
+            of None is treated as a failed exit.
+        target_percentage (float): The take-profit distance from the entry price (0.03 = 3%).
+        journal (TradeJournal): Optional journal that records every opened position and exit.
+        store (SharedState): Optional state shared with the other worker processes.
+        lease_ttl (float): The number of seconds a symbol lease lasts without renewal.
+        sync_interval (float): The number of seconds between lease renewals and adoptions.
+        claim_timeout (float): The number of seconds after which a position still closing in the
+            store is reopened by the lease holder: the worker that claimed its exit stopped
+            before recording the outcome.
+
+    Last Reviewed Date:
+        18 Oct 2026
+    """
+
+    def __init__(
+        self,
+        streams,
+        close_trade,
+        target_percentage: float = 0.03,
+        journal=None,
+        store=None,
+        lease_ttl: float = 10.0,
+        sync_interval: float = 2.0,
+        claim_timeout: float = 120.0,
+    ):
+        self.streams = streams
+        self.close_trade = close_trade
+        self.target_percentage = target_percentage
+        self.journal = journal
+        self.store = store
+        self.lease_ttl = lease_ttl
+        self.sync_interval = sync_interval
+        self.claim_timeout = claim_timeout
+        self.owner = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        self._ids = itertools.count(1)
+        self._positions: dict = {}
+        self._exits: dict = {}
+        self._watchers: dict = {}
+        self._leases: set = set()
+        self._closing: set = set()
+        self._exit_tasks: set = set()
+        # Serializes the lease and adoption steps of `add_position` and `_sync`.
+        self._store_lock = asyncio.Lock()
+        self._sync_task: asyncio.Task = None
+        self._ticks = 0
+        self._exits_triggered = 0
+        self._exits_skipped = 0
+        self._exits_reopened = 0
+
+    def target_price(self, side: str, entry_price: float) -> float:
+        """
+        Return the take-profit price for an entry (3% above a buy, 3% below a sell by default).
+        """
+        if side == "BUY":
+            return entry_price * (1 + self.target_percentage)
+        return entry_price * (1 - self.target_percentage)
+
+    async def add_position(
+        self,
+        symbol: str,
+        side: str,
+        entry_price: float,
+        stoploss: float,
+        quantity: float,
+        order_id: str,
+        target_price: float = None,
+    ) -> Position:
+        """
+        Start monitoring a position.
+
+        Args:
+            symbol (str): The trading pair (e.g., "BTCUSDT").
+            side (str): The side of the entry order, either "BUY" or "SELL".
+            entry_price (float): The price at which the trade was entered.
+            stoploss (float): The stoploss price, or None for no stoploss.
+            quantity (float): The quantity of the asset being traded.
+            order_id (str): The exchange id of the entry order.
+            target_price (float): The take-profit price. Defaults to `target_percentage` from the entry price.
+
+        Returns:
+            Position: The monitored position.
+        """
+        position = Position(
+            next(self._ids),
+            symbol,
+            side,
+            entry_price,
+            target_price or self.target_price(side, entry_price),
+            stoploss,
+            quantity,
+            order_id,
+            correlation_id.get(),
+        )
+        if self.store is None:
+            self._monitor(position)
+        else:
+            self.start()
+            async with self._store_lock:
+                position.position_id = await self.store.run(
+                    self.store.add_position, position.to_dict()
+                )
+                # Otherwise the worker holding the symbol lease adopts it on its next sync.
+                if await self._hold(symbol):
+                    self._monitor(position)
+                    await self._adopt(symbol)
+        if self.journal is not None:
+            self.journal.record(
+                "position_opened", position.to_dict(), symbol=symbol, order_id=order_id
+            )
+        return position
+
+    def restore_position(self, data: dict) -> Position:
+        """
+        Resume monitoring a position recorded before a restart (a "position_opened" journal entry).
+
+        The position keeps its levels, order id, opening time and correlation id, and gets a
+        new id. It is not journaled again: its exit is recorded against the same order id.
+        Only for an engine without a shared store; with one, positions survive restarts in the store.
+
+        Args:
+            data (dict): The position as returned by `Position.to_dict`.
+
+        Returns:
+            Position: The monitored position.
+        """
+        position = Position.from_dict(data)
+        position.position_id = next(self._ids)
+        position.status = "open"
+        self._monitor(position)
+        return position
+
+    async def remove_position(self, position_id: int) -> Position:
+        """
+        Stop monitoring a position without exiting it.
+
+        Args:
+            position_id (int): The id of the position.
+
+        Returns:
+            Position: The removed position, or None if it is not monitored.
+        """
+        if self.store is not None:
+            # The worker monitoring the position drops it on its next sync.
+            await self.store.run(self.store.remove_position, position_id)
+        position = self._positions.pop(position_id, None)
+        if position is None:
+            return None
+        exits = self._exits.get(position.symbol)
+        if exits is not None:
+            exits.remove(position)
+        if position.status == "open":
+            position.status = "removed"
+        self._release_symbol(position.symbol)
+        return position
+
+    def on_price(self, symbol: str, price: float) -> list:
+        """
+        Apply a price to the positions of a symbol and return the exits it triggers.
+
+        The triggered positions are marked "closing" and stop being monitored; the caller is
+        responsible for exiting them (the stream watcher calls `close_trade`).
+
+        Args:
+            symbol (str): The trading pair.
+            price (float): The traded price.
+
+        Returns:
+            list: (position, reason) tuples for every triggered position.
+        """
+        self._ticks += 1
+        exits = self._exits.get(symbol)
+        if not exits:
+            return []
+
+        triggered = []
+        for position_id, reason in exits.crossed(price):
+            position = self._positions.pop(position_id, None)
+            if position is None:
+                continue
+            # the other level of the position is still in the book
+            exits.remove(position)
+            position.status = "closing"
+            position.exit_reason = reason
+            position.exit_price = price
+            if self.store is not None:
+                # not adopted again from the store while its exit is pending
+                self._closing.add(position_id)
+            triggered.append((position, reason))
+        self._exits_triggered += len(triggered)
+        return triggered
+
+    def _monitor(self, position: Position):
+        self._positions[position.position_id] = position
+        self._exits.setdefault(position.symbol, SymbolExits()).add(position)
+        self._ensure_watcher(position.symbol)
+
+    async def _exit(self, position: Position):
+        # Runs in its own task: the exit is logged with the id of the indicator that opened it.
+        correlation_id.set(position.correlation_id)
+        try:
+            if self.store is not None:
+                try:
+                    claimed = await self.store.run(
+                        self.store.claim_exit,
+                        position.position_id,
+                        position.exit_reason,
+                        position.exit_price,
+                        self.owner,
+                    )
+                except Exception:
+                    # Still open in the store: monitor it again, so the next tick retries the exit.
+                    logger.exception(
+                        "Error claiming the exit of position %s", position.position_id
+                    )
+                    position.status = "open"
+                    position.exit_reason = position.exit_price = None
+                    self._monitor(position)
+                    return
+                if not claimed:
+                    # Exited by another worker, or removed, before this one triggered it.
+                    self._exits_skipped += 1
+                    return
+            await self._close_position(position)
+        finally:
+            self._closing.discard(position.position_id)
+
+    def _start_exit(self, position: Position):
+        # Exit tasks are kept until done, so they are not garbage-collected mid-exit and
+        # `close` can wait for the exit orders in flight.
+        task = asyncio.create_task(self._exit(position))
+        self._exit_tasks.add(task)
+        task.add_done_callback(self._exit_done)
+
+    def _exit_done(self, task: asyncio.Task):
+        self._exit_tasks.discard(task)
+        if not task.cancelled() and task.exception() is not None:
+            logger.error("Error exiting a position", exc_info=task.exception())
+
+    async def _close_position(self, position: Position):
+        fields = {
+            "position_id": position.position_id,
+            "symbol": position.symbol,
+            "order_id": position.order_id,
+            "exit_reason": position.exit_reason,
+            "exit_price": position.exit_price,
+        }
+        try:
+            response = await self.close_trade(
+                position.symbol, position.side, position.order_id, position.quantity
+            )
+        except Exception:
+            logger.exception(
+                "Error closing position %s", position.position_id, extra=fields
+            )
+            response = None
+        position.status = "closed" if response is not None else "exit_failed"
+        position.closed_at = time.time()
+        if self.store is not None:
+            await self.store.run(
+                self.store.finish_exit,
+                position.position_id,
+                position.status,
+                position.closed_at,
+            )
+        if self.journal is not None:
+            self.journal.record(
+                "exit",
+                {**position.to_dict(), "response": response},
+                symbol=position.symbol,
+                order_id=position.order_id,
+            )
+        logger.info(
+            "Target reached, trade closed."
+            if position.exit_reason == "target"
+            else "Stoploss triggered, trade closed.",
+            extra={**fields, "status": position.status},
+        )
+
+    def _ensure_watcher(self, symbol: str):
+        if self.streams is None:
+            return
+        watcher = self._watchers.get(symbol)
+        if watcher is None or watcher.done():
+            self._watchers[symbol] = asyncio.create_task(self._watch(symbol))
+
+    async def _hold(self, symbol: str) -> bool:
+        # Acquire or renew the lease of a symbol; True if this worker monitors the symbol.
+        held = await self.store.run(
+            self.store.acquire_lease, f"exit:{symbol}", self.owner, self.lease_ttl
+        )
+        if held:
+            self._leases.add(symbol)
+        return held
+
+    async def _reopen_stale_exits(self, symbol: str):
+        # Exits claimed by a worker that stopped before recording the outcome would stay
+        # "closing" forever; the lease holder reopens them so they are monitored again.
+        claimed_before = time.time() - self.claim_timeout
+        rows = await self.store.run(self.store.stale_exits, claimed_before, symbol)
+        for row in rows:
+            if row["position_id"] in self._closing:
+                continue
+            if await self.store.run(
+                self.store.reopen_exit, row["position_id"], claimed_before
+            ):
+                self._exits_reopened += 1
+                logger.warning(
+                    "Reopened position %s: its exit was claimed by %s and never finished.",
+                    row["position_id"],
+                    row["claimed_by"],
+                    extra={
+                        "position_id": row["position_id"],
+                        "symbol": symbol,
+                        "order_id": row["order_id"],
+                        "claimed_at": row["claimed_at"],
+                    },
+                )
+
+    async def _adopt(self, symbol: str):
+        # Match the monitored positions of a held symbol with the open positions in the store.
+        await self._reopen_stale_exits(symbol)
+        rows = await self.store.run(self.store.open_positions, symbol)
+        stored = {row["position_id"]: row for row in rows}
+        for position in self.positions(symbol):
+            if position.position_id not in stored:
+                self._drop(position)
+        for position_id, row in stored.items():
+            if position_id not in self._positions and position_id not in self._closing:
+                self._monitor(Position.from_dict(row))
+
+    def _drop(self, position: Position):
+        self._positions.pop(position.position_id, None)
+        exits = self._exits.get(position.symbol)
+        if exits is not None:
+            exits.remove(position)
+        self._release_symbol(position.symbol)
+
+    async def _sync(self):
+        while True:
+            await asyncio.sleep(self.sync_interval)
+            try:
+                symbols = await self.store.run(self.store.open_symbols)
+                for symbol in symbols | self._leases:
+                    async with self._store_lock:
+                        await self._sync_symbol(symbol)
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.exception("Error syncing the shared positions")
+
+    async def _sync_symbol(self, symbol: str):
+        if await self._hold(symbol):
+            await self._adopt(symbol)
+            if symbol not in self._exits:
+                await self.store.run(
+                    self.store.release_lease, f"exit:{symbol}", self.owner
+                )
+                self._leases.discard(symbol)
+        elif symbol in self._leases:
+            logger.warning("Lost the exit lease of %s to another worker.", symbol)
+            self._leases.discard(symbol)
+            for position in self.positions(symbol):
+                self._drop(position)
+
+    def start(self):
+        """
+        Start syncing with the shared store, if there is one. Called from the FastAPI lifespan
+        on startup, or on the first position; adopts the positions left by stopped workers.
+        """
+        if self.store is not None and (
+            self._sync_task is None or self._sync_task.done()
+        ):
+            self._sync_task = asyncio.create_task(self._sync())
+
+    def _release_symbol(self, symbol: str):
+        exits = self._exits.get(symbol)
+        if exits is not None and not exits:
+            del self._exits[symbol]
+            watcher = self._watchers.pop(symbol, None)
+            if watcher is not None and watcher is not asyncio.current_task():
+                watcher.cancel()
+
+    async def _watch(self, symbol: str):
+        # Exits are triggered by ticks, not by the webhook that may have started this watcher.
+        trace_started_at.set(None)
+        correlation_id.set(None)
+        logger.info("Listening to the trades of %s.", symbol)
+        try:
+            with self.streams.subscribe(f"{symbol.lower()}@trade") as trades:
+                while symbol in self._exits:
+                    trade = await trades.get()
+                    for position, _ in self.on_price(symbol, float(trade["p"])):
+                        self._start_exit(position)
+                    self._release_symbol(symbol)
+        except asyncio.CancelledError:
+            pass
+        except Exception:
+            logger.exception("Error while monitoring the trades of %s", symbol)
+        finally:
+            if self._watchers.get(symbol) is asyncio.current_task():
+                del self._watchers[symbol]
+            logger.info("Stopped listening to the trades of %s.", symbol)
+
+    def positions(self, symbol: str = None) -> list:
+        """
+        Return the monitored positions, optionally for one symbol only.
+        """
+        return [
+            position
+            for position in self._positions.values()
+            if symbol is None or position.symbol == symbol
+        ]
+
+    async def stale_exits(self) -> list:
+        """
+        Return the positions of the shared store whose exit was claimed more than
+        `claim_timeout` seconds ago and never finished; the lease holder of their symbol
+        reopens them on its next sync. Empty without a shared store.
+        """
+        if self.store is None:
+            return []
+        return await self.store.run(
+            self.store.stale_exits, time.time() - self.claim_timeout
+        )
+
+    async def close(self):
+        """
+        Stop every symbol watcher, wait for the exits in flight, and release the symbol leases,
+        so another worker takes over the positions right away. Called from the FastAPI lifespan
+        on shutdown, before the HTTP clients and the journal the exits use are closed.
+        """
+        if self._sync_task is not None:
+            self._sync_task.cancel()
+            await asyncio.gather(self._sync_task, return_exceptions=True)
+            self._sync_task = None
+        watchers = list(self._watchers.values())
+        for watcher in watchers:
+            watcher.cancel()
+        await asyncio.gather(*watchers, return_exceptions=True)
+        self._watchers = {}
+        # Failures are logged by `_exit_done`.
+        await asyncio.gather(*list(self._exit_tasks), return_exceptions=True)
+        if self.store is not None:
+            for symbol in self._leases:
+                await self.store.run(
+                    self.store.release_lease, f"exit:{symbol}", self.owner
+                )
+            self._leases = set()
+
+    def stats(self) -> dict:
+        """
+        Return engine statistics.
+
+        Returns:
+            dict: The number of monitored positions per symbol, ticks processed, exits
+            triggered and exits in flight, and with a shared store the worker id, its leased
+            symbols, the exits skipped because the position was no longer open and the
+            stale exits reopened.
+        """
+        per_symbol: dict = {}
+        for position in self._positions.values():
+            per_symbol[position.symbol] = per_symbol.get(position.symbol, 0) + 1
+        return {
+            "open_positions": len(self._positions),
+            "positions_per_symbol": per_symbol,
+            "watched_symbols": list(self._watchers),
+            "ticks": self._ticks,
+            "exits_triggered": self._exits_triggered,
+            "exits_skipped": self._exits_skipped,
+            "exits_in_flight": len(self._exit_tasks),
+            "exits_reopened": self._exits_reopened,
+            "owner": self.owner,
+            "leased_symbols": sorted(self._leases),
+        }
@@ -0,0 +1,207 @@
+import time
+import httpx
+
+try:
+    import h2  # noqa: F401  (HTTP/2 support for httpx is only available when h2 is installed)
+
+    HTTP2_AVAILABLE = True
+except ImportError:
+    HTTP2_AVAILABLE = False
+
+
+class PooledHTTPClient:
+    """
+    Application-lifetime pooled `httpx.AsyncClient` with connection reuse statistics.
+
+    A single instance is shared by every REST call to an exchange so that TCP and TLS
+    handshakes are paid once per pooled connection instead of once per request. The
+    client is opened and closed by the FastAPI lifespan in `app.main`, but is also
+    created lazily on first use so the CRUD functions keep working when called
+    outside of the web application (scripts, notebooks, tests).
+
+    Args:
+        name (str): A label for the pool, used in the statistics output (e.g., "binance").
+        max_connections (int): The maximum number of concurrent connections in the pool.
+        max_keepalive_connections (int): The maximum number of idle connections kept alive.
+        keepalive_expiry (float): Seconds an idle connection is kept before being closed.
+        timeout (float): The default read/write/pool timeout in seconds.
+        connect_timeout (float): The timeout in seconds for establishing a new connection.
+        http2 (bool): Whether to negotiate HTTP/2. Ignored if the `h2` package is not installed.
+        rate_limiter (BinanceRateLimiter): Optional limiter that every request waits for and
+            that follows the rate limit headers of every response.
+        metrics (MetricsRegistry): Optional registry that receives the latency and status code
+            of every request, per endpoint. The latency excludes the rate limiter wait.
+        signer (RequestSigner): Optional signer with a server clock; signed requests that
+            waited for the rate limiter are signed again with the current time before they
+            are sent, so the wait cannot push them past their receive window.
+
+    Last Reviewed Date:
+        18 Oct 2026
+    """
+
+    def __init__(
+        self,
+        name: str,
+        max_connections: int = 20,
+        max_keepalive_connections: int = 10,
+        keepalive_expiry: float = 30.0,
+        timeout: float = 10.0,
+        connect_timeout: float = 5.0,
+        http2: bool = True,
+        rate_limiter=None,
+        metrics=None,
+        signer=None,
+    ):
+        self.name = name
+        self.rate_limiter = rate_limiter
+        self.signer = signer
+        self._resigned = 0
+        self._latency = self._responses_total = None
+        if metrics is not None:
+            self._latency = metrics.histogram(
+                "exchange_rest_request_seconds",
+                "Exchange REST call latency in seconds, until the response headers (or SDK call) complete.",
+                ("exchange", "method", "endpoint"),
+            )
+            self._responses_total = metrics.counter(
+                "exchange_rest_responses_total",
+                "Exchange REST responses by status code.",
+                ("exchange", "endpoint", "status"),
+            )
+        self.limits = httpx.Limits(
+            max_connections=max_connections,
+            max_keepalive_connections=max_keepalive_connections,
+            keepalive_expiry=keepalive_expiry,
+        )
+        self.timeout = httpx.Timeout(timeout, connect=connect_timeout)
+        self.http2 = http2 and HTTP2_AVAILABLE
+        self._client: httpx.AsyncClient = None
+        self._opened_at: float = None
+        self._requests = 0
+        self._responses = 0
+        self._new_connections = 0
+        self._failed_connections = 0
+        self._http_versions: dict = {}
+        self._status_codes: dict = {}
+
+    @property
+    def client(self) -> httpx.AsyncClient:
+        """
+        Return the shared client, creating it on first use.
+
+        Returns:
+            httpx.AsyncClient: The pooled client.
+        """
+        if self._client is None or self._client.is_closed:
+            self._client = httpx.AsyncClient(
+                http2=self.http2,
+                limits=self.limits,
+                timeout=self.timeout,
+                event_hooks={
+                    "request": [self._on_request],
+                    "response": [self._on_response],
+                },
+            )
+            self._opened_at = time.time()
+        return self._client
+
+    async def open(self):
+        """
+        Create the pooled client. Called from the FastAPI lifespan on startup.
+        """
+        return self.client
+
+    async def close(self):
+        """
+        Close the pooled client and all of its connections. Called from the FastAPI lifespan on shutdown.
+        """
+        if self._client is not None and not self._client.is_closed:
+            await self._client.aclose()
+        self._client = None
+
+    async def _on_request(self, request: httpx.Request):
+        if self.rate_limiter is not None:
+            waiting_since = time.perf_counter()
+            await self.rate_limiter.before_request(request)
+            if (
+                self.signer is not None
+                and self.signer.clock is not None
+                and time.perf_counter() - waiting_since >= 0.001
+                and b"signature=" in request.url.query
+            ):
+                # Signed before the wait: the timestamp is stale, so sign it again now.
+                request.url = self.signer.refresh(request.url)
+                self._resigned += 1
+        self._requests += 1
+        request.extensions["trace"] = self._trace
+        request.extensions["sent_at"] = time.perf_counter()
+
+    async def _on_response(self, response: httpx.Response):
+        if self.rate_limiter is not None:
+            self.rate_limiter.after_response(response)
+        self._responses += 1
+        self._http_versions[response.http_version] = (
+            self._http_versions.get(response.http_version, 0) + 1
+        )
+        self._status_codes[response.status_code] = (
+            self._status_codes.get(response.status_code, 0) + 1
+        )
+        if self._latency is not None:
+            request = response.request
+            endpoint = request.url.path
+            self._latency.observe(
+                time.perf_counter() - request.extensions["sent_at"],
+                self.name,
+                request.method,
+                endpoint,
+            )
+            self._responses_total.inc(self.name, endpoint, str(response.status_code))
+
+    async def _trace(self, event_name: str, info: dict):
+        # httpcore emits "connection.connect_tcp.complete" only when a new socket is opened,
+        # so every request that does not produce this event was served by a pooled connection.
+        if event_name == "connection.connect_tcp.complete":
+            self._new_connections += 1
+        elif event_name == "connection.connect_tcp.failed":
+            self._failed_connections += 1
+
+    def stats(self) -> dict:
+        """
+        Return connection pool statistics.
+
+        Returns:
+            dict: Request counts, new connections opened, the connection reuse rate,
+            the current pool occupancy and the configured limits.
+        """
+        open_connections = idle_connections = 0
+        if self._client is not None and not self._client.is_closed:
+            pool = getattr(self._client._transport, "_pool", None)
+            for connection in getattr(pool, "connections", []):
+                open_connections += 1
+                if connection.is_idle():
+                    idle_connections += 1
+
+        reused = max(0, self._requests - self._new_connections)
+        return {
+            "name": self.name,
+            "http2": self.http2,
+            "opened_at": self._opened_at,
+            "requests": self._requests,
+            "responses": self._responses,
+            "resigned_requests": self._resigned,
+            "new_connections": self._new_connections,
+            "failed_connections": self._failed_connections,
+            "reused_connections": reused,
+            "reuse_rate": round(reused / self._requests, 4) if self._requests else 0.0,
+            "open_connections": open_connections,
+            "idle_connections": idle_connections,
+            "http_versions": dict(self._http_versions),
+            "status_codes": dict(self._status_codes),
+            "limits": {
+                "max_connections": self.limits.max_connections,
+                "max_keepalive_connections": self.limits.max_keepalive_connections,
+                "keepalive_expiry": self.limits.keepalive_expiry,
+                "timeout": self.timeout.read,
+                "connect_timeout": self.timeout.connect,
+            },
+        }
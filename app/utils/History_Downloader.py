@@ -0,0 +1,429 @@
+import argparse
+import asyncio
+import logging
+import os
+import time
+from datetime import datetime, timezone
+import numpy as np
+import httpx
+from decouple import config
+from fastapi import HTTPException
+from app.crud.Binance_CRUD import (
+    binance_http,
+    get_binance_historical_trades,
+    get_binance_klines,
+    get_binance_recent_trades,
+)
+from app.crud.ByBit_CRUD import get_Kline_data_f
+from app.schemas.Bybit_Schema import GetKline
+from app.utils.Column_Store import ColumnStore
+
+
+logger = logging.getLogger(__name__)
+
+
+HISTORY_CACHE_DIR = str(config("HISTORY_CACHE_DIR", default="history"))
+
+PAGE_SIZE = 1000
+
+MINUTE_MS = 60_000
+BINANCE_INTERVALS_MS = {
+    "1s": 1_000,
+    "1m": MINUTE_MS,
+    "3m": 3 * MINUTE_MS,
+    "5m": 5 * MINUTE_MS,
+    "15m": 15 * MINUTE_MS,
+    "30m": 30 * MINUTE_MS,
+    "1h": 60 * MINUTE_MS,
+    "2h": 120 * MINUTE_MS,
+    "4h": 240 * MINUTE_MS,
+    "6h": 360 * MINUTE_MS,
+    "8h": 480 * MINUTE_MS,
+    "12h": 720 * MINUTE_MS,
+    "1d": 1440 * MINUTE_MS,
+    "3d": 3 * 1440 * MINUTE_MS,
+    "1w": 7 * 1440 * MINUTE_MS,
+}
+BYBIT_INTERVALS_MS = {
+    **{
+        str(minutes): minutes * MINUTE_MS
+        for minutes in (1, 3, 5, 15, 30, 60, 120, 240, 360, 720)
+    },
+    "D": 1440 * MINUTE_MS,
+    "W": 7 * 1440 * MINUTE_MS,
+}
+
+TRADE_COLUMNS = {
+    "id": "int64",
+    "price": "float64",
+    "qty": "float64",
+    "quote_qty": "float64",
+    "time": "int64",
+    "is_buyer_maker": "bool",
+}
+BINANCE_KLINE_COLUMNS = {
+    "open_time": "int64",
+    "open": "float64",
+    "high": "float64",
+    "low": "float64",
+    "close": "float64",
+    "volume": "float64",
+    "close_time": "int64",
+    "quote_volume": "float64",
+    "trades": "int64",
+}
+BYBIT_KLINE_COLUMNS = {
+    "open_time": "int64",
+    "open": "float64",
+    "high": "float64",
+    "low": "float64",
+    "close": "float64",
+    "volume": "float64",
+    "turnover": "float64",
+}
+
+
+class HistoryDownloader:
+    """
+    Bulk downloader of historical market data into a local columnar cache.
+
+    Trades are paged by trade id and klines by time range. Because the pages of a range are
+    known in advance, up to `concurrency` pages are fetched at once and stored in order. The
+    requests go through the shared exchange rate limiters as market data, so orders placed
+    by the bot are served ahead of a running download. Every dataset is a `ColumnStore` that records how far
+    it was downloaded, so an interrupted or repeated download resumes after the last stored
+    row instead of starting over, and loading the data later costs no network and no parsing.
+
+    Datasets are stored under `cache_dir` as "<exchange>/<dataset>/<symbol>", e.g.
+    "history/binance/klines-1m/BTCUSDT" or "history/binance/trades/BTCUSDT".
+
+    Args:
+        cache_dir (str): The root directory of the cache.
+        concurrency (int): The maximum number of pages fetched at once.
+        max_retries (int): The number of retries of a failed page before the download stops.
+
+    Last Reviewed Date:
+        18 Oct 2026
+    """
+
+    def __init__(
+        self,
+        cache_dir: str = HISTORY_CACHE_DIR,
+        concurrency: int = 4,
+        max_retries: int = 5,
+    ):
+        self.cache_dir = cache_dir
+        self.concurrency = concurrency
+        self.max_retries = max_retries
+
+    def store(
+        self, exchange: str, dataset: str, symbol: str, columns: dict = None
+    ) -> ColumnStore:
+        """
+        Return the store of a dataset, e.g. `store("binance", "klines-1m", "BTCUSDT")`.
+        """
+        return ColumnStore(
+            os.path.join(self.cache_dir, exchange, dataset, symbol.upper()), columns
+        )
+
+    def load(self, exchange: str, dataset: str, symbol: str) -> dict:
+        """
+        Load a downloaded dataset as memory-mapped arrays, one per column.
+        """
+        return self.store(exchange, dataset, symbol).load()
+
+    async def _fetch(self, fetch, *args):
+        delay = 1.0
+        for attempt in range(self.max_retries + 1):
+            try:
+                return await fetch(*args)
+            except (HTTPException, httpx.HTTPError, RuntimeError) as e:
+                status_code = getattr(e, "status_code", None)
+                # 418 means the IP is banned for hammering; retrying only extends the ban.
+                if attempt == self.max_retries or status_code in (400, 401, 403, 418):
+                    raise
+                logger.warning(
+                    "Retrying page after error (%s), attempt %d.", e, attempt + 1
+                )
+                await asyncio.sleep(delay)
+                delay = min(delay * 2, 60.0)
+
+    async def binance_trades(
+        self, symbol: str, start_id: int = 0, end_id: int = None
+    ) -> ColumnStore:
+        """
+        Download the trades of a symbol from Binance, by trade id.
+
+        Args:
+            symbol (str): The trading pair (e.g., "BTCUSDT").
+            start_id (int): The first trade id, used when the dataset is empty.
+            end_id (int): The last trade id. Defaults to the latest trade.
+
+        Returns:
+            ColumnStore: The dataset, with the columns of TRADE_COLUMNS.
+        """
+        store = self.store("binance", "trades", symbol, TRADE_COLUMNS)
+        next_id = store.info.get("next_id", start_id)
+        if end_id is None:
+            latest = await self._fetch(
+                get_binance_recent_trades,
+                symbol,
+                1,
+            )
+            end_id = latest[-1]["id"] if latest else next_id - 1
+
+        while next_id <= end_id:
+            pages = await asyncio.gather(
+                *[
+                    self._fetch(
+                        get_binance_historical_trades,
+                        symbol,
+                        PAGE_SIZE,
+                        # fromId 0 is ignored by the API, so the first page starts at 1
+                        max(page_id, 1),
+                    )
+                    for page_id in range(
+                        next_id,
+                        min(end_id + 1, next_id + self.concurrency * PAGE_SIZE),
+                        PAGE_SIZE,
+                    )
+                ]
+            )
+            trades = [
+                trade
+                for page in pages
+                for trade in page
+                if next_id <= trade["id"] <= end_id
+            ]
+            if not trades:
+                break
+            ids = np.fromiter((trade["id"] for trade in trades), np.int64, len(trades))
+            ids, first = np.unique(ids, return_index=True)
+            # A page shorter than requested leaves a hole before the next page: store only
+            # the ids contiguous from the first one, and fetch the rest again from the hole.
+            gaps = np.flatnonzero(np.diff(ids) != 1)
+            if len(gaps):
+                ids, first = ids[: gaps[0] + 1], first[: gaps[0] + 1]
+            if ids[0] > max(next_id, 1):
+                logger.warning(
+                    "Binance returned no %s trades with ids %d to %d.",
+                    symbol,
+                    next_id,
+                    ids[0] - 1,
+                )
+            trades = [trades[index] for index in first]
+            store.append(
+                {
+                    "id": ids,
+                    "price": [float(trade["price"]) for trade in trades],
+                    "qty": [float(trade["qty"]) for trade in trades],
+                    "quote_qty": [float(trade["quoteQty"]) for trade in trades],
+                    "time": [trade["time"] for trade in trades],
+                    "is_buyer_maker": [trade["isBuyerMaker"] for trade in trades],
+                },
+                info={"next_id": int(ids[-1]) + 1},
+            )
+            next_id = int(ids[-1]) + 1
+            logger.info(
+                "Stored %d %s trades, up to id %d of %d.",
+                store.rows,
+                symbol,
+                next_id - 1,
+                end_id,
+            )
+        return store
+
+    async def _klines(
+        self,
+        store: ColumnStore,
+        interval_ms: int,
+        start_time: int,
+        end_time: int,
+        fetch_page,
+        columns: list,
+    ) -> ColumnStore:
+        next_time = store.info.get("next_time", start_time)
+        while next_time <= end_time:
+            window_ends = []
+            page_start = next_time
+            while page_start <= end_time and len(window_ends) < self.concurrency:
+                page_end = min(page_start + PAGE_SIZE * interval_ms - 1, end_time)
+                window_ends.append((page_start, page_end))
+                page_start = page_end + 1
+            pages = await asyncio.gather(
+                *[fetch_page(start, end) for start, end in window_ends]
+            )
+
+            rows = [row for page in pages for row in page]
+            window_end = window_ends[-1][1]
+            if rows:
+                data = np.array([row[: len(columns)] for row in rows], dtype=np.float64)
+                data = data[(data[:, 0] >= next_time) & (data[:, 0] <= window_end)]
+                data = data[np.unique(data[:, 0], return_index=True)[1]]
+            else:
+                data = np.empty((0, len(columns)))
+            # Empty windows (e.g. before the listing of a pair) still advance the resume point.
+            store.append(
+                {name: data[:, index] for index, name in enumerate(columns)},
+                info={"next_time": window_end + 1},
+            )
+            next_time = window_end + 1
+            logger.info(
+                "Stored %d klines in %s, up to %s.",
+                store.rows,
+                store.directory,
+                f"{datetime.fromtimestamp(min(next_time, end_time) / 1000, timezone.utc):%Y-%m-%d %H:%M}",
+            )
+        return store
+
+    async def binance_klines(
+        self, symbol: str, interval: str, start_time: int, end_time: int = None
+    ) -> ColumnStore:
+        """
+        Download the klines of a symbol from Binance, by time range.
+
+        Args:
+            symbol (str): The trading pair (e.g., "BTCUSDT").
+            interval (str): The kline interval, one of BINANCE_INTERVALS_MS (e.g., "1m").
+            start_time (int): The open time of the first kline in milliseconds, used when the dataset is empty.
+            end_time (int): The open time of the last kline in milliseconds. Defaults to now.
+
+        Returns:
+            ColumnStore: The dataset, with the columns of BINANCE_KLINE_COLUMNS.
+        """
+        interval_ms = BINANCE_INTERVALS_MS[interval]
+        store = self.store(
+            "binance", f"klines-{interval}", symbol, BINANCE_KLINE_COLUMNS
+        )
+
+        async def fetch_page(start: int, end: int):
+            return await self._fetch(
+                get_binance_klines,
+                symbol,
+                interval,
+                start,
+                end,
+                PAGE_SIZE,
+            )
+
+        return await self._klines(
+            store,
+            interval_ms,
+            start_time,
+            end_time or int(time.time() * 1000) - interval_ms,
+            fetch_page,
+            list(BINANCE_KLINE_COLUMNS),
+        )
+
+    async def bybit_klines(
+        self,
+        symbol: str,
+        interval: str,
+        start_time: int,
+        end_time: int = None,
+        category: str = "spot",
+    ) -> ColumnStore:
+        """
+        Download the klines of a symbol from Bybit, by time range.
+
+        Args:
+            symbol (str): The trading pair (e.g., "BTCUSDT").
+            interval (str): The kline interval, one of BYBIT_INTERVALS_MS (e.g., "1" or "D").
+            start_time (int): The open time of the first kline in milliseconds, used when the dataset is empty.
+            end_time (int): The open time of the last kline in milliseconds. Defaults to now.
+            category (str): The market category (e.g., "spot", "linear").
+
+        Returns:
+            ColumnStore: The dataset, with the columns of BYBIT_KLINE_COLUMNS.
+        """
+        interval_ms = BYBIT_INTERVALS_MS[interval]
+        store = self.store(
+            "bybit", f"{category}-klines-{interval}", symbol, BYBIT_KLINE_COLUMNS
+        )
+
+        async def get_page(start: int, end: int):
+            response = await get_Kline_data_f(
+                GetKline(
+                    category=category,
+                    symbol=symbol,
+                    interval=interval,
+                    start=start,
+                    end=end,
+                    limit=PAGE_SIZE,
+                )
+            )
+            # get_Kline_data_f returns the error message as a string
+            if not isinstance(response, dict) or response.get("retCode") != 0:
+                raise RuntimeError(f"Bybit kline request failed: {response}")
+            return response["result"]["list"]
+
+        async def fetch_page(start: int, end: int):
+            return await self._fetch(get_page, start, end)
+
+        return await self._klines(
+            store,
+            interval_ms,
+            start_time,
+            end_time or int(time.time() * 1000) - interval_ms,
+            fetch_page,
+            list(BYBIT_KLINE_COLUMNS),
+        )
+
+
+def to_milliseconds(date: str) -> int:
+    """
+    Convert an ISO date (e.g. "2024-01-01" or "2024-01-01T12:00"), taken as UTC, to milliseconds.
+    """
+    moment = datetime.fromisoformat(date)
+    if moment.tzinfo is None:
+        moment = moment.replace(tzinfo=timezone.utc)
+    return int(moment.timestamp() * 1000)
+
+
+async def main(args):
+    downloader = HistoryDownloader(args.cache_dir, concurrency=args.concurrency)
+    end_time = to_milliseconds(args.end) if args.end else None
+    try:
+        for symbol in args.symbols:
+            if args.dataset == "binance-trades":
+                await downloader.binance_trades(symbol, args.from_id, args.to_id)
+            elif args.dataset == "binance-klines":
+                await downloader.binance_klines(
+                    symbol, args.interval, to_milliseconds(args.start), end_time
+                )
+            else:
+                await downloader.bybit_klines(
+                    symbol,
+                    args.interval,
+                    to_milliseconds(args.start),
+                    end_time,
+                    args.category,
+                )
+    finally:
+        await binance_http.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Download historical market data into the local columnar cache."
+    )
+    parser.add_argument(
+        "dataset", choices=("binance-trades", "binance-klines", "bybit-klines")
+    )
+    parser.add_argument("symbols", nargs="+", help="e.g. BTCUSDT ETHUSDT")
+    parser.add_argument(
+        "--interval", default="1m", help='e.g. "1m" (Binance), "1" (Bybit)'
+    )
+    parser.add_argument(
+        "--start", default="2024-01-01", help="first kline, ISO date (UTC)"
+    )
+    parser.add_argument("--end", help="last kline, ISO date (UTC); defaults to now")
+    parser.add_argument("--from-id", type=int, default=0, help="first trade id")
+    parser.add_argument(
+        "--to-id", type=int, help="last trade id; defaults to the latest"
+    )
+    parser.add_argument("--category", default="spot", help="Bybit market category")
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument("--cache-dir", default=HISTORY_CACHE_DIR)
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+    asyncio.run(main(parser.parse_args()))
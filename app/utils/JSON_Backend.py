@@ -0,0 +1,34 @@
+import json
+
+# orjson is optional. It is used for decoding when installed and the standard library otherwise.
+try:
+    import orjson
+
+    JSON_BACKEND = "orjson"
+
+    def json_loads(data):
+        """
+        Decode a JSON document from bytes or str.
+
+        Parameters:
+        - data (bytes | str): The JSON document.
+
+        Returns:
+        - Any: The decoded object.
+        """
+        return orjson.loads(data)
+
+except ImportError:
+    JSON_BACKEND = "json"
+
+    def json_loads(data):
+        """
+        Decode a JSON document from bytes or str.
+
+        Parameters:
+        - data (bytes | str): The JSON document.
+
+        Returns:
+        - Any: The decoded object.
+        """
+        return json.loads(data)
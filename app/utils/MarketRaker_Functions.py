@@ -1,23 +1,69 @@
 import base64
+import hashlib
 import json
 import asyncio
-from cryptography.hazmat.primitives import serialization, hashes
-from cryptography.hazmat.primitives.asymmetric import padding
-from cryptography.hazmat.backends import default_backend
+import logging
+import time
+from functools import lru_cache
+from cryptography.hazmat.primitives import hashes
 from cryptography.exceptions import InvalidSignature
-from decouple import config
-from fastapi import Request, HTTPException
+from decouple import config, Csv
+from fastapi import HTTPException
 from app.utils.TradingBot import *
+from app.crud.Binance_CRUD import trade_journal, shared_state
+from app.utils.JSON_Backend import json_loads
+from app.utils.Work_Queue import WorkQueue, QueueFull
+from app.utils.Reconciliation import StartupReconciler
+from app.utils.Metrics import metrics
+from app.utils.Structured_Logging import correlation_id
+from app.schemas.MarketRaker_Schema import Indicator
+from app.utils.Signature_Verifier import (
+    SignatureVerifier,
+    load_public_key,
+    PSS_PADDING,
+)
+
+
+logger = logging.getLogger(__name__)
 
 # If an error is received about loading the PUBLIC_KEY_STR, Paste the PUBLIC_KEY_STR directly into the MarketRaker_Functions.py file.
 PUBLIC_KEY_STR = str(config("PUBLIC_KEY_STR"))
 PUBLIC_KEY_STR = PUBLIC_KEY_STR.replace("\\n", "\n")
 
+# Optional: the previous verification key, kept active while MarketRaker rotates to PUBLIC_KEY_STR.
+PREVIOUS_PUBLIC_KEY_STR = str(config("PREVIOUS_PUBLIC_KEY_STR", default=""))
+# Optional: a file with one or more PEM keys (primary first) that is re-read when it changes.
+PUBLIC_KEY_FILE = str(config("PUBLIC_KEY_FILE", default=""))
+PUBLIC_KEY_RELOAD_INTERVAL = config(
+    "PUBLIC_KEY_RELOAD_INTERVAL", default=30.0, cast=float
+)
+
+# The verification keys are parsed once at startup instead of on every webhook.
+signature_verifier = SignatureVerifier(
+    [key for key in (PUBLIC_KEY_STR, PREVIOUS_PUBLIC_KEY_STR) if key],
+    key_file=PUBLIC_KEY_FILE or None,
+)
+
+
+INDICATOR_QUEUE_SIZE = config("INDICATOR_QUEUE_SIZE", default=1000, cast=int)
+INDICATOR_WORKERS = config("INDICATOR_WORKERS", default=4, cast=int)
+INDICATOR_DEDUPE_TTL = config("INDICATOR_DEDUPE_TTL", default=86400.0, cast=float)
+## THE STRATEGIES RUN FOR EVERY INDICATOR, ANY OF "momentum,overbought_oversold"; NONE BY DEFAULT
+INDICATOR_STRATEGIES = tuple(config("INDICATOR_STRATEGIES", default="", cast=Csv()))
+
+
+@lru_cache(maxsize=8)
+def _cached_public_key(public_key_str: str):
+    return load_public_key(public_key_str)[1]
+
 
 ############################## Validate the indicator that was send from the marketraker api
 def verify_signature(payload: json, signature: str, public_key_str: str) -> bool:
     """
-    Verifies the signature of a payload.
+    Verifies the signature of a payload against a single public key.
+
+    The webhook pipeline uses the pre-loaded `signature_verifier` instead, which also
+    supports several active keys during a key rotation.
 
     Parameters:
     - payload (json): The payload that was signed.
@@ -34,24 +80,15 @@ def verify_signature(payload: json, signature: str, public_key_str: str) -> bool
         payload_bytes: bytes = payload.encode("utf-8")
         signature_bytes: bytes = base64.b64decode(signature.encode("utf-8"))
 
-        public_key = serialization.load_pem_public_key(
-            public_key_str.encode("utf-8"), backend=default_backend()
-        )
+        # Parsed keys are cached, so the PEM string is only parsed the first time it is seen.
+        public_key = _cached_public_key(public_key_str)
 
-        public_key.verify(
-            signature_bytes,
-            payload_bytes,
-            padding.PSS(
-                mgf=padding.MGF1(hashes.SHA256()),
-                salt_length=padding.PSS.MAX_LENGTH,
-            ),
-            hashes.SHA256(),
-        )
+        public_key.verify(signature_bytes, payload_bytes, PSS_PADDING, hashes.SHA256())
         return True
     except InvalidSignature:
         return False
     except Exception as e:
-        print(f"An error occurred during signature verification: {e}")
+        logger.error("An error occurred during signature verification: %s", e)
         return False
 
 
@@ -92,90 +129,252 @@ def prepare_binance_trading_pair(trading_pair: str):
     return binance_prepared_trading_pair
 
 
-async def notification_type_indicator(request: Request):
+def legacy_signed_payload(notification: dict) -> str:
     """
-    Handles an incoming notification and processes the trading strategy based on the payload data.
+    Rebuild the payload string that the indicator was signed over from a decoded notification.
+
+    MarketRaker signs the notification serialized with Python's `json.dumps` defaults, with the
+    indicator itself as a string in the "data" field. This is only needed when the received body
+    is not byte-for-byte the signed payload, e.g. a pretty-printed Postman request or an indicator
+    sent as a JSON object instead of a string.
+
+    Parameters:
+    - notification (dict): The decoded notification.
+
+    Returns:
+    - str: The payload to verify the signature against.
+
+    Last Reviewed Date:
+        18 Oct 2026
+    """
+    if isinstance(notification["data"], str):
+        return json.dumps(notification)
+    return json.dumps({"type": "indicator", "data": json.dumps(notification["data"])})
+
 
-    This function listens for a webhook notification, verifies the authenticity of the data using
-    a provided signature, and then processes the data to execute multiple trading strategies
-    depending on the market conditions. The payload can either be in string or dictionary format,
-    and it will be parsed accordingly. The strategies include a momentum strategy and an overbought/oversold
-    strategy, which are executed concurrently.
+signature_verify_seconds = metrics.histogram(
+    "webhook_signature_verify_seconds",
+    "Seconds spent verifying the signature of an indicator, by result.",
+    ("result",),
+    buckets=(0.00005, 0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025),
+)
+
+
+def verify_indicator(body: bytes, notification: dict, signature: str) -> bool:
+    """
+    Verifies the signature of an indicator notification.
+
+    The signature is checked against the exact bytes that were received first, so the common
+    case needs no re-serialization. Only if that fails is the legacy re-serialized payload tried.
+
+    Parameters:
+    - body (bytes): The raw request body.
+    - notification (dict): The decoded request body.
+    - signature (str): The base64 encoded signature from the "x-signature" header.
+
+    Returns:
+    - bool: True if the signature is valid, False otherwise.
+
+    Last Reviewed Date:
+        18 Oct 2026
+    """
+    start = time.perf_counter()
+    if signature_verifier.verify(body, signature):
+        result = "valid"
+    elif signature_verifier.verify(legacy_signed_payload(notification), signature):
+        result = "legacy"
+    else:
+        result = "invalid"
+    signature_verify_seconds.observe(time.perf_counter() - start, result)
+    return result != "invalid"
+
+
+def decode_indicator(notification: dict) -> Indicator:
+    """
+    Decode the indicator of a notification into an `Indicator` model.
+
+    MarketRaker sends the indicator as a JSON string, which is parsed and validated in a single
+    pass by pydantic. Postman sends it as a JSON object, which is only validated.
+
+    Parameters:
+    - notification (dict): The decoded request body.
+
+    Returns:
+    - Indicator: The typed indicator.
+
+    Last Reviewed Date:
+        18 Oct 2026
+    """
+    data = notification["data"]
+    if isinstance(data, (str, bytes)):
+        return Indicator.model_validate_json(data)
+    return Indicator.model_validate(data)
+
+
+def indicator_key(indicator: Indicator) -> str:
+    """
+    Return the idempotency key of an indicator: a hash of its decoded fields.
+
+    A redelivered indicator has the same fields, even if it is re-signed or re-serialized,
+    so it gets the same key and is only handled once.
+
+    Parameters:
+    - indicator (Indicator): The decoded indicator.
+
+    Returns:
+    - str: The hex SHA-256 digest of the indicator.
+
+    Last Reviewed Date:
+        18 Oct 2026
+    """
+    return hashlib.sha256(indicator.model_dump_json().encode()).hexdigest()
+
+
+async def run_indicator_strategies(indicator: Indicator):
+    """
+    Runs the trading strategies for an indicator. Called by the workers of the `indicator_queue`.
+
+    The strategies of `INDICATOR_STRATEGIES` (momentum, overbought/oversold; none by default)
+    are evaluated with `evaluate_indicators`, the same entry rules as the backtester, and
+    every accepted entry is placed and monitored concurrently.
 
     Args:
-        request (Request): The incoming HTTP request containing the webhook data, which includes
-                            the trading indicator information in the request body.
+        indicator (Indicator): The decoded indicator.
+
+    Last Reviewed Date:
+        18 Oct 2026
+    """
+    # Process the payload, add any functionality here:
+    ##############################################################################
+
+    # prepare the trading pair string for Binance API
+    binance_prepared_trading_pair = prepare_binance_trading_pair(
+        indicator.trading_pair
+    )
+
+    intents = await evaluate_indicators(
+        [indicator], [binance_prepared_trading_pair], INDICATOR_STRATEGIES
+    )
+    if not intents and INDICATOR_STRATEGIES:
+        logger.info(no_trade_message(indicator.trading_type))
+
+    # execute the entries of all the trading strategies that accepted the indicator.
+    await asyncio.gather(*[execute_order_intent(intent) for intent in intents])
+
+
+# Indicators are queued by the webhook and handled by a pool of strategy workers, so the
+# webhook answers without waiting for the strategies. Started and stopped by the app lifespan.
+indicator_queue = WorkQueue(
+    "indicator",
+    run_indicator_strategies,
+    maxsize=INDICATOR_QUEUE_SIZE,
+    workers=INDICATOR_WORKERS,
+    dedupe_ttl=INDICATOR_DEDUPE_TTL,
+    # With several workers, a redelivered indicator is dropped whichever worker receives it.
+    claim=(
+        (lambda key, ttl: shared_state.run(shared_state.claim_key, key, ttl))
+        if shared_state is not None
+        else None
+    ),
+    metrics=metrics,
+)
+
+RECONCILE_ON_STARTUP = config("RECONCILE_ON_STARTUP", default=True, cast=bool)
+RECONCILE_SYMBOLS = config("RECONCILE_SYMBOLS", default="", cast=Csv())
+RECONCILE_BYBIT_CATEGORIES = config(
+    "RECONCILE_BYBIT_CATEGORIES", default="linear", cast=Csv()
+)
+RECONCILE_LOOKBACK = config("RECONCILE_LOOKBACK", default=604800.0, cast=float)
+
+# Restores the exit monitoring of the positions open before a restart, checked against the
+# exchanges. Started by the app lifespan; with a shared state the positions survive restarts
+# in the shared database, so they are only checked.
+startup_reconciler = StartupReconciler(
+    trade_journal,
+    exit_engine if shared_state is None else None,
+    order_store,
+    Binance_get_orders,
+    fetch_binance_open_orders,
+    fetch_bybit_open_orders,
+    fetch_bybit_positions,
+    symbols=RECONCILE_SYMBOLS,
+    bybit_categories=RECONCILE_BYBIT_CATEGORIES,
+    lookback=RECONCILE_LOOKBACK,
+)
+
+
+async def notification_type_indicator(body: bytes, notification: dict, signature: str):
+    """
+    Handles an incoming notification and queues the indicator for the trading strategies.
+
+    This function verifies the authenticity of the indicator using the provided signature and
+    decodes it once into a typed `Indicator` model. The request body is read and decoded only
+    once by the webhook endpoint; the signature is verified against the received bytes, and an
+    indicator with an invalid signature is rejected before it is deduplicated, recorded or
+    queued, so a forged copy cannot take the key of the genuine delivery. The indicator is
+    recorded in the trade journal and queued on the `indicator_queue`, whose
+    workers run the strategies (`run_indicator_strategies`), so the webhook can answer right
+    away. Indicators with the largest predicted change are handled first when the queue
+    backs up. A redelivered indicator is recognized by its `indicator_key` and not queued or
+    recorded again.
+
+    Args:
+        body (bytes): The raw request body, exactly as received.
+        notification (dict): The decoded request body.
+        signature (str): The base64 encoded signature from the "x-signature" header.
 
     Returns:
-        None: The function performs internal processing and does not return any data to the caller.
+        dict: The status of the indicator, "queued" or "duplicate", and its key.
 
     Raises:
-        HTTPException: If an error occurs during the processing of the webhook, an HTTPException
-                       with status code 500 (Internal Server Error) is raised.
+        HTTPException: With status code 401 (Unauthorized) if the signature is invalid,
+                       503 (Service Unavailable) if the queue is full, or
+                       500 (Internal Server Error) if an error occurs during the processing.
 
     Last Reviewed Date:
-        11 Dec 2024
+        18 Oct 2026
     """
     try:
-
-        # Parse the incoming JSON payload
-        response = await request.json()
+        # verify indicator; nothing is recorded or queued for an invalid signature
+        if not verify_indicator(body, notification, signature):
+            logger.warning("Indicator rejected: the signature is invalid.")
+            raise HTTPException(status_code=401, detail="Invalid signature.")
 
         # Postman sends out an indicator in json form, but MarketRaker sends indicators in str form.
-        # payload_str is mainly used for verification. Use payload_dict for easy access to indicator keys.
-
-        if isinstance(response["data"], str):
-            payload_dict: dict = json.loads(response["data"])
-            payload_str = json.dumps(response)
-        else:
-            payload_dict: dict = response["data"]
-            data_str = json.dumps(response["data"])
-            payload_str = {"type": "indicator", "data": data_str}
-            payload_str = json.dumps(payload_str)
-
-        # verify indicator
-        x_Sign = request.headers.get("x-signature")
-        is_valid: bool = verify_signature(payload_str, x_Sign, PUBLIC_KEY_STR)
-        verified: str = (
-            "The signature is valid." if is_valid else "The signature is invalid."
+        indicator: Indicator = decode_indicator(notification)
+
+        key = indicator_key(indicator)
+        # Everything done for this indicator (its orders, positions and exits) is logged with its key.
+        correlation_id.set(key)
+        logger.info(
+            "The signature is valid.", extra={"trading_pair": indicator.trading_pair}
         )
-        print(verified)
-
-        # Process the payload, add any functionality here:
-        ##############################################################################
-
-        # prepare the trading pair string for Binance API
-        trading_pair = payload_dict["trading_pair"]
-        binance_prepared_trading_pair = prepare_binance_trading_pair(trading_pair)
-
-        # call all the trading strategies that the bot should implement.
-        await asyncio.gather(
-            # momentum_strategy(
-            #     binance_prepared_trading_pair,
-            #     payload_dict["market_direction"],
-            #     payload_dict["percentage_change"],
-            #     payload_dict["leverage"],
-            #     payload_dict["buy_price"],
-            #     payload_dict["stoploss"],
-            #     payload_dict["trading_type"],
-            # ),
-            # overbought_oversold_strategy(
-            #     binance_prepared_trading_pair,
-            #     payload_dict["market_direction"],
-            #     payload_dict["percentage_change_24h"],
-            #     payload_dict["leverage"],
-            #     payload_dict["stoploss"],
-            #     payload_dict["trading_type"],
-            # ),
+        if not await indicator_queue.submit(
+            indicator, key, priority=-abs(indicator.percentage_change)
+        ):
+            logger.info("Duplicate indicator ignored.")
+            return {"status": "duplicate", "key": key}
+
+        # record the indicator before any strategy acts on it
+        trade_journal.record(
+            "indicator",
+            indicator.model_dump(),
+            symbol=prepare_binance_trading_pair(indicator.trading_pair),
         )
-
-        return
-    except Exception as e:
-        print(f"Error processing webhook: {e}")
+        return {"status": "queued", "key": key}
+    except HTTPException:
+        raise
+    except QueueFull as e:
+        logger.warning("Indicator rejected: %s", e)
+        raise HTTPException(
+            status_code=503, detail=str(e), headers={"Retry-After": "5"}
+        )
+    except Exception:
+        logger.exception("Error processing webhook")
         raise HTTPException(status_code=500, detail="Internal server error")
 
 
-async def notification_type_market_direction(request: Request):
+async def notification_type_market_direction(notification: dict):
     """
     Placeholder function for handling market direction notifications.
 
@@ -183,7 +382,10 @@ async def notification_type_market_direction(request: Request):
     It is intended to be implemented with functionality that processes market direction-related
     notifications in the future.
 
+    Args:
+        notification (dict): The decoded request body.
+
     Last Reviewed Date:
-        11 Dec 2024
+        18 Oct 2026
     """
-    return print("Coming Soon!!!")
+    logger.info("Coming Soon!!!")
@@ -0,0 +1,198 @@
+import asyncio
+import time
+from collections import OrderedDict
+
+
+def _retrieve_exception(task: asyncio.Task):
+    # Failed fetches are raised to their callers; this only silences the warning when none are left.
+    if not task.cancelled():
+        task.exception()
+
+
+class MarketDataCache:
+    """
+    In-process cache of market data responses keyed by endpoint and symbol.
+
+    Every endpoint has its own time-to-live, and the least recently used entries are evicted
+    once `max_entries` is reached. Concurrent requests for the same key are coalesced: the
+    first one fetches from the exchange and the others wait for its result, so N callers
+    asking for the same symbol at once cost one upstream call. Failed fetches are not cached;
+    the error is raised to every waiting caller.
+
+    Args:
+        ttls (dict): The time-to-live in seconds per endpoint (e.g., {"ticker/price": 1.0}).
+            Endpoints without a TTL are never cached, but still coalesced.
+        max_entries (int): The maximum number of cached responses.
+
+    Last Reviewed Date:
+        18 Oct 2026
+    """
+
+    def __init__(self, ttls: dict, max_entries: int = 1024):
+        self.ttls = dict(ttls)
+        self.max_entries = max_entries
+        self._entries: OrderedDict = OrderedDict()
+        self._inflight: dict = {}
+        self._hits = 0
+        self._stream_hits = 0
+        self._misses = 0
+        self._coalesced = 0
+        self._evictions = 0
+
+    def _lookup(self, key: tuple):
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        expires_at, value = entry
+        if expires_at < time.monotonic():
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return entry
+
+    def _store(self, key: tuple, value):
+        ttl = self.ttls.get(key[0], 0)
+        if ttl <= 0:
+            return
+        self._entries[key] = (time.monotonic() + ttl, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self._evictions += 1
+
+    async def get(self, endpoint: str, symbol: str, fetch):
+        """
+        Return the cached response for an endpoint and symbol, fetching it if needed.
+
+        Args:
+            endpoint (str): The endpoint name, used to look up its TTL (e.g., "ticker/price").
+            symbol (str): The symbol of the request (e.g., "BTCUSDT").
+            fetch (callable): A coroutine function without arguments that fetches the response.
+
+        Returns:
+            The cached or freshly fetched response.
+        """
+        key = (endpoint, symbol)
+        entry = self._lookup(key)
+        if entry is not None:
+            self._hits += 1
+            return entry[1]
+
+        task = self._inflight.get(key)
+        if task is None:
+            self._misses += 1
+            task = asyncio.create_task(self._fetch(key, fetch))
+            task.add_done_callback(_retrieve_exception)
+            self._inflight[key] = task
+        else:
+            self._coalesced += 1
+        # The fetch runs in its own task, so a cancelled caller does not cancel it for the others.
+        return await asyncio.shield(task)
+
+    async def _fetch(self, key: tuple, fetch):
+        try:
+            value = await fetch()
+            self._store(key, value)
+            return value
+        finally:
+            del self._inflight[key]
+
+    async def get_many(self, endpoint: str, symbols, fetch_many) -> dict:
+        """
+        Return the cached responses for an endpoint and several symbols, fetching the missing
+        ones in one call.
+
+        Symbols already being fetched (by `get` or another batch) wait for that fetch; the
+        others are fetched together, and every response is cached per symbol, so later `get`
+        calls for one of them are cache hits.
+
+        Args:
+            endpoint (str): The endpoint name, used to look up its TTL (e.g., "ticker/price").
+            symbols (iterable): The symbols of the request (e.g., ["BTCUSDT", "ETHUSDT"]).
+            fetch_many (callable): A coroutine function that takes a list of symbols and
+                returns their responses as {symbol: response}.
+
+        Returns:
+            dict: The cached or freshly fetched response per symbol.
+        """
+        results = {}
+        tasks = {}
+        missing = []
+        for symbol in dict.fromkeys(symbols):
+            key = (endpoint, symbol)
+            entry = self._lookup(key)
+            if entry is not None:
+                self._hits += 1
+                results[symbol] = entry[1]
+            elif key in self._inflight:
+                self._coalesced += 1
+                tasks[symbol] = self._inflight[key]
+            else:
+                missing.append(symbol)
+
+        if missing:
+            self._misses += 1
+            batch = asyncio.create_task(
+                self._fetch_many(endpoint, missing, fetch_many)
+            )
+            batch.add_done_callback(_retrieve_exception)
+            for symbol in missing:
+                # One task per symbol, so a `get` of the symbol waits for its part of the batch.
+                task = asyncio.create_task(self._pick(batch, symbol))
+                task.add_done_callback(_retrieve_exception)
+                self._inflight[(endpoint, symbol)] = tasks[symbol] = task
+
+        if tasks:
+            values = await asyncio.shield(asyncio.gather(*tasks.values()))
+            results.update(zip(tasks, values))
+        return results
+
+    async def _fetch_many(self, endpoint: str, symbols: list, fetch_many) -> dict:
+        try:
+            values = await fetch_many(symbols)
+            for symbol in symbols:
+                if symbol in values:
+                    self._store((endpoint, symbol), values[symbol])
+            return values
+        finally:
+            for symbol in symbols:
+                self._inflight.pop((endpoint, symbol), None)
+
+    @staticmethod
+    async def _pick(batch: asyncio.Task, symbol: str):
+        values = await batch
+        if symbol not in values:
+            raise KeyError(f"No response for {symbol}")
+        return values[symbol]
+
+    def record_stream_hit(self):
+        """
+        Count a response served from a live stream price instead of the cache or the exchange.
+        """
+        self._stream_hits += 1
+
+    def clear(self):
+        """
+        Drop all cached responses.
+        """
+        self._entries.clear()
+
+    def stats(self) -> dict:
+        """
+        Return cache statistics.
+
+        Returns:
+            dict: The number of entries, hits, live stream hits, misses (upstream calls),
+            coalesced requests, evictions, the in-flight fetches and the TTL per endpoint.
+        """
+        return {
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "hits": self._hits,
+            "stream_hits": self._stream_hits,
+            "misses": self._misses,
+            "coalesced": self._coalesced,
+            "evictions": self._evictions,
+            "inflight": len(self._inflight),
+            "ttls": self.ttls,
+        }
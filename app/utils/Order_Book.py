@@ -0,0 +1,425 @@
+import asyncio
+import json
+import logging
+import time
+import websockets
+from bisect import bisect_left, insort
+from app.utils.JSON_Backend import json_loads
+
+
+logger = logging.getLogger(__name__)
+
+
+class BookSide:
+    """
+    One side of an order book: the price levels kept sorted from the best price outwards.
+
+    The prices are kept in a sorted list (negated for bids, so both sides sort ascending)
+    next to a dict of the levels, so updates are a binary search and the top N levels are
+    a slice. The levels keep the price and quantity strings of the exchange, so responses
+    have the exchange's format.
+
+    Args:
+        descending (bool): True for bids (best is the highest price), False for asks.
+
+    Last Reviewed Date:
+        18 Oct 2026
+    """
+
+    def __init__(self, descending: bool):
+        self.descending = descending
+        self._keys = []
+        self._levels = {}
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    def clear(self):
+        self._keys = []
+        self._levels = {}
+
+    def set(self, price: str, quantity: str):
+        """
+        Set the quantity of a price level; a quantity of zero removes the level.
+        """
+        key = float(price)
+        if self.descending:
+            key = -key
+        amount = float(quantity)
+        if amount == 0:
+            if self._levels.pop(key, None) is not None:
+                del self._keys[bisect_left(self._keys, key)]
+            return
+        if key not in self._levels:
+            insort(self._keys, key)
+        self._levels[key] = (price, quantity, amount)
+
+    def best(self) -> list:
+        """
+        Return the best level as [price, quantity], or None if the side is empty.
+        """
+        if not self._keys:
+            return None
+        price, quantity, _ = self._levels[self._keys[0]]
+        return [price, quantity]
+
+    def levels(self, limit: int) -> list:
+        """
+        Return the best `limit` levels as [price, quantity] pairs.
+        """
+        levels = self._levels
+        return [list(levels[key][:2]) for key in self._keys[:limit]]
+
+    def vwap(self, quantity: float) -> tuple:
+        """
+        Walk the levels from the best price until `quantity` is filled.
+
+        Returns:
+            tuple: The volume-weighted average price and the filled quantity, which is less
+            than `quantity` if the side does not hold enough. The price is None if nothing
+            could be filled.
+        """
+        filled = 0.0
+        cost = 0.0
+        for key in self._keys:
+            take = min(self._levels[key][2], quantity - filled)
+            filled += take
+            cost += take * abs(key)
+            if filled >= quantity:
+                break
+        return (cost / filled if filled else None), filled
+
+
+class OrderBook:
+    """
+    A local L2 order book of one symbol, kept up to date from depth updates.
+
+    Args:
+        symbol (str): The symbol of the book (e.g., "BTCUSDT").
+
+    Last Reviewed Date:
+        18 Oct 2026
+    """
+
+    def __init__(self, symbol: str):
+        self.symbol = symbol
+        self.bids = BookSide(descending=True)
+        self.asks = BookSide(descending=False)
+        self.update_id: int = None
+        self.updated_at: float = None
+        self.updates = 0
+        self.synced = asyncio.Event()
+
+    def load_snapshot(self, bids: list, asks: list, update_id: int):
+        """
+        Replace the book with a snapshot.
+        """
+        self.bids.clear()
+        self.asks.clear()
+        self.apply(bids, asks, update_id)
+
+    def apply(self, bids: list, asks: list, update_id: int):
+        """
+        Apply a depth update: absolute quantities per price level, zero removes the level.
+        """
+        for price, quantity in bids:
+            self.bids.set(price, quantity)
+        for price, quantity in asks:
+            self.asks.set(price, quantity)
+        self.update_id = update_id
+        self.updated_at = time.time()
+        self.updates += 1
+
+    def reset(self):
+        """
+        Mark the book as out of sync until the next snapshot is loaded.
+        """
+        self.synced.clear()
+        self.bids.clear()
+        self.asks.clear()
+        self.update_id = None
+
+    def top(self) -> dict:
+        """
+        Return the best bid and ask as [price, quantity] pairs.
+        """
+        return {"bid": self.bids.best(), "ask": self.asks.best()}
+
+    def depth(self, limit: int) -> dict:
+        """
+        Return the best `limit` levels of both sides.
+        """
+        return {"bids": self.bids.levels(limit), "asks": self.asks.levels(limit)}
+
+    def vwap(self, side: str, quantity: float) -> dict:
+        """
+        Return the average price of a market order of `quantity` against the book.
+
+        Args:
+            side (str): "BUY" to walk the asks or "SELL" to walk the bids.
+            quantity (float): The quantity of the order.
+
+        Returns:
+            dict: The volume-weighted average price and the quantity the book can fill.
+        """
+        book_side = self.asks if side.upper() == "BUY" else self.bids
+        price, filled = book_side.vwap(quantity)
+        return {"price": price, "filled": filled}
+
+
+class _LocalOrderBooks:
+    """
+    Base of the order book managers: one maintenance task per book, started on the first
+    request of the book and stopped once the book was not requested for `idle_timeout` seconds.
+    """
+
+    name = ""
+
+    def __init__(self, idle_timeout: float, reconnect_delay: float):
+        self.idle_timeout = idle_timeout
+        self.reconnect_delay = reconnect_delay
+        self._books: dict = {}
+        self._tasks: dict = {}
+        self._last_used: dict = {}
+        self._resyncs: dict = {}
+
+    async def book(self, key, timeout: float) -> OrderBook:
+        """
+        Return the synced local book, starting its maintenance if needed.
+
+        Args:
+            key: The key of the book.
+            timeout (float): The maximum number of seconds to wait for the book to sync.
+
+        Returns:
+            OrderBook: The book, or None if it did not sync within `timeout`.
+        """
+        self._last_used[key] = time.monotonic()
+        task = self._tasks.get(key)
+        if task is None or task.done():
+            book = self._books.get(key) or OrderBook(self._symbol(key))
+            self._books[key] = book
+            self._tasks[key] = asyncio.create_task(self._run(key, book))
+        book = self._books[key]
+        if not book.synced.is_set():
+            try:
+                await asyncio.wait_for(book.synced.wait(), timeout)
+            except asyncio.TimeoutError:
+                return None
+        return book
+
+    def _symbol(self, key) -> str:
+        return key
+
+    def _idle(self, key) -> bool:
+        return time.monotonic() - self._last_used.get(key, 0) > self.idle_timeout
+
+    def _resync(self, key, book: OrderBook, reason: str):
+        self._resyncs[key] = self._resyncs.get(key, 0) + 1
+        book.reset()
+        logger.warning(
+            "%s order book %s resync: %s", self.name, book.symbol, reason
+        )
+
+    async def _run(self, key, book: OrderBook):
+        try:
+            while not self._idle(key):
+                try:
+                    await self._maintain(key, book)
+                except asyncio.CancelledError:
+                    raise
+                except Exception as e:
+                    self._resync(key, book, f"error: {e}")
+                    await asyncio.sleep(self.reconnect_delay)
+        finally:
+            book.reset()
+            self._books.pop(key, None)
+            self._tasks.pop(key, None)
+
+    async def _maintain(self, key, book: OrderBook):
+        raise NotImplementedError
+
+    async def close(self):
+        """
+        Stop maintaining every book. Called from the FastAPI lifespan on shutdown.
+        """
+        tasks = list(self._tasks.values())
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    def stats(self) -> dict:
+        """
+        Return the state of every local book.
+
+        Returns:
+            dict: Per book: whether it is synced, the last update id and time, the number of
+            updates applied and of levels per side, the number of resyncs and the seconds since
+            it was last requested.
+        """
+        now = time.monotonic()
+        return {
+            key: {
+                "synced": book.synced.is_set(),
+                "update_id": book.update_id,
+                "updated_at": book.updated_at,
+                "updates": book.updates,
+                "bids": len(book.bids),
+                "asks": len(book.asks),
+                "resyncs": self._resyncs.get(key, 0),
+                "idle": round(now - self._last_used.get(key, now), 3),
+            }
+            for key, book in self._books.items()
+        }
+
+
+class BinanceOrderBooks(_LocalOrderBooks):
+    """
+    Local Binance order books maintained from the "<symbol>@depth@100ms" diff streams.
+
+    Each book follows the Binance procedure: the diff stream is subscribed on the shared
+    stream hub first, a depth snapshot is fetched over REST, diffs older than the snapshot
+    are dropped, and every following diff must continue exactly where the previous one
+    ended (its first update id is the last update id + 1). On a gap (for example a diff
+    dropped by a full queue) the book is reset and re-bootstrapped from a new snapshot.
+
+    Args:
+        streams (BinanceStreamHub): The hub providing the diff streams.
+        snapshot (callable): A coroutine function (symbol, limit) returning a REST depth
+            snapshot with "lastUpdateId", "bids" and "asks".
+        depth (int): The number of levels of the snapshot.
+        idle_timeout (float): Stop maintaining a book that was not requested for this many seconds.
+        reconnect_delay (float): The delay in seconds before re-bootstrapping after an error.
+
+    Last Reviewed Date:
+        18 Oct 2026
+    """
+
+    name = "Binance"
+
+    def __init__(
+        self,
+        streams,
+        snapshot,
+        depth: int = 1000,
+        idle_timeout: float = 300.0,
+        reconnect_delay: float = 1.0,
+    ):
+        super().__init__(idle_timeout, reconnect_delay)
+        self.streams = streams
+        self.snapshot = snapshot
+        self.depth = depth
+
+    async def book(self, symbol: str, timeout: float = 5.0) -> OrderBook:
+        return await super().book(symbol.upper(), timeout)
+
+    async def _maintain(self, symbol: str, book: OrderBook):
+        with self.streams.subscribe(f"{symbol.lower()}@depth@100ms") as diffs:
+            # The first diff shows the stream is live; later diffs queue up during the snapshot.
+            first = await diffs.get()
+            snapshot = await self.snapshot(symbol, self.depth)
+            while snapshot["lastUpdateId"] < first["U"]:
+                snapshot = await self.snapshot(symbol, self.depth)
+            book.load_snapshot(
+                snapshot["bids"], snapshot["asks"], snapshot["lastUpdateId"]
+            )
+
+            diff = first
+            while True:
+                if diff["u"] > book.update_id:
+                    expected = book.update_id + 1
+                    if book.synced.is_set():
+                        in_sequence = diff["U"] == expected
+                    else:
+                        in_sequence = diff["U"] <= expected <= diff["u"]
+                    if not in_sequence:
+                        self._resync(
+                            symbol, book, f"expected update {expected}, got {diff['U']}"
+                        )
+                        return
+                    book.apply(diff["b"], diff["a"], diff["u"])
+                    book.synced.set()
+
+                diff = None
+                while diff is None:
+                    if self._idle(symbol):
+                        return
+                    try:
+                        diff = await asyncio.wait_for(diffs.get(), self.idle_timeout)
+                    except asyncio.TimeoutError:
+                        pass
+
+
+class BybitOrderBooks(_LocalOrderBooks):
+    """
+    Local Bybit order books maintained from the public "orderbook.<depth>.<symbol>" streams.
+
+    Every book has its own connection to the public stream of its category. Bybit sends a
+    snapshot on subscription (and again after a restart of its service), followed by deltas.
+    Every delta must carry the next update id ("u"); on a gap the connection is re-opened,
+    which bootstraps the book from a new snapshot.
+
+    Args:
+        url (str): The public stream endpoint without the category
+            (e.g., "wss://stream-testnet.bybit.com/v5/public").
+        depth (int): The depth of the stream (e.g., 50 or 200).
+        idle_timeout (float): Stop maintaining a book that was not requested for this many seconds.
+        reconnect_delay (float): The delay in seconds before reconnecting after an error.
+        ping_interval (float): The number of seconds between heartbeats, as Bybit requires.
+
+    Last Reviewed Date:
+        18 Oct 2026
+    """
+
+    name = "Bybit"
+
+    def __init__(
+        self,
+        url: str,
+        depth: int = 200,
+        idle_timeout: float = 300.0,
+        reconnect_delay: float = 1.0,
+        ping_interval: float = 20.0,
+    ):
+        super().__init__(idle_timeout, reconnect_delay)
+        self.url = url
+        self.depth = depth
+        self.ping_interval = ping_interval
+
+    async def book(self, category: str, symbol: str, timeout: float = 5.0) -> OrderBook:
+        return await super().book(f"{category}.{symbol.upper()}", timeout)
+
+    def _symbol(self, key: str) -> str:
+        return key.split(".", 1)[1]
+
+    async def _maintain(self, key: str, book: OrderBook):
+        category, symbol = key.split(".", 1)
+        topic = f"orderbook.{self.depth}.{symbol}"
+        async with websockets.connect(f"{self.url}/{category}") as ws:
+            await ws.send(json.dumps({"op": "subscribe", "args": [topic]}))
+            while not self._idle(key):
+                try:
+                    message = await asyncio.wait_for(ws.recv(), self.ping_interval)
+                except asyncio.TimeoutError:
+                    await ws.send(json.dumps({"op": "ping"}))
+                    continue
+
+                payload = json_loads(message)
+                if payload.get("topic") != topic:
+                    if payload.get("success") is False:
+                        logger.error(
+                            "Bybit order book subscription failed: %s", payload
+                        )
+                    continue
+
+                data = payload["data"]
+                if payload["type"] == "snapshot":
+                    book.load_snapshot(data["b"], data["a"], data["u"])
+                    book.synced.set()
+                elif book.synced.is_set() and data["u"] == book.update_id + 1:
+                    book.apply(data["b"], data["a"], data["u"])
+                else:
+                    self._resync(
+                        key, book, f"update {data['u']} after update {book.update_id}"
+                    )
+                    return
@@ -0,0 +1,442 @@
+import logging
+import time
+from collections import OrderedDict
+from decouple import config
+
+
+logger = logging.getLogger(__name__)
+
+ORDER_STORE_CLOSED_ORDERS = config("ORDER_STORE_CLOSED_ORDERS", default=10000, cast=int)
+
+# Order statuses after which an order no longer changes, on Binance and on Bybit.
+FINAL_STATUSES = frozenset(
+    (
+        "FILLED",
+        "CANCELED",
+        "REJECTED",
+        "EXPIRED",
+        "EXPIRED_IN_MATCH",
+        "Filled",
+        "Cancelled",
+        "Rejected",
+        "Deactivated",
+        "PartiallyFilledCanceled",
+    )
+)
+
+# Quantities below this are rounding dust of a closed position.
+_FLAT = 1e-12
+
+
+def _float(value, default: float = 0.0) -> float:
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return default
+
+
+class OrderRecord:
+    """
+    An order placed by the bot, as last reported by the exchange.
+
+    Attributes:
+        exchange (str): "binance" or "bybit".
+        order_id (str): The exchange id of the order.
+        client_order_id (str): The client order id (Binance) or orderLinkId (Bybit).
+        symbol (str): The trading pair (e.g., "BTCUSDT").
+        side (str): "BUY" or "SELL".
+        order_type (str): The order type as named by the exchange (e.g., "MARKET").
+        quantity (float): The ordered quantity.
+        executed_quantity (float): The filled quantity.
+        quote_quantity (float): The filled quantity in the quote asset, or None if unknown.
+        status (str): The order status as named by the exchange (e.g., "FILLED", "Filled").
+        strategy (str): The strategy that placed the order, or None.
+        created_at (float): The time the order was first recorded (Unix timestamp).
+        updated_at (int): The exchange time of the last update in milliseconds, or None.
+    """
+
+    __slots__ = (
+        "exchange",
+        "order_id",
+        "client_order_id",
+        "symbol",
+        "side",
+        "order_type",
+        "quantity",
+        "executed_quantity",
+        "quote_quantity",
+        "status",
+        "strategy",
+        "created_at",
+        "updated_at",
+    )
+
+    def __init__(self, exchange: str, order_id: str, symbol: str, side: str):
+        self.exchange = exchange
+        self.order_id = order_id
+        self.client_order_id = None
+        self.symbol = symbol
+        self.side = side
+        self.order_type = None
+        self.quantity = 0.0
+        self.executed_quantity = 0.0
+        self.quote_quantity = None
+        self.status = None
+        self.strategy = None
+        self.created_at = time.time()
+        self.updated_at = None
+
+    @property
+    def is_open(self) -> bool:
+        return self.status not in FINAL_STATUSES
+
+    @property
+    def average_price(self):
+        if self.quote_quantity is None or not self.executed_quantity:
+            return None
+        return self.quote_quantity / self.executed_quantity
+
+    def to_dict(self) -> dict:
+        data = {name: getattr(self, name) for name in self.__slots__}
+        data["average_price"] = self.average_price
+        data["is_open"] = self.is_open
+        return data
+
+
+class PositionRecord:
+    """
+    The net position of one strategy in one symbol on one exchange, built from the fills of
+    its orders.
+
+    Attributes:
+        exchange (str): "binance" or "bybit".
+        symbol (str): The trading pair (e.g., "BTCUSDT").
+        strategy (str): The strategy holding the position, or None for untagged orders.
+        quantity (float): The net quantity: positive when long, negative when short.
+        entry_price (float): The average price of the open quantity, or None if unknown.
+        realized_pnl (float): The profit of the closed quantity, in the quote asset.
+        updated_at (float): The time of the last fill (Unix timestamp).
+    """
+
+    __slots__ = (
+        "exchange",
+        "symbol",
+        "strategy",
+        "quantity",
+        "entry_price",
+        "realized_pnl",
+        "updated_at",
+    )
+
+    def __init__(self, exchange: str, symbol: str, strategy: str):
+        self.exchange = exchange
+        self.symbol = symbol
+        self.strategy = strategy
+        self.quantity = 0.0
+        self.entry_price = None
+        self.realized_pnl = 0.0
+        self.updated_at = None
+
+    def fill(self, quantity: float, price):
+        """
+        Apply a fill of a signed quantity (negative for sells) at a price (None if unknown).
+        """
+        held = self.quantity
+        if abs(held) < _FLAT or (held > 0) == (quantity > 0):
+            if price is not None:
+                if self.entry_price is None or abs(held) < _FLAT:
+                    self.entry_price = price
+                else:
+                    self.entry_price = (
+                        self.entry_price * abs(held) + price * abs(quantity)
+                    ) / (abs(held) + abs(quantity))
+        else:
+            closed = min(abs(quantity), abs(held))
+            if price is not None and self.entry_price is not None:
+                direction = 1 if held > 0 else -1
+                self.realized_pnl += closed * (price - self.entry_price) * direction
+            if abs(quantity) > abs(held):
+                # The fill reversed the position: the rest is opened at the fill price.
+                self.entry_price = price
+        self.quantity = held + quantity
+        if abs(self.quantity) < _FLAT:
+            self.quantity = 0.0
+            self.entry_price = None
+        self.updated_at = time.time()
+
+    def to_dict(self) -> dict:
+        return {name: getattr(self, name) for name in self.__slots__}
+
+
+class OrderStore:
+    """
+    In-memory record of the orders the bot placed and the positions they built, on every exchange.
+
+    Orders are indexed by exchange and order id, by client order id, by symbol and by
+    strategy, so every lookup is a dictionary access. They are kept current from the
+    responses of the order calls and from the exchange events (Binance executionReport,
+    Bybit "order" topic); every update may arrive in any order. Positions are netted per
+    exchange, symbol and strategy from the growth of each order's executed quantity, so an
+    update seen twice (the response and the event of the same fill) is counted once.
+
+    The strategy of an order is known before the exchange answers: the caller registers
+    the client order id it sends with `expect`, so fills reported by the event streams
+    ahead of the response are attributed to the right strategy.
+
+    Open orders are kept until they reach a final status; the last `max_closed_orders`
+    closed orders are kept for reads.
+
+    Args:
+        max_closed_orders (int): The number of closed orders kept.
+
+    Last Reviewed Date:
+        18 Oct 2026
+    """
+
+    def __init__(self, max_closed_orders: int = 10000):
+        self.max_closed_orders = max_closed_orders
+        self._orders: dict = {}
+        self._client_ids: dict = {}
+        self._by_symbol: dict = {}
+        self._by_strategy: dict = {}
+        self._open: dict = {}
+        self._closed: OrderedDict = OrderedDict()
+        self._expected: OrderedDict = OrderedDict()
+        self._positions: dict = {}
+        self._updates = 0
+        self._stale_updates = 0
+
+    ############################################################ Updates
+
+    def expect(self, exchange: str, client_order_id: str, strategy: str):
+        """
+        Register the strategy of an order about to be sent with a client order id.
+        """
+        self._expected[(exchange, client_order_id)] = strategy
+        while len(self._expected) > self.max_closed_orders:
+            self._expected.popitem(last=False)
+
+    def record(
+        self,
+        exchange: str,
+        order_id,
+        symbol: str,
+        side: str,
+        status: str,
+        quantity: float = None,
+        executed_quantity: float = None,
+        quote_quantity: float = None,
+        client_order_id: str = None,
+        order_type: str = None,
+        strategy: str = None,
+        updated_at: int = None,
+    ) -> OrderRecord:
+        """
+        Create or update an order from an exchange response or event.
+
+        Updates older than the last one applied (by exchange time) are ignored, and an order
+        never goes back from a final status. Fills are taken from the growth of the executed
+        quantity, at the price implied by the growth of the quote quantity.
+
+        Returns:
+            OrderRecord: The stored order.
+        """
+        key = (exchange, str(order_id))
+        record = self._orders.get(key)
+        if record is None:
+            record = OrderRecord(exchange, key[1], symbol, side.upper())
+            self._orders[key] = record
+            self._by_symbol.setdefault(symbol, {})[key] = None
+            self._open[key] = None
+        elif (
+            updated_at is not None
+            and record.updated_at is not None
+            and updated_at < record.updated_at
+        ) or (not record.is_open and status not in FINAL_STATUSES):
+            self._stale_updates += 1
+            return record
+        self._updates += 1
+
+        if client_order_id:
+            record.client_order_id = client_order_id
+            self._client_ids[(exchange, client_order_id)] = key
+            expected = self._expected.pop((exchange, client_order_id), None)
+            strategy = strategy or expected
+        if strategy and record.strategy is None:
+            record.strategy = strategy
+            self._by_strategy.setdefault(strategy, {})[key] = None
+        if order_type:
+            record.order_type = order_type
+        if quantity is not None:
+            record.quantity = quantity
+        if updated_at is not None:
+            record.updated_at = updated_at
+
+        if executed_quantity is not None and executed_quantity > record.executed_quantity:
+            filled = executed_quantity - record.executed_quantity
+            price = None
+            if quote_quantity is not None:
+                previous_quote = record.quote_quantity or 0.0
+                price = (quote_quantity - previous_quote) / filled
+                record.quote_quantity = quote_quantity
+            record.executed_quantity = executed_quantity
+            self._position(exchange, record.symbol, record.strategy).fill(
+                filled if record.side == "BUY" else -filled, price
+            )
+
+        record.status = status
+        if not record.is_open and key in self._open:
+            del self._open[key]
+            self._closed[key] = None
+            while len(self._closed) > self.max_closed_orders:
+                self._evict(self._closed.popitem(last=False)[0])
+        return record
+
+    def _position(self, exchange: str, symbol: str, strategy: str) -> PositionRecord:
+        key = (exchange, symbol, strategy)
+        position = self._positions.get(key)
+        if position is None:
+            position = self._positions[key] = PositionRecord(exchange, symbol, strategy)
+        return position
+
+    def _evict(self, key: tuple):
+        record = self._orders.pop(key)
+        if record.client_order_id:
+            self._client_ids.pop((record.exchange, record.client_order_id), None)
+        for index, value in (
+            (self._by_symbol, record.symbol),
+            (self._by_strategy, record.strategy),
+        ):
+            keys = index.get(value)
+            if keys is not None:
+                keys.pop(key, None)
+                if not keys:
+                    del index[value]
+
+    def record_binance_order(self, order: dict, strategy: str = None) -> OrderRecord:
+        """
+        Record a Binance order response, or an order of GET /api/v3/order, /api/v3/openOrders
+        or the user data stream (in the same format).
+        """
+        quote = order.get("cummulativeQuoteQty")
+        return self.record(
+            "binance",
+            order["orderId"],
+            order["symbol"],
+            order["side"],
+            order["status"],
+            quantity=_float(order.get("origQty"), None),
+            executed_quantity=_float(order.get("executedQty"), None),
+            quote_quantity=_float(quote, None) if quote is not None else None,
+            client_order_id=order.get("clientOrderId"),
+            order_type=order.get("type"),
+            strategy=strategy,
+            updated_at=order.get("updateTime") or order.get("transactTime"),
+        )
+
+    def record_bybit_order(self, order: dict, strategy: str = None) -> OrderRecord:
+        """
+        Record an order of the Bybit "order" stream topic or of GET /v5/order/realtime.
+        """
+        updated_at = order.get("updatedTime")
+        return self.record(
+            "bybit",
+            order["orderId"],
+            order["symbol"],
+            order["side"],
+            order["orderStatus"],
+            quantity=_float(order.get("qty"), None),
+            executed_quantity=_float(order.get("cumExecQty"), None),
+            quote_quantity=_float(order.get("cumExecValue"), None),
+            client_order_id=order.get("orderLinkId") or None,
+            order_type=order.get("orderType"),
+            strategy=strategy,
+            updated_at=int(updated_at) if updated_at else None,
+        )
+
+    ############################################################ Reads
+
+    def order(self, exchange: str, order_id=None, client_order_id: str = None):
+        """
+        Return an order by its exchange id or client order id, or None.
+        """
+        if order_id is not None:
+            return self._orders.get((exchange, str(order_id)))
+        key = self._client_ids.get((exchange, client_order_id))
+        return self._orders.get(key) if key is not None else None
+
+    def orders(
+        self,
+        exchange: str = None,
+        symbol: str = None,
+        strategy: str = None,
+        open_only: bool = False,
+    ) -> list:
+        """
+        Return the orders matching every given filter, oldest first.
+        """
+        candidates = [self._open if open_only else self._orders]
+        if symbol is not None:
+            candidates.append(self._by_symbol.get(symbol, {}))
+        if strategy is not None:
+            candidates.append(self._by_strategy.get(strategy, {}))
+        # Scan the smallest index and check the other filters on its orders only.
+        keys = min(candidates, key=len)
+        records = [self._orders[key] for key in keys]
+        return [
+            record
+            for record in records
+            if (exchange is None or record.exchange == exchange)
+            and (symbol is None or record.symbol == symbol)
+            and (strategy is None or record.strategy == strategy)
+            and (not open_only or record.is_open)
+        ]
+
+    def position(self, exchange: str, symbol: str, strategy: str = None):
+        """
+        Return the position of a strategy in a symbol, or None if it never traded it.
+        """
+        return self._positions.get((exchange, symbol, strategy))
+
+    def positions(
+        self,
+        exchange: str = None,
+        symbol: str = None,
+        strategy: str = None,
+        open_only: bool = True,
+    ) -> list:
+        """
+        Return the positions matching every given filter; by default only the non-flat ones.
+        """
+        return [
+            position
+            for position in self._positions.values()
+            if (exchange is None or position.exchange == exchange)
+            and (symbol is None or position.symbol == symbol)
+            and (strategy is None or position.strategy == strategy)
+            and (not open_only or position.quantity)
+        ]
+
+    def stats(self) -> dict:
+        """
+        Return store statistics.
+
+        Returns:
+            dict: The number of orders, open orders, symbols, strategies and open positions,
+            and the updates applied and ignored as stale.
+        """
+        return {
+            "orders": len(self._orders),
+            "open_orders": len(self._open),
+            "max_closed_orders": self.max_closed_orders,
+            "symbols": len(self._by_symbol),
+            "strategies": len(self._by_strategy),
+            "positions": len(self._positions),
+            "open_positions": sum(1 for p in self._positions.values() if p.quantity),
+            "updates": self._updates,
+            "stale_updates": self._stale_updates,
+        }
+
+
+# The store shared by the whole app (one per worker process).
+order_store = OrderStore(max_closed_orders=ORDER_STORE_CLOSED_ORDERS)
@@ -0,0 +1,404 @@
+import asyncio
+import heapq
+import itertools
+import logging
+import time
+import httpx
+
+
+logger = logging.getLogger(__name__)
+
+
+# Lower values are served first when requests have to wait for the rate limit.
+PRIORITY_ORDERS = 0
+PRIORITY_ACCOUNT = 1
+PRIORITY_MARKET_DATA = 2
+
+
+class TokenBucket:
+    """
+    Token bucket with priority scheduling of the requests that have to wait.
+
+    The bucket refills continuously at `limit` per `period`, keeping `headroom` of the
+    exchange limit unused as a safety margin. A request that fits in the available tokens is
+    granted immediately; otherwise it waits in a priority queue, so an order placement that
+    arrives behind a backlog of market data queries is still served first.
+
+    The estimate can be corrected from what the exchange reports (`observe_used`) and the
+    bucket can be paused when the exchange asks to back off (`pause`).
+
+    Args:
+        name (str): A label for the bucket, used in the statistics output.
+        limit (float): The exchange limit per period (request weight or number of requests).
+        period (float): The period of the limit in seconds.
+        headroom (float): The fraction of the limit kept unused (0.1 = 10%).
+    """
+
+    def __init__(self, name: str, limit: float, period: float, headroom: float = 0.1):
+        self.name = name
+        self.limit = limit
+        self.period = period
+        self.capacity = limit * (1 - headroom)
+        self.rate = self.capacity / period
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._paused_until = 0.0
+        self._waiters: list = []
+        self._sequence = itertools.count()
+        self._dispatcher: asyncio.Task = None
+        self._granted = 0.0
+        self._waited = 0
+        self._server_used = None
+
+    def _refill(self):
+        now = time.monotonic()
+        self._tokens = min(
+            self.capacity, self._tokens + (now - self._updated) * self.rate
+        )
+        self._updated = now
+
+    async def acquire(self, weight: float = 1, priority: int = PRIORITY_MARKET_DATA):
+        """
+        Wait until `weight` tokens are available and take them.
+
+        Args:
+            weight (float): The weight of the request.
+            priority (int): The priority of the request, PRIORITY_ORDERS first.
+        """
+        weight = min(weight, self.capacity)
+        self._refill()
+        if (
+            not self._waiters
+            and self._paused_until <= time.monotonic()
+            and self._tokens >= weight
+        ):
+            self._tokens -= weight
+            self._granted += weight
+            return
+
+        future = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._waiters, (priority, next(self._sequence), weight, future))
+        self._waited += 1
+        if self._dispatcher is None or self._dispatcher.done():
+            self._dispatcher = asyncio.create_task(self._dispatch())
+        await future
+
+    async def _dispatch(self):
+        while self._waiters:
+            now = time.monotonic()
+            if self._paused_until > now:
+                await asyncio.sleep(self._paused_until - now)
+                continue
+            self._refill()
+            _, _, weight, future = self._waiters[0]
+            if future.done():
+                # the waiting request was cancelled
+                heapq.heappop(self._waiters)
+            elif self._tokens >= weight:
+                heapq.heappop(self._waiters)
+                self._tokens -= weight
+                self._granted += weight
+                future.set_result(None)
+            else:
+                await asyncio.sleep((weight - self._tokens) / self.rate)
+
+    def observe_used(self, used: float):
+        """
+        Correct the estimate with the usage the exchange reports for the current window.
+
+        The estimate is only ever lowered, so requests made by other processes with the
+        same key or IP are accounted for.
+        """
+        self._server_used = used
+        self._refill()
+        self._tokens = min(self._tokens, self.capacity - used)
+
+    def pause(self, seconds: float):
+        """
+        Grant no requests for `seconds`, e.g. after a 429 response with a Retry-After header.
+        """
+        self._paused_until = max(self._paused_until, time.monotonic() + seconds)
+        self._tokens = min(self._tokens, 0)
+
+    def stats(self) -> dict:
+        """
+        Return bucket statistics.
+
+        Returns:
+            dict: The limit, the tokens available now, the headroom as a fraction of the
+            usable capacity, the waiting requests and the last usage reported by the exchange.
+        """
+        self._refill()
+        available = max(self._tokens, 0.0)
+        return {
+            "limit": self.limit,
+            "period_seconds": self.period,
+            "capacity": self.capacity,
+            "available": round(available, 2),
+            "headroom": round(available / self.capacity, 4),
+            "waiting": sum(1 for *_, future in self._waiters if not future.done()),
+            "waited": self._waited,
+            "granted": round(self._granted, 2),
+            "server_used": self._server_used,
+            "paused_seconds": round(max(0.0, self._paused_until - time.monotonic()), 3),
+        }
+
+
+# Request weights of the Binance spot REST endpoints used by Binance_CRUD.
+BINANCE_WEIGHTS = {
+    ("GET", "/api/v3/time"): 1,
+    ("GET", "/api/v3/exchangeInfo"): 20,
+    ("GET", "/api/v3/account"): 20,
+    ("GET", "/api/v3/avgPrice"): 2,
+    ("GET", "/api/v3/historicalTrades"): 25,
+    ("GET", "/api/v3/trades"): 25,
+    ("GET", "/api/v3/klines"): 2,
+    ("GET", "/api/v3/order"): 4,
+    ("POST", "/api/v3/order"): 1,
+    ("POST", "/api/v3/order/test"): 1,
+    ("DELETE", "/api/v3/order"): 1,
+    ("DELETE", "/api/v3/openOrders"): 1,
+    ("POST", "/api/v3/orderList"): 1,
+    ("GET", "/api/v3/allOrders"): 20,
+    ("POST", "/api/v3/userDataStream"): 2,
+    ("PUT", "/api/v3/userDataStream"): 2,
+    ("DELETE", "/api/v3/userDataStream"): 2,
+}
+# Endpoints whose weight depends on whether a symbol is given: (with symbol, without symbol).
+BINANCE_SYMBOL_WEIGHTS = {
+    ("GET", "/api/v3/openOrders"): (6, 80),
+    ("GET", "/api/v3/ticker/24hr"): (2, 80),
+    ("GET", "/api/v3/ticker/price"): (2, 4),
+}
+# Order book weight by requested depth: (maximum limit, weight).
+BINANCE_DEPTH_WEIGHTS = ((100, 5), (500, 25), (1000, 50), (5000, 250))
+BINANCE_ORDER_PATHS = ("/api/v3/order", "/api/v3/orderList", "/api/v3/openOrders")
+
+
+class BinanceRateLimiter:
+    """
+    Schedules every Binance REST request within the exchange rate limits.
+
+    Each request is weighed with the Binance endpoint weights and waits for the request
+    weight bucket (per IP and minute), the SAPI weight bucket for /sapi endpoints, and, for
+    new orders, the order count bucket (per account and 10 seconds). Order placements and
+    cancels are served ahead of account queries, which are served ahead of market data.
+
+    The buckets follow what Binance reports in the X-MBX-USED-WEIGHT-1M, X-SAPI-USED-IP-WEIGHT-1M
+    and X-MBX-ORDER-COUNT-10S response headers, and stop granting requests for the Retry-After
+    period of a 429 (rate limited) or 418 (IP banned) response.
+
+    It is installed on the pooled Binance HTTP client, so every call in Binance_CRUD goes
+    through it without any change to the call sites.
+
+    Args:
+        weight_limit (int): The request weight limit per minute.
+        sapi_weight_limit (int): The SAPI request weight limit per minute.
+        order_limit_10s (int): The number of new orders allowed per 10 seconds.
+        headroom (float): The fraction of every limit kept unused (0.1 = 10%).
+
+    Last Reviewed Date:
+        18 Oct 2026
+    """
+
+    def __init__(
+        self,
+        weight_limit: int = 6000,
+        sapi_weight_limit: int = 12000,
+        order_limit_10s: int = 100,
+        headroom: float = 0.1,
+    ):
+        self.weight = TokenBucket("request_weight_1m", weight_limit, 60.0, headroom)
+        self.sapi_weight = TokenBucket(
+            "sapi_ip_weight_1m", sapi_weight_limit, 60.0, headroom
+        )
+        self.orders = TokenBucket("orders_10s", order_limit_10s, 10.0, headroom)
+        self._requests_per_priority: dict = {}
+        self._rate_limited = 0
+
+    def request_weight(self, method: str, path: str, params) -> int:
+        """
+        Return the request weight of a Binance endpoint.
+        """
+        if path == "/api/v3/depth":
+            limit = int(params.get("limit", 100))
+            return next(
+                (
+                    weight
+                    for maximum, weight in BINANCE_DEPTH_WEIGHTS
+                    if limit <= maximum
+                ),
+                BINANCE_DEPTH_WEIGHTS[-1][1],
+            )
+        if (method, path) in BINANCE_SYMBOL_WEIGHTS:
+            with_symbol, without_symbol = BINANCE_SYMBOL_WEIGHTS[(method, path)]
+            return with_symbol if "symbol" in params else without_symbol
+        return BINANCE_WEIGHTS.get((method, path), 1)
+
+    def priority(self, method: str, path: str) -> int:
+        """
+        Return the scheduling priority of a request: orders, then account queries, then market data.
+        """
+        if path in BINANCE_ORDER_PATHS and method in ("POST", "DELETE"):
+            return PRIORITY_ORDERS
+        if path.startswith("/sapi") or path in (
+            "/api/v3/account",
+            "/api/v3/order",
+            "/api/v3/openOrders",
+            "/api/v3/allOrders",
+            "/api/v3/userDataStream",
+        ):
+            return PRIORITY_ACCOUNT
+        return PRIORITY_MARKET_DATA
+
+    async def before_request(self, request: httpx.Request):
+        """
+        Wait until the request fits in the rate limits. Installed as an httpx request hook.
+        """
+        method, path, params = request.method, request.url.path, request.url.params
+        priority = self.priority(method, path)
+        self._requests_per_priority[priority] = (
+            self._requests_per_priority.get(priority, 0) + 1
+        )
+        if method == "POST" and path in BINANCE_ORDER_PATHS:
+            await self.orders.acquire(1, priority)
+        if path.startswith("/sapi"):
+            await self.sapi_weight.acquire(1, priority)
+        else:
+            await self.weight.acquire(
+                self.request_weight(method, path, params), priority
+            )
+
+    def after_response(self, response: httpx.Response):
+        """
+        Follow the usage reported by Binance. Installed as an httpx response hook.
+        """
+        headers = response.headers
+        for header, bucket in (
+            ("x-mbx-used-weight-1m", self.weight),
+            ("x-sapi-used-ip-weight-1m", self.sapi_weight),
+            ("x-mbx-order-count-10s", self.orders),
+        ):
+            if header in headers:
+                bucket.observe_used(float(headers[header]))
+        if response.status_code in (418, 429):
+            self._rate_limited += 1
+            retry_after = float(headers.get("retry-after", 60))
+            for bucket in (self.weight, self.sapi_weight, self.orders):
+                bucket.pause(retry_after)
+            logger.warning(
+                "Binance rate limit hit (%s), pausing requests for %s seconds.",
+                response.status_code,
+                retry_after,
+            )
+
+    def stats(self) -> dict:
+        """
+        Return rate limiter statistics.
+
+        Returns:
+            dict: The state and headroom of every bucket, the requests per priority and the
+            number of rate limited responses.
+        """
+        return {
+            "buckets": {
+                bucket.name: bucket.stats()
+                for bucket in (self.weight, self.sapi_weight, self.orders)
+            },
+            "requests_per_priority": {
+                name: self._requests_per_priority.get(priority, 0)
+                for name, priority in (
+                    ("orders", PRIORITY_ORDERS),
+                    ("account", PRIORITY_ACCOUNT),
+                    ("market_data", PRIORITY_MARKET_DATA),
+                )
+            },
+            "rate_limited_responses": self._rate_limited,
+        }
+
+
+BYBIT_ORDER_CALLS = (
+    "place_order",
+    "amend_order",
+    "cancel_order",
+    "cancel_all_orders",
+    "place_batch_order",
+    "cancel_batch_order",
+)
+BYBIT_ACCOUNT_CALLS = (
+    "get_account_info",
+    "get_wallet_balance",
+    "get_coins_balance",
+    "get_coin_exchange_records",
+    "get_open_orders",
+    "get_positions",
+    "get_fee_rates",
+    "set_leverage",
+    "switch_position_mode",
+)
+
+
+class BybitRateLimiter:
+    """
+    Schedules every Bybit SDK call within the exchange rate limits.
+
+    Every call waits for the IP request bucket, and order calls (place, amend, cancel) also
+    for the order bucket; a batch call takes one order token per order in the batch. Order calls are served ahead of account queries, which are served
+    ahead of market data. pybit does not return the rate limit headers of its responses by
+    default, so the buckets follow the documented limits only.
+
+    It is installed on the Bybit executor, so every call in ByBit_CRUD goes through it.
+
+    Args:
+        requests_per_5s (int): The number of requests allowed per IP and 5 seconds.
+        orders_per_second (int): The number of order calls allowed per second.
+        headroom (float): The fraction of every limit kept unused (0.1 = 10%).
+
+    Last Reviewed Date:
+        18 Oct 2026
+    """
+
+    def __init__(
+        self,
+        requests_per_5s: int = 600,
+        orders_per_second: int = 10,
+        headroom: float = 0.1,
+    ):
+        self.requests = TokenBucket("requests_5s", requests_per_5s, 5.0, headroom)
+        self.orders = TokenBucket("orders_1s", orders_per_second, 1.0, headroom)
+
+    def priority(self, call_name: str) -> int:
+        """
+        Return the scheduling priority of a call: orders, then account queries, then market data.
+        """
+        if call_name in BYBIT_ORDER_CALLS:
+            return PRIORITY_ORDERS
+        if call_name in BYBIT_ACCOUNT_CALLS:
+            return PRIORITY_ACCOUNT
+        return PRIORITY_MARKET_DATA
+
+    async def acquire(self, call_name: str, weight: int = 1):
+        """
+        Wait until the call fits in the rate limits.
+
+        Args:
+            call_name (str): The name of the SDK call (e.g., "place_order").
+            weight (int): The number of orders of an order call (the size of a batch).
+        """
+        priority = self.priority(call_name)
+        if priority == PRIORITY_ORDERS:
+            await self.orders.acquire(weight, priority)
+        await self.requests.acquire(1, priority)
+
+    def stats(self) -> dict:
+        """
+        Return rate limiter statistics.
+
+        Returns:
+            dict: The state and headroom of every bucket.
+        """
+        return {
+            "buckets": {
+                bucket.name: bucket.stats() for bucket in (self.requests, self.orders)
+            }
+        }
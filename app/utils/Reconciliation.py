@@ -0,0 +1,251 @@
+import asyncio
+import logging
+import time
+
+
+logger = logging.getLogger(__name__)
+
+# Quantities closer than this are the same order size.
+_QUANTITY_TOLERANCE = 1e-9
+
+
+def _closing_order(entry: dict, position: dict, orders: list, used: set):
+    # The first filled order of the opposite side, after the entry, for the same quantity.
+    closing_side = "SELL" if position["side"] == "BUY" else "BUY"
+    for order in orders:
+        if (
+            order["orderId"] not in used
+            and order["side"] == closing_side
+            and order["status"] == "FILLED"
+            and order["time"] >= entry["time"]
+            and abs(float(order["executedQty"]) - float(position["quantity"]))
+            <= _QUANTITY_TOLERANCE * max(1.0, float(position["quantity"]))
+        ):
+            return order
+    return None
+
+
+class StartupReconciler:
+    """
+    Rebuilds the exit monitoring of the positions that were open when the process stopped.
+
+    The exit levels of a position exist only in the bot, so the candidates are the positions
+    of the trade journal without a completed exit. Every candidate is then checked against
+    the exchange, with one "all orders" request per symbol, all symbols in parallel:
+
+    - the entry order is filled and no closing order was filled after it: the position is
+      monitored again by the exit engine, with its original levels;
+    - a closing order was filled after it (the exit happened but was not recorded): an exit
+      is recorded in the journal and the position is not restored;
+    - the entry order was not filled: the position is dropped;
+    - the entry order could not be checked (request failed, or older than the orders
+      returned): the position is left unmonitored and reported, rather than risking an
+      exit order for a position that no longer exists.
+
+    In parallel, the open orders of both exchanges are loaded into the order store, so the
+    routes and strategies see them without polling, and the Bybit positions are reported.
+    The order history of "all orders" is only used to check the candidates: loading it into
+    the store would net untagged positions from an arbitrary window of past (and manual) orders. The report,
+    including the time it took to be ready, is kept in `report`.
+
+    Args:
+        journal (TradeJournal): The journal with the "position_opened" and "exit" entries.
+        exit_engine (ExitEngine): The engine to restore the positions into, or None to only
+            check them (e.g. with a shared store, where positions survive restarts).
+        order_store (OrderStore): The store the fetched orders are recorded in.
+        fetch_binance_orders (callable): A coroutine function returning the recent orders of
+            a symbol (GET /api/v3/allOrders).
+        fetch_binance_open_orders (callable): A coroutine function returning the open orders
+            of every symbol.
+        fetch_bybit_open_orders (callable): A coroutine function returning the open orders of
+            a Bybit category.
+        fetch_bybit_positions (callable): A coroutine function returning the positions of a
+            Bybit category.
+        symbols (iterable): Binance symbols checked in addition to those of the candidates.
+        bybit_categories (iterable): The Bybit categories loaded (e.g., ["linear"]).
+        lookback (float): Only positions opened within this many seconds are candidates.
+
+    Last Reviewed Date:
+        18 Oct 2026
+    """
+
+    def __init__(
+        self,
+        journal,
+        exit_engine,
+        order_store,
+        fetch_binance_orders,
+        fetch_binance_open_orders,
+        fetch_bybit_open_orders,
+        fetch_bybit_positions,
+        symbols=(),
+        bybit_categories=("linear",),
+        lookback: float = 7 * 24 * 3600,
+    ):
+        self.journal = journal
+        self.exit_engine = exit_engine
+        self.order_store = order_store
+        self.fetch_binance_orders = fetch_binance_orders
+        self.fetch_binance_open_orders = fetch_binance_open_orders
+        self.fetch_bybit_open_orders = fetch_bybit_open_orders
+        self.fetch_bybit_positions = fetch_bybit_positions
+        self.symbols = [symbol.upper() for symbol in symbols if symbol]
+        self.bybit_categories = [category for category in bybit_categories if category]
+        self.lookback = lookback
+        self.report: dict = {"ready": False}
+        self._task: asyncio.Task = None
+
+    def start(self):
+        """
+        Run the reconciliation in the background. Called from the FastAPI lifespan on startup,
+        so the app serves requests while the exchanges answer.
+        """
+        if self._task is None:
+            self._task = asyncio.create_task(self.run())
+
+    async def close(self):
+        """
+        Cancel a reconciliation still running. Called from the FastAPI lifespan on shutdown.
+        """
+        if self._task is not None and not self._task.done():
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+
+    async def run(self) -> dict:
+        """
+        Reconcile once and return the report.
+        """
+        started = time.perf_counter()
+        errors = {}
+        try:
+            candidates = await asyncio.to_thread(
+                self.journal.unexited_positions, time.time() - self.lookback
+            )
+        except Exception as e:
+            logger.exception("Error reading the open positions from the trade journal")
+            errors["journal"] = repr(e)
+            candidates = []
+        symbols = sorted(
+            set(self.symbols) | {entry["data"]["symbol"] for entry in candidates}
+        )
+
+        calls = {
+            ("binance_orders", symbol): self.fetch_binance_orders(symbol)
+            for symbol in symbols
+        }
+        calls[("binance_open_orders", None)] = self.fetch_binance_open_orders()
+        for category in self.bybit_categories:
+            calls[("bybit_open_orders", category)] = self.fetch_bybit_open_orders(
+                category
+            )
+            calls[("bybit_positions", category)] = self.fetch_bybit_positions(category)
+        results = dict(
+            zip(calls, await asyncio.gather(*calls.values(), return_exceptions=True))
+        )
+        for (name, key), result in results.items():
+            if isinstance(result, Exception):
+                errors[f"{name}:{key}" if key else name] = repr(result)
+
+        # Only the open orders are loaded into the store; the order history only checks candidates.
+        binance_open_orders = 0
+        bybit_open_orders = 0
+        bybit_positions = []
+        for (name, key), result in results.items():
+            if isinstance(result, Exception):
+                continue
+            if name == "binance_open_orders":
+                for order in result:
+                    self.order_store.record_binance_order(order)
+                binance_open_orders = len(result)
+            elif name == "bybit_open_orders":
+                for order in result:
+                    self.order_store.record_bybit_order(order)
+                bybit_open_orders += len(result)
+            elif name == "bybit_positions":
+                bybit_positions.extend(
+                    {
+                        "category": key,
+                        "symbol": position["symbol"],
+                        "side": position.get("side"),
+                        "size": position.get("size"),
+                        "avgPrice": position.get("avgPrice"),
+                    }
+                    for position in result
+                    if float(position.get("size") or 0)
+                )
+
+        outcome = {"restored": [], "closed": [], "not_filled": [], "unverified": []}
+        used = set()
+        for entry in candidates:
+            position = entry["data"]
+            result = results.get(("binance_orders", position["symbol"]))
+            state, closing = self._check(position, result, used)
+            outcome[state].append(position["order_id"])
+            if state == "restored" and self.exit_engine is not None:
+                self.exit_engine.restore_position(position)
+            elif state == "closed":
+                self.journal.record(
+                    "exit",
+                    {
+                        **position,
+                        "status": "closed",
+                        "exit_reason": "reconciled",
+                        "closed_at": closing["updateTime"] / 1000,
+                        "response": closing,
+                    },
+                    symbol=position["symbol"],
+                    order_id=position["order_id"],
+                )
+        if outcome["unverified"]:
+            logger.warning(
+                "Positions left unmonitored: their entry orders could not be checked.",
+                extra={"order_ids": outcome["unverified"]},
+            )
+
+        self.report = {
+            "ready": True,
+            "seconds": time.perf_counter() - started,
+            "finished_at": time.time(),
+            "symbols": symbols,
+            "candidates": len(candidates),
+            **outcome,
+            "monitored": self.exit_engine is not None,
+            "binance_open_orders": binance_open_orders,
+            "bybit_open_orders": bybit_open_orders,
+            "bybit_positions": bybit_positions,
+            "errors": errors,
+        }
+        logger.info(
+            "Startup reconciliation finished.",
+            extra={
+                "seconds": self.report["seconds"],
+                "candidates": len(candidates),
+                **{key: len(order_ids) for key, order_ids in outcome.items()},
+                "errors": len(errors),
+            },
+        )
+        return self.report
+
+    @staticmethod
+    def _check(position: dict, orders, used: set) -> tuple:
+        if orders is None or isinstance(orders, Exception):
+            return "unverified", None
+        order_id = str(position["order_id"])
+        entry = next(
+            (order for order in orders if str(order["orderId"]) == order_id), None
+        )
+        if entry is None:
+            return "unverified", None
+        if float(entry["executedQty"]) <= 0:
+            return "not_filled", None
+        closing = _closing_order(entry, position, orders, used)
+        if closing is not None:
+            used.add(closing["orderId"])
+            return "closed", closing
+        return "restored", None
+
+    def stats(self) -> dict:
+        """
+        Return the report of the last reconciliation ({"ready": False} while it runs).
+        """
+        return self.report
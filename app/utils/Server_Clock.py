@@ -0,0 +1,145 @@
+import asyncio
+import logging
+import time
+from collections import deque
+
+
+logger = logging.getLogger(__name__)
+
+
+class ServerClock:
+    """
+    Tracks the offset between the local clock and an exchange's server clock.
+
+    A background task samples the server time every `interval` seconds. Each sample
+    measures the round trip time (RTT) of the request and the offset of the server time
+    from the midpoint of the request. The offset of the sample with the lowest RTT in the
+    recent window is used, because that sample had the least room for queueing and
+    asymmetric network delay. Signed requests then read the corrected time from
+    `now_ms()`, which is a local clock read plus an addition, so no request ever waits for
+    a clock sync.
+
+    The receive window grows with the uncertainty of the estimate (half the best RTT plus
+    the spread of the sampled offsets), so a noisy network widens the window instead of
+    causing timestamp rejections.
+
+    Args:
+        name (str): A label for the clock, used in the statistics output (e.g., "binance").
+        fetch_server_time (callable): A coroutine function without arguments that returns the
+            server time in milliseconds.
+        interval (float): The number of seconds between samples.
+        window (int): The number of recent samples the estimate is taken from.
+        recv_window (int): The minimum receive window in milliseconds.
+        max_recv_window (int): The maximum receive window the exchange accepts, in milliseconds.
+        on_sync (callable): Optional function called with the clock after every successful sample.
+
+    Last Reviewed Date:
+        18 Oct 2026
+    """
+
+    def __init__(
+        self,
+        name: str,
+        fetch_server_time,
+        interval: float = 60.0,
+        window: int = 8,
+        recv_window: int = 5000,
+        max_recv_window: int = 60000,
+        on_sync=None,
+    ):
+        self.name = name
+        self.fetch_server_time = fetch_server_time
+        self.interval = interval
+        self.min_recv_window = recv_window
+        self.max_recv_window = max_recv_window
+        self.on_sync = on_sync
+        self.offset_ms = 0.0
+        self.recv_window = recv_window
+        self._samples = deque(maxlen=window)
+        self._task: asyncio.Task = None
+        self._synced_at: float = None
+        self._failures = 0
+
+    def now_ms(self) -> int:
+        """
+        Return the current server time in milliseconds, estimated from the local clock.
+        """
+        return int(time.time() * 1000 + self.offset_ms)
+
+    async def sample(self):
+        """
+        Take one sample of the server time and update the estimate.
+        """
+        sent = time.time() * 1000
+        server_time = await self.fetch_server_time()
+        received = time.time() * 1000
+        rtt = received - sent
+        self._samples.append((rtt, server_time - (sent + received) / 2))
+
+        best_rtt, offset = min(self._samples)
+        spread = max(abs(sample_offset - offset) for _, sample_offset in self._samples)
+        self.offset_ms = offset
+        self.recv_window = int(
+            min(
+                self.max_recv_window,
+                self.min_recv_window + best_rtt / 2 + spread,
+            )
+        )
+        self._synced_at = time.time()
+        if self.on_sync is not None:
+            self.on_sync(self)
+
+    async def _run(self):
+        # A quick burst first, so the estimate starts from more than one sample.
+        burst = self._samples.maxlen
+        while True:
+            try:
+                await self.sample()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self._failures += 1
+                logger.warning("%s server time sync failed: %s", self.name, e)
+            if burst > 1:
+                burst -= 1
+                await asyncio.sleep(0.2)
+            else:
+                await asyncio.sleep(self.interval)
+
+    def start(self):
+        """
+        Start sampling in the background. Called from the FastAPI lifespan on startup.
+        """
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+
+    async def close(self):
+        """
+        Stop sampling. Called from the FastAPI lifespan on shutdown.
+        """
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except (asyncio.CancelledError, Exception):
+                pass
+        self._task = None
+
+    def stats(self) -> dict:
+        """
+        Return the clock estimate.
+
+        Returns:
+            dict: The offset (server minus local time) and receive window in milliseconds,
+            the RTT of the samples, the time of the last sync and the number of failed samples.
+        """
+        return {
+            "name": self.name,
+            "offset_ms": round(self.offset_ms, 3),
+            "recv_window": self.recv_window,
+            "best_rtt_ms": round(min(self._samples)[0], 3) if self._samples else None,
+            "samples_rtt_ms": [round(rtt, 3) for rtt, _ in self._samples],
+            "synced_at": self._synced_at,
+            "failures": self._failures,
+            "interval": self.interval,
+        }
@@ -0,0 +1,391 @@
+import asyncio
+import logging
+import sqlite3
+import time
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+
+
+logger = logging.getLogger(__name__)
+
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS positions (
+    position_id INTEGER PRIMARY KEY AUTOINCREMENT,
+    symbol TEXT NOT NULL,
+    side TEXT NOT NULL,
+    entry_price REAL NOT NULL,
+    target_price REAL NOT NULL,
+    stoploss REAL,
+    quantity REAL NOT NULL,
+    order_id TEXT,
+    opened_at REAL NOT NULL,
+    status TEXT NOT NULL,
+    exit_reason TEXT,
+    exit_price REAL,
+    closed_at REAL,
+    correlation_id TEXT,
+    claimed_by TEXT,
+    claimed_at REAL
+);
+CREATE INDEX IF NOT EXISTS positions_status_symbol ON positions (status, symbol);
+CREATE TABLE IF NOT EXISTS leases (
+    name TEXT PRIMARY KEY,
+    owner TEXT NOT NULL,
+    expires_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS dedupe (
+    key TEXT PRIMARY KEY,
+    expires_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS dedupe_expires_at ON dedupe (expires_at);
+CREATE TABLE IF NOT EXISTS signals (
+    name TEXT PRIMARY KEY,
+    counter INTEGER NOT NULL
+);
+"""
+
+POSITION_COLUMNS = (
+    "position_id",
+    "symbol",
+    "side",
+    "entry_price",
+    "target_price",
+    "stoploss",
+    "quantity",
+    "order_id",
+    "opened_at",
+    "status",
+    "exit_reason",
+    "exit_price",
+    "closed_at",
+    "correlation_id",
+)
+# Added after the first release; added to existing databases on connection.
+CLAIM_COLUMNS = (("claimed_by", "TEXT"), ("claimed_at", "REAL"))
+
+
+class SharedState:
+    """
+    State shared by every worker process of the app, stored in one SQLite database.
+
+    With several uvicorn workers each process has its own memory, so the state that must be
+    seen by all of them lives here instead:
+
+    - positions: the open positions, so any worker can open a position and exactly one
+      worker monitors it.
+    - leases: named, expiring locks. The exit engine holds one lease per symbol, so one
+      elected worker keeps the trade stream of a symbol and monitors its positions; when that
+      worker stops renewing, another one takes over after the lease expires.
+    - dedupe: idempotency keys, so a redelivered webhook is dropped whichever worker gets it.
+    - signals: counters that are bumped to reach every worker (e.g. stopping the websocket
+      listeners, which run in whichever worker started them).
+
+    Every change is a single statement, so it is atomic across processes. The database runs
+    in WAL mode so readers do not block the writer.
+
+    The methods are blocking, and a statement waits up to `busy_timeout` seconds while another
+    process holds the lock. From async code, call them through `run`, which executes them on
+    a dedicated thread: lock contention then delays only that call, not the webhooks and
+    ticks handled by the event loop of the worker.
+
+    Args:
+        path (str): The SQLite database file. It is created if it does not exist. Every worker
+            must use the same file.
+        busy_timeout (float): The number of seconds a statement waits for another process's lock.
+
+    Last Reviewed Date:
+        18 Oct 2026
+    """
+
+    def __init__(self, path: str, busy_timeout: float = 5.0):
+        self.path = path
+        self.busy_timeout = busy_timeout
+        self._connection: sqlite3.Connection = None
+        self._executor: ThreadPoolExecutor = None
+
+    async def run(self, fn, *args):
+        """
+        Run a method of the shared state on its dedicated thread and await the result.
+
+        Args:
+            fn (Callable): The method to call (e.g., `shared_state.claim_key`).
+            *args: The arguments of `fn`.
+
+        Returns:
+            Any: The return value of `fn`.
+        """
+        if self._executor is None:
+            # One thread, so the calls of this process run one at a time on one connection.
+            self._executor = ThreadPoolExecutor(
+                max_workers=1, thread_name_prefix="shared-state"
+            )
+        return await asyncio.get_running_loop().run_in_executor(
+            self._executor, partial(fn, *args)
+        )
+
+    @property
+    def db(self) -> sqlite3.Connection:
+        # Connected on first use, so every worker process opens its own connection.
+        if self._connection is None:
+            connection = sqlite3.connect(
+                self.path,
+                timeout=self.busy_timeout,
+                isolation_level=None,
+                check_same_thread=False,
+            )
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            connection.executescript(SCHEMA)
+            columns = {
+                row[1] for row in connection.execute("PRAGMA table_info(positions)")
+            }
+            for column, column_type in CLAIM_COLUMNS:
+                if column not in columns:
+                    connection.execute(
+                        f"ALTER TABLE positions ADD COLUMN {column} {column_type}"
+                    )
+            self._connection = connection
+        return self._connection
+
+    def close(self):
+        """
+        Close the connection of this process. Called from the FastAPI lifespan on shutdown.
+        """
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
+        if self._connection is not None:
+            self._connection.close()
+            self._connection = None
+
+    ############################################################ Idempotency keys
+
+    def claim_key(self, key: str, ttl: float) -> bool:
+        """
+        Claim an idempotency key for `ttl` seconds.
+
+        Returns:
+            bool: True if the key was claimed, False if another claim of it has not expired yet.
+        """
+        now = time.time()
+        self.db.execute("DELETE FROM dedupe WHERE expires_at <= ?", (now,))
+        cursor = self.db.execute(
+            "INSERT OR IGNORE INTO dedupe (key, expires_at) VALUES (?, ?)",
+            (str(key), now + ttl),
+        )
+        return cursor.rowcount == 1
+
+    ############################################################ Leases
+
+    def acquire_lease(self, name: str, owner: str, ttl: float) -> bool:
+        """
+        Acquire or renew a lease for `ttl` seconds.
+
+        Returns:
+            bool: True if `owner` holds the lease, False if another owner holds an unexpired lease.
+        """
+        now = time.time()
+        cursor = self.db.execute(
+            "INSERT INTO leases (name, owner, expires_at) VALUES (?, ?, ?) "
+            "ON CONFLICT (name) DO UPDATE SET owner = excluded.owner, expires_at = excluded.expires_at "
+            "WHERE leases.owner = excluded.owner OR leases.expires_at <= ?",
+            (name, owner, now + ttl, now),
+        )
+        return cursor.rowcount == 1
+
+    def release_lease(self, name: str, owner: str):
+        """
+        Release a lease if `owner` holds it.
+        """
+        self.db.execute(
+            "DELETE FROM leases WHERE name = ? AND owner = ?", (name, owner)
+        )
+
+    def leases(self, prefix: str = "") -> dict:
+        """
+        Return the unexpired leases whose name starts with `prefix`, as {name: owner}.
+        """
+        rows = self.db.execute(
+            "SELECT name, owner FROM leases WHERE expires_at > ? AND substr(name, 1, ?) = ?",
+            (time.time(), len(prefix), prefix),
+        ).fetchall()
+        return dict(rows)
+
+    ############################################################ Positions
+
+    def add_position(self, position: dict) -> int:
+        """
+        Store a new open position.
+
+        Args:
+            position (dict): The position fields; "position_id" is ignored.
+
+        Returns:
+            int: The id of the stored position.
+        """
+        columns = [column for column in POSITION_COLUMNS if column != "position_id"]
+        cursor = self.db.execute(
+            f"INSERT INTO positions ({', '.join(columns)}) "
+            f"VALUES ({', '.join('?' for _ in columns)})",
+            [position.get(column) for column in columns],
+        )
+        return cursor.lastrowid
+
+    def open_positions(self, symbol: str = None) -> list:
+        """
+        Return the open positions as dicts, optionally for one symbol only.
+        """
+        query = (
+            f"SELECT {', '.join(POSITION_COLUMNS)} FROM positions WHERE status = 'open'"
+        )
+        params = []
+        if symbol is not None:
+            query += " AND symbol = ?"
+            params.append(symbol)
+        rows = self.db.execute(query + " ORDER BY position_id", params).fetchall()
+        return [dict(zip(POSITION_COLUMNS, row)) for row in rows]
+
+    def open_symbols(self) -> set:
+        """
+        Return the symbols with at least one open or closing position.
+        """
+        rows = self.db.execute(
+            "SELECT DISTINCT symbol FROM positions WHERE status IN ('open', 'closing')"
+        ).fetchall()
+        return {symbol for (symbol,) in rows}
+
+    def claim_exit(
+        self, position_id: int, reason: str, price: float, owner: str = None
+    ) -> bool:
+        """
+        Mark an open position as closing, claimed by `owner` now.
+
+        Only one caller can move a position out of "open", so a position is exited once even
+        if two workers triggered it (e.g. around a lease handover).
+
+        Returns:
+            bool: True if the caller must exit the position, False if it is no longer open.
+        """
+        cursor = self.db.execute(
+            "UPDATE positions SET status = 'closing', exit_reason = ?, exit_price = ?, "
+            "claimed_by = ?, claimed_at = ? WHERE position_id = ? AND status = 'open'",
+            (reason, price, owner, time.time(), position_id),
+        )
+        return cursor.rowcount == 1
+
+    def stale_exits(self, claimed_before: float, symbol: str = None) -> list:
+        """
+        Return the positions still closing that were claimed before `claimed_before`, as dicts
+        with their "claimed_by" and "claimed_at"; their worker most likely stopped mid-exit.
+        """
+        columns = POSITION_COLUMNS + ("claimed_by", "claimed_at")
+        query = (
+            f"SELECT {', '.join(columns)} FROM positions WHERE status = 'closing' "
+            "AND (claimed_at IS NULL OR claimed_at <= ?)"
+        )
+        params = [claimed_before]
+        if symbol is not None:
+            query += " AND symbol = ?"
+            params.append(symbol)
+        rows = self.db.execute(query + " ORDER BY position_id", params).fetchall()
+        return [dict(zip(columns, row)) for row in rows]
+
+    def reopen_exit(self, position_id: int, claimed_before: float) -> bool:
+        """
+        Move a stale closing position back to "open", so it is monitored and exited again.
+
+        Returns:
+            bool: True if the position was closing and claimed before `claimed_before`.
+        """
+        cursor = self.db.execute(
+            "UPDATE positions SET status = 'open', exit_reason = NULL, exit_price = NULL, "
+            "claimed_by = NULL, claimed_at = NULL WHERE position_id = ? AND status = 'closing' "
+            "AND (claimed_at IS NULL OR claimed_at <= ?)",
+            (position_id, claimed_before),
+        )
+        return cursor.rowcount == 1
+
+    def finish_exit(self, position_id: int, status: str, closed_at: float):
+        """
+        Record the outcome of an exit ("closed" or "exit_failed").
+        """
+        self.db.execute(
+            "UPDATE positions SET status = ?, closed_at = ? WHERE position_id = ?",
+            (status, closed_at, position_id),
+        )
+
+    def remove_position(self, position_id: int) -> bool:
+        """
+        Stop monitoring an open position without exiting it.
+
+        Returns:
+            bool: True if the position was open.
+        """
+        cursor = self.db.execute(
+            "UPDATE positions SET status = 'removed' WHERE position_id = ? AND status = 'open'",
+            (position_id,),
+        )
+        return cursor.rowcount == 1
+
+    ############################################################ Signals
+
+    def signal(self, name: str):
+        """
+        Bump a signal; every process watching it calls its handler once.
+        """
+        self.db.execute(
+            "INSERT INTO signals (name, counter) VALUES (?, 1) "
+            "ON CONFLICT (name) DO UPDATE SET counter = counter + 1",
+            (name,),
+        )
+
+    def _signal_counters(self) -> dict:
+        return dict(self.db.execute("SELECT name, counter FROM signals").fetchall())
+
+    async def watch_signals(self, handlers: dict, interval: float = 0.5):
+        """
+        Call `handlers[name]()` every time the signal `name` is bumped, from any process.
+        Runs until cancelled; started from the FastAPI lifespan.
+
+        Args:
+            handlers (dict): Functions without arguments, by signal name.
+            interval (float): The number of seconds between checks.
+        """
+        seen = await self.run(self._signal_counters)
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                counters = await self.run(self._signal_counters)
+            except sqlite3.Error as e:
+                logger.error("Error reading the shared signals: %s", e)
+                continue
+            for name, counter in counters.items():
+                if counter != seen.get(name) and name in handlers:
+                    try:
+                        handlers[name]()
+                    except Exception:
+                        logger.exception("Error handling the %s signal", name)
+            seen = counters
+
+    def stats(self) -> dict:
+        """
+        Return shared state statistics.
+
+        Returns:
+            dict: The number of positions per status, the unexpired leases and the remembered keys.
+        """
+        statuses = dict(
+            self.db.execute(
+                "SELECT status, COUNT(*) FROM positions GROUP BY status"
+            ).fetchall()
+        )
+        (keys,) = self.db.execute(
+            "SELECT COUNT(*) FROM dedupe WHERE expires_at > ?", (time.time(),)
+        ).fetchone()
+        return {
+            "path": self.path,
+            "positions": statuses,
+            "leases": self.leases(),
+            "remembered_keys": keys,
+        }
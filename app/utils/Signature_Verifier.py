@@ -0,0 +1,228 @@
+import asyncio
+import base64
+import hashlib
+import logging
+import os
+from cryptography.hazmat.primitives import serialization, hashes
+from cryptography.hazmat.primitives.asymmetric import padding
+from cryptography.hazmat.backends import default_backend
+from cryptography.exceptions import InvalidSignature
+
+
+logger = logging.getLogger(__name__)
+
+
+PEM_END_MARKER = "-----END PUBLIC KEY-----"
+
+# MarketRaker signs with RSA-PSS over SHA-256. The padding object is immutable, so it is built once.
+PSS_PADDING = padding.PSS(
+    mgf=padding.MGF1(hashes.SHA256()),
+    salt_length=padding.PSS.MAX_LENGTH,
+)
+
+
+def load_public_key(public_key_str: str):
+    """
+    Parse a PEM formatted public key.
+
+    Parameters:
+    - public_key_str (str): The PEM formatted public key string. Escaped new lines ("\\n") are accepted.
+
+    Returns:
+    - tuple: The key id (the first 16 hex characters of the SHA-256 fingerprint of the key) and the parsed public key.
+
+    Raises:
+    - ValueError: If the string is not a valid PEM public key.
+    """
+    pem = public_key_str.strip().replace("\\n", "\n").encode("utf-8")
+    public_key = serialization.load_pem_public_key(pem, backend=default_backend())
+    der = public_key.public_bytes(
+        serialization.Encoding.DER, serialization.PublicFormat.SubjectPublicKeyInfo
+    )
+    return hashlib.sha256(der).hexdigest()[:16], public_key
+
+
+def split_pem_keys(text: str) -> list:
+    """
+    Split a string holding one or more concatenated PEM public keys into separate keys.
+
+    Parameters:
+    - text (str): The text containing the PEM blocks, e.g. the content of a key file.
+
+    Returns:
+    - list: The PEM strings, in the order in which they appear.
+    """
+    text = text.replace("\\n", "\n")
+    return [
+        block.strip() + "\n" + PEM_END_MARKER
+        for block in text.split(PEM_END_MARKER)
+        if block.strip()
+    ]
+
+
+class SignatureVerifier:
+    """
+    Verifies MarketRaker webhook signatures against one or more pre-parsed public keys.
+
+    The PEM keys are parsed once, when the verifier is created or a key is added, instead
+    of on every webhook. Several keys can be active at the same time so that a key rotation
+    does not reject indicators that are still signed with the previous key: the primary
+    (newest) key is tried first and the remaining keys afterwards.
+
+    The active key set is an immutable tuple that is replaced as a whole on every change,
+    so `verify` never needs a lock and a rotation never affects a verification in progress.
+
+    Parameters:
+    - public_keys (list): PEM formatted public key strings, the primary key first.
+    - key_file (str): Optional path to a file holding one or more PEM keys, primary first.
+      When set, the file can be edited to rotate keys without restarting (see `watch_key_file`).
+
+    Last Reviewed Date:
+        18 Oct 2026
+    """
+
+    def __init__(self, public_keys: list = (), key_file: str = None):
+        self._keys: tuple = ()
+        self.key_file = key_file
+        self._key_file_mtime: float = None
+        for public_key_str in public_keys:
+            self._add(public_key_str, primary=False)
+        if key_file:
+            self.reload_key_file()
+
+    def _add(self, public_key_str: str, primary: bool) -> str:
+        try:
+            key_id, public_key = load_public_key(public_key_str)
+        except ValueError as e:
+            logger.error("Unable to load public key: %s", e)
+            return None
+
+        keys = tuple(key for key in self._keys if key[0] != key_id)
+        self._keys = (
+            ((key_id, public_key),) + keys
+            if primary
+            else keys + ((key_id, public_key),)
+        )
+        return key_id
+
+    def add_key(self, public_key_str: str) -> str:
+        """
+        Activate an additional key, tried after the keys that are already active.
+
+        Parameters:
+        - public_key_str (str): The PEM formatted public key string.
+
+        Returns:
+        - str: The id of the added key, or None if the key could not be parsed.
+        """
+        return self._add(public_key_str, primary=False)
+
+    def rotate_key(self, public_key_str: str, keep_previous: bool = True) -> str:
+        """
+        Make a new key the primary key.
+
+        Parameters:
+        - public_key_str (str): The PEM formatted public key string of the new key.
+        - keep_previous (bool): Keep the previous keys active (tried after the new key) until
+          they are retired with `retire_key`. If False, only the new key stays active.
+
+        Returns:
+        - str: The id of the new primary key, or None if the key could not be parsed (the active keys are then left unchanged).
+        """
+        key_id = self._add(public_key_str, primary=True)
+        if key_id and not keep_previous:
+            self._keys = self._keys[:1]
+        return key_id
+
+    def retire_key(self, key_id: str) -> bool:
+        """
+        Deactivate a key.
+
+        Parameters:
+        - key_id (str): The id of the key to deactivate.
+
+        Returns:
+        - bool: True if the key was active, False otherwise.
+        """
+        keys = tuple(key for key in self._keys if key[0] != key_id)
+        retired = len(keys) != len(self._keys)
+        self._keys = keys
+        return retired
+
+    def key_ids(self) -> list:
+        """
+        Return the ids of the active keys, primary key first.
+        """
+        return [key_id for key_id, _ in self._keys]
+
+    def reload_key_file(self) -> bool:
+        """
+        Replace the active keys with the keys in `key_file` if the file changed since the last load.
+
+        Returns:
+        - bool: True if the keys were reloaded, False otherwise.
+        """
+        try:
+            mtime = os.stat(self.key_file).st_mtime
+            if mtime == self._key_file_mtime:
+                return False
+            with open(self.key_file, "r") as f:
+                pem_keys = split_pem_keys(f.read())
+        except OSError as e:
+            logger.error("Unable to read public key file %s: %s", self.key_file, e)
+            return False
+
+        loaded = SignatureVerifier(pem_keys)
+        self._key_file_mtime = mtime
+        if not loaded._keys:
+            logger.error(
+                "No valid public keys found in %s, keeping the active keys.",
+                self.key_file,
+            )
+            return False
+        self._keys = loaded._keys
+        logger.info("Loaded public keys %s from %s.", self.key_ids(), self.key_file)
+        return True
+
+    async def watch_key_file(self, interval: float = 30.0):
+        """
+        Periodically reload `key_file` so keys can be rotated without restarting the application.
+
+        Parameters:
+        - interval (float): Seconds between checks of the file modification time.
+        """
+        while True:
+            await asyncio.sleep(interval)
+            self.reload_key_file()
+
+    def verify(self, payload, signature: str) -> bool:
+        """
+        Verifies the signature of a payload against the active keys.
+
+        Parameters:
+        - payload (str | bytes): The payload that was signed.
+        - signature (str): The base64 encoded signature to verify.
+
+        Returns:
+        - bool: True if the signature is valid for any active key, False otherwise.
+        """
+        try:
+            payload_bytes: bytes = (
+                payload.encode("utf-8") if isinstance(payload, str) else payload
+            )
+            signature_bytes: bytes = base64.b64decode(signature.encode("utf-8"))
+        except Exception as e:
+            logger.error("An error occurred during signature verification: %s", e)
+            return False
+
+        for _, public_key in self._keys:
+            try:
+                public_key.verify(
+                    signature_bytes, payload_bytes, PSS_PADDING, hashes.SHA256()
+                )
+                return True
+            except InvalidSignature:
+                continue
+            except Exception as e:
+                logger.error("An error occurred during signature verification: %s", e)
+        return False
@@ -0,0 +1,584 @@
+import asyncio
+import hashlib
+import hmac
+import json
+import logging
+import time
+import websockets
+from app.utils.JSON_Backend import json_loads
+
+
+logger = logging.getLogger(__name__)
+
+
+class StreamSubscription:
+    """
+    A consumer of one stream of a `StreamHub` (a Binance stream or a Bybit topic).
+
+    Every subscription owns a bounded queue. When a consumer falls behind and its queue is
+    full, the oldest message is dropped so a slow consumer never blocks the hub or the other
+    consumers of the same stream.
+
+    Subscriptions are context managers and async iterators:
+
+        with binance_streams.subscribe("btcusdt@trade") as trades:
+            async for trade in trades:
+                ...
+
+    Last Reviewed Date:
+        18 Oct 2026
+    """
+
+    def __init__(self, hub, stream: str, maxsize: int):
+        self.hub = hub
+        self.stream = stream
+        self.queue = asyncio.Queue(maxsize)
+        self.dropped = 0
+        self.closed = False
+
+    def _put(self, data: dict):
+        if self.queue.full():
+            self.queue.get_nowait()
+            self.dropped += 1
+        self.queue.put_nowait(data)
+
+    async def get(self) -> dict:
+        """
+        Wait for and return the next message of the stream.
+
+        Returns:
+            dict: For Binance, the "data" part of the combined stream message (e.g. a trade
+            event); for Bybit, the whole topic message ("topic", "type", "ts" and "data").
+        """
+        return await self.queue.get()
+
+    def close(self):
+        """
+        Stop receiving messages. The hub unsubscribes the stream when its last consumer closes.
+        """
+        if not self.closed:
+            self.closed = True
+            self.hub.unsubscribe(self)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self) -> dict:
+        if self.closed:
+            raise StopAsyncIteration
+        return await self.get()
+
+
+class StreamHub:
+    """
+    Process-wide multiplexer of the streams of one WebSocket connection.
+
+    Streams are subscribed and unsubscribed on the live connection with reference counting:
+    the first consumer of a stream subscribes it, further consumers share it, and the stream
+    is unsubscribed when its last consumer closes. Every message is fanned out to the bounded
+    queue of each consumer of its stream.
+
+    The connection is opened on the first subscription, closed when no streams remain, and
+    re-established with exponential backoff (re-subscribing every active stream) if it drops.
+    Subscribe and unsubscribe requests are batched and throttled. Subclasses implement the
+    exchange protocol: `_request`, `_dispatch` and, if needed, `_on_connect` and `_ping`.
+
+    Args:
+        url (str): The stream endpoint.
+        queue_size (int): The default queue size of each subscription.
+        control_interval (float): The minimum number of seconds between subscribe/unsubscribe requests.
+        reconnect_delay (float): The initial delay in seconds before reconnecting.
+        max_reconnect_delay (float): The maximum delay in seconds before reconnecting.
+        ping_interval (float): The number of seconds between heartbeats, or None if the
+            exchange needs none besides the WebSocket protocol pings.
+
+    Last Reviewed Date:
+        18 Oct 2026
+    """
+
+    name = "stream"
+
+    def __init__(
+        self,
+        url: str,
+        queue_size: int = 1000,
+        control_interval: float = 0.25,
+        reconnect_delay: float = 1.0,
+        max_reconnect_delay: float = 30.0,
+        ping_interval: float = None,
+    ):
+        self.url = url
+        self.queue_size = queue_size
+        self.control_interval = control_interval
+        self.reconnect_delay = reconnect_delay
+        self.max_reconnect_delay = max_reconnect_delay
+        self.ping_interval = ping_interval
+        self._subscribers: dict = {}
+        self._active: set = set()
+        self._ws = None
+        self._task: asyncio.Task = None
+        self._control_event: asyncio.Event = None
+        self._request_id = 0
+        self._messages = 0
+        self._stream_messages: dict = {}
+        self._reconnects = 0
+        self._connected_at: float = None
+
+    def subscribe(self, stream: str, maxsize: int = None) -> StreamSubscription:
+        """
+        Subscribe to a stream.
+
+        Args:
+            stream (str): The stream name (e.g., "btcusdt@trade" or "tickers.BTCUSDT").
+            maxsize (int): The queue size of this subscription. Defaults to the hub's `queue_size`.
+
+        Returns:
+            StreamSubscription: The subscription, which receives every message of the stream from now on.
+        """
+        subscription = StreamSubscription(self, stream, maxsize or self.queue_size)
+        self._subscribers.setdefault(stream, set()).add(subscription)
+        self._ensure_running()
+        self._wake()
+        return subscription
+
+    def unsubscribe(self, subscription: StreamSubscription):
+        """
+        Remove a subscription. The stream is unsubscribed when its last consumer is removed.
+
+        Args:
+            subscription (StreamSubscription): The subscription to remove.
+        """
+        subscriptions = self._subscribers.get(subscription.stream)
+        if subscriptions is None:
+            return
+        subscriptions.discard(subscription)
+        if not subscriptions:
+            del self._subscribers[subscription.stream]
+            self._wake()
+
+    def streams(self) -> list:
+        """
+        Return the names of the streams that currently have consumers.
+        """
+        return list(self._subscribers)
+
+    def _ensure_running(self):
+        if self._task is None or self._task.done():
+            self._control_event = asyncio.Event()
+            self._task = asyncio.create_task(self._run())
+
+    def _wake(self):
+        if self._control_event is not None:
+            self._control_event.set()
+
+    async def _request(self, ws, method: str, streams: list):
+        # Send a "SUBSCRIBE" or "UNSUBSCRIBE" request for the streams.
+        raise NotImplementedError
+
+    def _dispatch(self, message):
+        # Fan a received message out to the consumers of its stream.
+        raise NotImplementedError
+
+    async def _on_connect(self, ws):
+        # Called once the connection is open, before any stream is subscribed.
+        pass
+
+    def _on_unsubscribed(self, streams: list):
+        pass
+
+    async def _ping(self, ws):
+        pass
+
+    def _fan_out(self, stream: str, data):
+        self._messages += 1
+        self._stream_messages[stream] = self._stream_messages.get(stream, 0) + 1
+        for subscription in tuple(self._subscribers.get(stream, ())):
+            subscription._put(data)
+
+    async def _sync_subscriptions(self, ws):
+        # Reconcile the streams subscribed on the connection with the streams that have
+        # consumers, so a stream subscribed and closed in between two syncs costs nothing.
+        while True:
+            await self._control_event.wait()
+            self._control_event.clear()
+
+            wanted = set(self._subscribers)
+            to_subscribe = sorted(wanted - self._active)
+            to_unsubscribe = sorted(self._active - wanted)
+            if to_unsubscribe:
+                await self._request(ws, "UNSUBSCRIBE", to_unsubscribe)
+                self._active.difference_update(to_unsubscribe)
+                self._on_unsubscribed(to_unsubscribe)
+                await asyncio.sleep(self.control_interval)
+            if to_subscribe:
+                await self._request(ws, "SUBSCRIBE", to_subscribe)
+                self._active.update(to_subscribe)
+                await asyncio.sleep(self.control_interval)
+            if not self._subscribers:
+                await ws.close()
+                return
+
+    async def _heartbeat(self, ws):
+        while True:
+            await asyncio.sleep(self.ping_interval)
+            await self._ping(ws)
+
+    async def _run(self):
+        delay = self.reconnect_delay
+        while self._subscribers:
+            sync_task = None
+            heartbeat_task = None
+            try:
+                async with websockets.connect(self.url) as ws:
+                    await self._on_connect(ws)
+                    self._ws = ws
+                    self._active = set()
+                    self._connected_at = time.time()
+                    delay = self.reconnect_delay
+                    self._control_event.set()
+                    sync_task = asyncio.create_task(self._sync_subscriptions(ws))
+                    if self.ping_interval:
+                        heartbeat_task = asyncio.create_task(self._heartbeat(ws))
+                    async for message in ws:
+                        self._dispatch(message)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning("%s stream connection error: %s", self.name, e)
+            finally:
+                # The sync task closes the connection itself once no streams are left.
+                closed_when_idle = (
+                    sync_task is not None
+                    and sync_task.done()
+                    and not sync_task.cancelled()
+                    and sync_task.exception() is None
+                )
+                if sync_task is not None:
+                    sync_task.cancel()
+                if heartbeat_task is not None:
+                    heartbeat_task.cancel()
+                self._ws = None
+                self._active = set()
+                self._connected_at = None
+
+            if self._subscribers and not closed_when_idle:
+                self._reconnects += 1
+                await asyncio.sleep(delay)
+                delay = min(delay * 2, self.max_reconnect_delay)
+
+    async def close(self):
+        """
+        Close the connection. Called from the FastAPI lifespan on shutdown.
+        """
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except (asyncio.CancelledError, Exception):
+                pass
+        self._task = None
+
+    def stats(self) -> dict:
+        """
+        Return hub statistics.
+
+        Returns:
+            dict: The connection state, the streams with their number of consumers and
+            messages received, and the number of messages dropped by slow consumers.
+        """
+        return {
+            "url": self.url,
+            "connected": self._ws is not None,
+            "connected_at": self._connected_at,
+            "reconnects": self._reconnects,
+            "messages": self._messages,
+            "streams": {
+                stream: {
+                    "consumers": len(subscriptions),
+                    "messages": self._stream_messages.get(stream, 0),
+                    "dropped": sum(s.dropped for s in subscriptions),
+                    "queued": sum(s.queue.qsize() for s in subscriptions),
+                }
+                for stream, subscriptions in self._subscribers.items()
+            },
+        }
+
+
+class BinanceStreamHub(StreamHub):
+    """
+    Process-wide multiplexer for Binance market-data streams.
+
+    All streams (e.g. "btcusdt@trade", "ethusdt@depth@100ms") share a single combined-stream
+    WebSocket connection, with the reference counting, fan-out and reconnects of `StreamHub`.
+    SUBSCRIBE and UNSUBSCRIBE requests are batched and throttled to respect the Binance limit
+    on incoming messages per connection. The price of the last trade of every consumed
+    "<symbol>@trade" stream is kept, so price lookups can skip a REST call.
+
+    Args:
+        url (str): The combined stream endpoint (e.g., "wss://testnet.binance.vision/stream").
+        queue_size (int): The default queue size of each subscription.
+        control_interval (float): The minimum number of seconds between SUBSCRIBE/UNSUBSCRIBE requests.
+        reconnect_delay (float): The initial delay in seconds before reconnecting.
+        max_reconnect_delay (float): The maximum delay in seconds before reconnecting.
+
+    Last Reviewed Date:
+        18 Oct 2026
+    """
+
+    name = "Binance"
+
+    def __init__(
+        self,
+        url: str,
+        queue_size: int = 1000,
+        control_interval: float = 0.25,
+        reconnect_delay: float = 1.0,
+        max_reconnect_delay: float = 30.0,
+    ):
+        super().__init__(
+            url, queue_size, control_interval, reconnect_delay, max_reconnect_delay
+        )
+        self._last_trades: dict = {}
+
+    def last_trade_price(self, symbol: str, max_age: float):
+        """
+        Return the price of the last trade received on the live "<symbol>@trade" stream.
+
+        Args:
+            symbol (str): The symbol (e.g., "BTCUSDT").
+            max_age (float): The maximum age in seconds of the trade.
+
+        Returns:
+            str: The trade price as sent by Binance, or None if the stream is not consumed
+            in-process, the connection is down, or no trade arrived within `max_age`.
+        """
+        stream = f"{symbol.lower()}@trade"
+        if self._ws is None or stream not in self._active:
+            return None
+        last = self._last_trades.get(stream)
+        if last is None or time.monotonic() - last[1] > max_age:
+            return None
+        return last[0]
+
+    async def _request(self, ws, method: str, streams: list):
+        self._request_id += 1
+        await ws.send(
+            json.dumps({"method": method, "params": streams, "id": self._request_id})
+        )
+
+    def _on_unsubscribed(self, streams: list):
+        for stream in streams:
+            self._last_trades.pop(stream, None)
+
+    def _dispatch(self, message):
+        payload = json_loads(message)
+        stream = payload.get("stream")
+        if stream is None:
+            if payload.get("error"):
+                logger.error("Binance stream request failed: %s", payload)
+            return
+
+        data = payload["data"]
+        if stream.endswith("@trade"):
+            self._last_trades[stream] = (data["p"], time.monotonic())
+        self._fan_out(stream, data)
+
+
+class BybitStream(StreamHub):
+    """
+    One Bybit v5 WebSocket connection, multiplexing many topics (e.g. "tickers.BTCUSDT",
+    "publicTrade.ETHUSDT", or "order" and "execution" on the private stream).
+
+    Topics are subscribed once on the live connection with "subscribe" / "unsubscribe"
+    operations of at most `args_per_request` topics, shared by all their consumers and
+    re-subscribed after a reconnect. A "ping" operation is sent every `ping_interval`
+    seconds, as Bybit closes silent connections. The private stream is authenticated with
+    the API key before any topic is subscribed.
+
+    Args:
+        url (str): The stream endpoint (e.g., "wss://stream-testnet.bybit.com/v5/public/spot"
+            or "wss://stream-testnet.bybit.com/v5/private").
+        api_key (str): The API key of the private stream, or None for a public stream.
+        api_secret (str): The API secret of the private stream.
+        now_ms (callable): Returns the current (exchange) time in milliseconds, for the
+            expiry of the authentication.
+        queue_size (int): The default queue size of each subscription.
+        control_interval (float): The minimum number of seconds between subscribe/unsubscribe requests.
+        ping_interval (float): The number of seconds between heartbeats.
+        args_per_request (int): The maximum number of topics per request (10 on the spot stream).
+
+    Last Reviewed Date:
+        18 Oct 2026
+    """
+
+    name = "Bybit"
+
+    def __init__(
+        self,
+        url: str,
+        api_key: str = None,
+        api_secret: str = None,
+        now_ms=lambda: int(time.time() * 1000),
+        queue_size: int = 1000,
+        control_interval: float = 0.25,
+        ping_interval: float = 20.0,
+        args_per_request: int = 10,
+    ):
+        super().__init__(
+            url, queue_size, control_interval, ping_interval=ping_interval
+        )
+        self.api_key = api_key
+        self.api_secret = api_secret
+        self.now_ms = now_ms
+        self.args_per_request = args_per_request
+
+    async def _on_connect(self, ws):
+        if self.api_key is None:
+            return
+        expires = int(self.now_ms()) + 10000
+        signature = hmac.new(
+            self.api_secret.encode(),
+            f"GET/realtime{expires}".encode(),
+            hashlib.sha256,
+        ).hexdigest()
+        await ws.send(
+            json.dumps({"op": "auth", "args": [self.api_key, expires, signature]})
+        )
+        response = json_loads(await asyncio.wait_for(ws.recv(), 10))
+        if not response.get("success"):
+            raise ConnectionError(f"Bybit stream authentication failed: {response}")
+
+    async def _request(self, ws, method: str, streams: list):
+        for i in range(0, len(streams), self.args_per_request):
+            self._request_id += 1
+            await ws.send(
+                json.dumps(
+                    {
+                        "op": method.lower(),
+                        "args": streams[i : i + self.args_per_request],
+                        "req_id": str(self._request_id),
+                    }
+                )
+            )
+
+    async def _ping(self, ws):
+        await ws.send(json.dumps({"op": "ping"}))
+
+    def _dispatch(self, message):
+        payload = json_loads(message)
+        topic = payload.get("topic")
+        if topic is None:
+            if payload.get("success") is False:
+                logger.error("Bybit stream request failed: %s", payload)
+            return
+        self._fan_out(topic, payload)
+
+
+class BybitStreamHub:
+    """
+    Process-wide Bybit v5 stream client: one `BybitStream` connection per channel.
+
+    The channels are the public categories ("spot", "linear", "inverse", "option"), each on
+    "<public_url>/<category>", and "private" on `private_url`. A connection is opened on the
+    first subscription of its channel, carries every topic of that channel, and is closed
+    when its last subscription closes. Messages are read on the event loop, so no thread or
+    blocking call is involved.
+
+        with bybit_streams.subscribe("linear", "tickers.BTCUSDT") as tickers:
+            async for message in tickers:
+                ...
+
+    Args:
+        public_url (str): The public stream endpoint without the category
+            (e.g., "wss://stream-testnet.bybit.com/v5/public").
+        private_url (str): The private stream endpoint (e.g., "wss://stream-testnet.bybit.com/v5/private").
+        api_key (str): The API key of the private stream.
+        api_secret (str): The API secret of the private stream.
+        now_ms (callable): Returns the current (exchange) time in milliseconds.
+        queue_size (int): The default queue size of each subscription.
+
+    Last Reviewed Date:
+        18 Oct 2026
+    """
+
+    CHANNELS = ("spot", "linear", "inverse", "option", "private")
+
+    def __init__(
+        self,
+        public_url: str,
+        private_url: str,
+        api_key: str,
+        api_secret: str,
+        now_ms=lambda: int(time.time() * 1000),
+        queue_size: int = 1000,
+    ):
+        self.public_url = public_url
+        self.private_url = private_url
+        self.api_key = api_key
+        self.api_secret = api_secret
+        self.now_ms = now_ms
+        self.queue_size = queue_size
+        self._connections: dict = {}
+
+    def connection(self, channel: str) -> BybitStream:
+        """
+        Return the connection of a channel, creating it on first use.
+        """
+        if channel not in self.CHANNELS:
+            raise ValueError(
+                f"Unknown Bybit stream channel {channel!r}, expected one of {self.CHANNELS}"
+            )
+        connection = self._connections.get(channel)
+        if connection is None:
+            if channel == "private":
+                connection = BybitStream(
+                    self.private_url,
+                    self.api_key,
+                    self.api_secret,
+                    self.now_ms,
+                    queue_size=self.queue_size,
+                )
+            else:
+                connection = BybitStream(
+                    f"{self.public_url}/{channel}", queue_size=self.queue_size
+                )
+            self._connections[channel] = connection
+        return connection
+
+    def subscribe(
+        self, channel: str, topic: str, maxsize: int = None
+    ) -> StreamSubscription:
+        """
+        Subscribe to a topic.
+
+        Args:
+            channel (str): "spot", "linear", "inverse", "option" or "private".
+            topic (str): The Bybit topic (e.g., "tickers.BTCUSDT", or "order" on the private channel).
+            maxsize (int): The queue size of this subscription. Defaults to the hub's `queue_size`.
+
+        Returns:
+            StreamSubscription: The subscription, which receives every message of the topic from now on.
+        """
+        return self.connection(channel).subscribe(topic, maxsize)
+
+    async def close(self):
+        """
+        Close every connection. Called from the FastAPI lifespan on shutdown.
+        """
+        for connection in self._connections.values():
+            await connection.close()
+
+    def stats(self) -> dict:
+        """
+        Return the statistics of every connection, by channel.
+        """
+        return {
+            channel: connection.stats()
+            for channel, connection in self._connections.items()
+        }
@@ -0,0 +1,228 @@
+import copy
+import itertools
+import json
+import logging
+import queue
+import sys
+from contextvars import ContextVar
+from logging.handlers import QueueHandler, QueueListener
+
+
+# The id that ties log records to the indicator being handled (its idempotency key), or None.
+# Set by the webhook; carried to the queue workers and to the exits of the positions it opened.
+correlation_id: ContextVar = ContextVar("correlation_id", default=None)
+
+# High-frequency events (e.g. every trade tick) are logged to this logger, which is sampled.
+TICK_LOGGER = "app.ticks"
+
+# Attributes every LogRecord has; any other attribute was passed with `extra` and is a field.
+_RECORD_ATTRIBUTES = set(vars(logging.makeLogRecord({}))) | {
+    "message",
+    "asctime",
+    "correlation_id",
+    "sampled",
+}
+
+
+class ContextFilter(logging.Filter):
+    """
+    Adds the current `correlation_id` to every record, in the thread that logs it.
+    """
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        record.correlation_id = correlation_id.get()
+        return True
+
+
+class SamplingFilter(logging.Filter):
+    """
+    Lets one in `every` records through. Kept records carry `sampled` = `every`, so counts
+    taken from the logs can be scaled back up.
+    """
+
+    def __init__(self, every: int):
+        super().__init__()
+        self.every = max(1, every)
+        self._counter = itertools.count()
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if next(self._counter) % self.every:
+            return False
+        record.sampled = self.every
+        return True
+
+
+class JSONFormatter(logging.Formatter):
+    """
+    Formats a record as one JSON object per line: the time, level, logger, message, the
+    correlation id and every field passed with `extra`.
+    """
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "ts": round(record.created, 6),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        if getattr(record, "correlation_id", None):
+            entry["correlation_id"] = record.correlation_id
+        if getattr(record, "sampled", None):
+            entry["sampled"] = record.sampled
+        for key, value in vars(record).items():
+            if key not in _RECORD_ATTRIBUTES:
+                entry[key] = value
+        if record.exc_text:
+            entry["exception"] = record.exc_text
+        return json.dumps(entry, default=str)
+
+
+class TextFormatter(logging.Formatter):
+    """
+    Formats a record as a readable line, with the correlation id and the `extra` fields appended.
+    """
+
+    def __init__(self):
+        super().__init__("%(asctime)s %(levelname)s %(name)s: %(message)s")
+
+    def format(self, record: logging.LogRecord) -> str:
+        line = super().format(record)
+        fields = {
+            key: value
+            for key, value in vars(record).items()
+            if key not in _RECORD_ATTRIBUTES
+        }
+        if getattr(record, "correlation_id", None):
+            fields = {"correlation_id": record.correlation_id, **fields}
+        if fields:
+            line += " " + " ".join(f"{key}={value}" for key, value in fields.items())
+        return line
+
+
+class NonBlockingQueueHandler(QueueHandler):
+    """
+    Puts records on a bounded queue without ever waiting; a record that does not fit is
+    dropped and counted instead of blocking the event loop.
+    """
+
+    def __init__(self, log_queue: queue.Queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # Merge the arguments and render the traceback now, while they are still valid; the
+        # extra fields are kept for the formatter on the listener thread.
+        record = copy.copy(record)
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+    def enqueue(self, record: logging.LogRecord):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+class LogPipeline:
+    """
+    Structured, asynchronous logging for the app, built on the standard `logging` module.
+
+    Every module logs to its own logger (`logging.getLogger(__name__)`). Records are put on a
+    bounded in-memory queue by a non-blocking handler, and a listener thread formats and
+    writes them, so logging never waits on stdout. Records are written as JSON lines (or
+    readable text), with the correlation id of the indicator being handled and the fields
+    passed with `extra`.
+
+    High-frequency events are logged to the "app.ticks" logger at DEBUG level, so they cost
+    nothing unless that logger is enabled, and are sampled when it is.
+
+    Args:
+        level (str): The level of the "app" loggers (e.g., "INFO").
+        levels (dict): Per logger levels, e.g. {"app.crud.Binance_CRUD": "DEBUG"}.
+        json_output (bool): Whether to write JSON lines instead of text.
+        queue_size (int): The maximum number of records waiting to be written.
+        tick_sample_every (int): Write one in this many records of the "app.ticks" logger.
+        stream: The stream the records are written to.
+
+    Last Reviewed Date:
+        18 Oct 2026
+    """
+
+    def __init__(
+        self,
+        level: str = "INFO",
+        levels: dict = None,
+        json_output: bool = True,
+        queue_size: int = 10000,
+        tick_sample_every: int = 100,
+        stream=None,
+    ):
+        self.level = level
+        self.levels = levels or {}
+        self.json_output = json_output
+        self.tick_sample_every = tick_sample_every
+        self.queue: queue.Queue = queue.Queue(queue_size)
+        self.handler = NonBlockingQueueHandler(self.queue)
+        self.handler.addFilter(ContextFilter())
+        output = logging.StreamHandler(stream or sys.stdout)
+        output.setFormatter(JSONFormatter() if json_output else TextFormatter())
+        self.listener = QueueListener(self.queue, output)
+        self._sampler = SamplingFilter(tick_sample_every)
+
+    def start(self):
+        """
+        Route the "app" loggers through the queue and start the writer thread.
+        Called when the app module is imported, so startup messages are included.
+        """
+        root = logging.getLogger("app")
+        if self.handler not in root.handlers:
+            root.addHandler(self.handler)
+        root.setLevel(self.level.upper())
+        # The app loggers are written once, here, not again by the root logger's handlers.
+        root.propagate = False
+        ticks = logging.getLogger(TICK_LOGGER)
+        if self._sampler not in ticks.filters:
+            ticks.addFilter(self._sampler)
+        if TICK_LOGGER not in self.levels:
+            ticks.setLevel(logging.WARNING)
+        for name, level in self.levels.items():
+            logging.getLogger(name).setLevel(level.upper())
+        if self.listener._thread is None:
+            self.listener.start()
+
+    def stop(self):
+        """
+        Write the queued records and stop the writer thread. Called from the FastAPI lifespan on shutdown.
+        """
+        if self.listener._thread is not None:
+            self.listener.stop()
+
+    def stats(self) -> dict:
+        """
+        Return logging statistics.
+
+        Returns:
+            dict: The number of queued and dropped records.
+        """
+        return {
+            "format": "json" if self.json_output else "text",
+            "queued": self.queue.qsize(),
+            "dropped": self.handler.dropped,
+            "tick_sample_every": self.tick_sample_every,
+        }
+
+
+def parse_levels(entries) -> dict:
+    """
+    Parse "logger=LEVEL" entries (e.g. from the LOG_LEVELS setting) into a dict.
+    """
+    levels = {}
+    for entry in entries:
+        name, _, level = entry.partition("=")
+        if name.strip() and level.strip():
+            levels[name.strip()] = level.strip()
+    return levels
@@ -0,0 +1,292 @@
+import json
+import logging
+import queue
+import sqlite3
+import threading
+import time
+
+
+logger = logging.getLogger(__name__)
+
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS journal (
+    seq INTEGER PRIMARY KEY AUTOINCREMENT,
+    ts REAL NOT NULL,
+    kind TEXT NOT NULL,
+    symbol TEXT,
+    order_id TEXT,
+    data TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS journal_kind_ts ON journal (kind, ts);
+CREATE INDEX IF NOT EXISTS journal_symbol_ts ON journal (symbol, ts);
+CREATE INDEX IF NOT EXISTS journal_order_id ON journal (order_id);
+CREATE TRIGGER IF NOT EXISTS journal_no_update BEFORE UPDATE ON journal
+BEGIN SELECT RAISE(ABORT, 'the trade journal is append-only'); END;
+CREATE TRIGGER IF NOT EXISTS journal_no_delete BEFORE DELETE ON journal
+BEGIN SELECT RAISE(ABORT, 'the trade journal is append-only'); END;
+"""
+
+INSERT = "INSERT INTO journal (ts, kind, symbol, order_id, data) VALUES (?, ?, ?, ?, ?)"
+
+# Sentinel put on the queue by `close` to stop the writer thread after the pending entries.
+_STOP = object()
+
+
+class TradeJournal:
+    """
+    Append-only journal of everything the bot receives and does, stored in SQLite.
+
+    Every verified indicator, order request, exchange response and exit is recorded with a
+    timestamp. `record` only puts the entry on an in-memory queue, so the hot path never waits
+    on disk: a background writer thread drains the queue and inserts the entries in batches,
+    one transaction per batch. The database runs in WAL mode so the query API can read while
+    the writer appends, and triggers reject any UPDATE or DELETE on the journal table.
+
+    Entries can be read back in order with `query` to replay a session or to reconcile the
+    recorded orders with the exchange.
+
+    Args:
+        path (str): The SQLite database file. It is created if it does not exist.
+        batch_size (int): The maximum number of entries inserted per transaction.
+        flush_interval (float): The maximum number of seconds an entry waits in the queue.
+
+    Last Reviewed Date:
+        18 Oct 2026
+    """
+
+    def __init__(self, path: str, batch_size: int = 500, flush_interval: float = 0.2):
+        self.path = path
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self._queue: queue.SimpleQueue = queue.SimpleQueue()
+        self._writer: threading.Thread = None
+        self._recorded = 0
+        self._written = 0
+        self._batches = 0
+        self._failed = 0
+
+    def _connect(self) -> sqlite3.Connection:
+        connection = sqlite3.connect(self.path, check_same_thread=False)
+        connection.execute("PRAGMA journal_mode=WAL")
+        connection.execute("PRAGMA synchronous=NORMAL")
+        return connection
+
+    def open(self):
+        """
+        Create the schema and start the writer thread. Called from the FastAPI lifespan on startup.
+        """
+        if self._writer is not None and self._writer.is_alive():
+            return
+        connection = self._connect()
+        connection.executescript(SCHEMA)
+        connection.commit()
+        self._writer = threading.Thread(
+            target=self._write, args=(connection,), name="trade-journal", daemon=True
+        )
+        self._writer.start()
+
+    def close(self, timeout: float = 5.0):
+        """
+        Write the pending entries and stop the writer thread. Called from the FastAPI lifespan on shutdown.
+
+        Args:
+            timeout (float): The maximum number of seconds to wait for the pending entries to be written.
+        """
+        if self._writer is None:
+            return
+        self._queue.put(_STOP)
+        self._writer.join(timeout)
+        if self._writer.is_alive():
+            logger.warning(
+                "Trade journal writer did not finish within %ss, %d entries may not be written.",
+                timeout,
+                self._queue.qsize(),
+            )
+        self._writer = None
+
+    def record(
+        self, kind: str, data: dict, symbol: str = None, order_id: str = None
+    ) -> None:
+        """
+        Queue an entry for the journal. Never blocks and is safe to call from any thread.
+
+        Args:
+            kind (str): The type of the entry (e.g., "indicator", "order_request", "order_response", "exit").
+            data (dict): The payload of the entry. It must be JSON serializable (other values are stored as strings).
+            symbol (str): The trading pair the entry relates to, if any.
+            order_id (str): The exchange id of the order the entry relates to, if any.
+        """
+        self._recorded += 1
+        self._queue.put(
+            (
+                time.time(),
+                kind,
+                symbol,
+                None if order_id is None else str(order_id),
+                data,
+            )
+        )
+
+    def _write(self, connection: sqlite3.Connection):
+        stopping = False
+        while not stopping:
+            try:
+                entry = self._queue.get(timeout=self.flush_interval)
+            except queue.Empty:
+                continue
+
+            batch = []
+            while True:
+                if entry is _STOP:
+                    stopping = True
+                else:
+                    ts, kind, symbol, order_id, data = entry
+                    batch.append(
+                        (ts, kind, symbol, order_id, json.dumps(data, default=str))
+                    )
+                if stopping or len(batch) >= self.batch_size:
+                    break
+                try:
+                    entry = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+
+            if batch:
+                try:
+                    with connection:
+                        connection.executemany(INSERT, batch)
+                    self._written += len(batch)
+                    self._batches += 1
+                except sqlite3.Error:
+                    self._failed += len(batch)
+                    logger.exception(
+                        "Error writing %d trade journal entries", len(batch)
+                    )
+        connection.close()
+
+    def query(
+        self,
+        kind: str = None,
+        symbol: str = None,
+        order_id: str = None,
+        since: float = None,
+        until: float = None,
+        after_seq: int = 0,
+        limit: int = 100,
+    ) -> list:
+        """
+        Read journal entries in the order they were recorded.
+
+        Only entries that were already written are returned; entries still in the queue
+        appear within `flush_interval`. This call reads from disk, so call it from a worker
+        thread (e.g. `asyncio.to_thread`) when used from the event loop.
+
+        Args:
+            kind (str): Only return entries of this type.
+            symbol (str): Only return entries for this trading pair.
+            order_id (str): Only return entries for this order.
+            since (float): Only return entries recorded at or after this Unix timestamp.
+            until (float): Only return entries recorded before this Unix timestamp.
+            after_seq (int): Only return entries after this sequence number, to page through the journal.
+            limit (int): The maximum number of entries to return.
+
+        Returns:
+            list: The entries as dicts with "seq", "ts", "kind", "symbol", "order_id" and "data".
+        """
+        clauses, params = ["seq > ?"], [after_seq]
+        for column, value in (
+            ("kind", kind),
+            ("symbol", symbol),
+            ("order_id", order_id),
+        ):
+            if value is not None:
+                clauses.append(f"{column} = ?")
+                params.append(str(value))
+        if since is not None:
+            clauses.append("ts >= ?")
+            params.append(since)
+        if until is not None:
+            clauses.append("ts < ?")
+            params.append(until)
+        params.append(limit)
+
+        connection = self._connect()
+        try:
+            rows = connection.execute(
+                "SELECT seq, ts, kind, symbol, order_id, data FROM journal "
+                f"WHERE {' AND '.join(clauses)} ORDER BY seq LIMIT ?",
+                params,
+            ).fetchall()
+        finally:
+            connection.close()
+        return [
+            {
+                "seq": seq,
+                "ts": ts,
+                "kind": kind,
+                "symbol": symbol,
+                "order_id": order_id,
+                "data": json.loads(data),
+            }
+            for seq, ts, kind, symbol, order_id, data in rows
+        ]
+
+    def unexited_positions(self, since: float = None) -> list:
+        """
+        Return the positions that were opened but have no completed exit, oldest first.
+
+        A position is identified by the order id of its entry; an "exit" entry with the
+        "closed" status ends it, while a failed exit leaves it open. If several positions
+        were opened for the same order, only the latest entry is returned. Reads from disk, like `query`.
+
+        Args:
+            since (float): Only consider positions opened at or after this Unix timestamp.
+
+        Returns:
+            list: The "position_opened" entries as dicts, like `query`.
+        """
+        connection = self._connect()
+        try:
+            rows = connection.execute(
+                "SELECT seq, ts, kind, symbol, order_id, data FROM journal "
+                "WHERE seq IN ("
+                "  SELECT MAX(seq) FROM journal"
+                "  WHERE kind = 'position_opened' AND ts >= ? GROUP BY order_id"
+                ") AND order_id NOT IN ("
+                "  SELECT order_id FROM journal"
+                "  WHERE kind = 'exit' AND order_id IS NOT NULL"
+                "  AND json_extract(data, '$.status') = 'closed'"
+                ") ORDER BY seq",
+                (since or 0,),
+            ).fetchall()
+        finally:
+            connection.close()
+        return [
+            {
+                "seq": seq,
+                "ts": ts,
+                "kind": kind,
+                "symbol": symbol,
+                "order_id": order_id,
+                "data": json.loads(data),
+            }
+            for seq, ts, kind, symbol, order_id, data in rows
+        ]
+
+    def stats(self) -> dict:
+        """
+        Return journal statistics.
+
+        Returns:
+            dict: The number of entries recorded, written, failed and still queued, and the number of batches.
+        """
+        return {
+            "path": self.path,
+            "running": self._writer is not None and self._writer.is_alive(),
+            "recorded": self._recorded,
+            "written": self._written,
+            "failed": self._failed,
+            "queued": self._queue.qsize(),
+            "batches": self._batches,
+        }
@@ -1,7 +1,290 @@
+import logging
+import numpy as np
 from app.crud.Binance_CRUD import *
 from app.crud.ByBit_CRUD import *
 
 
+logger = logging.getLogger(__name__)
+
+STRATEGIES = ("momentum", "overbought_oversold")
+
+
+# The entry rules of the strategies, defined once as batched functions: one array operation
+# per condition over all indicators, so the backtester and the live strategies apply exactly
+# the same rules. Sides are encoded as 1 (BUY), -1 (SELL) and 0 (no trade).
+_DIRECTIONS = {("Long", "Bull"): 1, ("Short", "Bear"): -1}
+_SIDES = {1: "BUY", -1: "SELL"}
+_SIDE_CODES = {"BUY": 1, "SELL": -1}
+
+
+def entry_directions(indicators: list) -> np.ndarray:
+    """
+    Returns the side every indicator can trade by its trading type and market direction:
+    1 (BUY) for a Long on a Bull market, -1 (SELL) for a Short on a Bear market, 0 otherwise.
+    """
+    return np.array(
+        [
+            _DIRECTIONS.get((indicator.trading_type, indicator.market_direction), 0)
+            for indicator in indicators
+        ],
+        dtype=np.int8,
+    )
+
+
+def momentum_sides(directions, percentage_changes) -> np.ndarray:
+    """
+    Returns the side of a momentum trade for every indicator: the predicted change must
+    exceed 2% in the direction of the trade. A missing (None) change never trades.
+    """
+    directions = np.asarray(directions, dtype=np.int8)
+    # None becomes NaN, and comparisons with NaN are False
+    percentage_changes = np.array(percentage_changes, dtype=float)
+    return np.where(directions * percentage_changes > 2, directions, 0).astype(np.int8)
+
+
+def momentum_entries_allowed(sides, current_prices, buy_prices) -> np.ndarray:
+    """
+    Returns, for every indicator, whether the current price allows a momentum entry: at or
+    below the indicator's buy price for a BUY, at or above it for a SELL. A NaN price
+    (unknown) never allows an entry.
+    """
+    sides = np.asarray(sides)
+    current_prices = np.asarray(current_prices, dtype=float)
+    buy_prices = np.asarray(buy_prices, dtype=float)
+    return ((sides == 1) & (current_prices <= buy_prices)) | (
+        (sides == -1) & (current_prices >= buy_prices)
+    )
+
+
+def overbought_oversold_sides(directions, percentage_changes_24h) -> np.ndarray:
+    """
+    Returns the side of an overbought/oversold trade for every indicator: the predicted
+    24 hour change must exceed 5% in the direction of the trade. A missing (None) 24 hour
+    change never trades.
+    """
+    directions = np.asarray(directions, dtype=np.int8)
+    # None becomes NaN, and comparisons with NaN are False
+    percentage_changes_24h = np.array(percentage_changes_24h, dtype=float)
+    return np.where(directions * percentage_changes_24h > 5, directions, 0).astype(
+        np.int8
+    )
+
+
+# The rules for one indicator, as used by `momentum_strategy` and `overbought_oversold_strategy`.
+def momentum_side(trading_type: str, market_direction: str, percentage_change: float):
+    """
+    Returns the side of a momentum trade, or None if the entry conditions are not met.
+
+    A long position (BUY) is entered on a Bull market with more than 2% predicted change,
+    a short position (SELL) on a Bear market with less than -2% predicted change.
+    """
+    direction = _DIRECTIONS.get((trading_type, market_direction), 0)
+    return _SIDES.get(int(momentum_sides([direction], [percentage_change])[0]))
+
+
+def momentum_entry_allowed(side: str, current_price: float, buy_price: float) -> bool:
+    """
+    Returns True if the current price allows a momentum entry: at or below the indicator's
+    buy price for a BUY, at or above it for a SELL.
+    """
+    return bool(
+        momentum_entries_allowed(
+            [_SIDE_CODES.get(side, 0)], [current_price], [buy_price]
+        )[0]
+    )
+
+
+def overbought_oversold_side(
+    trading_type: str, market_direction: str, percentage_change_24h: float
+):
+    """
+    Returns the side of an overbought/oversold trade, or None if the entry conditions are not met.
+
+    A long position (BUY) is entered when the market is bullish with more than 5% predicted
+    change in the next 24 hours (overbought), a short position (SELL) when it is bearish with
+    less than -5% predicted change (oversold).
+    """
+    direction = _DIRECTIONS.get((trading_type, market_direction), 0)
+    return _SIDES.get(
+        int(overbought_oversold_sides([direction], [percentage_change_24h])[0])
+    )
+
+
+def no_trade_message(trading_type: str) -> str:
+    if trading_type == "Long":
+        return "Long trade conditions not met. No trade executed."
+    if trading_type == "Short":
+        return "Short trade conditions not met. No trade executed."
+    return "Invalid trading type. Trade not executed."
+
+
+def _entry_sides(indicators: list, strategies: tuple) -> tuple:
+    # The sides of the strategies before the price checks: (momentum, overbought/oversold).
+    directions = entry_directions(indicators)
+    momentum = reversal = np.zeros(len(indicators), dtype=np.int8)
+    if "momentum" in strategies:
+        momentum = momentum_sides(
+            directions, [indicator.percentage_change for indicator in indicators]
+        )
+    if "overbought_oversold" in strategies:
+        reversal = overbought_oversold_sides(
+            directions, [indicator.percentage_change_24h for indicator in indicators]
+        )
+    return momentum, reversal
+
+
+def _order_intents(
+    indicators: list, sides: tuple, symbols: list, current_prices
+) -> list:
+    momentum, reversal = sides
+    buy_prices = np.array(
+        [indicator.buy_price for indicator in indicators], dtype=float
+    )
+    current_prices = np.asarray(current_prices, dtype=float)
+
+    # one row per indicator, one column per strategy: (side, reference price)
+    sides = np.column_stack(
+        (
+            np.where(
+                momentum_entries_allowed(momentum, current_prices, buy_prices),
+                momentum,
+                0,
+            ),
+            # the entry is at the market price, so it needs a known price
+            np.where(np.isnan(current_prices), 0, reversal),
+        )
+    )
+    reference_prices = np.column_stack((buy_prices, current_prices))
+    rows, strategies = np.nonzero(sides)
+    return [
+        {
+            "index": row,
+            "strategy": STRATEGIES[strategy],
+            "symbol": symbols[row],
+            "side": _SIDES[side],
+            "quantity": 1 / indicators[row].leverage,
+            "reference_price": reference_price,
+            "stoploss": indicators[row].stoploss,
+        }
+        for row, strategy, side, reference_price in zip(
+            rows.tolist(),
+            strategies.tolist(),
+            sides[rows, strategies].tolist(),
+            reference_prices[rows, strategies].tolist(),
+        )
+    ]
+
+
+def order_intents(
+    indicators: list, symbols: list, current_prices, strategies: tuple = STRATEGIES
+) -> list:
+    """
+    Evaluates the entry rules of the strategies for a batch of indicators in one pass.
+
+    The fields the rules need are read once per indicator into arrays, and every entry
+    condition is one NumPy operation over the whole batch instead of a Python branch per
+    indicator and strategy. The rules are the same as those of `momentum_strategy` and
+    `overbought_oversold_strategy`.
+
+    Args:
+        indicators (list): The decoded indicators (`Indicator` models).
+        symbols (list): The Binance symbol of every indicator (e.g., "BTCUSDT").
+        current_prices (array-like): The current price of every indicator's symbol; NaN if unknown.
+        strategies (tuple): The strategies to evaluate, any of STRATEGIES.
+
+    Returns:
+        list: One order intent dict per accepted entry, in indicator order and then strategy
+        order, with the keys "index" (of the indicator in the batch), "strategy", "symbol",
+        "side", "quantity" (1 / leverage), "reference_price" (the price the exit target is
+        computed from: the buy price for momentum, the current price for overbought/oversold)
+        and "stoploss".
+
+    Last Reviewed Date:
+        18 Oct 2026
+    """
+    if not indicators:
+        return []
+    return _order_intents(
+        indicators, _entry_sides(indicators, strategies), symbols, current_prices
+    )
+
+
+async def evaluate_indicators(
+    indicators: list, symbols: list, strategies: tuple = STRATEGIES
+) -> list:
+    """
+    Evaluates the entry rules of the strategies for a batch of indicators, with the current
+    prices of all their symbols fetched together.
+
+    MarketRaker can send many indicators in a short window; instead of one price request per
+    indicator and strategy, the prices of every symbol in the batch come from one
+    `get_binance_price_tickers` call (live trade streams and cached tickers are used first),
+    and the entry rules are evaluated as in `order_intents`. Only indicators that can trade by
+    their fields alone need a price, so a batch without candidates makes no request.
+
+    Args:
+        indicators (list): The decoded indicators (`Indicator` models).
+        symbols (list): The Binance symbol of every indicator (e.g., "BTCUSDT").
+        strategies (tuple): The strategies to evaluate, any of STRATEGIES.
+
+    Returns:
+        list: The order intents, as returned by `order_intents`.
+
+    Raises:
+        HTTPException: If the prices could not be fetched.
+
+    Last Reviewed Date:
+        18 Oct 2026
+    """
+    if not indicators:
+        return []
+    momentum, reversal = _entry_sides(indicators, strategies)
+
+    needed = [symbols[i] for i in np.flatnonzero(momentum | reversal).tolist()]
+    prices = await get_binance_price_tickers(needed) if needed else {}
+    current_prices = [prices.get(symbol.upper(), np.nan) for symbol in symbols]
+    return _order_intents(indicators, (momentum, reversal), symbols, current_prices)
+
+
+async def execute_order_intent(intent: dict):
+    """
+    Places the order of an order intent on Binance and monitors the position until it exits,
+    as `momentum_strategy` and `overbought_oversold_strategy` do after their entry checks.
+
+    Args:
+        intent (dict): An order intent, as returned by `order_intents` or `evaluate_indicators`.
+
+    Last Reviewed Date:
+        18 Oct 2026
+    """
+    try:
+        response = await Binance_place_order(
+            symbol=intent["symbol"],
+            side=intent["side"],
+            quantity=intent["quantity"],
+            strategy=intent["strategy"],
+        )
+        logger.info(
+            "Trade executed.",
+            extra={
+                "symbol": intent["symbol"],
+                "side": intent["side"],
+                "strategy": intent["strategy"],
+                "response": response,
+            },
+        )
+        await listen_to_websocket(
+            intent["symbol"],
+            intent["side"],
+            intent["reference_price"],
+            intent["stoploss"],
+            response["orderId"],
+            intent["quantity"],
+        )
+    except Exception:
+        logger.exception("Error in %s strategy", intent["strategy"])
+
+
 async def momentum_strategy(
     trading_pair: str,
     market_direction: str,
@@ -37,21 +320,9 @@ async def momentum_strategy(
     """
     try:
         # Determine the trade side based on market direction and trading type
-        if trading_type == "Long":
-            if market_direction == "Bull" and percentage_change > 2:
-                side = "BUY"  # Enter a long position if conditions are met
-            else:
-                print("Long trade conditions not met. No trade executed.")
-                return
-
-        elif trading_type == "Short":
-            if market_direction == "Bear" and percentage_change < -2:
-                side = "SELL"  # Enter a short position if conditions are met
-            else:
-                print("Short trade conditions not met. No trade executed.")
-                return
-        else:
-            print("Invalid trading type. Trade not executed.")
+        side = momentum_side(trading_type, market_direction, percentage_change)
+        if side is None:
+            logger.info(no_trade_message(trading_type))
             return
 
         # Get current price
@@ -59,14 +330,18 @@ async def momentum_strategy(
         current_price = float(current_price_data["price"])
 
         # Check conditions and place an order
-        if (side == "BUY" and current_price <= buy_price) or (
-            side == "SELL" and current_price >= buy_price
-        ):
+        if momentum_entry_allowed(side, current_price, buy_price):
             quantity = 1 / leverage  # Example quantity
             response = await Binance_place_order(
-                symbol=trading_pair, side=side, quantity=quantity
+                symbol=trading_pair,
+                side=side,
+                quantity=quantity,
+                strategy="momentum",
+            )
+            logger.info(
+                "Momentum trade executed.",
+                extra={"symbol": trading_pair, "side": side, "response": response},
             )
-            print(f"Momentum trade executed: {response}")
             orderId = response["orderId"]
 
             # Use WebSocket to monitor exit conditions
@@ -75,10 +350,13 @@ async def momentum_strategy(
             )
 
         else:
-            print("Price conditions not favorable for momentum trade entry.")
+            logger.info(
+                "Price conditions not favorable for momentum trade entry.",
+                extra={"symbol": trading_pair, "price": current_price},
+            )
 
-    except Exception as e:
-        print(f"Error in momentum strategy: {e}")
+    except Exception:
+        logger.exception("Error in momentum strategy")
 
 
 async def overbought_oversold_strategy(
@@ -97,7 +375,7 @@ async def overbought_oversold_strategy(
     Args:
         trading_pair (str): The trading pair for the order (e.g., 'BTCUSDT').
         market_direction (str): The market direction, either 'Bull' or 'Bear'.
-        percentage_change_24h (float): The predicted percentage change to come in the next 24 hours   
+        percentage_change_24h (float): The predicted percentage change to come in the next 24 hours
                                         to identify overbought or oversold conditions.
         leverage (int): The leverage to be used in the trade.
         stoploss (float): The stoploss price to limit potential losses.
@@ -115,23 +393,11 @@ async def overbought_oversold_strategy(
     """
     try:
         # Determine the trade side based on market direction and trading type
-        if trading_type == "Long":
-            # If market is bullish and there's a significant predicted percentage change to come (overbought condition)
-            if market_direction == "Bull" and percentage_change_24h > 5:
-                side = "BUY"  # Enter a Long position (BUY) to capitalize on the comming market growth
-            else:
-                print("Long trade conditions not met. No trade executed.")
-                return
-
-        elif trading_type == "Short":
-            # If market is bearish and there's a significant predicted percentage change to come (oversold condition)
-            if market_direction == "Bear" and percentage_change_24h < -5:
-                side = "SELL"  # Enter a Short position (SELL) to capitalize on the comming market depression
-            else:
-                print("Short trade conditions not met. No trade executed.")
-                return
-        else:
-            print("Invalid trading type. Trade not executed.")
+        side = overbought_oversold_side(
+            trading_type, market_direction, percentage_change_24h
+        )
+        if side is None:
+            logger.info(no_trade_message(trading_type))
             return
 
         # Fetch price stats and place order
@@ -139,15 +405,21 @@ async def overbought_oversold_strategy(
         current_price = float(stats["lastPrice"])
         quantity = 1 / leverage
         response = await Binance_place_order(
-            symbol=trading_pair, side=side, quantity=quantity
+            symbol=trading_pair,
+            side=side,
+            quantity=quantity,
+            strategy="overbought_oversold",
         )
         orderId = response["orderId"]
-        print(f"Reversal trade executed: {response}")
+        logger.info(
+            "Reversal trade executed.",
+            extra={"symbol": trading_pair, "side": side, "response": response},
+        )
 
         # Monitor exit conditions using WebSocket
         await listen_to_websocket(
             trading_pair, side, current_price, stoploss, orderId, quantity
         )
 
-    except Exception as e:
-        print(f"Error in overbought_oversold strategy: {e}")
+    except Exception:
+        logger.exception("Error in overbought_oversold strategy")
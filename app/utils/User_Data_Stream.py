@@ -0,0 +1,425 @@
+import asyncio
+import logging
+import time
+from collections import OrderedDict, deque
+import websockets
+from app.utils.JSON_Backend import json_loads
+
+
+logger = logging.getLogger(__name__)
+
+# Order statuses after which an order no longer changes.
+FINAL_ORDER_STATUSES = frozenset(
+    ("FILLED", "CANCELED", "REJECTED", "EXPIRED", "EXPIRED_IN_MATCH")
+)
+
+
+def order_from_execution_report(event: dict) -> dict:
+    """
+    Convert an "executionReport" event into the order format of the REST API
+    (GET /api/v3/order), so locally known orders are drop-in replacements for REST responses.
+    """
+    return {
+        "symbol": event["s"],
+        "orderId": event["i"],
+        "orderListId": event.get("g", -1),
+        # "C" holds the original client order id of a canceled order, "c" the cancel request's id
+        "clientOrderId": event.get("C") or event["c"],
+        "price": event["p"],
+        "origQty": event["q"],
+        "executedQty": event["z"],
+        "cummulativeQuoteQty": event.get("Z", "0"),
+        "status": event["X"],
+        "timeInForce": event["f"],
+        "type": event["o"],
+        "side": event["S"],
+        "stopPrice": event.get("P", "0"),
+        "icebergQty": event.get("F", "0"),
+        "time": event.get("O", event["T"]),
+        "updateTime": event["T"],
+        "isWorking": event.get("w", False),
+        "workingTime": event.get("W", -1),
+        "origQuoteOrderQty": event.get("Q", "0"),
+        "selfTradePreventionMode": event.get("V", "NONE"),
+    }
+
+
+class AccountState:
+    """
+    In-memory orders, fills and balances of the account, kept up to date from the user data stream.
+
+    Open orders are kept until they reach a final status; the last `max_closed_orders`
+    closed orders and the last `max_fills` fills stay available. Orders are stored in the
+    REST API order format. Every update carries the exchange time of the change, and updates
+    older than what is already known are ignored, so a REST snapshot and the events that
+    arrived while it was loading can be applied in any order.
+
+    Args:
+        max_closed_orders (int): The number of closed orders kept.
+        max_fills (int): The number of fills kept.
+        on_order (callable): Optional function called with every order update applied.
+
+    Last Reviewed Date:
+        18 Oct 2026
+    """
+
+    def __init__(
+        self, max_closed_orders: int = 1000, max_fills: int = 1000, on_order=None
+    ):
+        self.max_closed_orders = max_closed_orders
+        self.on_order = on_order
+        self._open: dict = {}
+        self._closed: OrderedDict = OrderedDict()
+        self._client_ids: dict = {}
+        self._fills: deque = deque(maxlen=max_fills)
+        self._balances: dict = {}
+        self._balances_updated_at = 0
+        self._waiters: dict = {}
+        self._events: dict = {}
+
+    ############################################################ Updates
+
+    def load_snapshot(self, account: dict, open_orders: list) -> list:
+        """
+        Load the balances of GET /api/v3/account and the orders of GET /api/v3/openOrders.
+
+        Orders that were open locally but are missing from the snapshot were closed while
+        the stream was down; their final state is unknown, so they are dropped and returned
+        for the caller to re-query and pass to `update_order`.
+        """
+        updated_at = account.get("updateTime", 0)
+        if updated_at >= self._balances_updated_at:
+            self._balances = {
+                balance["asset"]: dict(balance) for balance in account["balances"]
+            }
+            self._balances_updated_at = updated_at
+
+        snapshot_ids = {order["orderId"] for order in open_orders}
+        dropped = []
+        for order_id in [i for i in self._open if i not in snapshot_ids]:
+            order = self._open.pop(order_id)
+            self._client_ids.pop(order["clientOrderId"], None)
+            dropped.append(order)
+        for order in open_orders:
+            self._store_order(dict(order))
+        return dropped
+
+    def update_order(self, order: dict):
+        """
+        Apply an order of GET /api/v3/order, e.g. the final state of a dropped order.
+        """
+        self._store_order(dict(order))
+
+    def apply(self, event: dict):
+        """
+        Apply one user data stream event.
+        """
+        event_type = event.get("e")
+        self._events[event_type] = self._events.get(event_type, 0) + 1
+        if event_type == "executionReport":
+            self._apply_execution_report(event)
+        elif event_type == "outboundAccountPosition":
+            if event["u"] >= self._balances_updated_at:
+                for balance in event["B"]:
+                    self._balances[balance["a"]] = {
+                        "asset": balance["a"],
+                        "free": balance["f"],
+                        "locked": balance["l"],
+                    }
+                self._balances_updated_at = event["u"]
+        # "balanceUpdate" (deposits, withdrawals, transfers) is always followed by an
+        # "outboundAccountPosition" with the new balances, so it is only counted.
+
+    def _apply_execution_report(self, event: dict):
+        order = order_from_execution_report(event)
+        if event["x"] == "TRADE":
+            self._fills.append(
+                {
+                    "symbol": event["s"],
+                    "orderId": event["i"],
+                    "tradeId": event["t"],
+                    "side": event["S"],
+                    "price": event["L"],
+                    "qty": event["l"],
+                    "quoteQty": event.get("Y"),
+                    "commission": event["n"],
+                    "commissionAsset": event["N"],
+                    "isMaker": event["m"],
+                    "time": event["T"],
+                }
+            )
+        self._store_order(order)
+
+    def _store_order(self, order: dict):
+        order_id = order["orderId"]
+        known = self._open.get(order_id) or self._closed.get(order_id)
+        if known is not None and known["updateTime"] > order["updateTime"]:
+            return
+
+        self._client_ids[order["clientOrderId"]] = order_id
+        if self.on_order is not None:
+            self.on_order(order)
+        if order["status"] in FINAL_ORDER_STATUSES:
+            self._open.pop(order_id, None)
+            self._closed[order_id] = order
+            self._closed.move_to_end(order_id)
+            while len(self._closed) > self.max_closed_orders:
+                _, evicted = self._closed.popitem(last=False)
+                self._client_ids.pop(evicted["clientOrderId"], None)
+            for waiter in self._waiters.pop(order_id, ()):
+                if not waiter.done():
+                    waiter.set_result(order)
+        else:
+            self._open[order_id] = order
+
+    ############################################################ Reads
+
+    def order(self, order_id: int = None, client_order_id: str = None):
+        """
+        Return a locally known order by its id or client order id, or None.
+        """
+        if order_id is None:
+            order_id = self._client_ids.get(client_order_id)
+        return self._open.get(order_id) or self._closed.get(order_id)
+
+    def open_orders(self, symbol: str = None) -> list:
+        """
+        Return the open orders, optionally of one symbol only.
+        """
+        return [
+            order
+            for order in self._open.values()
+            if symbol is None or order["symbol"] == symbol
+        ]
+
+    def fills(self, symbol: str = None, order_id: int = None) -> list:
+        """
+        Return the recent fills, oldest first, optionally of one symbol or order only.
+        """
+        return [
+            fill
+            for fill in self._fills
+            if (symbol is None or fill["symbol"] == symbol)
+            and (order_id is None or fill["orderId"] == order_id)
+        ]
+
+    def balance(self, asset: str):
+        """
+        Return the balance of an asset as {"asset", "free", "locked"}, or None.
+        """
+        return self._balances.get(asset)
+
+    def balances(self) -> list:
+        """
+        Return the balances with a non-zero free or locked amount.
+        """
+        return [
+            balance
+            for balance in self._balances.values()
+            if float(balance["free"]) or float(balance["locked"])
+        ]
+
+    async def wait_for_order(self, order_id: int, timeout: float) -> dict:
+        """
+        Wait until an order reaches a final status (e.g. FILLED or CANCELED).
+
+        Returns:
+            dict: The order in the REST API order format.
+
+        Raises:
+            asyncio.TimeoutError: If the order is not final within `timeout` seconds.
+        """
+        order = self.order(order_id)
+        if order is not None and order["status"] in FINAL_ORDER_STATUSES:
+            return order
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.setdefault(order_id, []).append(waiter)
+        try:
+            return await asyncio.wait_for(waiter, timeout)
+        finally:
+            waiters = self._waiters.get(order_id)
+            if waiters is not None and waiter in waiters:
+                waiters.remove(waiter)
+                if not waiters:
+                    del self._waiters[order_id]
+
+    def stats(self) -> dict:
+        return {
+            "open_orders": len(self._open),
+            "closed_orders": len(self._closed),
+            "fills": len(self._fills),
+            "balances": len(self.balances()),
+            "balances_updated_at": self._balances_updated_at,
+            "events": dict(self._events),
+        }
+
+
+class BinanceUserDataStream:
+    """
+    Managed Binance user data stream feeding an `AccountState`.
+
+    The service obtains a listenKey, connects to "<url>/<listenKey>", loads the balances
+    and open orders once from REST, and from then on applies every "executionReport",
+    "outboundAccountPosition" and "balanceUpdate" event, so orders, fills and balances are
+    read locally. The listenKey is renewed every `keepalive_interval` seconds (Binance
+    expires it after 60 minutes without a keepalive). If the connection drops or the key
+    expires, the service reconnects with exponential backoff under a new listenKey and
+    reloads the snapshot, since events may have been missed in between.
+
+    `synced` is True while the state is complete: connected and loaded. Readers fall back
+    to REST while it is False.
+
+    Args:
+        url (str): The user data stream endpoint without the listenKey
+            (e.g., "wss://testnet.binance.vision/ws").
+        create_listen_key (callable): A coroutine function that returns {"listenKey": ...}.
+        keepalive_listen_key (callable): A coroutine function that renews a listenKey.
+        fetch_account (callable): A coroutine function that returns GET /api/v3/account.
+        fetch_open_orders (callable): A coroutine function that returns GET /api/v3/openOrders.
+        state (AccountState): The state to update.
+        fetch_order (callable): Optional coroutine function called with (symbol, orderId)
+            that returns GET /api/v3/order; re-queries the orders closed while disconnected.
+        keepalive_interval (float): The number of seconds between listenKey renewals.
+        reconnect_delay (float): The initial delay in seconds before reconnecting.
+        max_reconnect_delay (float): The maximum delay in seconds before reconnecting.
+
+    Last Reviewed Date:
+        18 Oct 2026
+    """
+
+    def __init__(
+        self,
+        url: str,
+        create_listen_key,
+        keepalive_listen_key,
+        fetch_account,
+        fetch_open_orders,
+        state: AccountState,
+        keepalive_interval: float = 1800.0,
+        reconnect_delay: float = 1.0,
+        max_reconnect_delay: float = 30.0,
+        fetch_order=None,
+    ):
+        self.url = url.rstrip("/")
+        self.create_listen_key = create_listen_key
+        self.keepalive_listen_key = keepalive_listen_key
+        self.fetch_account = fetch_account
+        self.fetch_open_orders = fetch_open_orders
+        self.state = state
+        self.fetch_order = fetch_order
+        self.keepalive_interval = keepalive_interval
+        self.reconnect_delay = reconnect_delay
+        self.max_reconnect_delay = max_reconnect_delay
+        self.synced = False
+        self._task: asyncio.Task = None
+        self._connected_at: float = None
+        self._synced_at: float = None
+        self._reconnects = 0
+        self._keepalives = 0
+        self._keepalive_errors = 0
+
+    def start(self):
+        """
+        Start the stream in the background. Called from the FastAPI lifespan on startup.
+        """
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+
+    async def _keepalive(self, listen_key: str):
+        while True:
+            await asyncio.sleep(self.keepalive_interval)
+            try:
+                await self.keepalive_listen_key(listen_key)
+                self._keepalives += 1
+            except Exception as e:
+                # The key stays valid for 60 minutes, so the next renewal can still save it.
+                self._keepalive_errors += 1
+                logger.warning("Error renewing the Binance listenKey: %s", e)
+
+    async def _resolve_order(self, order: dict):
+        # The final state of an order closed while disconnected; the listeners of the state
+        # (e.g. the order store) would otherwise keep it open.
+        try:
+            self.state.update_order(
+                await self.fetch_order(order["symbol"], order["orderId"])
+            )
+        except Exception as e:
+            logger.warning(
+                "Error re-querying Binance order %s: %s", order["orderId"], e
+            )
+
+    async def _run(self):
+        delay = self.reconnect_delay
+        while True:
+            keepalive_task = None
+            try:
+                listen_key = (await self.create_listen_key())["listenKey"]
+                async with websockets.connect(f"{self.url}/{listen_key}") as ws:
+                    self._connected_at = time.time()
+                    keepalive_task = asyncio.create_task(self._keepalive(listen_key))
+                    # Events received while the snapshot loads wait in the connection and
+                    # are applied after it; the state ignores those older than the snapshot.
+                    account, open_orders = await asyncio.gather(
+                        self.fetch_account(), self.fetch_open_orders()
+                    )
+                    dropped = self.state.load_snapshot(account, open_orders)
+                    if dropped and self.fetch_order is not None:
+                        await asyncio.gather(*map(self._resolve_order, dropped))
+                    self.synced = True
+                    self._synced_at = time.time()
+                    delay = self.reconnect_delay
+                    logger.info("Binance user data stream synced.")
+                    async for message in ws:
+                        event = json_loads(message)
+                        if event.get("e") == "listenKeyExpired":
+                            logger.warning("The Binance listenKey expired; reconnecting.")
+                            break
+                        self.state.apply(event)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning("Binance user data stream error: %s", e)
+            finally:
+                self.synced = False
+                self._connected_at = None
+                if keepalive_task is not None:
+                    keepalive_task.cancel()
+
+            self._reconnects += 1
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, self.max_reconnect_delay)
+
+    async def close(self):
+        """
+        Stop the stream. Called from the FastAPI lifespan on shutdown.
+
+        The listenKey is not deleted: other worker processes using the same API key share
+        it, and Binance expires it 60 minutes after its last keepalive.
+        """
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except (asyncio.CancelledError, Exception):
+                pass
+        self._task = None
+
+    def stats(self) -> dict:
+        """
+        Return stream statistics.
+
+        Returns:
+            dict: The connection and sync state, the number of reconnects and listenKey
+            renewals, and the size of the account state with the events received per type.
+        """
+        return {
+            "url": self.url,
+            "connected": self._connected_at is not None,
+            "connected_at": self._connected_at,
+            "synced": self.synced,
+            "synced_at": self._synced_at,
+            "reconnects": self._reconnects,
+            "keepalives": self._keepalives,
+            "keepalive_errors": self._keepalive_errors,
+            "state": self.state.stats(),
+        }
@@ -0,0 +1,237 @@
+import asyncio
+import contextvars
+import itertools
+import logging
+import time
+from collections import OrderedDict
+
+
+logger = logging.getLogger(__name__)
+
+
+class QueueFull(Exception):
+    """
+    Raised by `WorkQueue.submit` when the queue holds `maxsize` items.
+    """
+
+
+class WorkQueue:
+    """
+    Bounded priority queue consumed by a fixed pool of worker tasks.
+
+    Producers (e.g. the webhook) submit items and return immediately; the workers call the
+    handler for one item at a time, lowest priority value first and in submission order
+    within a priority. When the queue is full `submit` raises `QueueFull`, so the producer
+    can push back (e.g. answer 503 so the sender retries later) instead of buffering
+    without limit.
+
+    The handler runs in a copy of the submitter's context, so context variables set by the
+    producer (e.g. the correlation id and trace start of a webhook) are seen by the handler.
+
+    Items are submitted with an idempotency key. A key seen within the last `dedupe_ttl`
+    seconds is not queued again, so redelivered items are handled once. With several worker
+    processes, `claim` extends this to the keys submitted to the other processes.
+
+    Args:
+        name (str): A label for the queue, used in log messages and statistics.
+        handler (callable): A coroutine function called with each item.
+        maxsize (int): The maximum number of queued items.
+        workers (int): The number of worker tasks.
+        dedupe_ttl (float): The number of seconds an idempotency key is remembered.
+        max_keys (int): The maximum number of remembered idempotency keys.
+        claim (callable): Optional coroutine function called as `claim(key, dedupe_ttl)` for a
+            new key; it returns False if the key was already claimed elsewhere (e.g.
+            `SharedState.claim_key` through `SharedState.run`).
+        metrics (MetricsRegistry): Optional registry that receives the queue wait of every item
+            and, at scrape time, the queue depth and item counts.
+
+    Last Reviewed Date:
+        18 Oct 2026
+    """
+
+    def __init__(
+        self,
+        name: str,
+        handler,
+        maxsize: int = 1000,
+        workers: int = 4,
+        dedupe_ttl: float = 86400.0,
+        max_keys: int = 100000,
+        claim=None,
+        metrics=None,
+    ):
+        self.name = name
+        self.handler = handler
+        self.maxsize = maxsize
+        self.workers = workers
+        self.dedupe_ttl = dedupe_ttl
+        self.max_keys = max_keys
+        self.claim = claim
+        self._queue: asyncio.PriorityQueue = None
+        self._tasks: list = []
+        self._order = itertools.count()
+        self._keys: OrderedDict = OrderedDict()
+        self._busy = 0
+        self._submitted = 0
+        self._duplicates = 0
+        self._rejected = 0
+        self._processed = 0
+        self._failed = 0
+        self._max_depth = 0
+        self._total_wait = 0.0
+        self._max_wait = 0.0
+        self._wait = None
+        if metrics is not None:
+            self._register(metrics)
+
+    def _seen(self, key) -> bool:
+        now = time.monotonic()
+        while self._keys:
+            oldest, expires_at = next(iter(self._keys.items()))
+            if expires_at > now and len(self._keys) <= self.max_keys:
+                break
+            del self._keys[oldest]
+        return key in self._keys
+
+    async def submit(self, item, key, priority: float = 0) -> bool:
+        """
+        Queue an item without waiting for the handler. Only the `claim` of a new key is awaited.
+
+        Args:
+            item: The item to pass to the handler.
+            key: The idempotency key of the item.
+            priority (float): Items with a lower value are handled first.
+
+        Returns:
+            bool: True if the item was queued, False if the key was already submitted or claimed.
+
+        Raises:
+            QueueFull: If the queue holds `maxsize` items.
+        """
+        self.start()
+        if self._seen(key):
+            self._duplicates += 1
+            return False
+        if self._queue.qsize() >= self.maxsize:
+            self._rejected += 1
+            raise QueueFull(f"The {self.name} queue is full ({self.maxsize} items)")
+        # Remembered before the claim is awaited, so a concurrent submission of the key is a duplicate.
+        self._keys[key] = time.monotonic() + self.dedupe_ttl
+        if self.claim is not None:
+            try:
+                claimed = await self.claim(key, self.dedupe_ttl)
+            except BaseException:
+                self._keys.pop(key, None)
+                raise
+            if not claimed:
+                self._duplicates += 1
+                return False
+        self._queue.put_nowait(
+            (
+                priority,
+                next(self._order),
+                time.monotonic(),
+                contextvars.copy_context(),
+                item,
+            )
+        )
+        self._submitted += 1
+        self._max_depth = max(self._max_depth, self._queue.qsize())
+        return True
+
+    async def _work(self):
+        while True:
+            _, _, queued_at, context, item = await self._queue.get()
+            wait = time.monotonic() - queued_at
+            self._total_wait += wait
+            self._max_wait = max(self._max_wait, wait)
+            if self._wait is not None:
+                self._wait.observe(wait)
+            self._busy += 1
+            try:
+                await asyncio.create_task(self.handler(item), context=context)
+                self._processed += 1
+            except Exception:
+                self._failed += 1
+                logger.exception("Error in the %s queue worker", self.name)
+            finally:
+                self._busy -= 1
+                self._queue.task_done()
+
+    def _register(self, metrics):
+        self._wait = metrics.histogram(
+            f"{self.name}_queue_wait_seconds",
+            f"Seconds items waited in the {self.name} queue before a worker picked them up.",
+        )
+        metrics.gauge(
+            f"{self.name}_queue_depth",
+            f"Items waiting in the {self.name} queue.",
+            collect=lambda: self._queue.qsize() if self._queue is not None else 0,
+        )
+        metrics.counter(
+            f"{self.name}_queue_items_total",
+            f"Items offered to the {self.name} queue, by outcome.",
+            ("outcome",),
+            collect=lambda: {
+                ("submitted",): self._submitted,
+                ("duplicate",): self._duplicates,
+                ("rejected",): self._rejected,
+                ("processed",): self._processed,
+                ("failed",): self._failed,
+            },
+        )
+
+    def start(self):
+        """
+        Start the workers. Called from the FastAPI lifespan on startup, or on the first submit.
+        """
+        if self._queue is None:
+            self._queue = asyncio.PriorityQueue()
+        self._tasks = [task for task in self._tasks if not task.done()]
+        while len(self._tasks) < self.workers:
+            self._tasks.append(asyncio.create_task(self._work()))
+
+    async def close(self, timeout: float = 10.0):
+        """
+        Wait up to `timeout` seconds for the queued items, then stop the workers.
+        Called from the FastAPI lifespan on shutdown.
+        """
+        if self._queue is not None and self._tasks:
+            try:
+                await asyncio.wait_for(self._queue.join(), timeout)
+            except asyncio.TimeoutError:
+                logger.warning(
+                    "The %s queue was stopped with %d items left.",
+                    self.name,
+                    self._queue.qsize(),
+                )
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    def stats(self) -> dict:
+        """
+        Return queue and backpressure statistics.
+
+        Returns:
+            dict: The current depth and busy workers, the item counts (submitted, duplicate,
+            rejected because the queue was full, processed, failed) and the queue wait times.
+        """
+        started = self._processed + self._failed + self._busy
+        return {
+            "name": self.name,
+            "depth": self._queue.qsize() if self._queue is not None else 0,
+            "maxsize": self.maxsize,
+            "max_depth": self._max_depth,
+            "workers": self.workers,
+            "busy_workers": self._busy,
+            "submitted": self._submitted,
+            "duplicates": self._duplicates,
+            "rejected": self._rejected,
+            "processed": self._processed,
+            "failed": self._failed,
+            "avg_wait": round(self._total_wait / started, 6) if started else 0.0,
+            "max_wait": round(self._max_wait, 6),
+            "remembered_keys": len(self._keys),
+        }
@@ -0,0 +1,85 @@
+"""
+Backtest run time on a year of 1-minute candles across many pairs.
+
+Random-walk candles are generated for every pair together with random MarketRaker
+indicators in the README format, and the `Backtester` simulates both strategies on
+them. Candle generation is not included in the timing.
+
+Run from the repository root:
+    python -m benchmarks.backtest_benchmark --pairs 36 --days 365 --indicators 200
+"""
+
+import argparse
+import time
+import numpy as np
+
+from app.schemas.MarketRaker_Schema import Indicator
+from app.utils.Backtester import Backtester, Klines
+
+MINUTE_MS = 60_000
+START_MS = 1_704_067_200_000  # 1 Jan 2024
+
+
+def random_klines(rng: np.random.Generator, minutes: int) -> Klines:
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.0008, minutes)))
+    open = np.concatenate(([100.0], close[:-1]))
+    spread = np.abs(rng.normal(0, 0.0004, minutes)) * close
+    high = np.maximum(open, close) + spread
+    low = np.minimum(open, close) - spread
+    open_time = START_MS + np.arange(minutes, dtype=np.int64) * MINUTE_MS
+    return Klines(open_time, open, high, low, close)
+
+
+def random_indicators(
+    rng: np.random.Generator, pair: str, klines: Klines, count: int
+) -> list:
+    indicators = []
+    for index in rng.integers(0, len(klines) - 1, count):
+        price = float(klines.open[index])
+        bull = bool(rng.random() < 0.5)
+        indicators.append(
+            Indicator(
+                trading_type="Long" if bull else "Short",
+                leverage=1,
+                buy_price=price * (1.001 if bull else 0.999),
+                buy_date=int(klines.open_time[index] // 1000),
+                market_direction="Bull" if bull else "Bear",
+                percentage_change=float(rng.uniform(1, 8)) * (1 if bull else -1),
+                percentage_change_24h=float(rng.uniform(2, 10)) * (1 if bull else -1),
+                stoploss=price * (0.98 if bull else 1.02),
+                trading_pair=pair,
+            )
+        )
+    return indicators
+
+
+def main(pairs: int, days: int, indicators_per_pair: int):
+    rng = np.random.default_rng(7)
+    klines, indicators = {}, []
+    for number in range(pairs):
+        pair = f"C{number:02d}/USD"
+        klines[f"C{number:02d}USDT"] = random_klines(rng, days * 24 * 60)
+        indicators += random_indicators(
+            rng, pair, klines[f"C{number:02d}USDT"], indicators_per_pair
+        )
+
+    start = time.perf_counter()
+    result = Backtester(klines).run(indicators)
+    elapsed = time.perf_counter() - start
+
+    candles = pairs * days * 24 * 60
+    print(
+        f"{pairs} pairs x {days} days of 1m candles ({candles:,} candles), "
+        f"{len(indicators)} indicators"
+    )
+    print(f"{len(result)} trades simulated in {elapsed:.2f} s")
+    print(result.summary())
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--pairs", type=int, default=36)
+    parser.add_argument("--days", type=int, default=365)
+    parser.add_argument("--indicators", type=int, default=200)
+    args = parser.parse_args()
+    main(args.pairs, args.days, args.indicators)
@@ -0,0 +1,170 @@
+"""
+Time to place and cancel a burst of orders, one call at a time and with the batch APIs.
+
+The bot runs against the local exchange simulator with a fixed simulated network latency:
+
+- Binance: `Binance_place_order` called once per order, then `Binance_place_orders`,
+  which sends the orders concurrently within the rate limits.
+- Bybit: `place_order_f` called once per order, then `place_batch_order_f`, which sends
+  one `/v5/order/create-batch` call per 20 linear orders.
+- Bybit cancels: `cancel_order_f` once per order, `cancel_batch_order_f`, and
+  `cancel_all_orders_f` for the symbol.
+
+Run from the repository root:
+    python -m benchmarks.batch_order_benchmark --orders 40 --latency 0.05
+"""
+
+import argparse
+import asyncio
+import tempfile
+import time
+
+from benchmarks.end_to_end_benchmark import (
+    BINANCE_KEY,
+    BINANCE_SECRET,
+    BYBIT_KEY,
+    BYBIT_SECRET,
+    configure_bot,
+)
+from benchmarks.exchange_simulator import ExchangeSimulator
+
+
+async def timed(results: dict, name: str, calls) -> list:
+    start = time.perf_counter()
+    outcome = await calls
+    results[name] = time.perf_counter() - start
+    return outcome
+
+
+async def sequential(calls) -> list:
+    return [await call() for call in calls]
+
+
+async def main(orders: int, latency: float):
+    simulator = ExchangeSimulator(
+        BINANCE_KEY, BINANCE_SECRET, BYBIT_KEY, BYBIT_SECRET, latency=latency
+    )
+    await simulator.start()
+    configure_bot(
+        {
+            "binance_url": simulator.binance_url,
+            "binance_stream_url": simulator.binance_stream_url,
+            "bybit_url": simulator.bybit_url,
+        },
+        "",
+        tempfile.mkdtemp(),
+    )
+    # Imported once the environment points at the simulator.
+    from app.crud.Binance_CRUD import (
+        Binance_place_order,
+        Binance_place_orders,
+        binance_http,
+        trade_journal,
+    )
+    from app.crud.ByBit_CRUD import (
+        bybit_executor,
+        cancel_all_orders_f,
+        cancel_batch_order_f,
+        cancel_order_f,
+        place_batch_order_f,
+        place_order_f,
+    )
+    from app.schemas.Binance_Schema import OrderRequest
+    from app.schemas.Bybit_Schema import (
+        BatchCancelOrderRequest,
+        BatchPlaceOrderRequest,
+        CancelAllOrders,
+        CancelOrder,
+        PlaceOrderRequest,
+    )
+
+    trade_journal.open()
+    binance_orders = [
+        OrderRequest(symbol="BTCUSDT", side="BUY", quantity=0.001)
+        for _ in range(orders)
+    ]
+    bybit_orders = [
+        PlaceOrderRequest(
+            category="linear", symbol="BTCUSDT", side="Buy", orderType="Market", qty="0.001"
+        )
+        for _ in range(orders)
+    ]
+    results = {}
+
+    await timed(
+        results,
+        "binance place, one at a time",
+        sequential(
+            lambda order=order: Binance_place_order(
+                order.symbol, order.side, order.quantity
+            )
+            for order in binance_orders
+        ),
+    )
+    await timed(results, "binance place, batch", Binance_place_orders(binance_orders))
+
+    placed = await timed(
+        results,
+        "bybit place, one at a time",
+        sequential(lambda order=order: place_order_f(order) for order in bybit_orders),
+    )
+    await timed(
+        results,
+        "bybit cancel, one at a time",
+        sequential(
+            lambda response=response: cancel_order_f(
+                CancelOrder(
+                    category="linear",
+                    symbol="BTCUSDT",
+                    orderId=response["result"]["orderId"],
+                )
+            )
+            for response in placed
+        ),
+    )
+    placed = await timed(
+        results,
+        "bybit place, batch",
+        place_batch_order_f(BatchPlaceOrderRequest(orders=bybit_orders)),
+    )
+    await timed(
+        results,
+        "bybit cancel, batch",
+        cancel_batch_order_f(
+            BatchCancelOrderRequest(
+                orders=[
+                    CancelOrder(
+                        category="linear",
+                        symbol="BTCUSDT",
+                        orderId=result["result"]["orderId"],
+                    )
+                    for result in placed
+                ]
+            )
+        ),
+    )
+    await place_batch_order_f(BatchPlaceOrderRequest(orders=bybit_orders))
+    await timed(
+        results,
+        "bybit cancel all",
+        cancel_all_orders_f(CancelAllOrders(category="linear", symbol="BTCUSDT")),
+    )
+
+    await binance_http.close()
+    bybit_executor.shutdown(wait=True)
+    trade_journal.close()
+    await simulator.stop()
+
+    print(f"{orders} orders, {latency * 1000:.0f} ms simulated latency")
+    for name, seconds in results.items():
+        print(f"{name:>30}: {seconds * 1000:8.1f} ms")
+    if simulator.rejected:
+        print(f"{'rejected':>30}: {simulator.rejected}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--orders", type=int, default=40)
+    parser.add_argument("--latency", type=float, default=0.05)
+    args = parser.parse_args()
+    asyncio.run(main(args.orders, args.latency))
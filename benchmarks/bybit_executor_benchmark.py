@@ -0,0 +1,91 @@
+"""
+Concurrent throughput of blocking Bybit SDK calls, before and after the bounded executor.
+
+The pybit HTTP session is synchronous. This benchmark replaces it with a stand-in that
+blocks for a fixed simulated network latency and fires a burst of concurrent calls:
+
+- "direct" calls the blocking function inside the coroutine (the previous behaviour of
+  the `*_f` functions in ByBit_CRUD), which serialises every call on the event loop.
+- "executor" awaits the same function through `BoundedExecutor.run`, as ByBit_CRUD does now.
+
+While the burst runs, a heartbeat coroutine measures how long the event loop is stalled,
+which is the delay every other coroutine (e.g. Binance webhooks) would see.
+
+Run from the repository root:
+    python -m benchmarks.bybit_executor_benchmark --calls 64 --latency 0.05
+"""
+
+import argparse
+import asyncio
+import time
+
+from app.utils.Blocking_Executor import BoundedExecutor
+
+
+def blocking_call(latency: float):
+    time.sleep(latency)
+    return {"retCode": 0}
+
+
+async def heartbeat(stop: asyncio.Event, interval: float = 0.005) -> float:
+    max_stall = 0.0
+    while not stop.is_set():
+        start = time.perf_counter()
+        await asyncio.sleep(interval)
+        max_stall = max(max_stall, time.perf_counter() - start - interval)
+    return max_stall
+
+
+async def run_direct(calls: int, latency: float):
+    async def call():
+        return blocking_call(latency)
+
+    await asyncio.gather(*[call() for _ in range(calls)])
+
+
+async def run_executor(calls: int, latency: float, executor: BoundedExecutor):
+    await asyncio.gather(*[executor.run(blocking_call, latency) for _ in range(calls)])
+
+
+async def measure(name: str, burst) -> dict:
+    stop = asyncio.Event()
+    monitor = asyncio.create_task(heartbeat(stop))
+    await asyncio.sleep(0)
+    start = time.perf_counter()
+    await burst
+    elapsed = time.perf_counter() - start
+    stop.set()
+    max_stall = await monitor
+    return {"mode": name, "seconds": elapsed, "max_loop_stall": max_stall}
+
+
+async def main(calls: int, latency: float, workers: int, per_call_limit: int):
+    executor = BoundedExecutor(
+        "bybit", max_workers=workers, per_call_limit=per_call_limit
+    )
+    results = [
+        await measure("direct", run_direct(calls, latency)),
+        await measure("executor", run_executor(calls, latency, executor)),
+    ]
+    executor.shutdown(wait=True)
+
+    print(
+        f"{calls} calls, {latency * 1000:.0f} ms simulated latency, "
+        f"{workers} workers, per-call limit {per_call_limit}"
+    )
+    for result in results:
+        print(
+            f"{result['mode']:>9}: {result['seconds']:.3f} s total, "
+            f"{calls / result['seconds']:.1f} calls/s, "
+            f"max event loop stall {result['max_loop_stall'] * 1000:.1f} ms"
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--calls", type=int, default=64)
+    parser.add_argument("--latency", type=float, default=0.05)
+    parser.add_argument("--workers", type=int, default=8)
+    parser.add_argument("--per-call-limit", type=int, default=8)
+    args = parser.parse_args()
+    asyncio.run(main(args.calls, args.latency, args.workers, args.per_call_limit))
@@ -0,0 +1,497 @@
+"""
+End-to-end throughput and latency of the bot against a local exchange simulator.
+
+The bot (app.main:app) is served by uvicorn in this process, configured against the fake
+Binance REST, Binance websocket and Bybit REST servers of `exchange_simulator`, with
+throwaway API keys and a throwaway MarketRaker verification key. It never talks to a
+real exchange. A second process runs the simulator and fires signed indicator webhooks
+at a fixed rate (open loop, so a slow bot does not slow down the load). Every indicator
+has its own trading pair, so each order can be matched to the webhook that caused it.
+
+For every indicator the bot runs the momentum strategy (price ticker, Binance market
+order, exit engine) and places a Bybit market order, the code paths of Binance_CRUD,
+ByBit_CRUD and TradingBot. Once the exit engine subscribes to the trades of a position,
+the simulator publishes a trade above its target. Background trades below the targets
+are published on every subscribed stream at `--tick-rate`.
+
+Reported:
+- webhook throughput and response latency (202 Accepted, or 503 when the queue is full);
+- indicator-to-order latency: from sending the webhook until the simulator receives the
+  Binance and the Bybit order;
+- exit-trigger latency: from publishing the trade that crosses the target until the
+  simulator receives the closing order;
+- user data stream events sent by the simulator and applied to the bot's account state;
+- memory growth of the bot process over the run (RSS; with --tracemalloc, the Python
+  allocations that grew most).
+
+Latencies are measured by the simulator and include its own overhead, so compare runs
+made on the same machine. Use --json to save the results for comparison.
+
+Run from the repository root:
+    python -m benchmarks.end_to_end_benchmark --rate 100 --duration 10
+"""
+
+import argparse
+import asyncio
+import base64
+import json
+import multiprocessing
+import os
+import tempfile
+import time
+import tracemalloc
+
+import httpx
+import uvicorn
+from cryptography.hazmat.primitives import hashes, serialization
+
+from app.utils.Signature_Verifier import PSS_PADDING
+from benchmarks.exchange_simulator import ExchangeSimulator, bound_port
+from benchmarks.signature_benchmark import generate_key_pair
+
+BINANCE_KEY = "benchmark-binance-key"
+BINANCE_SECRET = "benchmark-binance-secret"
+BYBIT_KEY = "benchmark-bybit-key"
+BYBIT_SECRET = "benchmark-bybit-secret"
+
+# Every indicator is a long momentum trade at BUY_PRICE; the simulator quotes PRICE, just
+# below it, so the entry is allowed. The exit engine targets +3% from the entry.
+BUY_PRICE = 100.0
+PRICE = 99.0
+STOPLOSS = 95.0
+EXIT_PRICE = 105.0
+
+
+def percentiles(samples: list) -> dict:
+    if not samples:
+        return {"count": 0}
+    ordered = sorted(samples)
+
+    def rank(q: float) -> float:
+        return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+    return {
+        "count": len(ordered),
+        "p50": rank(0.5),
+        "p99": rank(0.99),
+        "max": ordered[-1],
+    }
+
+
+def rss_bytes() -> int:
+    try:
+        with open("/proc/self/statm") as statm:
+            return int(statm.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except OSError:
+        # Outside Linux, fall back to the peak resident size.
+        import resource
+
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak if os.uname().sysname == "Darwin" else peak * 1024
+
+
+def indicator_webhook(number: int, private_key) -> tuple:
+    symbol = f"SIM{number}USDT"
+    indicator = {
+        "trading_type": "Long",
+        "leverage": 1,
+        "buy_price": BUY_PRICE,
+        "sell_price": BUY_PRICE * 1.05,
+        "market_direction": "Bull",
+        "percentage_change": 5.0,
+        "stoploss": STOPLOSS,
+        "trading_pair": f"SIM{number}/USD",
+    }
+    body = json.dumps({"type": "indicator", "data": json.dumps(indicator)}).encode()
+    signature = base64.b64encode(
+        private_key.sign(body, PSS_PADDING, hashes.SHA256())
+    ).decode()
+    return symbol, body, signature
+
+
+############################################################ Simulator process
+
+
+async def drive(conn, options: dict, private_pem: bytes):
+    simulator = ExchangeSimulator(
+        BINANCE_KEY,
+        BINANCE_SECRET,
+        BYBIT_KEY,
+        BYBIT_SECRET,
+        price=PRICE,
+        latency=options["latency"],
+    )
+    await simulator.start()
+
+    # Signing costs about a millisecond, so every webhook is signed before the run.
+    private_key = serialization.load_pem_private_key(private_pem, password=None)
+    count = int(options["rate"] * options["duration"])
+    webhooks = [indicator_webhook(number, private_key) for number in range(count)]
+
+    conn.send(
+        {
+            "binance_url": simulator.binance_url,
+            "binance_stream_url": simulator.binance_stream_url,
+            "bybit_url": simulator.bybit_url,
+        }
+    )
+    bot_url = await asyncio.to_thread(conn.recv)
+
+    sent_at: dict = {}
+    trade_sent_at: dict = {}
+    order_latency = {"binance": [], "bybit": []}
+    exit_latency: list = []
+    responses: dict = {}
+    response_latency: list = []
+    exit_tasks: set = set()
+
+    async def trigger_exit(symbol: str):
+        # The exit engine subscribes to the trades of the symbol after the entry order.
+        if await simulator.wait_subscribed(f"{symbol.lower()}@trade", timeout=10):
+            trade_sent_at[symbol] = time.perf_counter()
+            await simulator.publish_trade(symbol, EXIT_PRICE)
+
+    def on_order(exchange: str, symbol: str, side: str, received_at: float):
+        if side.upper() == "SELL":
+            started = trade_sent_at.pop(symbol, None)
+            if started is not None:
+                exit_latency.append(received_at - started)
+            return
+        started = sent_at.get(symbol)
+        if started is not None:
+            order_latency[exchange].append(received_at - started)
+        if exchange == "binance":
+            task = asyncio.create_task(trigger_exit(symbol))
+            exit_tasks.add(task)
+            task.add_done_callback(exit_tasks.discard)
+
+    simulator.on_order(on_order)
+    ticks = None
+    if options["tick_rate"] > 0:
+        ticks = asyncio.create_task(
+            simulator.publish_trades(options["tick_rate"], STOPLOSS + 1, BUY_PRICE + 2)
+        )
+
+    async def send(client: httpx.AsyncClient, symbol: str, body: bytes, signature: str):
+        start = sent_at[symbol] = time.perf_counter()
+        try:
+            response = await client.post(
+                bot_url + "/marketraker/notification",
+                content=body,
+                headers={"x-signature": signature, "content-type": "application/json"},
+            )
+            status = response.status_code
+        except httpx.HTTPError as e:
+            status = type(e).__name__
+        response_latency.append(time.perf_counter() - start)
+        responses[status] = responses.get(status, 0) + 1
+
+    limits = httpx.Limits(max_connections=options["connections"])
+    async with httpx.AsyncClient(limits=limits, timeout=30) as client:
+        started = time.perf_counter()
+        cpu_started = time.process_time()
+        requests = []
+        for number, (symbol, body, signature) in enumerate(webhooks):
+            delay = started + number / options["rate"] - time.perf_counter()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            requests.append(asyncio.create_task(send(client, symbol, body, signature)))
+        await asyncio.gather(*requests)
+        sending = time.perf_counter() - started
+
+    # Wait for the orders and exits of every accepted indicator.
+    accepted = responses.get(202, 0)
+    deadline = time.perf_counter() + options["drain_timeout"]
+    while time.perf_counter() < deadline and (
+        len(order_latency["binance"]) < accepted
+        or len(order_latency["bybit"]) < accepted
+        or len(exit_latency) < accepted
+    ):
+        await asyncio.sleep(0.05)
+    elapsed = time.perf_counter() - started
+
+    if ticks is not None:
+        ticks.cancel()
+    for task in list(exit_tasks):
+        task.cancel()
+    conn.send(
+        {
+            "webhooks": count,
+            "sending_seconds": sending,
+            "elapsed_seconds": elapsed,
+            "simulator_cpu_seconds": time.process_time() - cpu_started,
+            "responses": responses,
+            "webhook_response": percentiles(response_latency),
+            "binance_order": percentiles(order_latency["binance"]),
+            "bybit_order": percentiles(order_latency["bybit"]),
+            "exit": percentiles(exit_latency),
+            "trades_published": simulator.trades_published,
+            "user_data_events": simulator.user_data_events,
+            "rejected_requests": simulator.rejected,
+        }
+    )
+    # Keep serving until the bot has shut down, so its remaining work does not fail.
+    await asyncio.to_thread(conn.recv)
+    await simulator.stop()
+
+
+def simulator_process(conn, options: dict, private_pem: bytes):
+    asyncio.run(drive(conn, options, private_pem))
+
+
+############################################################ Bot process
+
+
+def configure_bot(urls: dict, public_pem: str, directory: str):
+    # The exchange endpoints and keys are always the simulator's, so the bot cannot trade for real.
+    os.environ.update(
+        {
+            "BINANCE_BASE_URL": urls["binance_url"],
+            "BINANCE_STREAM_URL": urls["binance_stream_url"],
+            "BINANCE_API_KEY": BINANCE_KEY,
+            "BINANCE_API_SECRET": BINANCE_SECRET,
+            "BYBIT_BASE_URL": urls["bybit_url"],
+            "BYBIT_API_KEY": BYBIT_KEY,
+            "BYBIT_API_SECRET": BYBIT_SECRET,
+            "PUBLIC_KEY_STR": public_pem,
+            "PREVIOUS_PUBLIC_KEY_STR": "",
+            "PUBLIC_KEY_FILE": "",
+            "MULTI_WORKER": "False",
+            # The simulator has no Bybit private stream.
+            "BYBIT_ORDER_STREAM": "False",
+            "TRADE_JOURNAL_PATH": os.path.join(directory, "trade_journal.db"),
+        }
+    )
+    # The real exchange rate limits would measure the rate limiter instead of the bot; set
+    # them in the environment to benchmark with them.
+    for name in (
+        "BINANCE_WEIGHT_LIMIT",
+        "BINANCE_ORDER_LIMIT_10S",
+        "BYBIT_REQUESTS_PER_5S",
+        "BYBIT_ORDERS_PER_SECOND",
+    ):
+        os.environ.setdefault(name, "1000000")
+    os.environ.setdefault("LOG_LEVEL", "WARNING")
+
+
+def install_strategies():
+    """
+    Run the momentum strategy and a Bybit market order for every queued indicator.
+
+    The shipped `run_indicator_strategies` has its strategies commented out, so the
+    benchmark installs its own handler on the indicator queue.
+    """
+    from app.utils.MarketRaker_Functions import (
+        indicator_queue,
+        momentum_strategy,
+        place_order_f,
+        prepare_binance_trading_pair,
+        PlaceOrderRequest,
+    )
+
+    async def benchmark_strategies(indicator):
+        trading_pair = prepare_binance_trading_pair(indicator.trading_pair)
+        await asyncio.gather(
+            momentum_strategy(
+                trading_pair,
+                indicator.market_direction,
+                indicator.percentage_change,
+                indicator.leverage,
+                indicator.buy_price,
+                indicator.stoploss,
+                indicator.trading_type,
+            ),
+            place_order_f(
+                PlaceOrderRequest(
+                    category="spot",
+                    symbol=trading_pair,
+                    side="Buy",
+                    orderType="Market",
+                    qty=str(1 / indicator.leverage),
+                )
+            ),
+        )
+
+    indicator_queue.handler = benchmark_strategies
+    return indicator_queue
+
+
+async def run_bot(conn, use_tracemalloc: bool) -> dict:
+    from app.main import app
+    from app.crud.Binance_CRUD import binance_user_data_stream, exit_engine
+    from app.utils.MarketRaker_Functions import startup_reconciler
+    from app.utils.Order_Store import order_store
+
+    indicator_queue = install_strategies()
+    server = uvicorn.Server(
+        uvicorn.Config(
+            app, host="127.0.0.1", port=0, log_level="warning", access_log=False
+        )
+    )
+    serving = asyncio.create_task(server.serve())
+    while not server.started:
+        await asyncio.sleep(0.01)
+
+    if use_tracemalloc:
+        tracemalloc.start()
+        snapshot = tracemalloc.take_snapshot()
+    rss_start = peak = rss_bytes()
+    cpu_started = time.process_time()
+    conn.send(f"http://127.0.0.1:{bound_port(server)}")
+
+    results = asyncio.ensure_future(asyncio.to_thread(conn.recv))
+    while not results.done():
+        peak = max(peak, rss_bytes())
+        await asyncio.wait([results], timeout=0.25)
+    cpu = time.process_time() - cpu_started
+    memory = {"rss_start": rss_start, "rss_end": rss_bytes(), "rss_peak": peak}
+    if use_tracemalloc:
+        growth = tracemalloc.take_snapshot().compare_to(snapshot, "lineno")
+        memory["top_growth"] = [str(stat) for stat in growth[:10]]
+        tracemalloc.stop()
+
+    stats = {
+        "cpu_seconds": cpu,
+        "indicator_queue": indicator_queue.stats(),
+        "exit_engine": {
+            key: value
+            for key, value in exit_engine.stats().items()
+            if key in ("open_positions", "ticks", "exits_triggered")
+        },
+        "user_data_stream": binance_user_data_stream.stats(),
+        "order_store": order_store.stats(),
+        "reconciliation": startup_reconciler.stats(),
+    }
+    server.should_exit = True
+    await serving
+    conn.send("stop")
+    return {**results.result(), "memory": memory, "bot": stats}
+
+
+############################################################ Report
+
+
+def milliseconds(summary: dict) -> str:
+    if not summary["count"]:
+        return "no samples"
+    return (
+        f"p50 {summary['p50'] * 1000:.1f} ms, p99 {summary['p99'] * 1000:.1f} ms, "
+        f"max {summary['max'] * 1000:.1f} ms"
+    )
+
+
+def report(results: dict, options: dict):
+    accepted = results["responses"].get(202, 0)
+    memory = results["memory"]
+    megabyte = 1024 * 1024
+    growth = memory["rss_end"] - memory["rss_start"]
+    print(
+        f"{results['webhooks']} webhooks at {options['rate']:.0f}/s, "
+        f"{options['latency'] * 1000:.0f} ms simulated exchange latency, "
+        f"{options['tick_rate']:.0f} background trades/s"
+    )
+    print(
+        f"        webhooks: {accepted} accepted, responses {results['responses']}, "
+        f"{results['webhooks'] / results['sending_seconds']:.1f}/s sent; "
+        f"response {milliseconds(results['webhook_response'])}"
+    )
+    for name, key in (
+        ("binance orders", "binance_order"),
+        ("bybit orders", "bybit_order"),
+    ):
+        print(
+            f"{name:>16}: {results[key]['count']}/{accepted}; "
+            f"indicator-to-order {milliseconds(results[key])}"
+        )
+    print(
+        f"{'exits':>16}: {results['exit']['count']}/{accepted}; "
+        f"exit-trigger {milliseconds(results['exit'])}"
+    )
+    print(
+        f"{'memory':>16}: RSS {memory['rss_start'] / megabyte:.1f} MB -> "
+        f"{memory['rss_end'] / megabyte:.1f} MB (peak {memory['rss_peak'] / megabyte:.1f} MB), "
+        f"{growth / max(accepted, 1) / 1024:.1f} KB per indicator"
+    )
+    print(
+        f"{'cpu':>16}: bot {results['bot']['cpu_seconds']:.1f} s, simulator "
+        f"{results['simulator_cpu_seconds']:.1f} s in {results['elapsed_seconds']:.1f} s"
+    )
+    user_data = results["bot"]["user_data_stream"]
+    print(
+        f"{'user data':>16}: {results['user_data_events']} events sent, "
+        f"{sum(user_data['state']['events'].values())} applied, "
+        f"{user_data['state']['closed_orders']} orders filled, "
+        f"synced {user_data['synced']}"
+    )
+    orders = results["bot"]["order_store"]
+    print(
+        f"{'order store':>16}: {orders['orders']} orders ({orders['open_orders']} open), "
+        f"{orders['open_positions']} open positions, {orders['updates']} updates, "
+        f"{orders['stale_updates']} stale"
+    )
+    reconciliation = results["bot"]["reconciliation"]
+    if reconciliation["ready"]:
+        print(
+            f"{'reconciliation':>16}: ready in {reconciliation['seconds'] * 1000:.1f} ms, "
+            f"{reconciliation['candidates']} candidates, "
+            f"{len(reconciliation['errors'])} failed requests"
+        )
+    if results["rejected_requests"]:
+        print(f"{'rejected':>16}: {results['rejected_requests']}")
+    for line in memory.get("top_growth", []):
+        print(f"                  {line}")
+
+
+def main(options: dict, json_path: str, use_tracemalloc: bool):
+    private_key, public_pem = generate_key_pair()
+    private_pem = private_key.private_bytes(
+        serialization.Encoding.PEM,
+        serialization.PrivateFormat.PKCS8,
+        serialization.NoEncryption(),
+    )
+    context = multiprocessing.get_context("spawn")
+    conn, child_conn = context.Pipe()
+    simulator = context.Process(
+        target=simulator_process, args=(child_conn, options, private_pem), daemon=True
+    )
+    simulator.start()
+    urls = conn.recv()
+
+    with tempfile.TemporaryDirectory() as directory:
+        configure_bot(urls, public_pem, directory)
+        results = asyncio.run(run_bot(conn, use_tracemalloc))
+    simulator.join(timeout=10)
+
+    report(results, options)
+    if json_path:
+        with open(json_path, "w") as output:
+            json.dump({"options": options, **results}, output, indent=2, default=str)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rate", type=float, default=100, help="webhooks per second")
+    parser.add_argument("--duration", type=float, default=10, help="seconds of load")
+    parser.add_argument(
+        "--latency", type=float, default=0.0, help="simulated exchange latency (s)"
+    )
+    parser.add_argument(
+        "--tick-rate", type=float, default=500, help="background trades per second"
+    )
+    parser.add_argument("--connections", type=int, default=64)
+    parser.add_argument("--drain-timeout", type=float, default=30)
+    parser.add_argument("--json", help="write the results to this file")
+    parser.add_argument("--tracemalloc", action="store_true")
+    args = parser.parse_args()
+    main(
+        {
+            "rate": args.rate,
+            "duration": args.duration,
+            "latency": args.latency,
+            "tick_rate": args.tick_rate,
+            "connections": args.connections,
+            "drain_timeout": args.drain_timeout,
+        },
+        args.json,
+        args.tracemalloc,
+    )
@@ -0,0 +1,629 @@
+"""
+A local stand-in for the Binance and Bybit APIs, used by the end-to-end benchmark.
+
+- Binance REST: server time, price ticker, 24hr statistics, market orders, cancels (there
+  is never an open order), all orders, account, open orders and listenKeys.
+- Binance combined market data stream: SUBSCRIBE / UNSUBSCRIBE requests, and trade events
+  published by the caller.
+- Binance user data stream ("/ws/<listenKey>"): an executionReport for the acceptance and
+  the fill of every market order, and an outboundAccountPosition after each fill.
+- Bybit REST: server time, order creation (single and batch), cancels (single, batch and
+  all), open orders and positions (always empty).
+
+Signed requests are checked the way the exchanges check them (HMAC-SHA256 signature over
+the exact bytes sent, timestamp within the receive window), so a regression in request
+signing or in the server clocks shows up as rejected orders instead of going unnoticed.
+Every accepted order is recorded with the time it was received.
+
+The simulator only implements the calls the trading strategies and the exit engine make;
+every price is `price`.
+"""
+
+import asyncio
+import hashlib
+import hmac
+import itertools
+import json
+import random
+import time
+
+import uvicorn
+import websockets
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse
+
+
+def _now_ms() -> int:
+    return int(time.time() * 1000)
+
+
+def _valid_hmac(secret: str, payload: str, signature: str) -> bool:
+    expected = hmac.new(secret.encode(), payload.encode(), hashlib.sha256).hexdigest()
+    return hmac.compare_digest(expected, signature or "")
+
+
+def bound_port(server: uvicorn.Server) -> int:
+    """
+    Return the port a started uvicorn server listens on (it was started with port 0).
+    """
+    return server.servers[0].sockets[0].getsockname()[1]
+
+
+def _timestamp_rejected(timestamp: int, recv_window: int) -> bool:
+    # Binance rejects timestamps more than 1 s ahead, or older than the receive window.
+    now = _now_ms()
+    return timestamp > now + 1000 or now - timestamp > recv_window
+
+
+class ExchangeSimulator:
+    """
+    Fake Binance REST, Binance websocket and Bybit REST servers on local ports.
+
+    Args:
+        binance_key (str): The Binance API key the bot sends.
+        binance_secret (str): The Binance API secret the bot signs with.
+        bybit_key (str): The Bybit API key the bot sends.
+        bybit_secret (str): The Bybit API secret the bot signs with.
+        price (float): The price of every symbol.
+        latency (float): Seconds every REST response is delayed, to simulate the network.
+        host (str): The interface the servers listen on.
+    """
+
+    def __init__(
+        self,
+        binance_key: str,
+        binance_secret: str,
+        bybit_key: str,
+        bybit_secret: str,
+        price: float = 100.0,
+        latency: float = 0.0,
+        host: str = "127.0.0.1",
+    ):
+        self.binance_key = binance_key
+        self.binance_secret = binance_secret
+        self.bybit_key = bybit_key
+        self.bybit_secret = bybit_secret
+        self.price = price
+        self.latency = latency
+        self.host = host
+        self.orders: list = []
+        self.binance_orders: dict = {}
+        self.bybit_open_orders: dict = {}
+        self.rejected: dict = {}
+        self.trades_published = 0
+        self.user_data_events = 0
+        self.binance_url: str = None
+        self.binance_stream_url: str = None
+        self.bybit_url: str = None
+        self._order_ids = itertools.count(1)
+        self._trade_ids = itertools.count(1)
+        self._order_listeners: list = []
+        self._connections: dict = {}
+        self._subscribed: dict = {}
+        self._listen_keys: set = set()
+        self._user_streams: set = set()
+        self._servers: list = []
+        self._ws_server = None
+
+    ############################################################ Lifecycle
+
+    async def start(self):
+        """
+        Start the servers on free ports and set `binance_url`, `binance_stream_url` and `bybit_url`.
+        """
+        self.binance_url = await self._serve(self._binance_app())
+        self.bybit_url = await self._serve(self._bybit_app())
+        self._ws_server = await websockets.serve(self._stream, self.host, 0)
+        port = self._ws_server.sockets[0].getsockname()[1]
+        self.binance_stream_url = f"ws://{self.host}:{port}/stream"
+
+    async def stop(self):
+        """
+        Stop the servers.
+        """
+        if self._ws_server is not None:
+            self._ws_server.close()
+            await self._ws_server.wait_closed()
+        for server, task in self._servers:
+            server.should_exit = True
+            await task
+
+    async def _serve(self, app: FastAPI) -> str:
+        server = uvicorn.Server(
+            uvicorn.Config(
+                app,
+                host=self.host,
+                port=0,
+                log_level="warning",
+                access_log=False,
+                lifespan="off",
+            )
+        )
+        task = asyncio.create_task(server.serve())
+        while not server.started:
+            await asyncio.sleep(0.01)
+        self._servers.append((server, task))
+        return f"http://{self.host}:{bound_port(server)}"
+
+    ############################################################ Orders
+
+    def on_order(self, listener):
+        """
+        Call `listener(exchange, symbol, side, received_at)` for every accepted order;
+        `received_at` is a `time.perf_counter()` value.
+        """
+        self._order_listeners.append(listener)
+
+    def _record_order(self, exchange: str, symbol: str, side: str):
+        received_at = time.perf_counter()
+        self.orders.append((exchange, symbol, side, received_at))
+        for listener in self._order_listeners:
+            listener(exchange, symbol, side, received_at)
+
+    def _reject(self, reason: str):
+        self.rejected[reason] = self.rejected.get(reason, 0) + 1
+
+    ############################################################ Binance REST
+
+    def _binance_app(self) -> FastAPI:
+        app = FastAPI()
+
+        @app.get("/api/v3/time")
+        async def server_time():
+            return {"serverTime": _now_ms()}
+
+        @app.get("/api/v3/ticker/price")
+        async def ticker_price(symbol: str = None, symbols: str = None):
+            await self._delay()
+            price = f"{self.price:.8f}"
+            if symbols is not None:
+                return [{"symbol": s, "price": price} for s in json.loads(symbols)]
+            return {"symbol": symbol, "price": price}
+
+        @app.get("/api/v3/ticker/24hr")
+        async def ticker_24hr(symbol: str):
+            await self._delay()
+            price = f"{self.price:.8f}"
+            return {"symbol": symbol, "lastPrice": price, "openPrice": price}
+
+        @app.post("/api/v3/order")
+        async def order(request: Request):
+            await self._delay()
+            query = request.url.query
+            error = self._check_binance_signature(request, query)
+            if error is not None:
+                self._reject(error["msg"])
+                return JSONResponse(error, status_code=400)
+            params = dict(pair.split("=", 1) for pair in query.split("&"))
+            self._record_order("binance", params["symbol"], params["side"])
+            order_id = next(self._order_ids)
+            transact_time = _now_ms()
+            await self._publish_fill(params, order_id, transact_time)
+            response = {
+                "symbol": params["symbol"],
+                "orderId": order_id,
+                "transactTime": transact_time,
+                "status": "FILLED",
+                "type": params.get("type"),
+                "side": params["side"],
+                "clientOrderId": params.get("newClientOrderId"),
+                "origQty": params.get("quantity"),
+                "executedQty": params.get("quantity"),
+                "cummulativeQuoteQty": f"{float(params['quantity']) * self.price:.8f}",
+            }
+            self.binance_orders.setdefault(params["symbol"], []).append(
+                {**response, "time": transact_time, "updateTime": transact_time}
+            )
+            return response
+
+        @app.delete("/api/v3/order")
+        @app.delete("/api/v3/openOrders")
+        async def cancel(request: Request):
+            await self._delay()
+            error = self._check_binance_signature(request, request.url.query)
+            if error is not None:
+                self._reject(error["msg"])
+                return JSONResponse(error, status_code=400)
+            # Every order is a market order that fills at once, so none can be canceled.
+            return JSONResponse(
+                {"code": -2011, "msg": "Unknown order sent."}, status_code=400
+            )
+
+        @app.get("/api/v3/allOrders")
+        async def all_orders(request: Request, symbol: str):
+            await self._delay()
+            error = self._check_binance_signature(request, request.url.query)
+            if error is not None:
+                self._reject(error["msg"])
+                return JSONResponse(error, status_code=400)
+            return self.binance_orders.get(symbol, [])[-500:]
+
+        @app.get("/api/v3/account")
+        async def account(request: Request):
+            await self._delay()
+            error = self._check_binance_signature(request, request.url.query)
+            if error is not None:
+                self._reject(error["msg"])
+                return JSONResponse(error, status_code=400)
+            return {
+                "canTrade": True,
+                "updateTime": _now_ms(),
+                "balances": [
+                    {"asset": "USDT", "free": "1000000.00000000", "locked": "0.00000000"}
+                ],
+            }
+
+        @app.get("/api/v3/openOrders")
+        async def open_orders(request: Request):
+            await self._delay()
+            error = self._check_binance_signature(request, request.url.query)
+            if error is not None:
+                self._reject(error["msg"])
+                return JSONResponse(error, status_code=400)
+            # Every order is a market order that fills at once.
+            return []
+
+        @app.post("/api/v3/userDataStream")
+        async def create_listen_key(request: Request):
+            if request.headers.get("X-MBX-APIKEY") != self.binance_key:
+                return JSONResponse(
+                    {"code": -2014, "msg": "API-key format invalid."}, status_code=400
+                )
+            listen_key = f"listenkey{next(self._order_ids)}"
+            self._listen_keys.add(listen_key)
+            return {"listenKey": listen_key}
+
+        @app.put("/api/v3/userDataStream")
+        @app.delete("/api/v3/userDataStream")
+        async def listen_key(listenKey: str):
+            if listenKey not in self._listen_keys:
+                return JSONResponse(
+                    {"code": -1125, "msg": "This listenKey does not exist."},
+                    status_code=400,
+                )
+            return {}
+
+        return app
+
+    def _check_binance_signature(self, request: Request, query: str):
+        if request.headers.get("X-MBX-APIKEY") != self.binance_key:
+            return {"code": -2014, "msg": "API-key format invalid."}
+        signed, _, signature = query.rpartition("&signature=")
+        if not signed or not _valid_hmac(self.binance_secret, signed, signature):
+            return {"code": -1022, "msg": "Signature for this request is not valid."}
+        params = dict(pair.split("=", 1) for pair in signed.split("&"))
+        if _timestamp_rejected(
+            int(params.get("timestamp", 0)), int(params.get("recvWindow", 5000))
+        ):
+            return {
+                "code": -1021,
+                "msg": "Timestamp for this request is outside of the recvWindow.",
+            }
+        return None
+
+    ############################################################ Binance websocket
+
+    async def _stream(self, ws):
+        if ws.request.path.startswith("/ws/"):
+            await self._user_stream(ws)
+            return
+        streams = self._connections[ws] = set()
+        try:
+            async for message in ws:
+                request = json.loads(message)
+                if request.get("method") == "SUBSCRIBE":
+                    streams.update(request["params"])
+                    for stream in request["params"]:
+                        self._subscribed_event(stream).set()
+                elif request.get("method") == "UNSUBSCRIBE":
+                    streams.difference_update(request["params"])
+                await ws.send(json.dumps({"result": None, "id": request.get("id")}))
+        except websockets.ConnectionClosed:
+            pass
+        finally:
+            del self._connections[ws]
+
+    def _subscribed_event(self, stream: str) -> asyncio.Event:
+        event = self._subscribed.get(stream)
+        if event is None:
+            event = self._subscribed[stream] = asyncio.Event()
+        return event
+
+    def subscribed_streams(self) -> set:
+        """
+        Return the streams that at least one connection is subscribed to.
+        """
+        return set().union(*self._connections.values())
+
+    async def wait_subscribed(self, stream: str, timeout: float) -> bool:
+        """
+        Wait until a connection has subscribed to `stream`.
+
+        Returns:
+            bool: False if it was not subscribed within `timeout` seconds.
+        """
+        try:
+            await asyncio.wait_for(self._subscribed_event(stream).wait(), timeout)
+            return True
+        except asyncio.TimeoutError:
+            return False
+
+    async def publish_trade(self, symbol: str, price: float):
+        """
+        Send a trade event of `symbol` to every connection subscribed to its trade stream.
+        """
+        stream = f"{symbol.lower()}@trade"
+        now = _now_ms()
+        message = json.dumps(
+            {
+                "stream": stream,
+                "data": {
+                    "e": "trade",
+                    "E": now,
+                    "s": symbol.upper(),
+                    "t": next(self._trade_ids),
+                    "p": f"{price:.8f}",
+                    "q": "1.00000000",
+                    "T": now,
+                    "m": False,
+                    "M": True,
+                },
+            }
+        )
+        for ws, streams in list(self._connections.items()):
+            if stream in streams:
+                try:
+                    await ws.send(message)
+                except websockets.ConnectionClosed:
+                    continue
+                self.trades_published += 1
+
+    async def publish_trades(self, rate: float, low: float, high: float):
+        """
+        Publish trades at random prices in [low, high] on the subscribed trade streams, at
+        `rate` trades per second in total, until cancelled.
+        """
+        interval = 1 / rate
+        next_at = time.perf_counter()
+        while True:
+            next_at += interval
+            await asyncio.sleep(max(0.0, next_at - time.perf_counter()))
+            streams = [s for s in self.subscribed_streams() if s.endswith("@trade")]
+            if streams:
+                symbol = random.choice(streams).split("@")[0]
+                await self.publish_trade(symbol, random.uniform(low, high))
+
+    ############################################################ Binance user data stream
+
+    async def _user_stream(self, ws):
+        if ws.request.path[len("/ws/") :] not in self._listen_keys:
+            await ws.close(1008, "Invalid listenKey")
+            return
+        self._user_streams.add(ws)
+        try:
+            await ws.wait_closed()
+        finally:
+            self._user_streams.discard(ws)
+
+    async def _publish_fill(self, params: dict, order_id: int, transact_time: int):
+        quantity = params.get("quantity", "0")
+        price = f"{self.price:.8f}"
+        report = {
+            "e": "executionReport",
+            "E": transact_time,
+            "s": params["symbol"],
+            "c": params.get("newClientOrderId", f"sim{order_id}"),
+            "S": params["side"],
+            "o": params.get("type", "MARKET"),
+            "f": "GTC",
+            "q": quantity,
+            "p": "0.00000000",
+            "P": "0.00000000",
+            "F": "0.00000000",
+            "g": -1,
+            "C": "",
+            "x": "NEW",
+            "X": "NEW",
+            "r": "NONE",
+            "i": order_id,
+            "l": "0.00000000",
+            "z": "0.00000000",
+            "L": "0.00000000",
+            "n": "0",
+            "N": None,
+            "T": transact_time,
+            "t": -1,
+            "w": True,
+            "m": False,
+            "O": transact_time,
+            "Z": "0.00000000",
+            "Y": "0.00000000",
+            "Q": "0.00000000",
+        }
+        fill = dict(
+            report,
+            x="TRADE",
+            X="FILLED",
+            l=quantity,
+            z=quantity,
+            L=price,
+            n="0.00000000",
+            N="USDT",
+            t=next(self._trade_ids),
+            w=False,
+            Z=f"{float(quantity) * self.price:.8f}",
+            Y=f"{float(quantity) * self.price:.8f}",
+        )
+        position = {
+            "e": "outboundAccountPosition",
+            "E": transact_time,
+            "u": transact_time,
+            "B": [{"a": "USDT", "f": "1000000.00000000", "l": "0.00000000"}],
+        }
+        for event in (report, fill, position):
+            message = json.dumps(event)
+            for ws in list(self._user_streams):
+                try:
+                    await ws.send(message)
+                except websockets.ConnectionClosed:
+                    continue
+                self.user_data_events += 1
+
+    ############################################################ Bybit REST
+
+    def _bybit_app(self) -> FastAPI:
+        app = FastAPI()
+
+        @app.get("/v5/market/time")
+        async def server_time():
+            now = time.time_ns()
+            return self._bybit_response(
+                {"timeSecond": str(now // 10**9), "timeNano": str(now)}
+            )
+
+        @app.get("/v5/order/realtime")
+        @app.get("/v5/position/list")
+        async def empty_list(request: Request):
+            await self._delay()
+            error = self._check_bybit_signature(request, request.url.query)
+            if error is not None:
+                self._reject(error[1])
+                return {"retCode": error[0], "retMsg": error[1], "result": {}}
+            return self._bybit_response({"list": [], "nextPageCursor": ""})
+
+        @app.post("/v5/order/create")
+        async def order(request: Request):
+            await self._delay()
+            body = (await request.body()).decode()
+            error = self._check_bybit_signature(request, body)
+            if error is not None:
+                self._reject(error[1])
+                return {"retCode": error[0], "retMsg": error[1], "result": {}}
+            params = json.loads(body)
+            return self._bybit_response(self._bybit_order(params))
+
+        @app.post("/v5/order/create-batch")
+        async def batch_order(request: Request):
+            await self._delay()
+            body = (await request.body()).decode()
+            error = self._check_bybit_signature(request, body)
+            if error is not None:
+                self._reject(error[1])
+                return {"retCode": error[0], "retMsg": error[1], "result": {}}
+            params = json.loads(body)
+            orders = [
+                {
+                    "category": params["category"],
+                    **self._bybit_order({**order, "category": params["category"]}),
+                }
+                for order in params["request"]
+            ]
+            return self._bybit_batch_response(orders, [0] * len(orders))
+
+        @app.post("/v5/order/cancel")
+        @app.post("/v5/order/cancel-batch")
+        async def cancel_order(request: Request):
+            await self._delay()
+            body = (await request.body()).decode()
+            error = self._check_bybit_signature(request, body)
+            if error is not None:
+                self._reject(error[1])
+                return {"retCode": error[0], "retMsg": error[1], "result": {}}
+            params = json.loads(body)
+            orders, codes = [], []
+            for order in params.get("request", [params]):
+                canceled = self._bybit_cancel(order)
+                orders.append(
+                    canceled or {"orderId": "", "orderLinkId": order.get("orderLinkId", "")}
+                )
+                codes.append(0 if canceled else 110001)
+            if "request" not in params:
+                if codes[0]:
+                    return {"retCode": 110001, "retMsg": "Order does not exist.", "result": {}}
+                return self._bybit_response(orders[0])
+            return self._bybit_batch_response(orders, codes)
+
+        @app.post("/v5/order/cancel-all")
+        async def cancel_all(request: Request):
+            await self._delay()
+            body = (await request.body()).decode()
+            error = self._check_bybit_signature(request, body)
+            if error is not None:
+                self._reject(error[1])
+                return {"retCode": error[0], "retMsg": error[1], "result": {}}
+            params = json.loads(body)
+            canceled = [
+                self._bybit_cancel({"orderId": order_id})
+                for order_id, (category, symbol, _) in list(self.bybit_open_orders.items())
+                if category == params["category"]
+                and params.get("symbol") in (None, symbol)
+            ]
+            return self._bybit_response({"list": canceled, "success": "1"})
+
+        return app
+
+    def _check_bybit_signature(self, request: Request, body: str):
+        headers = request.headers
+        if headers.get("X-BAPI-API-KEY") != self.bybit_key:
+            return 10003, "API key is invalid."
+        timestamp = headers.get("X-BAPI-TIMESTAMP", "0")
+        recv_window = headers.get("X-BAPI-RECV-WINDOW", "5000")
+        payload = timestamp + self.bybit_key + recv_window + body
+        if not _valid_hmac(self.bybit_secret, payload, headers.get("X-BAPI-SIGN")):
+            return 10004, "error sign!"
+        if _timestamp_rejected(int(float(timestamp)), int(recv_window)):
+            return (
+                10002,
+                "invalid request, please check your server timestamp or recv_window param",
+            )
+        return None
+
+    def _bybit_order(self, params: dict) -> dict:
+        # Bybit orders are accepted and stay open until canceled.
+        self._record_order("bybit", params["symbol"], params["side"])
+        order_id = str(next(self._order_ids))
+        order_link_id = params.get("orderLinkId", "")
+        self.bybit_open_orders[order_id] = (
+            params.get("category"),
+            params["symbol"],
+            order_link_id,
+        )
+        return {"orderId": order_id, "orderLinkId": order_link_id}
+
+    def _bybit_cancel(self, params: dict):
+        order_id = params.get("orderId") or next(
+            (
+                order_id
+                for order_id, (_, _, order_link_id) in self.bybit_open_orders.items()
+                if params.get("orderLinkId") and order_link_id == params["orderLinkId"]
+            ),
+            None,
+        )
+        if order_id not in self.bybit_open_orders:
+            return None
+        _, _, order_link_id = self.bybit_open_orders.pop(order_id)
+        return {"orderId": order_id, "orderLinkId": order_link_id}
+
+    def _bybit_batch_response(self, orders: list, codes: list) -> dict:
+        response = self._bybit_response({"list": orders})
+        response["retExtInfo"] = {
+            "list": [
+                {"code": code, "msg": "OK" if code == 0 else "Order does not exist."}
+                for code in codes
+            ]
+        }
+        return response
+
+    @staticmethod
+    def _bybit_response(result: dict) -> dict:
+        return {
+            "retCode": 0,
+            "retMsg": "OK",
+            "result": result,
+            "retExtInfo": {},
+            "time": _now_ms(),
+        }
+
+    async def _delay(self):
+        if self.latency:
+            await asyncio.sleep(self.latency)
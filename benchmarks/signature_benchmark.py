@@ -0,0 +1,113 @@
+"""
+Webhook signature verifications per second, parsing the PEM key per call versus once.
+
+A throwaway RSA key pair is generated and used to sign an indicator payload in the
+format MarketRaker sends. The benchmark then verifies that signature repeatedly:
+
+- "pem per call" parses the PEM public key on every verification (the previous
+  behaviour of `verify_signature`).
+- "verifier" uses `SignatureVerifier`, which holds the parsed key.
+- "verifier, rotated" uses a verifier holding a retired key as primary and the signing
+  key second, the worst case during a key rotation.
+
+Run from the repository root:
+    python -m benchmarks.signature_benchmark --iterations 2000
+"""
+
+import argparse
+import base64
+import json
+import time
+
+from cryptography.hazmat.primitives import hashes, serialization
+from cryptography.hazmat.primitives.asymmetric import rsa
+from cryptography.hazmat.backends import default_backend
+
+from app.utils.Signature_Verifier import SignatureVerifier, PSS_PADDING
+
+
+PAYLOAD = json.dumps(
+    {
+        "type": "indicator",
+        "data": json.dumps(
+            {
+                "trading_type": "Long",
+                "leverage": 1,
+                "buy_price": 205.0,
+                "sell_price": 215.0,
+                "market_direction": "Bull",
+                "percentage_change": 5.1,
+                "stoploss": 200,
+                "trading_pair": "SOL/USD",
+            }
+        ),
+    }
+)
+
+
+def generate_key_pair():
+    private_key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+    public_pem = (
+        private_key.public_key()
+        .public_bytes(
+            serialization.Encoding.PEM,
+            serialization.PublicFormat.SubjectPublicKeyInfo,
+        )
+        .decode("utf-8")
+    )
+    return private_key, public_pem
+
+
+def verify_pem_per_call(payload: str, signature: str, public_key_str: str) -> bool:
+    public_key = serialization.load_pem_public_key(
+        public_key_str.encode("utf-8"), backend=default_backend()
+    )
+    public_key.verify(
+        base64.b64decode(signature.encode("utf-8")),
+        payload.encode("utf-8"),
+        PSS_PADDING,
+        hashes.SHA256(),
+    )
+    return True
+
+
+def measure(name: str, verify, iterations: int):
+    start = time.perf_counter()
+    for _ in range(iterations):
+        assert verify()
+    elapsed = time.perf_counter() - start
+    print(
+        f"{name:>18}: {iterations / elapsed:10.0f} verifications/s "
+        f"({elapsed / iterations * 1e6:.1f} us each)"
+    )
+
+
+def main(iterations: int):
+    private_key, public_pem = generate_key_pair()
+    _, retired_pem = generate_key_pair()
+    signature = base64.b64encode(
+        private_key.sign(PAYLOAD.encode("utf-8"), PSS_PADDING, hashes.SHA256())
+    ).decode("utf-8")
+
+    verifier = SignatureVerifier([public_pem])
+    rotated = SignatureVerifier([retired_pem, public_pem])
+    payload_bytes = PAYLOAD.encode("utf-8")
+
+    measure(
+        "pem per call",
+        lambda: verify_pem_per_call(PAYLOAD, signature, public_pem),
+        iterations,
+    )
+    measure("verifier", lambda: verifier.verify(payload_bytes, signature), iterations)
+    measure(
+        "verifier, rotated",
+        lambda: rotated.verify(payload_bytes, signature),
+        iterations,
+    )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--iterations", type=int, default=2000)
+    args = parser.parse_args()
+    main(args.iterations)